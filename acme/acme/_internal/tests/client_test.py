@@ -1,15 +1,22 @@
 """Tests for acme.client."""
 # pylint: disable=too-many-lines
+import asyncio
+import contextlib
 import copy
 import datetime
 import http.client as http_client
+import http.server
 import json
+import os
 import sys
+import threading
+import time
 from typing import Dict
 import unittest
 from unittest import mock
 
 import josepy as jose
+import OpenSSL
 import pytest
 import requests
 
@@ -21,10 +28,12 @@ from acme._internal.tests import messages_test
 from acme._internal.tests import test_util
 from acme.client import ClientNetwork
 from acme.client import ClientV2
+from acme.client import PollingStrategy
 
 CERT_SAN_PEM = test_util.load_vector('cert-san.pem')
 CSR_MIXED_PEM = test_util.load_vector('csr-mixed.pem')
 CSR_NO_SANS_PEM = test_util.load_vector('csr-nosans.pem')
+CSR_6SANS_PEM = test_util.load_vector('csr-6sans.pem')
 KEY = jose.JWKRSA.load(test_util.load_vector('rsa512_key.pem'))
 
 DIRECTORY_V2 = messages.Directory({
@@ -36,6 +45,22 @@ DIRECTORY_V2 = messages.Directory({
 })
 
 
+@contextlib.contextmanager
+def _patch_post_as_get(side_effect):
+    """Answer the POST-as-GET requests of ClientV2 with the responses of side_effect.
+
+    Yields the mock of the requests whose JSON body is decoded.
+
+    """
+    def post_as_get_json(*args, **kwargs):
+        response = side_effect(*args, **kwargs)
+        return response, response.json()
+    with mock.patch('acme.client.ClientV2._post_as_get', side_effect=side_effect):
+        with mock.patch('acme.client.ClientV2._post_as_get_json',
+                        side_effect=post_as_get_json) as mock_post_as_get_json:
+            yield mock_post_as_get_json
+
+
 class ClientV2Test(unittest.TestCase):
     """Tests for acme.client.ClientV2."""
 
@@ -46,6 +71,11 @@ class ClientV2Test(unittest.TestCase):
         self.net.post.return_value = self.response
         self.net.get.return_value = self.response
 
+        def post_json(*args, **kwargs):
+            response = self.net.post(*args, **kwargs)
+            return response, response.json()
+        self.net._post_json.side_effect = post_json  # pylint: disable=protected-access
+
         self.identifier = messages.Identifier(
             typ=messages.IDENTIFIER_FQDN, value='example.com')
 
@@ -159,12 +189,13 @@ class ClientV2Test(unittest.TestCase):
         authz_response2.json.return_value = self.authz2.to_json()
         authz_response2.headers['Location'] = self.authzr2.uri
 
-        with mock.patch('acme.client.ClientV2._post_as_get') as mock_post_as_get:
-            mock_post_as_get.side_effect = (authz_response, authz_response2)
+        # Authorizations are fetched concurrently, so answer by URL
+        authz_responses = {self.authzr.uri: authz_response,
+                           self.authzr_uri2: authz_response2}
+        with _patch_post_as_get(authz_responses.get):
             assert self.client.new_order(CSR_MIXED_PEM) == self.orderr
 
-        with mock.patch('acme.client.ClientV2._post_as_get') as mock_post_as_get:
-            mock_post_as_get.side_effect = (authz_response, authz_response2)
+        with _patch_post_as_get(authz_responses.get):
             assert self.client.new_order(CSR_NO_SANS_PEM) == self.orderr2
 
     def test_answer_challege(self):
@@ -193,17 +224,40 @@ class ClientV2Test(unittest.TestCase):
         self.client.poll_authorizations.assert_called_once_with(self.orderr, expected_deadline)
         self.client.finalize_order.assert_called_once_with(self.orderr, expected_deadline)
 
+    def _authz_responses(self, *authz_by_uri):
+        """Make _post_as_get answer each authorization URL with the next body."""
+        bodies = {uri: list(authzs) for uri, authzs in authz_by_uri}
+
+        def post_as_get(uri):
+            response = mock.MagicMock(headers={}, links={})
+            response.json.return_value = bodies[uri].pop(0).to_json()
+            return response
+        return _patch_post_as_get(post_as_get)
+
+    @mock.patch('acme.client.time.sleep')
     @mock.patch('acme.client.datetime')
-    def test_poll_authorizations_timeout(self, mock_datetime):
-        now_side_effect = [datetime.datetime(2018, 2, 15),
-                           datetime.datetime(2018, 2, 16),
-                           datetime.datetime(2018, 2, 17)]
-        mock_datetime.datetime.now.side_effect = now_side_effect
-        self.response.json.side_effect = [
-            self.authz.to_json(), self.authz2.to_json(), self.authz2.to_json()]
+    def test_poll_authorizations_timeout(self, mock_datetime, mock_sleep):
+        now = [datetime.datetime(2018, 2, 15)]
 
-        with pytest.raises(errors.TimeoutError):
-            self.client.poll_authorizations(self.orderr, now_side_effect[1])
+        def advance(seconds):
+            now[0] += datetime.timedelta(seconds=seconds)
+        mock_datetime.datetime.now.side_effect = lambda: now[0]
+        mock_datetime.timedelta = datetime.timedelta
+        mock_sleep.side_effect = advance
+        deadline = now[0] + datetime.timedelta(seconds=2.5)
+        self.client.polling = PollingStrategy(jitter=0)
+
+        with self._authz_responses((self.authzr.uri, [self.authz]),
+                                   (self.authzr_uri2, [self.authz2] * 3)) as mock_get:
+            with pytest.raises(errors.TimeoutError):
+                self.client.poll_authorizations(self.orderr, deadline)
+        # Polled both right away, the pending one again at 1s. The next poll
+        # would be at 3s, so it is made at the deadline before giving up.
+        assert mock_get.call_count == 4
+        assert now[0] == deadline
+        stats = self.client.polling.stats[self.orderr.uri]['authorizations']
+        assert (stats.polls, stats.waited) == (4, 2.5)
+        assert stats.elapsed is not None
 
     def test_poll_authorizations_failure(self):
         deadline = datetime.datetime(9999, 9, 9)
@@ -222,9 +276,60 @@ class ClientV2Test(unittest.TestCase):
             body=updated_authz2, uri=self.authzr_uri2)
         updated_orderr = self.orderr.update(authorizations=[self.authzr, updated_authzr2])
 
-        self.response.json.side_effect = (
-            self.authz.to_json(), self.authz2.to_json(), updated_authz2.to_json())
-        assert self.client.poll_authorizations(self.orderr, deadline) == updated_orderr
+        with self._authz_responses((self.authzr.uri, [self.authz]),
+                                   (self.authzr_uri2, [self.authz2, updated_authz2])):
+            assert self.client.poll_authorizations(self.orderr, deadline) == updated_orderr
+
+    @mock.patch('acme.client.time.sleep')
+    def test_poll_authorizations_decodes_pending_lazily(self, unused_mock_sleep):
+        deadline = datetime.datetime(9999, 9, 9)
+        updated_authz2 = self.authz2.update(status=messages.STATUS_VALID)
+        self.client.polling = PollingStrategy(immediate_first_poll=True, initial_delay=0)
+
+        with self._authz_responses((self.authzr.uri, [self.authz]),
+                                   (self.authzr_uri2, [self.authz2] * 3 + [updated_authz2])), \
+                mock.patch('acme.messages.Authorization.from_json',
+                           wraps=messages.Authorization.from_json) as mock_from_json:
+            orderr = self.client.poll_authorizations(self.orderr, deadline)
+        # Only the final response of each authorization is fully decoded
+        assert mock_from_json.call_count == 2
+        assert orderr.authorizations[1].body == updated_authz2
+
+    @mock.patch('acme.client.time.sleep')
+    @mock.patch('acme.client.datetime')
+    def test_poll_authorizations_retry_after(self, mock_datetime, mock_sleep):
+        now = [datetime.datetime(2018, 2, 15)]
+
+        def advance(seconds):
+            now[0] += datetime.timedelta(seconds=seconds)
+        mock_datetime.datetime.now.side_effect = lambda: now[0]
+        mock_datetime.timedelta = datetime.timedelta
+        mock_sleep.side_effect = advance
+        authz = self.authz.update(status=messages.STATUS_PENDING)
+        retry_after = {self.authzr.uri: '5', self.authzr_uri2: '2'}
+        bodies = {self.authzr.uri: [authz, authz.update(status=messages.STATUS_VALID)],
+                  self.authzr_uri2: [self.authz2, self.authz2,
+                                     self.authz2.update(status=messages.STATUS_VALID)]}
+        polled = []
+
+        def post_as_get(uri):
+            polled.append((uri, now[0]))
+            response = mock.MagicMock(headers={'Retry-After': retry_after[uri]}, links={})
+            response.json.return_value = bodies[uri].pop(0).to_json()
+            return response
+
+        deadline = now[0] + datetime.timedelta(seconds=90)
+        self.client.polling = PollingStrategy(immediate_first_poll=True)
+        with _patch_post_as_get(post_as_get):
+            orderr = self.client.poll_authorizations(self.orderr, deadline)
+        assert [authzr.body.status for authzr in orderr.authorizations] == \
+            [messages.STATUS_VALID, messages.STATUS_VALID]
+        # Each authorization was polled again after its own Retry-After
+        start = datetime.datetime(2018, 2, 15)
+        assert sorted((when - start).seconds for uri, when in polled
+                      if uri == self.authzr_uri2) == [0, 2, 4]
+        assert sorted((when - start).seconds for uri, when in polled
+                      if uri == self.authzr.uri) == [0, 5]
 
     def test_poll_unexpected_update(self):
         updated_authz = self.authz.update(identifier=self.identifier.update(value='foo'))
@@ -266,6 +371,30 @@ class ClientV2Test(unittest.TestCase):
         with pytest.raises(errors.TimeoutError):
             self.client.finalize_order(self.orderr, deadline)
 
+    @mock.patch('acme.client.time.sleep')
+    def test_finalize_order_polling(self, mock_sleep):
+        self.client.polling = PollingStrategy(initial_delay=0.5, backoff=3, max_delay=2, jitter=0)
+        pending = self.order.update(status=messages.STATUS_PROCESSING)
+        valid = self.order.update(certificate='https://www.letsencrypt-demo.org/acme/cert/',
+                                  status=messages.STATUS_VALID)
+        # The first order is the response to the finalization request
+        orders = [pending, pending, pending, pending, valid]
+        self.response.json.side_effect = lambda: orders.pop(0).to_json()
+
+        deadline = datetime.datetime(9999, 9, 9)
+        self.client.finalize_order(self.orderr, deadline)
+        assert [c[0][0] for c in mock_sleep.call_args_list] == [0.5, 1.5, 2]
+
+        # The Retry-After header of the finalization response is honored too
+        orders[:] = [pending, pending, valid]
+        self.response.headers['Retry-After'] = '7'
+        mock_sleep.reset_mock()
+        self.client.finalize_order(self.orderr, deadline)
+        assert mock_sleep.call_count == 2
+        assert all(6 < c[0][0] <= 7 for c in mock_sleep.call_args_list)
+        stats = self.client.polling.stats[self.orderr.uri]['finalization']
+        assert (stats.polls, stats.retry_after) == (2, 2)
+
     def test_finalize_order_alt_chains(self):
         updated_order = self.order.update(
             certificate='https://www.letsencrypt-demo.org/acme/cert/',
@@ -293,6 +422,52 @@ class ClientV2Test(unittest.TestCase):
         resp = self.client.finalize_order(self.orderr, deadline, fetch_alternative_chains=True)
         assert resp == updated_orderr.update(alternative_fullchains_pem=[])
 
+    def test_finalize_order_alt_chains_predicate(self):
+        self.response.json.return_value = self.order.update(
+            certificate='https://www.letsencrypt-demo.org/acme/cert/',
+            status=messages.STATUS_VALID).to_json()
+        self.response.headers['Link'] = ', '.join(
+            '<https://example.com/acme/cert/{0}>;rel="alternate"'.format(i) for i in (1, 2, 3))
+        fetched = []
+
+        def post_as_get(url):
+            fetched.append(url)
+            if not url.startswith('https://example.com/acme/cert/'):
+                return self.response
+            return mock.MagicMock(text=url, headers={})
+        self.client.polling = PollingStrategy(immediate_first_poll=True)
+        deadline = datetime.datetime(9999, 9, 9)
+        checked = []
+
+        def is_wanted(position, chain):
+            checked.append((position, chain))
+            return chain == 'https://example.com/acme/cert/2'
+
+        with _patch_post_as_get(post_as_get):
+            resp = self.client.poll_finalization(
+                self.orderr, deadline, fetch_alternative_chains=True, chain_predicate=is_wanted)
+            assert resp.alternative_fullchains_pem == ['https://example.com/acme/cert/1',
+                                                       'https://example.com/acme/cert/2']
+            assert [position for position, _ in checked] == [0, 1, 2]
+            assert 'https://example.com/acme/cert/3' not in fetched
+
+            # The hinted chain is fetched first
+            del fetched[:]
+            resp = self.client.poll_finalization(
+                self.orderr, deadline, fetch_alternative_chains=True,
+                chain_predicate=is_wanted, chain_hint=2)
+            assert resp.alternative_fullchains_pem == ['https://example.com/acme/cert/2']
+            assert fetched[-1] == 'https://example.com/acme/cert/2'
+            assert len(fetched) == 3  # order, certificate, alternative chain
+
+            # No alternative chain is fetched if the default one is wanted
+            del fetched[:]
+            resp = self.client.poll_finalization(
+                self.orderr, deadline, fetch_alternative_chains=True,
+                chain_predicate=lambda position, chain: True, chain_hint=2)
+            assert resp.alternative_fullchains_pem == []
+            assert len(fetched) == 2
+
     def test_revoke(self):
         self.client.revoke(messages_test.CERT, self.rsn)
         self.net.post.assert_called_once_with(
@@ -446,6 +621,50 @@ class ClientNetworkTest(unittest.TestCase):
         assert jws.signature.combined.kid == u'acct-uri'
         assert jws.signature.combined.url == u'url'
 
+    def test_wrap_in_jws_compact_and_verifiable(self):
+        # pylint: disable=protected-access
+        jws_dump = self.net._wrap_in_jws(
+            MockJSONDeSerializable('foo'), nonce=b'Tg', url="url")
+        assert not any(char.isspace() for char in jws_dump)
+        jws = acme_jws.JWS.json_loads(jws_dump)
+        assert jws.payload == b'{"foo":"foo"}'
+        assert jws.verify(KEY.public_key())
+        assert jws.signature.combined.jwk == KEY.public_key()
+        assert jws.signature.combined.kid is None
+        assert acme_jws.JWS.json_loads(
+            self.net._wrap_in_jws(None, nonce=b'Tg', url="url")).payload == b''
+
+    def test_jws_header_is_cached(self):
+        # pylint: disable=protected-access
+        header = self.net._jws_header.fields(self.net.key, self.net.account)
+        assert header == (None, KEY.public_key())
+        with mock.patch('acme.client._jws_header_fields') as mock_fields:
+            self.net._wrap_in_jws(MockJSONDeSerializable('foo'), nonce=b'Tg', url="url")
+            mock_fields.assert_not_called()
+        assert self.net._jws_header.fields(self.net.key, self.net.account) is header
+
+        self.net.account = {'uri': 'acct-uri'}
+        assert self.net._jws_header.fields(self.net.key, self.net.account) == ('acct-uri', None)
+
+    def test_check_response_json(self):
+        self.response.json.return_value = {'foo': 'bar'}
+        # pylint: disable=protected-access
+        assert self.net._check_response_json(self.response) == {'foo': 'bar'}
+        assert self.response.json.call_count == 1
+        self.response.json.side_effect = ValueError
+        assert self.net._check_response_json(self.response) is None
+
+    def test_send_request_without_debug_logging(self):
+        self.response.headers = mock.MagicMock()
+        self.net.session = mock.MagicMock()
+        self.net.session.request.return_value = self.response
+        with mock.patch('acme.client.logger') as mock_logger:
+            mock_logger.isEnabledFor.return_value = False
+            # pylint: disable=protected-access
+            self.net._send_request('GET', 'http://example.com/')
+        self.response.headers.items.assert_not_called()
+        assert self.response.encoding == 'utf-8'
+
     def test_check_response_not_ok_jobj_no_error(self):
         self.response.ok = False
         self.response.json.return_value = {}
@@ -681,6 +900,7 @@ class ClientNetworkWithMockedResponseTest(unittest.TestCase):
         self.net._send_request = self.send_request = mock.MagicMock(
             side_effect=send_request)
         self.net._check_response = self.check_response
+        self.net._check_response_json = self.check_response
         self.net._wrap_in_jws = mock.MagicMock(return_value=self.wrapped_obj)
 
     def check_response(self, response, content_type):
@@ -746,7 +966,7 @@ class ClientNetworkWithMockedResponseTest(unittest.TestCase):
         check_response.side_effect = messages.Error.with_code('badNonce')
 
         # pylint: disable=protected-access
-        self.net._check_response = check_response
+        self.net._check_response_json = check_response
         with pytest.raises(messages.Error):
             self.net.post('uri',
                           self.obj, content_type=self.content_type)
@@ -757,7 +977,7 @@ class ClientNetworkWithMockedResponseTest(unittest.TestCase):
                                       self.response]
 
         # pylint: disable=protected-access
-        self.net._check_response = check_response
+        self.net._check_response_json = check_response
         with pytest.raises(messages.Error):
             self.net.post('uri',
                           self.obj, content_type=self.content_type)
@@ -798,6 +1018,443 @@ class ClientNetworkWithMockedResponseTest(unittest.TestCase):
         self.content_type = None
         self.net.post('uri', self.obj, content_type=None, new_nonce_url='new_nonce_uri')
 
+    def test_bad_nonce_retry_uses_error_nonce(self):
+        self.content_type = None
+        check_response = mock.MagicMock(
+            side_effect=[self.response, messages.Error.with_code('badNonce'), self.response])
+        self.net._check_response = check_response  # pylint: disable=protected-access
+        self.net._check_response_json = check_response  # pylint: disable=protected-access
+        assert self.response == self.net.post(
+            'uri', self.obj, content_type=None, new_nonce_url='new_nonce_uri')
+        methods = [call[0][0] for call in self.send_request.call_args_list]
+        assert methods == ['HEAD', 'POST', 'POST']
+        assert self.net.nonce_stats == {'hits': 2, 'misses': 1, 'bad_nonce_retries': 1,
+                                        'expired': 0, 'discarded': 0}
+
+    def test_get_keeps_nonce(self):
+        self.net.get('http://example.com/', content_type=self.content_type)
+        self.content_type = None
+        self.net.post('uri', self.obj, content_type=None, new_nonce_url='new_nonce_uri')
+        methods = [call[0][0] for call in self.send_request.call_args_list]
+        assert methods == ['GET', 'POST']
+
+    def test_nonce_prefetch(self):
+        self.net = ClientNetwork(key=None, alg=None, nonce_prefetch=2)
+        self.net._send_request = self.send_request  # pylint: disable=protected-access
+        self.net._check_response = self.check_response  # pylint: disable=protected-access
+        self.net._check_response_json = self.check_response  # pylint: disable=protected-access
+        self.net._wrap_in_jws = mock.MagicMock(  # pylint: disable=protected-access
+            return_value=self.wrapped_obj)
+        self.content_type = None
+        self.available_nonces = [jose.b64encode(str(i).encode()) for i in range(10)]
+        self.net.post('uri', self.obj, content_type=None, new_nonce_url='new_nonce_uri')
+        # The pool is refilled in the background
+        for _ in range(100):
+            if len(self.net._nonces) >= 2:  # pylint: disable=protected-access
+                break
+            time.sleep(0.01)
+        assert len(self.net._nonces) >= 2  # pylint: disable=protected-access
+        heads = [call for call in self.send_request.call_args_list if call[0][0] == 'HEAD']
+        assert len(heads) >= 2
+
+
+class NoncePoolTest(unittest.TestCase):
+    """Tests for acme.client._NoncePool."""
+
+    @mock.patch('acme.client.time.monotonic')
+    def test_bounds_and_expiry(self, mock_monotonic):
+        from acme.client import _NoncePool
+        mock_monotonic.return_value = 100
+        pool = _NoncePool(max_size=2, max_age=10)
+        for nonce in ('a', 'b', 'c'):
+            pool.add(nonce)
+        assert len(pool) == 2
+        assert pool.take() == 'b'
+        mock_monotonic.return_value = 105
+        pool.add('d')
+        mock_monotonic.return_value = 111
+        assert pool.take() == 'd'
+        assert pool.take() is None
+        assert pool.stats() == {'hits': 2, 'misses': 1, 'bad_nonce_retries': 0,
+                                'expired': 1, 'discarded': 1}
+
+
+class PollingStrategyTest(unittest.TestCase):
+    """Tests for acme.client.PollingStrategy."""
+
+    def test_backoff(self):
+        polling = PollingStrategy(initial_delay=1, backoff=2, max_delay=5, jitter=0)
+        assert polling.first_delay() == 0
+        assert [polling.next_delay(polls) for polls in range(1, 6)] == [1, 2, 4, 5, 5]
+        assert polling.next_delay(10000) == 5
+        assert PollingStrategy(immediate_first_poll=False).first_delay() == 1
+
+    @mock.patch('acme.client.random.uniform')
+    def test_jitter(self, mock_uniform):
+        polling = PollingStrategy(initial_delay=2, backoff=2, max_delay=5, jitter=0.25)
+        mock_uniform.return_value = -0.25
+        assert polling.next_delay(2) == 3
+        mock_uniform.assert_called_with(-0.25, 0.25)
+        # The jitter doesn't exceed the maximum delay
+        mock_uniform.return_value = 0.25
+        assert polling.next_delay(2) == 5
+
+    def test_retry_after(self):
+        polling = PollingStrategy(max_delay=5, immediate_first_poll=True)
+        stats = polling.start('https://example.com/order/1', 'finalization')
+        response = mock.MagicMock(headers={'Retry-After': '30'})
+        assert 29 < polling.first_delay(response, stats) <= 30
+        assert 29 < polling.next_delay(1, response, stats) <= 30
+        response.headers['Retry-After'] = '0'
+        assert polling.next_delay(5, response, stats) == 0
+        response.headers['Retry-After'] = 'not a date'
+        assert 4 < polling.next_delay(1, response, stats) <= 5
+        assert polling.first_delay(mock.MagicMock(headers={}), stats) == 0
+        assert stats.retry_after == 4
+
+    def test_stats(self):
+        polling = PollingStrategy()
+        polling.start(None, 'authorizations')
+        assert polling.stats == {}
+
+        authz_stats = polling.start('https://example.com/order/0', 'authorizations')
+        finalize_stats = polling.start('https://example.com/order/0', 'finalization')
+        assert polling.stats['https://example.com/order/0'] == {
+            'authorizations': authz_stats, 'finalization': finalize_stats}
+        assert finalize_stats.elapsed is None
+        finalize_stats.finish()
+        assert finalize_stats.elapsed >= 0
+
+        with mock.patch('acme.client._MAX_POLL_STATS', 3):
+            for i in range(1, 4):
+                polling.start('https://example.com/order/{0}'.format(i), 'finalization')
+            # Order 0 was the least recently polled
+            assert list(polling.stats) == ['https://example.com/order/{0}'.format(i)
+                                           for i in range(1, 4)]
+
+
+class _StandInACMEServer(http.server.ThreadingHTTPServer):
+    """Minimal ACME server for the tests of the asyncio client.
+
+    Every identifier of an order gets an authorization with one http-01
+    challenge which becomes valid when answered. Orders become valid
+    when finalized. JWS signatures, URLs and nonces are checked.
+
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _StandInACMEHandler)
+        self.base = 'http://127.0.0.1:{0}'.format(self.server_address[1])
+        self.lock = threading.Lock()
+        self.issued_nonces = set()
+        self.used_nonces = set()
+        self.bad_nonces_to_send = 0
+        self.requests = []
+        self.connections = 0
+        self.open_connections = 0
+        self.max_open_connections = 0
+        self.authzs = {}
+        self.orders = {}
+        self.revoked = []
+        self.thread = threading.Thread(target=self.serve_forever)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+        self.thread.join()
+
+    def new_nonce(self):
+        with self.lock:
+            nonce = jose.b64encode(os.urandom(16)).decode()
+            self.issued_nonces.add(nonce)
+            return nonce
+
+
+class _StandInACMEHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    server: _StandInACMEServer
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+            self.server.open_connections += 1
+            self.server.max_open_connections = max(self.server.max_open_connections,
+                                                   self.server.open_connections)
+
+    def finish(self):
+        super().finish()
+        with self.server.lock:
+            self.server.open_connections -= 1
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+    def _reply(self, status, jobj=None, headers=(), body=None):
+        if body is None:
+            body = json.dumps(jobj).encode() if jobj is not None else b''
+        self.send_response(status)
+        self.send_header('Replay-Nonce', self.server.new_nonce())
+        self.send_header('Content-Length', str(len(body)))
+        if jobj is not None:
+            content_type = ('application/problem+json' if status >= 400
+                            else 'application/json')
+            self.send_header('Content-Type', content_type)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_HEAD(self):  # pylint: disable=invalid-name
+        self.server.requests.append(('HEAD', self.path))
+        self._reply(http_client.OK)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.server.requests.append(('GET', self.path))
+        base = self.server.base
+        if self.path == '/moved-directory':
+            self._reply(http_client.MOVED_PERMANENTLY,
+                        headers=[('Location', base + '/directory')])
+            return
+        self._reply(http_client.OK, {
+            'newNonce': base + '/new-nonce',
+            'newOrder': base + '/new-order',
+            'revokeCert': base + '/revoke-cert',
+        })
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        self.server.requests.append(('POST', self.path))
+        jws = acme_jws.JWS.json_loads(self.rfile.read(int(self.headers['Content-Length'])))
+        header = jws.signature.combined
+        with self.server.lock:
+            nonce = jose.b64encode(header.nonce).decode()
+            fresh = (nonce in self.server.issued_nonces and
+                     nonce not in self.server.used_nonces)
+            self.server.used_nonces.add(nonce)
+            if fresh and self.server.bad_nonces_to_send:
+                self.server.bad_nonces_to_send -= 1
+                fresh = False
+        assert jws.verify(KEY.public_key())
+        assert header.url == self.server.base + self.path
+        if not fresh:
+            self._reply(http_client.BAD_REQUEST, {
+                'type': 'urn:ietf:params:acme:error:badNonce', 'detail': 'bad nonce'})
+            return
+        payload = json.loads(jws.payload) if jws.payload else None
+        kind, _, number = self.path.strip('/').partition('/')
+        getattr(self, '_post_' + kind.replace('-', '_'))(payload, number)
+
+    def _order_json(self, number):
+        order = self.server.orders[number]
+        jobj = {
+            'status': order['status'],
+            'identifiers': order['identifiers'],
+            'authorizations': [self.server.base + '/authz/' + authz
+                               for authz in order['authzs']],
+            'finalize': self.server.base + '/finalize/' + number,
+        }
+        if order['status'] == 'valid':
+            jobj['certificate'] = self.server.base + '/cert/' + number
+        return jobj
+
+    def _post_new_order(self, payload, unused_number):
+        with self.server.lock:
+            number = str(len(self.server.orders) + 1)
+            authzs = []
+            for identifier in payload['identifiers']:
+                authz = '{0}-{1}'.format(number, len(authzs))
+                self.server.authzs[authz] = {'identifier': identifier, 'status': 'pending'}
+                authzs.append(authz)
+            self.server.orders[number] = {'identifiers': payload['identifiers'],
+                                          'authzs': authzs, 'status': 'pending'}
+        self._reply(http_client.CREATED, self._order_json(number),
+                    headers=[('Location', self.server.base + '/order/' + number)])
+
+    def _challenge_json(self, authz):
+        return {'type': 'http-01', 'token': 'evaGxfADs6pSRb2LAv9IZf17Dt3juxGJ-PCt92wr-oA',
+                'url': self.server.base + '/chall/' + authz,
+                'status': self.server.authzs[authz]['status']}
+
+    def _post_authz(self, unused_payload, authz):
+        self._reply(http_client.OK, {
+            'identifier': self.server.authzs[authz]['identifier'],
+            'status': self.server.authzs[authz]['status'],
+            'challenges': [self._challenge_json(authz)],
+        })
+
+    def _post_chall(self, unused_payload, authz):
+        self.server.authzs[authz]['status'] = 'valid'
+        self._reply(http_client.OK, self._challenge_json(authz), headers=[
+            ('Link', '<{0}/authz/{1}>;rel="up"'.format(self.server.base, authz))])
+
+    def _post_finalize(self, payload, number):
+        assert 'csr' in payload
+        self.server.orders[number]['status'] = 'processing'
+        self._reply(http_client.OK, self._order_json(number))
+
+    def _post_order(self, unused_payload, number):
+        if self.server.orders[number]['status'] == 'processing':
+            self.server.orders[number]['status'] = 'valid'
+        self._reply(http_client.OK, self._order_json(number))
+
+    def _post_cert(self, unused_payload, number):
+        if number.endswith('-alt'):
+            self._reply(http_client.OK, body=b'alternative chain')
+            return
+        self._reply(http_client.OK, body=CERT_SAN_PEM, headers=[
+            ('Link', '<{0}/cert/{1}-alt>;rel="alternate"'.format(self.server.base, number))])
+
+    def _post_revoke_cert(self, payload, unused_number):
+        self.server.revoked.append(payload)
+        self._reply(http_client.OK)
+
+
+class AsyncClientV2Test(unittest.TestCase):
+    """Tests for acme.client.AsyncClientV2 against a stand-in server."""
+
+    def setUp(self):
+        self.server = _StandInACMEServer()
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+        self.regr = messages.RegistrationResource(
+            body=messages.Registration(), uri=self.server.base + '/acct/1')
+
+    def _run(self, workflow, polling=None, **kwargs):
+        from acme.client import AsyncClientNetwork
+        from acme.client import AsyncClientV2
+
+        async def main():
+            async with AsyncClientNetwork(KEY, account=self.regr, user_agent='acme-test',
+                                          **kwargs) as net:
+                directory = await AsyncClientV2.get_directory(
+                    self.server.base + '/directory', net)
+                return await workflow(AsyncClientV2(directory, net, polling))
+        return asyncio.run(main())
+
+    async def _issue(self, client, csr_pem=CSR_MIXED_PEM):
+        deadline = datetime.datetime.now() + datetime.timedelta(seconds=30)
+        orderr = await client.new_order(csr_pem)
+        await asyncio.gather(*(
+            client.answer_challenge(authzr.body.challenges[0],
+                                    challenges.HTTP01Response())
+            for authzr in orderr.authorizations))
+        orderr = await client.poll_authorizations(orderr, deadline)
+        return await client.finalize_order(orderr, deadline, fetch_alternative_chains=True)
+
+    def test_order_workflow(self):
+        async def workflow(client):
+            orderr = await self._issue(client)
+            authzr, _ = await client.poll(orderr.authorizations[0])
+            cert = jose.ComparableX509(OpenSSL.crypto.load_certificate(
+                OpenSSL.crypto.FILETYPE_PEM, CERT_SAN_PEM))
+            await client.revoke(cert, 1)
+            return orderr, authzr
+
+        orderr, authzr = self._run(workflow)
+        assert orderr.body.status == messages.STATUS_VALID
+        assert [a.body.identifier.value for a in orderr.authorizations] == \
+            ['a.exemple.com', '192.0.2.111']
+        assert all(a.body.status == messages.STATUS_VALID for a in orderr.authorizations)
+        assert authzr == orderr.authorizations[0]
+        assert orderr.fullchain_pem == CERT_SAN_PEM.decode()
+        assert orderr.alternative_fullchains_pem == ['alternative chain']
+        assert self.server.revoked[0]['reason'] == 1
+        # Nonces are only fetched when none is left from previous responses,
+        # which happens once for each of the two concurrent requests
+        assert self.server.requests.count(('HEAD', '/new-nonce')) == 2
+        assert self.server.used_nonces <= self.server.issued_nonces
+        assert self.server.connections <= 2
+
+    def test_concurrent_orders(self):
+        async def workflow(client):
+            return await asyncio.gather(*(self._issue(client, CSR_6SANS_PEM)
+                                          for _ in range(10)))
+
+        orders = self._run(workflow, limit_per_host=3)
+        assert all(orderr.body.status == messages.STATUS_VALID for orderr in orders)
+        assert len({orderr.uri for orderr in orders}) == 10
+        assert self.server.max_open_connections <= 3
+        assert self.server.connections <= 3
+        assert self.server.used_nonces <= self.server.issued_nonces
+
+    def test_bad_nonce_is_retried(self):
+        self.server.bad_nonces_to_send = 1
+
+        async def workflow(client):
+            return await client.new_order(CSR_MIXED_PEM)
+
+        assert len(self._run(workflow).authorizations) == 2
+        assert self.server.requests.count(('POST', '/new-order')) == 2
+
+    def test_poll_authorizations_timeout(self):
+        async def workflow(client):
+            orderr = await client.new_order(CSR_MIXED_PEM)
+            deadline = datetime.datetime.now() + datetime.timedelta(milliseconds=500)
+            await client.poll_authorizations(orderr, deadline)
+
+        with pytest.raises(errors.TimeoutError):
+            self._run(workflow, polling=PollingStrategy(initial_delay=1, jitter=0,
+                                                        immediate_first_poll=False))
+        # Fetched by new_order, then polled at the deadline instead of after it
+        assert self.server.requests.count(('POST', '/authz/1-0')) == 2
+
+    def test_sent_with_requests(self):
+        from acme.client import AsyncClientNetwork
+
+        async def main():
+            async with AsyncClientNetwork(KEY) as net:
+                return await net.get(self.server.base + '/moved-directory')
+
+        with mock.patch('requests.Session.request',
+                        side_effect=requests.Session.request, autospec=True) as mock_request:
+            response = asyncio.run(main())
+        assert response.json()['newOrder'] == self.server.base + '/new-order'
+        assert mock_request.call_args[1]['verify'] is True
+        assert self.server.requests == [('GET', '/moved-directory'), ('GET', '/directory')]
+
+    def test_close_drops_unsent_requests(self):
+        from acme.client import AsyncClientNetwork
+        sending = threading.Event()
+        release = threading.Event()
+
+        def send(*unused_args, **unused_kwargs):
+            sending.set()
+            release.wait(5)
+            return mock.MagicMock()
+
+        async def main():
+            net = AsyncClientNetwork(KEY, limit_per_host=1)
+            with mock.patch.object(net._transport, '_send_request', side_effect=send):
+                sent = asyncio.ensure_future(net.head(self.server.base + '/directory'))
+                unsent = asyncio.ensure_future(net.head(self.server.base + '/directory'))
+                await asyncio.get_running_loop().run_in_executor(None, sending.wait, 5)
+                closing = asyncio.ensure_future(net.close())
+                await asyncio.sleep(0.1)
+                release.set()
+                await closing
+            return await asyncio.gather(sent, unsent, return_exceptions=True)
+
+        sent, unsent = asyncio.run(main())
+        assert not isinstance(sent, BaseException)
+        assert isinstance(unsent, asyncio.CancelledError)
+
+    def test_connection_error(self):
+        from acme.client import AsyncClientNetwork
+
+        async def main():
+            async with AsyncClientNetwork(KEY) as net:
+                await net.get('http://127.0.0.1:1/directory')
+
+        with pytest.raises(errors.ClientError):
+            asyncio.run(main())
+
 
 if __name__ == '__main__':
     sys.exit(pytest.main(sys.argv[1:] + [__file__]))  # pragma: no cover
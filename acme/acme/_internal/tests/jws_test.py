@@ -63,6 +63,15 @@ class JWSTest(unittest.TestCase):
         assert jws.signature.combined.kid is None
         assert jws.signature.combined.jwk == self.pubkey
 
+    def test_precomputed_jwk_serialize(self):
+        from acme.jws import JWS
+        jws = JWS.sign(payload=b'foo', key=self.privkey,
+                       alg=jose.RS256, nonce=self.nonce,
+                       url=self.url, jwk=self.pubkey)
+        assert jws.signature.combined.kid is None
+        assert jws.signature.combined.jwk == self.pubkey
+        assert jws.verify()
+
 
 if __name__ == '__main__':
     sys.exit(pytest.main(sys.argv[1:] + [__file__]))  # pragma: no cover
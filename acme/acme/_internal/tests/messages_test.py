@@ -426,6 +426,71 @@ class AuthorizationTest(unittest.TestCase):
         hash(Authorization.from_json(self.jobj_from))
 
 
+class AuthorizationViewTest(AuthorizationTest):
+    """Tests for acme.messages.AuthorizationView and ChallengeView."""
+
+    def test_view(self):
+        from acme.messages import AuthorizationView
+        from acme.messages import Error
+        from acme.messages import STATUS_PENDING
+        from acme.messages import STATUS_VALID
+        self.jobj_from['status'] = 'valid'
+        self.jobj_from['challenges'][1]['error'] = {'detail': 'failed'}
+        del self.jobj_from['challenges'][1]['status']
+        view = AuthorizationView.from_json(self.jobj_from)
+        assert view.status == STATUS_VALID
+        assert view.identifier == self.authz.identifier
+        assert view.wildcard is None
+        assert view.to_authorization() == self.authz.update(
+            status=STATUS_VALID, challenges=(
+                self.challbs[0],
+                self.challbs[1].update(status=STATUS_PENDING,
+                                       error=Error(detail='failed'))))
+        assert view.to_partial_json() == self.jobj_from
+        assert view == AuthorizationView.from_json(dict(self.jobj_from))
+        assert view != self.authz
+        assert repr(view).startswith('AuthorizationView(')
+
+        first, second = view.challenges
+        assert view.challenges[0] is first
+        assert first.uri == 'http://challb1'
+        assert first.typ == 'http-01'
+        assert first.status == STATUS_VALID
+        assert first.error is None
+        assert first.chall == self.challbs[0].chall
+        assert first.chall is first.chall
+        assert first.to_challenge_body() == self.challbs[0]
+        assert first != second
+        assert second.status == STATUS_PENDING
+        assert second.error == Error(detail='failed')
+        assert second.to_partial_json() == self.jobj_from['challenges'][1]
+        assert repr(second) == 'ChallengeView(dns, http://challb2)'
+
+    def test_view_decodes_lazily(self):
+        from acme.messages import AuthorizationView
+        from acme.messages import STATUS_PENDING
+        self.jobj_from['status'] = 'pending'
+        self.jobj_from['challenges'].append({'type': 'unknown', 'url': 'http://challb3'})
+        view = AuthorizationView.from_json(self.jobj_from)
+        assert view.status == STATUS_PENDING
+        assert view.challenges[2].status == STATUS_PENDING
+        assert isinstance(view.challenges[2].chall, challenges.UnrecognizedChallenge)
+        self.jobj_from['status'] = 'bogus'
+        with pytest.raises(jose.DeserializationError):
+            _ = AuthorizationView.from_json(self.jobj_from).status
+
+    def test_view_not_an_object(self):
+        from acme.messages import AuthorizationView
+        from acme.messages import ChallengeView
+        with pytest.raises(jose.DeserializationError):
+            AuthorizationView.from_json([])
+        with pytest.raises(jose.DeserializationError):
+            ChallengeView.from_json('challenge')
+        assert AuthorizationView.from_json({}).status is None
+        assert AuthorizationView.from_json({}).identifier is None
+        assert AuthorizationView.from_json({}).challenges == ()
+
+
 class AuthorizationResourceTest(unittest.TestCase):
     """Tests for acme.messages.AuthorizationResource."""
 
@@ -1,18 +1,32 @@
 """ACME client API."""
+# pylint: disable=too-many-lines
+import asyncio
 import base64
+import collections
+from concurrent import futures
 import datetime
 from email.utils import parsedate_tz
+import functools
 import http.client as http_client
 import logging
+import math
+import random
 import re
+import threading
 import time
 from typing import Any
+from typing import Awaitable
+from typing import Callable
 from typing import cast
+from typing import Deque
+from typing import Dict
+from typing import Iterator
 from typing import List
 from typing import Mapping
 from typing import Optional
-from typing import Set
+from typing import Sequence
 from typing import Tuple
+from typing import TypeVar
 from typing import Union
 
 from cryptography import x509
@@ -33,22 +47,177 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_NETWORK_TIMEOUT = 45
 
+# Maximum number of authorizations fetched at the same time, which is also
+# the number of connections requests keeps open to each host by default.
+_MAX_AUTHZ_WORKERS = 10
+
+# Maximum number of unused nonces kept by a network object
+DEFAULT_NONCE_POOL_SIZE = 10
+
+# Seconds after which an unused nonce is considered stale and discarded
+DEFAULT_NONCE_MAX_AGE = 60
+
+# Separators of compact JSON, as sent to the ACME server
+_COMPACT_SEPARATORS = (',', ':')
+
+# kid and jwk protected header fields of a JWS, only one of which is set
+_JWSHeaderFields = Tuple[Optional[str], Optional[jose.JWK]]
+
+# Maximum number of orders whose polling statistics a PollingStrategy keeps
+_MAX_POLL_STATS = 100
+
+_T = TypeVar('_T')
+
+
+class PollStats:
+    """Timing statistics of the polling of an order.
+
+    :ivar str order_uri: URI of the order, if known
+    :ivar str phase: what is polled, ``authorizations`` or ``finalization``
+    :ivar int polls: number of requests made
+    :ivar int retry_after: number of delays requested by the server with
+        a ``Retry-After`` header
+    :ivar float waited: seconds spent waiting before polls, waits of
+        resources polled independently add up
+    :ivar float elapsed: seconds from the start to the end of the
+        polling, or None while it is in progress
+
+    """
+    def __init__(self, order_uri: Optional[str], phase: str) -> None:
+        self.order_uri = order_uri
+        self.phase = phase
+        self.polls = 0
+        self.retry_after = 0
+        self.waited = 0.0
+        self.elapsed: Optional[float] = None
+        self._started = time.monotonic()
+
+    def finish(self) -> None:
+        """Record the end of the polling."""
+        self.elapsed = time.monotonic() - self._started
+        logger.debug("Polled %s of order %s %d time(s) in %.1f seconds, including %.1f "
+                     "seconds of waiting and %d delay(s) requested by the server",
+                     self.phase, self.order_uri, self.polls, self.elapsed, self.waited,
+                     self.retry_after)
+
+
+class PollingStrategy:
+    """Decides when to poll a pending ACME resource again.
+
+    A delay requested by the server with the ``Retry-After`` header of
+    the last response is always honored. Otherwise, the delay starts at
+    ``initial_delay`` seconds and is multiplied by ``backoff`` after each
+    poll, up to ``max_delay`` seconds. These delays are randomly
+    lengthened or shortened by up to ``jitter`` times their value so that
+    clients started together don't poll in lockstep. Unless the server
+    requested a delay, the first poll is made right away.
+
+    The statistics of the last pollings are kept in `stats`, keyed by
+    order URI and then by phase.
+
+    :param float initial_delay: seconds to wait before the second poll
+    :param float backoff: factor applied to the delay after each poll
+    :param float max_delay: maximum delay in seconds, unless requested
+        by the server
+    :param float jitter: maximum random change of a delay, as a fraction
+        of it
+    :param bool immediate_first_poll: poll for the first time without
+        waiting, unless the server requested a delay. If False, wait
+        ``initial_delay`` seconds first.
+
+    """
+    def __init__(self, initial_delay: float = 1.0, backoff: float = 2.0,
+                 max_delay: float = 10.0, jitter: float = 0.2,
+                 immediate_first_poll: bool = True) -> None:
+        self.initial_delay = initial_delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.immediate_first_poll = immediate_first_poll
+        self.stats: Dict[str, Dict[str, PollStats]] = {}
+        self._lock = threading.Lock()
+
+    def start(self, order_uri: Optional[str], phase: str) -> PollStats:
+        """Start recording the statistics of a polling.
+
+        :param str order_uri: URI of the order being polled, statistics
+            are only kept in `stats` if it is known
+        :param str phase: what is polled
+
+        """
+        stats = PollStats(order_uri, phase)
+        if order_uri is not None:
+            with self._lock:
+                # Reinserting the order keeps the most recent ones last
+                order_stats = self.stats.pop(order_uri, {})
+                order_stats[phase] = stats
+                self.stats[order_uri] = order_stats
+                while len(self.stats) > _MAX_POLL_STATS:
+                    del self.stats[next(iter(self.stats))]
+        return stats
+
+    def first_delay(self, response: Optional[requests.Response] = None,
+                    stats: Optional[PollStats] = None) -> float:
+        """Seconds to wait before polling a resource for the first time.
+
+        :param requests.Response response: the response that created or
+            updated the resource, if any
+        :param PollStats stats: statistics of the polling
+
+        """
+        delay = self._requested_delay(response, stats)
+        if delay is not None:
+            return delay
+        return 0.0 if self.immediate_first_poll else self.initial_delay
+
+    def next_delay(self, polls: int, response: Optional[requests.Response] = None,
+                   stats: Optional[PollStats] = None) -> float:
+        """Seconds to wait before polling a resource again.
+
+        :param int polls: how many times the resource was polled
+        :param requests.Response response: the last response for the resource
+        :param PollStats stats: statistics of the polling
+
+        """
+        delay = self._requested_delay(response, stats)
+        if delay is not None:
+            return delay
+        # The exponent is bounded to avoid overflows, the delay is capped anyway
+        delay = self.initial_delay * self.backoff ** min(max(polls - 1, 0), 64)
+        delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        return min(delay, self.max_delay)
+
+    def _requested_delay(self, response: Optional[requests.Response],
+                         stats: Optional[PollStats]) -> Optional[float]:
+        if response is None or 'Retry-After' not in response.headers:
+            return None
+        if stats is not None:
+            stats.retry_after += 1
+        # An unparsable header falls back to the largest delay we would choose
+        when = ClientV2.retry_after(response, math.ceil(self.max_delay))
+        return max((when - datetime.datetime.now()).total_seconds(), 0.0)
+
 
 class ClientV2:
     """ACME client for a v2 API.
 
     :ivar messages.Directory directory:
     :ivar .ClientNetwork net: Client network.
+    :ivar .PollingStrategy polling: When to poll pending resources.
     """
 
-    def __init__(self, directory: messages.Directory, net: 'ClientNetwork') -> None:
+    def __init__(self, directory: messages.Directory, net: 'ClientNetwork',
+                 polling: Optional[PollingStrategy] = None) -> None:
         """Initialize.
 
         :param .messages.Directory directory: Directory Resource
         :param .ClientNetwork net: Client network.
+        :param .PollingStrategy polling: When to poll pending resources,
+            a default `.PollingStrategy` if not provided.
         """
         self.directory = directory
         self.net = net
+        self.polling = polling if polling is not None else PollingStrategy()
 
     def new_account(self, new_account: messages.NewRegistration) -> messages.RegistrationResource:
         """Register.
@@ -60,12 +229,12 @@ class ClientV2:
         :returns: Registration Resource.
         :rtype: `.RegistrationResource`
         """
-        response = self._post(self.directory['newAccount'], new_account)
+        response, jobj = self._post_json(self.directory['newAccount'], new_account)
         # if account already exists
         if response.status_code == 200 and 'Location' in response.headers:
             raise errors.ConflictError(response.headers['Location'])
         # "Instance of 'Field' has no key/contact member" bug:
-        regr = self._regr_from_response(response)
+        regr = self._regr_from_response(response, jobj)
         self.net.account = regr
         return regr
 
@@ -107,9 +276,9 @@ class ClientV2:
                        ) -> messages.RegistrationResource:
         self.net.account = None
         only_existing_reg = regr.body.update(only_return_existing=True)
-        response = self._post(self.directory['newAccount'], only_existing_reg)
+        response, jobj = self._post_json(self.directory['newAccount'], only_existing_reg)
         updated_uri = response.headers['Location']
-        new_regr = regr.update(body=messages.Registration.from_json(response.json())
+        new_regr = regr.update(body=messages.Registration.from_json(jobj)
                                if update_body else regr.body,
                                uri=updated_uri)
         self.net.account = new_regr
@@ -123,30 +292,10 @@ class ClientV2:
         :returns: The newly created order.
         :rtype: OrderResource
         """
-        csr = x509.load_pem_x509_csr(csr_pem)
-        dnsNames = crypto_util.get_names_from_subject_and_extensions(csr.subject, csr.extensions)
-        try:
-            san_ext = csr.extensions.get_extension_for_class(x509.SubjectAlternativeName)
-        except x509.ExtensionNotFound:
-            ipNames = []
-        else:
-            ipNames = san_ext.value.get_values_for_type(x509.IPAddress)
-        identifiers = []
-        for name in dnsNames:
-            identifiers.append(messages.Identifier(typ=messages.IDENTIFIER_FQDN,
-                value=name))
-        for ip in ipNames:
-            identifiers.append(messages.Identifier(typ=messages.IDENTIFIER_IP,
-                value=str(ip)))
-        order = messages.NewOrder(identifiers=identifiers)
-        response = self._post(self.directory['newOrder'], order)
-        body = messages.Order.from_json(response.json())
-        authorizations = []
-        # pylint has trouble understanding our josepy based objects which use
-        # things like custom metaclass logic. body.authorizations should be a
-        # list of strings containing URLs so let's disable this check here.
-        for url in body.authorizations:  # pylint: disable=not-an-iterable
-            authorizations.append(self._authzr_from_response(self._post_as_get(url), uri=url))
+        order = messages.NewOrder(identifiers=_identifiers_from_csr(csr_pem))
+        response, jobj = self._post_json(self.directory['newOrder'], order)
+        body = messages.Order.from_json(jobj)
+        authorizations = [authzr for authzr, _ in self._get_authorizations(body.authorizations)]
         return messages.OrderResource(
             body=body,
             uri=response.headers.get('Location'),
@@ -165,9 +314,9 @@ class ClientV2:
         :rtype: (`.AuthorizationResource`, `requests.Response`)
 
         """
-        response = self._post_as_get(authzr.uri)
+        response, jobj = self._post_as_get_json(authzr.uri)
         updated_authzr = self._authzr_from_response(
-            response, authzr.body.identifier, authzr.uri)
+            response, jobj, authzr.body.identifier, authzr.uri)
         return updated_authzr, response
 
     def poll_and_finalize(self, orderr: messages.OrderResource,
@@ -191,19 +340,49 @@ class ClientV2:
 
     def poll_authorizations(self, orderr: messages.OrderResource, deadline: datetime.datetime
                             ) -> messages.OrderResource:
-        """Poll Order Resource for status."""
-        responses = []
-        for url in orderr.body.authorizations:
-            while datetime.datetime.now() < deadline:
-                authzr = self._authzr_from_response(self._post_as_get(url), uri=url)
-                if authzr.body.status != messages.STATUS_PENDING:  # pylint: disable=no-member
-                    responses.append(authzr)
-                    break
-                time.sleep(1)
-        # If we didn't get a response for every authorization, we fell through
-        # the bottom of the loop due to hitting the deadline.
-        if len(responses) < len(orderr.body.authorizations):
-            raise errors.TimeoutError()
+        """Poll Order Resource for status.
+
+        Authorizations are polled concurrently. A pending authorization is
+        polled again when `polling` says so, based on its own last
+        response. Responses are only decoded as `.AuthorizationView`
+        while the authorization is pending.
+
+        """
+        urls = list(orderr.body.authorizations)
+        done: Dict[str, messages.AuthorizationResource] = {}
+        polls = dict.fromkeys(urls, 0)
+        stats = self.polling.start(orderr.uri, 'authorizations')
+        now = datetime.datetime.now()
+        next_poll = dict.fromkeys(
+            urls, now + datetime.timedelta(seconds=self.polling.first_delay(stats=stats)))
+        try:
+            while next_poll:
+                wake_up = min(next_poll.values())
+                if wake_up > deadline:
+                    if now >= deadline:
+                        # Authorizations that are still pending would be polled too late.
+                        raise errors.TimeoutError()
+                    # Poll them a last time at the deadline
+                    wake_up = deadline
+                    next_poll = dict.fromkeys(next_poll, deadline)
+                sleep_seconds = max((wake_up - now).total_seconds(), 0)
+                if sleep_seconds:
+                    time.sleep(sleep_seconds)
+                    stats.waited += sleep_seconds
+                now = datetime.datetime.now()
+                due = [url for url, when in next_poll.items() if when <= now]
+                stats.polls += len(due)
+                for url, view, response in self._iter_authorization_views(due):
+                    polls[url] += 1
+                    if view.status != messages.STATUS_PENDING:
+                        done[url] = _authzr_from_view(view, response, url)
+                        del next_poll[url]
+                    else:
+                        next_poll[url] = now + datetime.timedelta(
+                            seconds=self.polling.next_delay(polls[url], response, stats))
+        finally:
+            stats.finish()
+        responses = [done[url] for url in urls]
         failed = []
         for authzr in responses:
             if authzr.body.status != messages.STATUS_VALID:
@@ -224,60 +403,105 @@ class ClientV2:
         :returns: updated order
         :rtype: messages.OrderResource
         """
-        csr = OpenSSL.crypto.load_certificate_request(
-            OpenSSL.crypto.FILETYPE_PEM, orderr.csr_pem)
-        wrapped_csr = messages.CertificateRequest(csr=jose.ComparableX509(csr))
-        res = self._post(orderr.body.finalize, wrapped_csr)
-        orderr = orderr.update(body=messages.Order.from_json(res.json()))
-        return orderr
+        return self._begin_finalization(orderr)[0]
+
+    def _begin_finalization(self, orderr: messages.OrderResource
+                            ) -> Tuple[messages.OrderResource, requests.Response]:
+        res, jobj = self._post_json(orderr.body.finalize, _certificate_request(orderr.csr_pem))
+        orderr = orderr.update(body=messages.Order.from_json(jobj))
+        return orderr, res
 
     def poll_finalization(self, orderr: messages.OrderResource,
                           deadline: datetime.datetime,
-                          fetch_alternative_chains: bool = False
+                          fetch_alternative_chains: bool = False,
+                          chain_predicate: Optional[Callable[[int, str], bool]] = None,
+                          chain_hint: Optional[int] = None,
+                          finalize_response: Optional[requests.Response] = None
                           ) -> messages.OrderResource:
         """
         Poll an order that has been finalized for its status.
         If it becomes valid, obtain the certificate.
 
-        :returns: finalized order (with certificate)
+        Chains are identified by their position: 0 is the default chain
+        and ``i`` the chain of the ``i``-th ``alternate`` link of the
+        certificate response. Without `chain_predicate`, all alternative
+        chains are fetched concurrently. With it, the default chain and
+        then the alternative chains are checked one at a time, starting
+        with `chain_hint`, and no further chain is fetched once one is
+        accepted.
+
+        :param bool fetch_alternative_chains: whether to also fetch
+            alternative certificate chains
+        :param chain_predicate: called with the position and the PEM of
+            each chain, returns whether it is the wanted one
+        :type chain_predicate: `callable` or None
+        :param int chain_hint: position of the alternative chain to fetch
+            first, e.g. the one accepted for the previous order
+        :param requests.Response finalize_response: response of the
+            request finalizing the order, whose ``Retry-After`` header is
+            honored before the first poll
+
+        :returns: finalized order (with certificate), whose
+            ``alternative_fullchains_pem`` are the alternative chains
+            fetched, in the order they were fetched
         :rtype: messages.OrderResource
         """
 
-        while datetime.datetime.now() < deadline:
-            time.sleep(1)
-            response = self._post_as_get(orderr.uri)
-            body = messages.Order.from_json(response.json())
-            if body.status == messages.STATUS_INVALID:
-                if body.error is not None:
-                    raise errors.IssuanceError(body.error)
-                raise errors.Error(
-                    "The certificate order failed. No further information was provided "
-                    "by the server.")
-            elif body.status == messages.STATUS_VALID and body.certificate is not None:
-                certificate_response = self._post_as_get(body.certificate)
-                orderr = orderr.update(body=body, fullchain_pem=certificate_response.text)
-                if fetch_alternative_chains:
-                    alt_chains_urls = self._get_links(certificate_response, 'alternate')
-                    alt_chains = [self._post_as_get(url).text for url in alt_chains_urls]
-                    orderr = orderr.update(alternative_fullchains_pem=alt_chains)
-                return orderr
-        raise errors.TimeoutError()
+        stats = self.polling.start(orderr.uri, 'finalization')
+        delay = self.polling.first_delay(finalize_response, stats)
+        try:
+            while True:
+                remaining = (deadline - datetime.datetime.now()).total_seconds()
+                if remaining <= 0:
+                    raise errors.TimeoutError()
+                # A poll that would be due after the deadline is made at the deadline
+                delay = min(delay, remaining)
+                if delay:
+                    time.sleep(delay)
+                    stats.waited += delay
+                response, jobj = self._post_as_get_json(orderr.uri)
+                stats.polls += 1
+                body = messages.Order.from_json(jobj)
+                if body.status == messages.STATUS_INVALID:
+                    if body.error is not None:
+                        raise errors.IssuanceError(body.error)
+                    raise errors.Error(
+                        "The certificate order failed. No further information was provided "
+                        "by the server.")
+                elif body.status == messages.STATUS_VALID and body.certificate is not None:
+                    certificate_response = self._post_as_get(body.certificate)
+                    orderr = orderr.update(body=body, fullchain_pem=certificate_response.text)
+                    if fetch_alternative_chains:
+                        alt_chains = self._get_alternative_chains(
+                            certificate_response, chain_predicate, chain_hint)
+                        orderr = orderr.update(alternative_fullchains_pem=alt_chains)
+                    return orderr
+                delay = self.polling.next_delay(stats.polls, response, stats)
+        finally:
+            stats.finish()
 
     def finalize_order(self, orderr: messages.OrderResource, deadline: datetime.datetime,
-                       fetch_alternative_chains: bool = False) -> messages.OrderResource:
+                       fetch_alternative_chains: bool = False,
+                       chain_predicate: Optional[Callable[[int, str], bool]] = None,
+                       chain_hint: Optional[int] = None) -> messages.OrderResource:
         """Finalize an order and obtain a certificate.
 
         :param messages.OrderResource orderr: order to finalize
         :param datetime.datetime deadline: when to stop polling and timeout
         :param bool fetch_alternative_chains: whether to also fetch alternative
             certificate chains
+        :param chain_predicate: stop fetching chains once one is accepted,
+            see `poll_finalization`
+        :type chain_predicate: `callable` or None
+        :param int chain_hint: position of the alternative chain to fetch first
 
         :returns: finalized order
         :rtype: messages.OrderResource
 
         """
-        self.begin_finalization(orderr)
-        return self.poll_finalization(orderr, deadline, fetch_alternative_chains)
+        _, response = self._begin_finalization(orderr)
+        return self.poll_finalization(orderr, deadline, fetch_alternative_chains,
+                                      chain_predicate, chain_hint, response)
 
     def revoke(self, cert: jose.ComparableX509, rsn: int) -> None:
         """Revoke certificate.
@@ -308,19 +532,86 @@ class ClientV2:
         new_args = args[:1] + (None,) + args[1:]
         return self._post(*new_args, **kwargs)
 
+    def _post_as_get_json(self, *args: Any, **kwargs: Any) -> Tuple[requests.Response, Any]:
+        """Same as `_post_as_get`, also returning the decoded JSON body of the response."""
+        new_args = args[:1] + (None,) + args[1:]
+        return self._post_json(*new_args, **kwargs)
+
+    def _get_authorizations(self, urls: Sequence[str]
+                            ) -> List[Tuple[messages.AuthorizationResource, requests.Response]]:
+        """Fetch authorizations concurrently.
+
+        :returns: the authorizations and their responses, in the order of `urls`
+
+        """
+        def fetch(url: str) -> Tuple[messages.AuthorizationResource, requests.Response]:
+            response, jobj = self._post_as_get_json(url)
+            return self._authzr_from_response(response, jobj, uri=url), response
+
+        if len(urls) <= 1:
+            return [fetch(url) for url in urls]
+        with futures.ThreadPoolExecutor(
+                max_workers=min(len(urls), _MAX_AUTHZ_WORKERS)) as executor:
+            return list(executor.map(fetch, urls))
+
+    def _iter_authorization_views(self, urls: Sequence[str]
+                                  ) -> Iterator[Tuple[str, messages.AuthorizationView,
+                                                      requests.Response]]:
+        """Fetch authorizations concurrently, as lazily decoded views.
+
+        :returns: the URL, view and response of each authorization, as
+            soon as the response is received
+
+        """
+        def fetch(url: str) -> Tuple[str, messages.AuthorizationView, requests.Response]:
+            response, jobj = self._post_as_get_json(url)
+            return url, messages.AuthorizationView.from_json(jobj), response
+
+        if len(urls) <= 1:
+            yield from (fetch(url) for url in urls)
+            return
+        with futures.ThreadPoolExecutor(
+                max_workers=min(len(urls), _MAX_AUTHZ_WORKERS)) as executor:
+            for future in futures.as_completed([executor.submit(fetch, url) for url in urls]):
+                yield future.result()
+
+    def _get_alternative_chains(self, certificate_response: requests.Response,
+                                chain_predicate: Optional[Callable[[int, str], bool]],
+                                chain_hint: Optional[int]) -> List[str]:
+        """Fetch the alternative chains of a certificate.
+
+        :returns: the fetched chains, in the order they were fetched
+
+        """
+        urls = self._get_links(certificate_response, 'alternate')
+        if chain_predicate is None:
+            if len(urls) <= 1:
+                return [self._post_as_get(url).text for url in urls]
+            with futures.ThreadPoolExecutor(
+                    max_workers=min(len(urls), _MAX_AUTHZ_WORKERS)) as executor:
+                return [response.text for response in executor.map(self._post_as_get, urls)]
+
+        if chain_predicate(0, certificate_response.text):
+            return []
+        positions = list(range(1, len(urls) + 1))
+        if chain_hint in positions:
+            positions.remove(chain_hint)
+            positions.insert(0, chain_hint)
+        chains = []
+        for position in positions:
+            chains.append(self._post_as_get(urls[position - 1]).text)
+            if chain_predicate(position, chains[-1]):
+                logger.debug("Using alternative chain %d of %d", position, len(urls))
+                break
+        return chains
+
     def _get_links(self, response: requests.Response, relation_type: str) -> List[str]:
         """
         Retrieves all Link URIs of relation_type from the response.
         :param requests.Response response: The requests HTTP response.
         :param str relation_type: The relation type to filter by.
         """
-        # Can't use response.links directly because it drops multiple links
-        # of the same relation type, which is possible in RFC8555 responses.
-        if 'Link' not in response.headers:
-            return []
-        links = parse_header_links(response.headers['Link'])
-        return [l['url'] for l in links
-                if 'rel' in l and 'url' in l and l['rel'] == relation_type]
+        return _get_links(response, relation_type)
 
     @classmethod
     def get_directory(cls, url: str, net: 'ClientNetwork') -> messages.Directory:
@@ -335,20 +626,21 @@ class ClientV2:
         return messages.Directory.from_json(net.get(url).json())
 
     @classmethod
-    def _regr_from_response(cls, response: requests.Response, uri: Optional[str] = None,
+    def _regr_from_response(cls, response: requests.Response, jobj: Any,
+                            uri: Optional[str] = None,
                             terms_of_service: Optional[str] = None
                             ) -> messages.RegistrationResource:
         if 'terms-of-service' in response.links:
             terms_of_service = response.links['terms-of-service']['url']
 
         return messages.RegistrationResource(
-            body=messages.Registration.from_json(response.json()),
+            body=messages.Registration.from_json(jobj),
             uri=response.headers.get('Location', uri),
             terms_of_service=terms_of_service)
 
     def _send_recv_regr(self, regr: messages.RegistrationResource,
                         body: messages.Registration) -> messages.RegistrationResource:
-        response = self._post(regr.uri, body)
+        response, jobj = self._post_json(regr.uri, body)
 
         # TODO: Boulder returns httplib.ACCEPTED
         #assert response.status_code == httplib.OK
@@ -357,7 +649,7 @@ class ClientV2:
         # (c.f. acme-spec #94)
 
         return self._regr_from_response(
-            response, uri=regr.uri,
+            response, jobj, uri=regr.uri,
             terms_of_service=regr.terms_of_service)
 
     def _post(self, *args: Any, **kwargs: Any) -> requests.Response:
@@ -369,6 +661,11 @@ class ClientV2:
         kwargs.setdefault('new_nonce_url', getattr(self.directory, 'newNonce'))
         return self.net.post(*args, **kwargs)
 
+    def _post_json(self, *args: Any, **kwargs: Any) -> Tuple[requests.Response, Any]:
+        """Same as `_post`, also returning the decoded JSON body of the response."""
+        kwargs.setdefault('new_nonce_url', getattr(self.directory, 'newNonce'))
+        return self.net._post_json(*args, **kwargs)  # pylint: disable=protected-access
+
     def deactivate_registration(self, regr: messages.RegistrationResource
                                 ) -> messages.RegistrationResource:
         """Deactivate registration.
@@ -396,19 +693,14 @@ class ClientV2:
 
         """
         body = messages.UpdateAuthorization(status='deactivated')
-        response = self._post(authzr.uri, body)
-        return self._authzr_from_response(response,
+        response, jobj = self._post_json(authzr.uri, body)
+        return self._authzr_from_response(response, jobj,
             authzr.body.identifier, authzr.uri)
 
-    def _authzr_from_response(self, response: requests.Response,
+    def _authzr_from_response(self, response: requests.Response, jobj: Any,
                               identifier: Optional[messages.Identifier] = None,
                               uri: Optional[str] = None) -> messages.AuthorizationResource:
-        authzr = messages.AuthorizationResource(
-            body=messages.Authorization.from_json(response.json()),
-            uri=response.headers.get('Location', uri))
-        if identifier is not None and authzr.body.identifier != identifier:  # pylint: disable=no-member
-            raise errors.UnexpectedUpdate(authzr)
-        return authzr
+        return _authzr_from_response(response, jobj, identifier, uri)
 
     def answer_challenge(self, challb: messages.ChallengeBody,
                          response: challenges.ChallengeResponse) -> messages.ChallengeResource:
@@ -426,18 +718,7 @@ class ClientV2:
         :raises .UnexpectedUpdate:
 
         """
-        resp = self._post(challb.uri, response)
-        try:
-            authzr_uri = resp.links['up']['url']
-        except KeyError:
-            raise errors.ClientError('"up" Link header missing')
-        challr = messages.ChallengeResource(
-            authzr_uri=authzr_uri,
-            body=messages.ChallengeBody.from_json(resp.json()))
-        # TODO: check that challr.uri == resp.headers['Location']?
-        if challr.uri != challb.uri:
-            raise errors.UnexpectedUpdate(challr.uri)
-        return challr
+        return _challr_from_response(*self._post_json(challb.uri, response), challb)
 
     @classmethod
     def retry_after(cls, response: requests.Response, default: int) -> datetime.datetime:
@@ -493,6 +774,63 @@ class ClientV2:
                 'Successful revocation must return HTTP OK status')
 
 
+class _NoncePool:
+    """Thread-safe pool of unused nonces.
+
+    Nonces are used in the order they were received. At most `max_size`
+    of them are kept, dropping the oldest ones first, and nonces older
+    than `max_age` seconds are dropped since the server may have
+    forgotten them already.
+
+    """
+    def __init__(self, max_size: int, max_age: float) -> None:
+        self._max_size = max_size
+        self._max_age = max_age
+        self._nonces: Deque[Tuple[float, str]] = collections.deque()
+        self._stats = dict.fromkeys(
+            ('hits', 'misses', 'bad_nonce_retries', 'expired', 'discarded'), 0)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._nonces)
+
+    def add(self, nonce: str) -> None:
+        """Add a nonce received from the server."""
+        with self._lock:
+            self._nonces.append((time.monotonic(), nonce))
+            while len(self._nonces) > self._max_size:
+                self._nonces.popleft()
+                self._stats['discarded'] += 1
+
+    def take(self) -> Optional[str]:
+        """Remove and return the oldest usable nonce, if any."""
+        with self._lock:
+            self._expire()
+            if not self._nonces:
+                self._stats['misses'] += 1
+                return None
+            self._stats['hits'] += 1
+            return self._nonces.popleft()[1]
+
+    def count(self, name: str) -> None:
+        """Increment one of the counters returned by `stats`."""
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """A copy of the counters of this pool."""
+        with self._lock:
+            return dict(self._stats)
+
+    def _expire(self) -> None:
+        oldest_usable = time.monotonic() - self._max_age
+        while self._nonces and self._nonces[0][0] < oldest_usable:
+            self._nonces.popleft()
+            self._stats['expired'] += 1
+
+
 class ClientNetwork:
     """Wrapper around requests that signs POSTs for authentication.
 
@@ -513,15 +851,27 @@ class ClientNetwork:
     :param bool verify_ssl: Whether to verify certificates on SSL connections.
     :param str user_agent: String to send as User-Agent header.
     :param int timeout: Timeout for requests.
+    :param int nonce_pool_size: Maximum number of unused nonces to keep.
+    :param float nonce_max_age: Seconds after which unused nonces are discarded.
+    :param int nonce_prefetch: If not 0, whenever fewer nonces than this are
+            left, more are requested from the newNonce endpoint in a background
+            thread, so that POST requests don't have to wait for them.
     """
     def __init__(self, key: jose.JWK, account: Optional[messages.RegistrationResource] = None,
                  alg: jose.JWASignature = jose.RS256, verify_ssl: bool = True,
-                 user_agent: str = 'acme-python', timeout: int = DEFAULT_NETWORK_TIMEOUT) -> None:
+                 user_agent: str = 'acme-python', timeout: int = DEFAULT_NETWORK_TIMEOUT,
+                 nonce_pool_size: int = DEFAULT_NONCE_POOL_SIZE,
+                 nonce_max_age: float = DEFAULT_NONCE_MAX_AGE,
+                 nonce_prefetch: int = 0) -> None:
         self.key = key
         self.account = account
         self.alg = alg
         self.verify_ssl = verify_ssl
-        self._nonces: Set[str] = set()
+        self._nonces = _NoncePool(nonce_pool_size, nonce_max_age)
+        self._jws_header = _JWSHeader()
+        self._nonce_prefetch = min(nonce_prefetch, nonce_pool_size)
+        self._refilling = False
+        self._refill_lock = threading.Lock()
         self.user_agent = user_agent
         self.session = requests.Session()
         self._default_timeout = timeout
@@ -549,19 +899,8 @@ class ClientNetwork:
         :rtype: str
 
         """
-        jobj = obj.json_dumps(indent=2).encode() if obj else b''
-        logger.debug('JWS payload:\n%s', jobj)
-        kwargs = {
-            "alg": self.alg,
-            "nonce": nonce,
-            "url": url
-        }
-        # newAccount and revokeCert work without the kid
-        # newAccount must not have kid
-        if self.account is not None:
-            kwargs["kid"] = self.account["uri"]
-        kwargs["key"] = self.key
-        return jws.JWS.sign(jobj, **cast(Mapping[str, Any], kwargs)).json_dumps(indent=2)
+        return _wrap_in_jws(obj, nonce, url, self.key, self.alg, self.account,
+                            self._jws_header.fields(self.key, self.account))
 
     @classmethod
     def _check_response(cls, response: requests.Response,
@@ -582,14 +921,24 @@ class ClientNetwork:
             carries HTTP Problem (https://datatracker.ietf.org/doc/html/rfc7807).
         :raises .ClientError: In case of other networking errors.
 
+        """
+        cls._check_response_json(response, content_type)
+        return response
+
+    @classmethod
+    def _check_response_json(cls, response: requests.Response,
+                             content_type: Optional[str] = None) -> Any:
+        """Check response content and its type, see `_check_response`.
+
+        :returns: the decoded JSON body of the response, or None if it
+            isn't JSON
+
         """
         response_ct = response.headers.get('Content-Type')
         # Strip parameters from the media-type (rfc2616#section-3.7)
         if response_ct:
             response_ct = response_ct.split(';')[0].strip()
         try:
-            # TODO: response.json() is called twice, once here, and
-            # once in _get and _post clients
             jobj = response.json()
         except ValueError:
             jobj = None
@@ -620,7 +969,7 @@ class ClientNetwork:
             if content_type == cls.JSON_CONTENT_TYPE and jobj is None:
                 raise errors.ClientError(f'Unexpected response Content-Type: {response_ct}')
 
-        return response
+        return jobj
 
     def _send_request(self, method: str, url: str, *args: Any, **kwargs: Any) -> requests.Response:
         """Send HTTP request.
@@ -676,21 +1025,20 @@ class ClientNetwork:
         # If an Accept header was sent in the request, the response may not be
         # UTF-8 encoded. In this case, we don't set response.encoding and log
         # the base64 response instead of raw bytes to keep binary data out of the logs.
-        debug_content: Union[bytes, str]
-        if "Accept" in kwargs["headers"]:
-            debug_content = base64.b64encode(response.content)
-        else:
+        accept_header = "Accept" in kwargs["headers"]
+        if not accept_header:
             # We set response.encoding so response.text knows the response is
             # UTF-8 encoded instead of trying to guess the encoding that was
             # used which is error prone. This setting affects all future
             # accesses of .text made on the returned response object as well.
             response.encoding = "utf-8"
-            debug_content = response.text
-        logger.debug('Received response:\nHTTP %d\n%s\n\n%s',
-                     response.status_code,
-                     "\n".join("{0}: {1}".format(k, v)
-                                for k, v in response.headers.items()),
-                     debug_content)
+        if logger.isEnabledFor(logging.DEBUG):
+            debug_content: Union[bytes, str]
+            if accept_header:
+                debug_content = base64.b64encode(response.content)
+            else:
+                debug_content = response.text
+            _log_response(response, debug_content)
         return response
 
     def head(self, *args: Any, **kwargs: Any) -> requests.Response:
@@ -706,23 +1054,43 @@ class ClientNetwork:
     def get(self, url: str, content_type: str = JSON_CONTENT_TYPE,
             **kwargs: Any) -> requests.Response:
         """Send GET request and check response."""
-        return self._check_response(
+        response = self._check_response(
             self._send_request('GET', url, **kwargs), content_type=content_type)
+        self._add_nonce_if_present(response)
+        return response
+
+    @property
+    def nonce_stats(self) -> Dict[str, int]:
+        """Counters of the nonce pool.
+
+        ``hits`` and ``misses`` count the requests that found a nonce in
+        the pool or had to wait for one, ``bad_nonce_retries`` the
+        requests sent again after a badNonce error, and ``expired`` and
+        ``discarded`` the nonces dropped for their age or because the
+        pool was full.
+
+        """
+        return self._nonces.stats()
 
     def _add_nonce(self, response: requests.Response) -> None:
-        if self.REPLAY_NONCE_HEADER in response.headers:
-            nonce = response.headers[self.REPLAY_NONCE_HEADER]
-            try:
-                decoded_nonce = jws.Header._fields['nonce'].decode(nonce)
-            except jose.DeserializationError as error:
-                raise errors.BadNonce(nonce, error)
-            logger.debug('Storing nonce: %s', nonce)
-            self._nonces.add(decoded_nonce)
-        else:
-            raise errors.MissingNonce(response)
+        self._nonces.add(_nonce_from_response(response))
+
+    def _add_nonce_if_present(self, response: requests.Response) -> None:
+        """Keep the nonce of a response that doesn't have to carry one."""
+        try:
+            self._add_nonce(response)
+        except (errors.MissingNonce, errors.BadNonce):
+            pass
 
     def _get_nonce(self, url: str, new_nonce_url: str) -> str:
-        if not self._nonces:
+        while True:
+            # Taking first keeps this safe when several threads share the
+            # client: another thread may take the last nonce at any time.
+            nonce = self._nonces.take()
+            if new_nonce_url is not None and len(self._nonces) < self._nonce_prefetch:
+                self._start_nonce_refill(new_nonce_url)
+            if nonce is not None:
+                return nonce
             logger.debug('Requesting fresh nonce')
             if new_nonce_url is None:
                 response = self.head(url)
@@ -730,7 +1098,26 @@ class ClientNetwork:
                 # request a new nonce from the acme newNonce endpoint
                 response = self._check_response(self.head(new_nonce_url), content_type=None)
             self._add_nonce(response)
-        return self._nonces.pop()
+
+    def _start_nonce_refill(self, new_nonce_url: str) -> None:
+        with self._refill_lock:
+            if self._refilling:
+                return
+            self._refilling = True
+        threading.Thread(target=self._refill_nonces, args=(new_nonce_url,),
+                         name='acme-nonce-refill', daemon=True).start()
+
+    def _refill_nonces(self, new_nonce_url: str) -> None:
+        """Request nonces until the prefetch level is reached again."""
+        try:
+            while len(self._nonces) < self._nonce_prefetch:
+                self._add_nonce(self._check_response(self.head(new_nonce_url),
+                                                     content_type=None))
+        except Exception:  # pylint: disable=broad-except
+            logger.debug('Unable to prefetch nonces', exc_info=True)
+        finally:
+            with self._refill_lock:
+                self._refilling = False
 
     def post(self, *args: Any, **kwargs: Any) -> requests.Response:
         """POST object wrapped in `.JWS` and check response.
@@ -738,21 +1125,563 @@ class ClientNetwork:
         If the server responded with a badNonce error, the request will
         be retried once.
 
+        """
+        return self._post_json(*args, **kwargs)[0]
+
+    def _post_json(self, *args: Any, **kwargs: Any) -> Tuple[requests.Response, Any]:
+        """Same as `post`, also returning the decoded JSON body of the response.
+
+        :returns: the response, and its JSON body or None if it isn't JSON
+
         """
         try:
             return self._post_once(*args, **kwargs)
         except messages.Error as error:
             if error.code == 'badNonce':
                 logger.debug('Retrying request after error:\n%s', error)
+                self._nonces.count('bad_nonce_retries')
                 return self._post_once(*args, **kwargs)
             raise
 
     def _post_once(self, url: str, obj: jose.JSONDeSerializable,
-                   content_type: str = JOSE_CONTENT_TYPE, **kwargs: Any) -> requests.Response:
+                   content_type: str = JOSE_CONTENT_TYPE,
+                   **kwargs: Any) -> Tuple[requests.Response, Any]:
         new_nonce_url = kwargs.pop('new_nonce_url', None)
         data = self._wrap_in_jws(obj, self._get_nonce(url, new_nonce_url), url)
         kwargs.setdefault('headers', {'Content-Type': content_type})
         response = self._send_request('POST', url, data=data, **kwargs)
-        response = self._check_response(response, content_type=content_type)
+        try:
+            jobj = self._check_response_json(response, content_type=content_type)
+        except messages.Error:
+            # Error responses carry a nonce too, which spares the HEAD
+            # request before retrying after a badNonce error.
+            self._add_nonce_if_present(response)
+            raise
         self._add_nonce(response)
-        return response
+        return response, jobj
+
+
+class AsyncClientV2:
+    """asyncio counterpart of `ClientV2`.
+
+    All methods are coroutines. Several of them may run concurrently on
+    the same instance, e.g. to manage many orders from one event loop;
+    they then share the nonces and connections of `net`.
+
+    :ivar messages.Directory directory:
+    :ivar .AsyncClientNetwork net: Client network.
+    :ivar .PollingStrategy polling: When to poll pending resources.
+    """
+
+    def __init__(self, directory: messages.Directory, net: 'AsyncClientNetwork',
+                 polling: Optional[PollingStrategy] = None) -> None:
+        """Initialize.
+
+        :param .messages.Directory directory: Directory Resource
+        :param .AsyncClientNetwork net: Client network.
+        :param .PollingStrategy polling: When to poll pending resources,
+            a default `.PollingStrategy` if not provided.
+        """
+        self.directory = directory
+        self.net = net
+        self.polling = polling if polling is not None else PollingStrategy()
+
+    @classmethod
+    async def get_directory(cls, url: str, net: 'AsyncClientNetwork') -> messages.Directory:
+        """Retrieve the ACME directory (RFC 8555 section 7.1.1) from the ACME server.
+
+        :param str url: the URL where the ACME directory is available
+        :param AsyncClientNetwork net: the network to use to make the request
+
+        :returns: the ACME directory object
+        :rtype: messages.Directory
+        """
+        return messages.Directory.from_json((await net.get(url)).json())
+
+    async def new_order(self, csr_pem: bytes) -> messages.OrderResource:
+        """Request a new Order object from the server.
+
+        The authorizations of the order are fetched concurrently.
+
+        :param bytes csr_pem: A CSR in PEM format.
+
+        :returns: The newly created order.
+        :rtype: OrderResource
+        """
+        order = messages.NewOrder(identifiers=_identifiers_from_csr(csr_pem))
+        response, jobj = await self._post(self.directory['newOrder'], order)
+        body = messages.Order.from_json(jobj)
+        # pylint has trouble understanding our josepy based objects which use
+        # things like custom metaclass logic. body.authorizations should be a
+        # list of strings containing URLs so let's disable this check here.
+        authorizations = await _gather(*(
+            self._get_authorization(url)
+            for url in body.authorizations))  # pylint: disable=not-an-iterable
+        return messages.OrderResource(
+            body=body,
+            uri=response.headers.get('Location'),
+            authorizations=authorizations,
+            csr_pem=csr_pem)
+
+    async def poll(self, authzr: messages.AuthorizationResource
+                   ) -> Tuple[messages.AuthorizationResource, requests.Response]:
+        """Poll Authorization Resource for status.
+
+        :param authzr: Authorization Resource
+        :type authzr: `.AuthorizationResource`
+
+        :returns: Updated Authorization Resource and HTTP response.
+
+        :rtype: (`.AuthorizationResource`, `requests.Response`)
+
+        """
+        response, jobj = await self._post_as_get(authzr.uri)
+        updated_authzr = _authzr_from_response(
+            response, jobj, authzr.body.identifier, authzr.uri)
+        return updated_authzr, response
+
+    async def poll_authorizations(self, orderr: messages.OrderResource,
+                                  deadline: datetime.datetime) -> messages.OrderResource:
+        """Poll the authorizations of an order until none is pending.
+
+        Each authorization is polled in its own task, as often as
+        `polling` says based on its last response.
+
+        :raises .TimeoutError: if an authorization is still pending at
+            the deadline
+        :raises .ValidationError: if an authorization failed
+
+        """
+        stats = self.polling.start(orderr.uri, 'authorizations')
+
+        async def poll_until_done(url: str) -> messages.AuthorizationResource:
+            delay = self.polling.first_delay(stats=stats)
+            polls = 0
+            while True:
+                await self._wait_before_poll(delay, deadline, stats)
+                response, jobj = await self._post_as_get(url)
+                polls += 1
+                stats.polls += 1
+                view = messages.AuthorizationView.from_json(jobj)
+                if view.status != messages.STATUS_PENDING:
+                    return _authzr_from_view(view, response, url)
+                delay = self.polling.next_delay(polls, response, stats)
+
+        try:
+            responses = await _gather(*(poll_until_done(url)
+                                        for url in orderr.body.authorizations))
+        finally:
+            stats.finish()
+        failed = [authzr for authzr in responses if authzr.body.status != messages.STATUS_VALID
+                  and any(chall.error is not None for chall in authzr.body.challenges)]
+        if failed:
+            raise errors.ValidationError(failed)
+        return orderr.update(authorizations=responses)
+
+    async def answer_challenge(self, challb: messages.ChallengeBody,
+                               response: challenges.ChallengeResponse
+                               ) -> messages.ChallengeResource:
+        """Answer challenge.
+
+        :param challb: Challenge Resource body.
+        :type challb: `.ChallengeBody`
+
+        :param response: Corresponding Challenge response
+        :type response: `.challenges.ChallengeResponse`
+
+        :returns: Challenge Resource with updated body.
+        :rtype: `.ChallengeResource`
+
+        :raises .UnexpectedUpdate:
+
+        """
+        return _challr_from_response(*await self._post(challb.uri, response), challb)
+
+    async def finalize_order(self, orderr: messages.OrderResource, deadline: datetime.datetime,
+                             fetch_alternative_chains: bool = False) -> messages.OrderResource:
+        """Finalize an order and obtain a certificate.
+
+        :param messages.OrderResource orderr: order to finalize
+        :param datetime.datetime deadline: when to stop polling and timeout
+        :param bool fetch_alternative_chains: whether to also fetch alternative
+            certificate chains
+
+        :returns: finalized order
+        :rtype: messages.OrderResource
+
+        """
+        response, _ = await self._post(orderr.body.finalize,
+                                       _certificate_request(orderr.csr_pem))
+        stats = self.polling.start(orderr.uri, 'finalization')
+        try:
+            return await self._poll_finalization(orderr, deadline, fetch_alternative_chains,
+                                                 response, stats)
+        finally:
+            stats.finish()
+
+    async def _poll_finalization(self, orderr: messages.OrderResource,
+                                 deadline: datetime.datetime, fetch_alternative_chains: bool,
+                                 response: requests.Response,
+                                 stats: PollStats) -> messages.OrderResource:
+        delay = self.polling.first_delay(response, stats)
+        while True:
+            await self._wait_before_poll(delay, deadline, stats)
+            response, jobj = await self._post_as_get(orderr.uri)
+            stats.polls += 1
+            body = messages.Order.from_json(jobj)
+            if body.status == messages.STATUS_INVALID:
+                if body.error is not None:
+                    raise errors.IssuanceError(body.error)
+                raise errors.Error(
+                    "The certificate order failed. No further information was provided "
+                    "by the server.")
+            if body.status == messages.STATUS_VALID and body.certificate is not None:
+                certificate_response, _ = await self._post_as_get(body.certificate)
+                orderr = orderr.update(body=body, fullchain_pem=certificate_response.text)
+                if fetch_alternative_chains:
+                    alt_chains = await _gather(*(
+                        self._post_as_get(url)
+                        for url in _get_links(certificate_response, 'alternate')))
+                    orderr = orderr.update(
+                        alternative_fullchains_pem=[chain.text for chain, _ in alt_chains])
+                return orderr
+            delay = self.polling.next_delay(stats.polls, response, stats)
+
+    @staticmethod
+    async def _wait_before_poll(delay: float, deadline: datetime.datetime,
+                                stats: PollStats) -> None:
+        # As in ClientV2, a poll that would be due after the deadline is
+        # still made at the deadline before giving up.
+        remaining = (deadline - datetime.datetime.now()).total_seconds()
+        if remaining <= 0:
+            raise errors.TimeoutError()
+        delay = min(delay, remaining)
+        if delay:
+            await asyncio.sleep(delay)
+            stats.waited += delay
+
+    async def revoke(self, cert: jose.ComparableX509, rsn: int) -> None:
+        """Revoke certificate.
+
+        :param .ComparableX509 cert: `OpenSSL.crypto.X509` wrapped in
+            `.ComparableX509`
+
+        :param int rsn: Reason code for certificate revocation.
+
+        :raises .ClientError: If revocation is unsuccessful.
+
+        """
+        response, _ = await self._post(self.directory['revokeCert'],
+                                       messages.Revocation(certificate=cert, reason=rsn))
+        if response.status_code != http_client.OK:
+            raise errors.ClientError(
+                'Successful revocation must return HTTP OK status')
+
+    async def _get_authorization(self, url: str) -> messages.AuthorizationResource:
+        return _authzr_from_response(*await self._post_as_get(url), uri=url)
+
+    async def _post_as_get(self, url: str) -> Tuple[requests.Response, Any]:
+        return await self._post(url, None)
+
+    async def _post(self, url: str, obj: Optional[jose.JSONDeSerializable]
+                    ) -> Tuple[requests.Response, Any]:
+        return await self.net._post_json(  # pylint: disable=protected-access
+            url, obj, new_nonce_url=self.directory['newNonce'])
+
+
+class AsyncClientNetwork:
+    """asyncio counterpart of `ClientNetwork`.
+
+    This is not an asyncio-native HTTP client: requests are sent by a
+    blocking `ClientNetwork` in a pool of at most ``limit_per_host``
+    threads, so they are handled exactly as by `ClientNetwork` (proxies,
+    CA bundle, redirects, connections kept open), while the coroutines
+    using this object wait for them without blocking the event loop.
+    Nonces returned by the server are pooled and used by whichever
+    request needs one next.
+
+    Cancelling a coroutine drops its request if it wasn't sent yet, but a
+    request already being sent runs to completion in its thread.
+
+    Call `close` (or use the object as an async context manager) to close
+    the connections once done.
+
+    :param josepy.JWK key: Account private key
+    :param messages.RegistrationResource account: Account object. Required if you are
+            planning to use .post() for anything other than creating a new account;
+            may be set later after registering.
+    :param josepy.JWASignature alg: Algorithm to use in signing JWS.
+    :param bool verify_ssl: Whether to verify certificates on SSL connections.
+    :param str user_agent: String to send as User-Agent header.
+    :param int timeout: Timeout for requests.
+    :param int limit_per_host: Maximum number of requests sent at the same
+            time, to all hosts together, and so of threads.
+    :param int nonce_pool_size: Maximum number of unused nonces to keep.
+    :param float nonce_max_age: Seconds after which unused nonces are discarded.
+    """
+    def __init__(self, key: jose.JWK, account: Optional[messages.RegistrationResource] = None,
+                 alg: jose.JWASignature = jose.RS256, verify_ssl: bool = True,
+                 user_agent: str = 'acme-python', timeout: int = DEFAULT_NETWORK_TIMEOUT,
+                 limit_per_host: int = _MAX_AUTHZ_WORKERS,
+                 nonce_pool_size: int = DEFAULT_NONCE_POOL_SIZE,
+                 nonce_max_age: float = DEFAULT_NONCE_MAX_AGE) -> None:
+        self.key = key
+        self.account = account
+        self.alg = alg
+        self._nonces = _NoncePool(nonce_pool_size, nonce_max_age)
+        self._jws_header = _JWSHeader()
+        # Only used to send requests, it signs nothing
+        self._transport = ClientNetwork(key, alg=alg, verify_ssl=verify_ssl,
+                                        user_agent=user_agent, timeout=timeout)
+        adapter = HTTPAdapter(pool_maxsize=limit_per_host)
+        self._transport.session.mount("http://", adapter)
+        self._transport.session.mount("https://", adapter)
+        self._executor = futures.ThreadPoolExecutor(max_workers=limit_per_host,
+                                                    thread_name_prefix='acme-network')
+
+    async def __aenter__(self) -> 'AsyncClientNetwork':
+        return self
+
+    async def __aexit__(self, *unused_exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Drop unsent requests, wait for those being sent, then close the connections."""
+        await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self._executor.shutdown, cancel_futures=True))
+        self._transport.session.close()
+
+    async def _send_request(self, method: str, url: str, data: Optional[str] = None,
+                            headers: Optional[Mapping[str, str]] = None) -> requests.Response:
+        """Send HTTP request.
+
+        :raises .ClientError: if the request could not be sent or no
+            response was received in time
+
+        """
+        send = functools.partial(
+            self._transport._send_request,  # pylint: disable=protected-access
+            method, url, data=data, headers=dict(headers or {}))
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, send)
+        except (requests.exceptions.RequestException, ValueError) as error:
+            raise errors.ClientError(f"Requesting {url}: {error!r}")
+
+    async def head(self, url: str) -> requests.Response:
+        """Send HEAD request without checking the response."""
+        return await self._send_request('HEAD', url)
+
+    async def get(self, url: str,
+                  content_type: str = ClientNetwork.JSON_CONTENT_TYPE) -> requests.Response:
+        """Send GET request and check response."""
+        return ClientNetwork._check_response(  # pylint: disable=protected-access
+            await self._send_request('GET', url), content_type=content_type)
+
+    @property
+    def nonce_stats(self) -> Dict[str, int]:
+        """Counters of the nonce pool, see `ClientNetwork.nonce_stats`."""
+        return self._nonces.stats()
+
+    async def _get_nonce(self, url: str, new_nonce_url: Optional[str]) -> str:
+        while True:
+            nonce = self._nonces.take()
+            if nonce is not None:
+                return nonce
+            logger.debug('Requesting fresh nonce')
+            if new_nonce_url is None:
+                response = await self.head(url)
+            else:
+                response = ClientNetwork._check_response(  # pylint: disable=protected-access
+                    await self.head(new_nonce_url), content_type=None)
+            self._nonces.add(_nonce_from_response(response))
+
+    async def post(self, url: str, obj: Optional[jose.JSONDeSerializable],
+                   content_type: str = ClientNetwork.JOSE_CONTENT_TYPE,
+                   new_nonce_url: Optional[str] = None) -> requests.Response:
+        """POST object wrapped in `.JWS` and check response.
+
+        If the server responded with a badNonce error, the request will
+        be retried once.
+
+        """
+        return (await self._post_json(url, obj, content_type, new_nonce_url))[0]
+
+    async def _post_json(self, url: str, obj: Optional[jose.JSONDeSerializable],
+                         content_type: str = ClientNetwork.JOSE_CONTENT_TYPE,
+                         new_nonce_url: Optional[str] = None) -> Tuple[requests.Response, Any]:
+        """Same as `post`, also returning the decoded JSON body of the response."""
+        try:
+            return await self._post_once(url, obj, content_type, new_nonce_url)
+        except messages.Error as error:
+            if error.code == 'badNonce':
+                logger.debug('Retrying request after error:\n%s', error)
+                self._nonces.count('bad_nonce_retries')
+                return await self._post_once(url, obj, content_type, new_nonce_url)
+            raise
+
+    async def _post_once(self, url: str, obj: Optional[jose.JSONDeSerializable],
+                         content_type: str, new_nonce_url: Optional[str]
+                         ) -> Tuple[requests.Response, Any]:
+        nonce = await self._get_nonce(url, new_nonce_url)
+        data = _wrap_in_jws(obj, nonce, url, self.key, self.alg, self.account,
+                            self._jws_header.fields(self.key, self.account))
+        response = await self._send_request('POST', url, data=data,
+                                            headers={'Content-Type': content_type})
+        try:
+            jobj = ClientNetwork._check_response_json(  # pylint: disable=protected-access
+                response, content_type=content_type)
+        except messages.Error:
+            # As in ClientNetwork, keep the nonce of error responses
+            try:
+                self._nonces.add(_nonce_from_response(response))
+            except (errors.MissingNonce, errors.BadNonce):
+                pass
+            raise
+        self._nonces.add(_nonce_from_response(response))
+        return response, jobj
+
+
+async def _gather(*aws: Awaitable[_T]) -> List[_T]:
+    """Run awaitables concurrently, cancelling the others if one fails."""
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def _identifiers_from_csr(csr_pem: bytes) -> List[messages.Identifier]:
+    """The identifiers to order for the names of a CSR."""
+    csr = x509.load_pem_x509_csr(csr_pem)
+    dnsNames = crypto_util.get_names_from_subject_and_extensions(csr.subject, csr.extensions)
+    try:
+        san_ext = csr.extensions.get_extension_for_class(x509.SubjectAlternativeName)
+    except x509.ExtensionNotFound:
+        ipNames = []
+    else:
+        ipNames = san_ext.value.get_values_for_type(x509.IPAddress)
+    identifiers = []
+    for name in dnsNames:
+        identifiers.append(messages.Identifier(typ=messages.IDENTIFIER_FQDN,
+            value=name))
+    for ip in ipNames:
+        identifiers.append(messages.Identifier(typ=messages.IDENTIFIER_IP,
+            value=str(ip)))
+    return identifiers
+
+
+def _certificate_request(csr_pem: bytes) -> messages.CertificateRequest:
+    csr = OpenSSL.crypto.load_certificate_request(OpenSSL.crypto.FILETYPE_PEM, csr_pem)
+    return messages.CertificateRequest(csr=jose.ComparableX509(csr))
+
+
+def _authzr_from_response(response: requests.Response, jobj: Any,
+                          identifier: Optional[messages.Identifier] = None,
+                          uri: Optional[str] = None) -> messages.AuthorizationResource:
+    authzr = messages.AuthorizationResource(
+        body=messages.Authorization.from_json(jobj),
+        uri=response.headers.get('Location', uri))
+    if identifier is not None and authzr.body.identifier != identifier:  # pylint: disable=no-member
+        raise errors.UnexpectedUpdate(authzr)
+    return authzr
+
+
+def _authzr_from_view(view: messages.AuthorizationView, response: requests.Response,
+                      uri: str) -> messages.AuthorizationResource:
+    return messages.AuthorizationResource(body=view.to_authorization(),
+                                          uri=response.headers.get('Location', uri))
+
+
+def _challr_from_response(response: requests.Response, jobj: Any,
+                          challb: messages.ChallengeBody) -> messages.ChallengeResource:
+    try:
+        authzr_uri = response.links['up']['url']
+    except KeyError:
+        raise errors.ClientError('"up" Link header missing')
+    challr = messages.ChallengeResource(
+        authzr_uri=authzr_uri,
+        body=messages.ChallengeBody.from_json(jobj))
+    # TODO: check that challr.uri == resp.headers['Location']?
+    if challr.uri != challb.uri:
+        raise errors.UnexpectedUpdate(challr.uri)
+    return challr
+
+
+def _get_links(response: requests.Response, relation_type: str) -> List[str]:
+    # Can't use response.links directly because it drops multiple links
+    # of the same relation type, which is possible in RFC8555 responses.
+    if 'Link' not in response.headers:
+        return []
+    links = parse_header_links(response.headers['Link'])
+    return [l['url'] for l in links
+            if 'rel' in l and 'url' in l and l['rel'] == relation_type]
+
+
+def _wrap_in_jws(obj: Optional[jose.JSONDeSerializable], nonce: str, url: str, key: jose.JWK,
+                 alg: jose.JWASignature, account: Optional[messages.RegistrationResource],
+                 header: Optional[_JWSHeaderFields] = None) -> str:
+    """Wrap `JSONDeSerializable` object in JWS, dumped as compact JSON.
+
+    :param tuple header: kid and jwk protected header fields from
+        `_JWSHeader`, computed if not provided
+
+    """
+    jobj = obj.json_dumps(separators=_COMPACT_SEPARATORS).encode() if obj else b''
+    logger.debug('JWS payload:\n%s', jobj)
+    kid, jwk = header if header is not None else _jws_header_fields(key, account)
+    return jws.JWS.sign(jobj, key=key, alg=alg, nonce=cast(bytes, nonce), url=url,
+                        kid=kid, jwk=jwk).json_dumps(separators=_COMPACT_SEPARATORS)
+
+
+def _jws_header_fields(key: jose.JWK, account: Optional[messages.RegistrationResource]
+                       ) -> _JWSHeaderFields:
+    """kid and jwk protected header fields, which don't change from one request to the next."""
+    # newAccount and revokeCert work without the kid
+    # newAccount must not have kid, and jwk and kid are mutually exclusive
+    if account is not None:
+        return account['uri'], None
+    return None, key.public_key()
+
+
+class _JWSHeader:
+    """kid and jwk protected JWS header fields of a network object.
+
+    The fields are computed again only when the key or account of the
+    network object is replaced.
+
+    """
+    def __init__(self) -> None:
+        self._cached: Optional[Tuple[Tuple[Any, ...], _JWSHeaderFields]] = None
+
+    def fields(self, key: jose.JWK,
+               account: Optional[messages.RegistrationResource]) -> _JWSHeaderFields:
+        """kid and jwk protected header fields for the key and account."""
+        source = (key, account)
+        cached = self._cached
+        if cached is None or any(old is not new for old, new in zip(cached[0], source)):
+            cached = (source, _jws_header_fields(key, account))
+            self._cached = cached
+        return cached[1]
+
+
+def _log_response(response: requests.Response, content: Union[bytes, str]) -> None:
+    logger.debug('Received response:\nHTTP %d\n%s\n\n%s',
+                 response.status_code,
+                 "\n".join("{0}: {1}".format(k, v)
+                            for k, v in response.headers.items()),
+                 content)
+
+
+def _nonce_from_response(response: requests.Response) -> str:
+    if ClientNetwork.REPLAY_NONCE_HEADER in response.headers:
+        nonce = response.headers[ClientNetwork.REPLAY_NONCE_HEADER]
+        try:
+            decoded_nonce = jws.Header._fields['nonce'].decode(nonce)
+        except jose.DeserializationError as error:
+            raise errors.BadNonce(nonce, error)
+        logger.debug('Storing nonce: %s', nonce)
+        return decoded_nonce
+    raise errors.MissingNonce(response)
@@ -49,11 +49,13 @@ class JWS(jose.JWS):
     @classmethod
     # type: ignore[override]  # pylint: disable=arguments-differ
     def sign(cls, payload: bytes, key: jose.JWK, alg: jose.JWASignature, nonce: Optional[bytes],
-             url: Optional[str] = None, kid: Optional[str] = None) -> jose.JWS:
+             url: Optional[str] = None, kid: Optional[str] = None,
+             jwk: Optional[jose.JWK] = None) -> jose.JWS:
         # Per ACME spec, jwk and kid are mutually exclusive, so only include a
-        # jwk field if kid is not provided.
-        include_jwk = kid is None
+        # jwk field if kid is not provided. A public jwk already computed from
+        # the key can be passed to save computing it again.
+        include_jwk = kid is None and jwk is None
         return super().sign(payload, key=key, alg=alg,
                             protect=frozenset(['nonce', 'url', 'kid', 'jwk', 'alg']),
-                            nonce=nonce, url=url, kid=kid,
+                            nonce=nonce, url=url, kid=kid, jwk=jwk,
                             include_jwk=include_jwk)
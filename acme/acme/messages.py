@@ -3,6 +3,7 @@ from collections.abc import Hashable
 import datetime
 import json
 from typing import Any
+from typing import cast
 from typing import Dict
 from typing import Iterator
 from typing import List
@@ -575,6 +576,140 @@ class AuthorizationResource(ResourceWithURI):
     new_cert_uri: str = jose.field('new_cert_uri', omitempty=True)
 
 
+class ChallengeView:
+    """Lazily decoded view of a challenge of an authorization.
+
+    Only the JSON object of the challenge is kept. Its fields are decoded
+    when they are accessed, and the wrapped `.challenges.Challenge` only
+    if `chall` is, so that checking the status of a challenge is cheap.
+    Use `to_challenge_body` to get the full `ChallengeBody`.
+
+    """
+    __slots__ = ('_jobj', '_chall')
+
+    def __init__(self, jobj: Mapping[str, Any]) -> None:
+        self._jobj = jobj
+        self._chall: Optional[challenges.Challenge] = None
+
+    @classmethod
+    def from_json(cls, jobj: Any) -> 'ChallengeView':
+        """Wrap the JSON object of a challenge, without decoding it."""
+        if not isinstance(jobj, Mapping):
+            raise jose.DeserializationError(f'{cls.__name__} must be a JSON object')
+        return cls(jobj)
+
+    @property
+    def uri(self) -> Optional[str]:
+        """The URL of this challenge."""
+        return self._jobj.get('url')
+
+    @property
+    def typ(self) -> Optional[str]:
+        """The type of this challenge, e.g. ``http-01``."""
+        return self._jobj.get('type')
+
+    @property
+    def status(self) -> Status:
+        """The status of this challenge."""
+        return cast(Status, Status.from_json(self._jobj.get('status', STATUS_PENDING.name)))
+
+    @property
+    def error(self) -> Optional[Error]:
+        """The error of this challenge, if any."""
+        error = self._jobj.get('error')
+        return Error.from_json(error) if error is not None else None
+
+    @property
+    def chall(self) -> challenges.Challenge:
+        """The wrapped challenge, decoded on first access."""
+        if self._chall is None:
+            self._chall = challenges.Challenge.from_json(self._jobj)
+        return self._chall
+
+    def to_challenge_body(self) -> ChallengeBody:
+        """Decode the full challenge resource body."""
+        return ChallengeBody.from_json(self._jobj)
+
+    def to_partial_json(self) -> Dict[str, Any]:
+        """The JSON object of this challenge."""
+        return dict(self._jobj)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, ChallengeView) and other._jobj == self._jobj
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.typ}, {self.uri})'
+
+
+class AuthorizationView:
+    """Lazily decoded view of an Authorization Resource Body.
+
+    Polling an authorization only needs its status, while decoding a
+    full `Authorization` also decodes every one of its challenges. This
+    view keeps the JSON object of the authorization and decodes fields
+    when they are accessed. Its challenges are `ChallengeView` objects.
+    Use `to_authorization` to get the full `Authorization`.
+
+    """
+    __slots__ = ('_jobj', '_identifier', '_challenges')
+
+    def __init__(self, jobj: Mapping[str, Any]) -> None:
+        self._jobj = jobj
+        self._identifier: Optional[Identifier] = None
+        self._challenges: Optional[Tuple[ChallengeView, ...]] = None
+
+    @classmethod
+    def from_json(cls, jobj: Any) -> 'AuthorizationView':
+        """Wrap the JSON object of an authorization, without decoding it."""
+        if not isinstance(jobj, Mapping):
+            raise jose.DeserializationError(f'{cls.__name__} must be a JSON object')
+        return cls(jobj)
+
+    @property
+    def status(self) -> Optional[Status]:
+        """The status of this authorization."""
+        status = self._jobj.get('status')
+        return cast(Status, Status.from_json(status)) if status is not None else None
+
+    @property
+    def identifier(self) -> Optional[Identifier]:
+        """The identifier of this authorization, decoded on first access."""
+        if self._identifier is None and self._jobj.get('identifier') is not None:
+            self._identifier = Identifier.from_json(self._jobj['identifier'])
+        return self._identifier
+
+    @property
+    def challenges(self) -> Tuple[ChallengeView, ...]:
+        """Views of the challenges of this authorization."""
+        if self._challenges is None:
+            self._challenges = tuple(ChallengeView.from_json(chall)
+                                     for chall in self._jobj.get('challenges', ()))
+        return self._challenges
+
+    @property
+    def wildcard(self) -> Optional[bool]:
+        """Whether this authorization is for a wildcard domain."""
+        return self._jobj.get('wildcard')
+
+    def to_authorization(self) -> Authorization:
+        """Decode the full authorization resource body."""
+        return Authorization.from_json(self._jobj)
+
+    def to_partial_json(self) -> Dict[str, Any]:
+        """The JSON object of this authorization."""
+        return dict(self._jobj)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, AuthorizationView) and other._jobj == self._jobj
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self._jobj.get("identifier")}, {self.status})'
+
+
 class CertificateRequest(jose.JSONObjectWithFields):
     """ACME newOrder request.
 
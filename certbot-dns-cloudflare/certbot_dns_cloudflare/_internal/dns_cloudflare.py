@@ -83,9 +83,16 @@ class Authenticator(dns_common.DNSAuthenticator):
         if not self.credentials:  # pragma: no cover
             raise errors.Error("Plugin has not been prepared.")
         if self.credentials.conf('api-token'):
-            return _CloudflareClient(api_token = self.credentials.conf('api-token'))
+            return _CloudflareClient(api_token = self.credentials.conf('api-token'),
+                                     zone_cache = dns_common.zone_cache(
+                                         self.config, self.name,
+                                         [self.credentials.conf('api-token')]))
         return _CloudflareClient(email = self.credentials.conf('email'),
-                                 api_key = self.credentials.conf('api-key'))
+                                 api_key = self.credentials.conf('api-key'),
+                                 zone_cache = dns_common.zone_cache(
+                                     self.config, self.name,
+                                     [self.credentials.conf('email'),
+                                      self.credentials.conf('api-key')]))
 
 
 class _CloudflareClient:
@@ -94,7 +101,9 @@ class _CloudflareClient:
     """
 
     def __init__(self, email: Optional[str] = None, api_key: Optional[str] = None,
-                 api_token: Optional[str] = None) -> None:
+                 api_token: Optional[str] = None,
+                 zone_cache: Optional[dns_common.ZoneCache] = None) -> None:
+        self._zone_cache = zone_cache
         if email:
             # If an email was specified, we're using an email/key combination and not a token.
             # We can't use named arguments in this case, as it would break compatibility with
@@ -137,6 +146,9 @@ class _CloudflareClient:
                 hint = 'Does your API token have "Zone:DNS:Edit" permissions?'
 
             logger.error('Encountered CloudFlareAPIError adding TXT record: %d %s', e, e)
+            if self._zone_cache is not None:
+                # The zone may have changed since it was cached
+                self._zone_cache.forget(domain)
             raise errors.PluginError('Error communicating with the Cloudflare API: {0}{1}'
                                      .format(e, ' ({0})'.format(hint) if hint else ''))
 
@@ -179,7 +191,20 @@ class _CloudflareClient:
 
     def _find_zone_id(self, domain: str) -> str:
         """
-        Find the zone_id for a given domain.
+        Find the zone_id for a given domain, unless it is cached.
+
+        :param str domain: The domain for which to find the zone_id.
+        :returns: The zone_id, if found.
+        :rtype: str
+        :raises certbot.errors.PluginError: if no zone_id is found.
+        """
+        if self._zone_cache is None:
+            return self._discover_zone_id(domain)
+        return self._zone_cache.find(domain, self._discover_zone_id)
+
+    def _discover_zone_id(self, domain: str) -> str:
+        """
+        Find the zone_id for a given domain using the Cloudflare API.
 
         :param str domain: The domain for which to find the zone_id.
         :returns: The zone_id, if found.
@@ -135,6 +135,25 @@ class CloudflareClientTest(unittest.TestCase):
         with pytest.raises(errors.PluginError):
             self.cloudflare_client.add_txt_record(DOMAIN, self.record_name, self.record_content, self.record_ttl)
 
+    def test_zone_cache(self):
+        zone_cache = mock.MagicMock()
+        zone_cache.find.return_value = self.zone_id
+        self.cloudflare_client._zone_cache = zone_cache  # pylint: disable=protected-access
+
+        self.cloudflare_client.add_txt_record(DOMAIN, self.record_name, self.record_content,
+                                              self.record_ttl)
+
+        zone_cache.find.assert_called_once_with(DOMAIN, mock.ANY)
+        self.cf.zones.get.assert_not_called()
+        self.cf.zones.dns_records.post.assert_called_with(self.zone_id, data=mock.ANY)
+
+        self.cf.zones.dns_records.post.side_effect = CloudFlare.exceptions.CloudFlareAPIError(
+            1009, '', '')
+        with pytest.raises(errors.PluginError):
+            self.cloudflare_client.add_txt_record(DOMAIN, self.record_name, self.record_content,
+                                                  self.record_ttl)
+        zone_cache.forget.assert_called_once_with(DOMAIN)
+
     def test_add_txt_record_error_during_zone_lookup(self):
         self.cf.zones.get.side_effect = API_ERROR
 
@@ -3,6 +3,7 @@ import logging
 from typing import Any
 from typing import Callable
 from typing import cast
+from typing import List
 from typing import Optional
 
 import digitalocean
@@ -57,7 +58,8 @@ class Authenticator(dns_common.DNSAuthenticator):
     def _get_digitalocean_client(self) -> "_DigitalOceanClient":
         if not self.credentials:  # pragma: no cover
             raise errors.Error("Plugin has not been prepared.")
-        return _DigitalOceanClient(cast(str, self.credentials.conf('token')))
+        token = cast(str, self.credentials.conf('token'))
+        return _DigitalOceanClient(token, dns_common.zone_cache(self.config, self.name, [token]))
 
 
 class _DigitalOceanClient:
@@ -65,8 +67,9 @@ class _DigitalOceanClient:
     Encapsulates all communication with the DigitalOcean API.
     """
 
-    def __init__(self, token: str) -> None:
+    def __init__(self, token: str, zone_cache: Optional[dns_common.ZoneCache] = None) -> None:
         self.manager = digitalocean.Manager(token=token)
+        self._zone_cache = zone_cache
 
     def add_txt_record(self, domain_name: str, record_name: str, record_content: str,
                        record_ttl: int) -> None:
@@ -109,6 +112,9 @@ class _DigitalOceanClient:
             logger.debug('Successfully added TXT record with id: %d', record_id)
         except digitalocean.Error as e:
             logger.debug('Error adding TXT record using the DigitalOcean API: %s', e)
+            if self._zone_cache is not None:
+                # The domain may have changed since it was cached
+                self._zone_cache.forget(domain_name)
             raise errors.PluginError('Error adding TXT record using the DigitalOcean API: {0}'
                                      .format(e))
 
@@ -153,7 +159,29 @@ class _DigitalOceanClient:
 
     def _find_domain(self, domain_name: str) -> digitalocean.Domain:
         """
-        Find the domain object for a given domain name.
+        Find the domain object for a given domain name, unless its name is cached.
+
+        :param str domain_name: The domain name for which to find the corresponding Domain.
+        :returns: The Domain, if found.
+        :rtype: `~digitalocean.Domain`
+        :raises certbot.errors.PluginError: if no matching Domain is found.
+        """
+        if self._zone_cache is None:
+            return self._discover_domain(domain_name)
+        found: List[digitalocean.Domain] = []
+
+        def discover(name: str) -> str:
+            found.append(self._discover_domain(name))
+            return cast(str, found[0].name)
+
+        name = self._zone_cache.find(domain_name, discover)
+        if found:
+            return found[0]
+        return digitalocean.Domain(token=self.manager.token, name=name)
+
+    def _discover_domain(self, domain_name: str) -> digitalocean.Domain:
+        """
+        Find the domain object for a given domain name using the DigitalOcean API.
 
         :param str domain_name: The domain name for which to find the corresponding Domain.
         :returns: The Domain, if found.
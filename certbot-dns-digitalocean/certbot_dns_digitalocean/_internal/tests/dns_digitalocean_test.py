@@ -112,6 +112,34 @@ class DigitalOceanClientTest(unittest.TestCase):
         with pytest.raises(errors.PluginError):
             self.digitalocean_client.add_txt_record(DOMAIN, self.record_name, self.record_content, self.record_ttl)
 
+    @mock.patch('digitalocean.Domain')
+    def test_add_txt_record_zone_cache(self, mock_domain):
+        zone_cache = mock.MagicMock()
+        zone_cache.find.side_effect = lambda name, discover: discover(name)
+        self.digitalocean_client._zone_cache = zone_cache  # pylint: disable=protected-access
+        domain_mock = mock.MagicMock()
+        domain_mock.name = DOMAIN
+        domain_mock.create_new_domain_record.side_effect = API_ERROR
+        self.manager.get_all_domains.return_value = [domain_mock]
+
+        # Domains found with the API are used as they are
+        with pytest.raises(errors.PluginError):
+            self.digitalocean_client.add_txt_record(DOMAIN, self.record_name, self.record_content,
+                                                    self.record_ttl)
+        domain_mock.create_new_domain_record.assert_called_once()
+        zone_cache.forget.assert_called_once_with(DOMAIN)
+
+        # Cached domains are built from their name
+        zone_cache.find.side_effect = None
+        zone_cache.find.return_value = DOMAIN
+        mock_domain.return_value.name = DOMAIN
+        self.digitalocean_client.add_txt_record(DOMAIN, self.record_name, self.record_content,
+                                                self.record_ttl)
+        mock_domain.assert_called_once_with(token=self.manager.token, name=DOMAIN)
+        mock_domain.return_value.create_new_domain_record.assert_called_once_with(
+            type='TXT', name=self.record_prefix, data=self.record_content, ttl=self.record_ttl)
+        self.manager.get_all_domains.assert_called_once()
+
     def test_del_txt_record(self):
         first_record_mock = mock.MagicMock()
         first_record_mock.type = 'TXT'
@@ -78,7 +78,10 @@ class Authenticator(dns_common.DNSAuthenticator):
 
     def _get_google_client(self) -> '_GoogleClient':
         if self.google_client is None:
-            self.google_client = _GoogleClient(self.conf('credentials'), self.conf('project'))
+            self.google_client = _GoogleClient(
+                self.conf('credentials'), self.conf('project'),
+                zone_cache=dns_common.zone_cache(
+                    self.config, self.name, [self.conf('credentials'), self.conf('project')]))
         return self.google_client
 
 
@@ -90,7 +93,9 @@ class _GoogleClient:
 
     def __init__(self, account_json: Optional[str] = None,
                  dns_project_id: Optional[str] = None,
-                 dns_api: Optional[discovery.Resource] = None) -> None:
+                 dns_api: Optional[discovery.Resource] = None,
+                 zone_cache: Optional[dns_common.ZoneCache] = None) -> None:
+        self._zone_cache = zone_cache
 
         scopes = ['https://www.googleapis.com/auth/ndev.clouddns.readwrite']
         credentials = None
@@ -189,6 +194,9 @@ class _GoogleClient:
                 status = response['status']
         except googleapiclient_errors.Error as e:
             logger.error('Encountered error adding TXT record: %s', e)
+            if self._zone_cache is not None:
+                # The managed zone may have changed since it was cached
+                self._zone_cache.forget(domain)
             raise errors.PluginError('Error communicating with the Google Cloud DNS API: {0}'
                                      .format(e))
 
@@ -285,7 +293,20 @@ class _GoogleClient:
 
     def _find_managed_zone_id(self, domain: str) -> str:
         """
-        Find the managed zone for a given domain.
+        Find the managed zone for a given domain, unless it is cached.
+
+        :param str domain: The domain for which to find the managed zone.
+        :returns: The ID of the managed zone, if found.
+        :rtype: str
+        :raises certbot.errors.PluginError: if the managed zone cannot be found.
+        """
+        if self._zone_cache is None:
+            return self._discover_managed_zone_id(domain)
+        return self._zone_cache.find(domain, self._discover_managed_zone_id)
+
+    def _discover_managed_zone_id(self, domain: str) -> str:
+        """
+        Find the managed zone for a given domain using the Google Cloud DNS API.
 
         :param str domain: The domain for which to find the managed zone.
         :returns: The ID of the managed zone, if found.
@@ -344,6 +344,29 @@ class GoogleClientTest(unittest.TestCase):
         with pytest.raises(errors.PluginError):
             client.add_txt_record(DOMAIN, self.record_name, self.record_content, self.record_ttl)
 
+    @mock.patch('google.auth.load_credentials_from_file')
+    @mock.patch('certbot_dns_google._internal.dns_google.open',
+                mock.mock_open(read_data='{"project_id": "' + PROJECT_ID + '"}'), create=True)
+    def test_add_txt_record_zone_cache(self, credential_mock):
+        credential_mock.return_value = (mock.MagicMock(), PROJECT_ID)
+
+        client, changes = self._setUp_client_with_mock([])
+        zone_cache = mock.MagicMock()
+        zone_cache.find.return_value = self.zone
+        client._zone_cache = zone_cache  # pylint: disable=protected-access
+
+        client.add_txt_record(DOMAIN, self.record_name, self.record_content, self.record_ttl)
+
+        zone_cache.find.assert_called_once_with(DOMAIN, mock.ANY)
+        client.dns.managedZones.assert_not_called()
+        changes.create.assert_called_with(body=mock.ANY, managedZone=self.zone,
+                                          project=PROJECT_ID)
+
+        changes.create.side_effect = API_ERROR
+        with pytest.raises(errors.PluginError):
+            client.add_txt_record(DOMAIN, self.record_name, self.record_content, self.record_ttl)
+        zone_cache.forget.assert_called_once_with(DOMAIN)
+
     @mock.patch('google.auth.load_credentials_from_file')
     @mock.patch('certbot_dns_google._internal.dns_google.open',
                 mock.mock_open(read_data='{"project_id": "' + PROJECT_ID + '"}'), create=True)
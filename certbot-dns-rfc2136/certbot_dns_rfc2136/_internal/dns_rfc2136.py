@@ -1,9 +1,15 @@
 """DNS Authenticator using RFC 2136 Dynamic Updates."""
 import logging
+import socket
+import threading
 from typing import Any
 from typing import Callable
 from typing import cast
+from typing import Dict
+from typing import Iterable
+from typing import List
 from typing import Optional
+from typing import Tuple
 
 import dns.flags
 import dns.message
@@ -16,6 +22,7 @@ import dns.tsigkeyring
 import dns.update
 
 from certbot import errors
+from certbot import util
 from certbot.plugins import dns_common
 from certbot.plugins.dns_common import CredentialsConfiguration
 from certbot.util import is_ipaddress
@@ -24,6 +31,14 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_NETWORK_TIMEOUT = 45
 
+# TCP connections to each DNS server, opened on first use and kept open for the run
+_connections: Dict[Tuple[str, int], "_Connection"] = {}
+_connections_lock = threading.Lock()
+
+# Whether each DNS server answered authoritatively for the SOA of a domain name during the run
+_soa_answers: Dict[Tuple[str, int, str], bool] = {}
+_soa_answers_lock = threading.Lock()
+
 
 class Authenticator(dns_common.DNSAuthenticator):
     """DNS Authenticator using RFC 2136 Dynamic Updates
@@ -87,17 +102,31 @@ class Authenticator(dns_common.DNSAuthenticator):
     def _cleanup(self, _domain: str, validation_name: str, validation: str) -> None:
         self._get_rfc2136_client().del_txt_record(validation_name, validation)
 
+    def _perform_batch(self, records: List[Tuple[str, str, str]]) -> None:
+        self._get_rfc2136_client().add_txt_records(
+            [(validation_name, validation) for _, validation_name, validation in records],
+            self.ttl)
+
+    def _cleanup_batch(self, records: List[Tuple[str, str, str]]) -> None:
+        self._get_rfc2136_client().del_txt_records(
+            [(validation_name, validation) for _, validation_name, validation in records])
+
     def _get_rfc2136_client(self) -> "_RFC2136Client":
         if not self.credentials:  # pragma: no cover
             raise errors.Error("Plugin has not been prepared.")
 
-        return _RFC2136Client(cast(str, self.credentials.conf('server')),
-                              int(cast(str, self.credentials.conf('port')) or self.PORT),
-                              cast(str, self.credentials.conf('name')),
+        server = cast(str, self.credentials.conf('server'))
+        port = int(cast(str, self.credentials.conf('port')) or self.PORT)
+        key_name = cast(str, self.credentials.conf('name'))
+        return _RFC2136Client(server,
+                              port,
+                              key_name,
                               cast(str, self.credentials.conf('secret')),
                               self.ALGORITHMS.get(self.credentials.conf('algorithm') or '',
                                                   dns.tsig.HMAC_MD5),
-                              (self.credentials.conf('sign_query') or '').upper() == "TRUE")
+                              (self.credentials.conf('sign_query') or '').upper() == "TRUE",
+                              zone_cache=dns_common.zone_cache(
+                                  self.config, self.name, [server, str(port), key_name]))
 
 
 class _RFC2136Client:
@@ -106,7 +135,8 @@ class _RFC2136Client:
     """
     def __init__(self, server: str, port: int, key_name: str, key_secret: str,
                  key_algorithm: dns.name.Name, sign_query: bool,
-                 timeout: int = DEFAULT_NETWORK_TIMEOUT) -> None:
+                 timeout: int = DEFAULT_NETWORK_TIMEOUT,
+                 zone_cache: Optional[dns_common.ZoneCache] = None) -> None:
         self.server = server
         self.port = port
         self.keyring = dns.tsigkeyring.from_text({
@@ -115,6 +145,7 @@ class _RFC2136Client:
         self.algorithm = key_algorithm
         self.sign_query = sign_query
         self._default_timeout = timeout
+        self._zone_cache = zone_cache
 
     def add_txt_record(self, record_name: str, record_content: str, record_ttl: int) -> None:
         """
@@ -125,31 +156,34 @@ class _RFC2136Client:
         :param int record_ttl: The record TTL (number of seconds that the record may be cached).
         :raises certbot.errors.PluginError: if an error occurs communicating with the DNS server
         """
+        self.add_txt_records([(record_name, record_content)], record_ttl)
 
-        domain = self._find_domain(record_name)
-
-        n = dns.name.from_text(record_name)
-        o = dns.name.from_text(domain)
-        rel = n.relativize(o)
+    def add_txt_records(self, records: Iterable[Tuple[str, str]], record_ttl: int) -> None:
+        """
+        Add TXT records, sending a single update for all records of a zone.
 
-        update = dns.update.Update(
-            domain,
-            keyring=self.keyring,
-            keyalgorithm=self.algorithm)
-        update.add(rel, record_ttl, dns.rdatatype.TXT, record_content)
+        :param records: The name and content of each record.
+        :type records: `collections.abc.Iterable` of `tuple` of `str`
+        :param int record_ttl: The record TTL (number of seconds that the record may be cached).
+        :raises certbot.errors.PluginError: if an error occurs communicating with the DNS server
+        """
+        for domain, zone_records in self._records_by_zone(records).items():
+            update = dns.update.Update(
+                domain,
+                keyring=self.keyring,
+                keyalgorithm=self.algorithm)
+            for _, rel, record_content in zone_records:
+                update.add(rel, record_ttl, dns.rdatatype.TXT, record_content)
+            try:
+                self._send_update(update, 'adding')
+            except errors.PluginError:
+                # The zone may have changed since it was cached
+                for record_name, _, _ in zone_records:
+                    self._forget_domain(record_name)
+                raise
 
-        try:
-            response = dns.query.tcp(update, self.server, self._default_timeout, self.port)
-        except Exception as e:
-            raise errors.PluginError('Encountered error adding TXT record: {0}'
-                                     .format(e))
-        rcode = response.rcode()
-
-        if rcode == dns.rcode.NOERROR:
-            logger.debug('Successfully added TXT record %s', record_name)
-        else:
-            raise errors.PluginError('Received response from server: {0}'
-                                     .format(dns.rcode.to_text(rcode)))
+            for record_name, _, _ in zone_records:
+                logger.debug('Successfully added TXT record %s', record_name)
 
     def del_txt_record(self, record_name: str, record_content: str) -> None:
         """
@@ -160,33 +194,83 @@ class _RFC2136Client:
         :param int record_ttl: The record TTL (number of seconds that the record may be cached).
         :raises certbot.errors.PluginError: if an error occurs communicating with the DNS server
         """
+        self.del_txt_records([(record_name, record_content)])
 
-        domain = self._find_domain(record_name)
+    def del_txt_records(self, records: Iterable[Tuple[str, str]]) -> None:
+        """
+        Delete TXT records, sending a single update for all records of a zone.
 
-        n = dns.name.from_text(record_name)
-        o = dns.name.from_text(domain)
-        rel = n.relativize(o)
+        :param records: The name and content of each record.
+        :type records: `collections.abc.Iterable` of `tuple` of `str`
+        :raises certbot.errors.PluginError: if an error occurs communicating with the DNS server
+        """
+        for domain, zone_records in self._records_by_zone(records).items():
+            update = dns.update.Update(
+                domain,
+                keyring=self.keyring,
+                keyalgorithm=self.algorithm)
+            for _, rel, record_content in zone_records:
+                update.delete(rel, dns.rdatatype.TXT, record_content)
+            self._send_update(update, 'deleting')
+
+            for record_name, _, _ in zone_records:
+                logger.debug('Successfully deleted TXT record %s', record_name)
+
+    def _records_by_zone(self, records: Iterable[Tuple[str, str]]
+                         ) -> Dict[str, List[Tuple[str, dns.name.Name, str]]]:
+        """
+        Group records by the domain of their zone.
 
-        update = dns.update.Update(
-            domain,
-            keyring=self.keyring,
-            keyalgorithm=self.algorithm)
-        update.delete(rel, dns.rdatatype.TXT, record_content)
+        :param records: The name and content of each record.
+        :returns: The name, the name relative to its zone and the content of each
+            record, by zone.
+        :rtype: dict
+        :raises certbot.errors.PluginError: if the zone of a record can't be found.
+        """
+        zones: Dict[str, List[Tuple[str, dns.name.Name, str]]] = {}
+        for record_name, record_content in records:
+            domain = self._find_domain(record_name)
+            rel = dns.name.from_text(record_name).relativize(dns.name.from_text(domain))
+            zones.setdefault(domain, []).append((record_name, rel, record_content))
+        return zones
+
+    def _send_update(self, update: dns.update.Update, action: str) -> None:
+        """
+        Send an update to the target DNS server.
 
+        :param dns.update.Update update: The update to send.
+        :param str action: What the update does, for error messages.
+        :raises certbot.errors.PluginError: if the update fails.
+        """
         try:
-            response = dns.query.tcp(update, self.server, self._default_timeout, self.port)
+            response = _connection(self.server, self.port).query(update, self._default_timeout)
         except Exception as e:
-            raise errors.PluginError('Encountered error deleting TXT record: {0}'
-                                     .format(e))
+            raise errors.PluginError('Encountered error {0} TXT record: {1}'
+                                     .format(action, e))
         rcode = response.rcode()
 
-        if rcode == dns.rcode.NOERROR:
-            logger.debug('Successfully deleted TXT record %s', record_name)
-        else:
+        if rcode != dns.rcode.NOERROR:
             raise errors.PluginError('Received response from server: {0}'
                                      .format(dns.rcode.to_text(rcode)))
 
     def _find_domain(self, record_name: str) -> str:
+        """
+        Find the closest domain with an SOA record for a given domain name, unless it is cached.
+
+        :param str record_name: The record name for which to find the closest SOA record.
+        :returns: The domain, if found.
+        :rtype: str
+        :raises certbot.errors.PluginError: if no SOA record can be found.
+        """
+        if self._zone_cache is None:
+            return self._discover_domain(record_name)
+        return self._zone_cache.find(record_name, self._discover_domain)
+
+    def _forget_domain(self, record_name: str) -> None:
+        if self._zone_cache is not None:
+            self._zone_cache.forget(record_name)
+
+    def _discover_domain(self, record_name: str) -> str:
         """
         Find the closest domain with an SOA record for a given domain name.
 
@@ -207,6 +291,24 @@ class _RFC2136Client:
                                  .format(record_name, domain_name_guesses))
 
     def _query_soa(self, domain_name: str) -> bool:
+        """
+        Query a domain name for an authoritative SOA record, unless it was queried during the run.
+
+        :param str domain_name: The domain name to query for an SOA record.
+        :returns: True if found, False otherwise.
+        :rtype: bool
+        :raises certbot.errors.PluginError: if no response is received.
+        """
+        key = (self.server, self.port, domain_name)
+        with _soa_answers_lock:
+            if key in _soa_answers:
+                return _soa_answers[key]
+        found = self._send_soa_query(domain_name)
+        with _soa_answers_lock:
+            _soa_answers[key] = found
+        return found
+
+    def _send_soa_query(self, domain_name: str) -> bool:
         """
         Query a domain name for an authoritative SOA record.
 
@@ -227,8 +329,9 @@ class _RFC2136Client:
 
         try:
             try:
-                response = dns.query.tcp(request, self.server, self._default_timeout, self.port)
-            except (OSError, dns.exception.Timeout) as e:
+                response = _connection(self.server, self.port).query(
+                    request, self._default_timeout)
+            except (OSError, EOFError, dns.exception.Timeout) as e:
                 logger.debug('TCP query failed, fallback to UDP: %s', e)
                 response = dns.query.udp(request, self.server, self._default_timeout, self.port)
             rcode = response.rcode()
@@ -246,3 +349,78 @@ class _RFC2136Client:
         except Exception as e:
             raise errors.PluginError('Encountered error when making query: {0}'
                                      .format(e))
+
+
+class _Connection:
+    """
+    A TCP connection to a DNS server, used for all its queries and updates during the run.
+    """
+    def __init__(self, server: str, port: int) -> None:
+        self.server = server
+        self.port = port
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+
+    def query(self, request: dns.message.Message, timeout: float) -> dns.message.Message:
+        """
+        Send a message and wait for its response.
+
+        Servers close connections which stay idle for a while, so a message which
+        can't be sent on a connection opened earlier is sent again on a new one.
+
+        :param dns.message.Message request: The message to send.
+        :param float timeout: The number of seconds to wait for the response.
+        :returns: The response.
+        :rtype: dns.message.Message
+        """
+        with self._lock:
+            reused = self._sock is not None
+            try:
+                return self._query(request, timeout)
+            except (OSError, EOFError) as e:
+                if not reused:
+                    raise
+                logger.debug('Connection to %s closed, reconnecting: %s', self.server, e)
+            return self._query(request, timeout)
+
+    def close(self) -> None:
+        """Close the connection, if it is open."""
+        with self._lock:
+            self._close()
+
+    def _query(self, request: dns.message.Message, timeout: float) -> dns.message.Message:
+        if self._sock is None:
+            sock = socket.create_connection((self.server, self.port), timeout)
+            sock.setblocking(False)
+            self._sock = sock
+        try:
+            return dns.query.tcp(request, self.server, timeout, self.port, sock=self._sock)
+        except BaseException:
+            # The connection is left in an unknown state after a partial exchange
+            self._close()
+            raise
+
+    def _close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+def _connection(server: str, port: int) -> _Connection:
+    """The connection to a DNS server, shared by all clients during the run."""
+    with _connections_lock:
+        connection = _connections.get((server, port))
+        if connection is None:
+            connection = _connections[(server, port)] = _Connection(server, port)
+        return connection
+
+
+def _close_connections() -> None:
+    with _connections_lock:
+        connections = list(_connections.values())
+        _connections.clear()
+    for connection in connections:
+        connection.close()
+
+
+util.atexit_register(_close_connections)
@@ -1,12 +1,24 @@
 """Tests for certbot_dns_rfc2136._internal.dns_rfc2136."""
 
+import socketserver
 import sys
+import threading
+from typing import cast
+from typing import List
+from typing import Tuple
+from typing import TYPE_CHECKING
 import unittest
 from unittest import mock
 
+import dns.exception
 import dns.flags
+import dns.message
+import dns.opcode
+import dns.query
 import dns.rcode
+import dns.rrset
 import dns.tsig
+import dns.tsigkeyring
 import pytest
 
 from certbot import errors
@@ -15,12 +27,16 @@ from certbot.plugins import dns_test_common
 from certbot.plugins.dns_test_common import DOMAIN
 from certbot.tests import util as test_util
 
+if TYPE_CHECKING:
+    from certbot_dns_rfc2136._internal.dns_rfc2136 import _RFC2136Client
+
 SERVER = '192.0.2.1'
 PORT = 53
 NAME = 'a-tsig-key.'
 SECRET = 'SSB3b25kZXIgd2hvIHdpbGwgYm90aGVyIHRvIGRlY29kZSB0aGlzIHRleHQK'
 VALID_CONFIG = {"rfc2136_server": SERVER, "rfc2136_name": NAME, "rfc2136_secret": SECRET}
 TIMEOUT = 45
+MODULE = 'certbot_dns_rfc2136._internal.dns_rfc2136'
 
 
 class AuthenticatorTest(test_util.TempDirTestCase, dns_test_common.BaseAuthenticatorTest):
@@ -59,7 +75,7 @@ class AuthenticatorTest(test_util.TempDirTestCase, dns_test_common.BaseAuthentic
     def test_perform(self, unused_mock_get_utility):
         self.auth.perform([self.achall])
 
-        expected = [mock.call.add_txt_record('_acme-challenge.'+DOMAIN, mock.ANY, mock.ANY)]
+        expected = [mock.call.add_txt_records([('_acme-challenge.'+DOMAIN, mock.ANY)], mock.ANY)]
         assert expected == self.mock_client.mock_calls
 
     def test_cleanup(self):
@@ -67,7 +83,7 @@ class AuthenticatorTest(test_util.TempDirTestCase, dns_test_common.BaseAuthentic
         self.auth._attempt_cleanup = True
         self.auth.cleanup([self.achall])
 
-        expected = [mock.call.del_txt_record('_acme-challenge.'+DOMAIN, mock.ANY)]
+        expected = [mock.call.del_txt_records([('_acme-challenge.'+DOMAIN, mock.ANY)])]
         assert expected == self.mock_client.mock_calls
 
     def test_invalid_algorithm_raises(self):
@@ -115,6 +131,15 @@ class RFC2136ClientTest(unittest.TestCase):
         self.rfc2136_client = _RFC2136Client(SERVER, PORT, NAME, SECRET, dns.tsig.HMAC_MD5,
         False, TIMEOUT)
 
+        # Connections and SOA answers are kept for the run
+        for patcher in (mock.patch.dict(MODULE + '._connections', clear=True),
+                        mock.patch.dict(MODULE + '._soa_answers', clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        connection_patcher = mock.patch(MODULE + '.socket.create_connection')
+        self.create_connection = connection_patcher.start()
+        self.addCleanup(connection_patcher.stop)
+
     @mock.patch("dns.query.tcp")
     def test_add_txt_record(self, query_mock):
         query_mock.return_value.rcode.return_value = dns.rcode.NOERROR
@@ -125,7 +150,7 @@ class RFC2136ClientTest(unittest.TestCase):
 
         self.rfc2136_client.add_txt_record("bar", "baz", 42)
 
-        query_mock.assert_called_with(mock.ANY, SERVER, TIMEOUT, PORT)
+        query_mock.assert_called_with(mock.ANY, SERVER, TIMEOUT, PORT, sock=mock.ANY)
         assert 'bar. 42 IN TXT "baz"' in str(query_mock.call_args[0][0])
 
     @mock.patch("dns.query.tcp")
@@ -150,6 +175,43 @@ class RFC2136ClientTest(unittest.TestCase):
         with pytest.raises(errors.PluginError):
             self.rfc2136_client.add_txt_record("bar", "baz", 42)
 
+    @mock.patch("dns.query.tcp")
+    def test_add_txt_records_one_update_per_zone(self, query_mock):
+        query_mock.return_value.rcode.return_value = dns.rcode.NOERROR
+        # _find_domain | pylint: disable=protected-access
+        # workaround for wont-fix https://github.com/python/mypy/issues/2427 that works with
+        # both strict and non-strict mypy
+        setattr(self.rfc2136_client, '_find_domain', mock.MagicMock(
+            side_effect=lambda name: name.split('.', 1)[1]))
+
+        self.rfc2136_client.add_txt_records([
+            ("_acme-challenge.example.com", "foo"),
+            ("_acme-challenge.example.com", "bar"),
+            ("_acme-challenge.example.org", "baz"),
+        ], 42)
+
+        assert query_mock.call_count == 2
+        first, second = (str(call[0][0]) for call in query_mock.call_args_list)
+        assert '_acme-challenge 42 IN TXT "foo"' in first
+        assert '_acme-challenge 42 IN TXT "bar"' in first
+        assert 'example.org' not in first
+        assert '_acme-challenge 42 IN TXT "baz"' in second
+
+    @mock.patch("dns.query.tcp")
+    def test_del_txt_records_one_update_per_zone(self, query_mock):
+        query_mock.return_value.rcode.return_value = dns.rcode.NOERROR
+        # _find_domain | pylint: disable=protected-access
+        # workaround for wont-fix https://github.com/python/mypy/issues/2427 that works with
+        # both strict and non-strict mypy
+        setattr(self.rfc2136_client, '_find_domain', mock.MagicMock(return_value="example.com"))
+
+        self.rfc2136_client.del_txt_records([("foo.example.com", "baz"),
+                                             ("bar.example.com", "qux")])
+
+        query_mock.assert_called_once_with(mock.ANY, SERVER, TIMEOUT, PORT, sock=mock.ANY)
+        assert 'foo 0 NONE TXT "baz"' in str(query_mock.call_args[0][0])
+        assert 'bar 0 NONE TXT "qux"' in str(query_mock.call_args[0][0])
+
     @mock.patch("dns.query.tcp")
     def test_del_txt_record(self, query_mock):
         query_mock.return_value.rcode.return_value = dns.rcode.NOERROR
@@ -160,7 +222,7 @@ class RFC2136ClientTest(unittest.TestCase):
 
         self.rfc2136_client.del_txt_record("bar", "baz")
 
-        query_mock.assert_called_with(mock.ANY, SERVER, TIMEOUT, PORT)
+        query_mock.assert_called_with(mock.ANY, SERVER, TIMEOUT, PORT, sock=mock.ANY)
         assert 'bar. 0 NONE TXT "baz"' in str(query_mock.call_args[0][0])
 
     @mock.patch("dns.query.tcp")
@@ -196,6 +258,27 @@ class RFC2136ClientTest(unittest.TestCase):
 
         assert domain == DOMAIN
 
+    @mock.patch("dns.query.tcp")
+    def test_find_domain_zone_cache(self, query_mock):
+        zone_cache = mock.MagicMock()
+        zone_cache.find.side_effect = lambda name, discover: discover(name)
+        self.rfc2136_client._zone_cache = zone_cache  # pylint: disable=protected-access
+        # _query_soa | pylint: disable=protected-access
+        # workaround for wont-fix https://github.com/python/mypy/issues/2427 that works with
+        # both strict and non-strict mypy
+        setattr(self.rfc2136_client, '_query_soa', mock.MagicMock(side_effect=[False, True]))
+
+        assert self.rfc2136_client._find_domain('foo.'+DOMAIN) == DOMAIN
+        zone_cache.find.assert_called_once_with('foo.'+DOMAIN, mock.ANY)
+
+        # Failed updates make the zone be looked up again next time
+        query_mock.return_value.rcode.return_value = dns.rcode.NOTAUTH
+        zone_cache.find.side_effect = None
+        zone_cache.find.return_value = DOMAIN
+        with pytest.raises(errors.PluginError):
+            self.rfc2136_client.add_txt_record('foo.'+DOMAIN, "baz", 42)
+        zone_cache.forget.assert_called_once_with('foo.'+DOMAIN)
+
     def test_find_domain_wraps_errors(self):
         # _query_soa | pylint: disable=protected-access
         # workaround for wont-fix https://github.com/python/mypy/issues/2427 that works with
@@ -215,7 +298,7 @@ class RFC2136ClientTest(unittest.TestCase):
         # _query_soa | pylint: disable=protected-access
         result = self.rfc2136_client._query_soa(DOMAIN)
 
-        query_mock.assert_called_with(mock.ANY, SERVER, TIMEOUT, PORT)
+        query_mock.assert_called_with(mock.ANY, SERVER, TIMEOUT, PORT, sock=mock.ANY)
         mock_make_query.return_value.use_tsig.assert_not_called()
         assert result
 
@@ -226,7 +309,7 @@ class RFC2136ClientTest(unittest.TestCase):
         # _query_soa | pylint: disable=protected-access
         result = self.rfc2136_client._query_soa(DOMAIN)
 
-        query_mock.assert_called_with(mock.ANY, SERVER, TIMEOUT, PORT)
+        query_mock.assert_called_with(mock.ANY, SERVER, TIMEOUT, PORT, sock=mock.ANY)
         assert not result
 
     @mock.patch("dns.query.tcp")
@@ -246,7 +329,7 @@ class RFC2136ClientTest(unittest.TestCase):
         # _query_soa | pylint: disable=protected-access
         result = self.rfc2136_client._query_soa(DOMAIN)
 
-        tcp_mock.assert_called_with(mock.ANY, SERVER, TIMEOUT, PORT)
+        tcp_mock.assert_called_with(mock.ANY, SERVER, TIMEOUT, PORT, sock=mock.ANY)
         udp_mock.assert_called_with(mock.ANY, SERVER, TIMEOUT, PORT)
         assert result
 
@@ -262,6 +345,177 @@ class RFC2136ClientTest(unittest.TestCase):
         mock_make_query.return_value.use_tsig.assert_called_with(mock.ANY,
             algorithm=dns.tsig.HMAC_MD5)
 
+    @mock.patch("dns.query.tcp")
+    def test_query_soa_once_per_run(self, query_mock):
+        query_mock.return_value.rcode.return_value = dns.rcode.NXDOMAIN
+
+        # _query_soa | pylint: disable=protected-access
+        assert not self.rfc2136_client._query_soa(DOMAIN)
+        assert not self.rfc2136_client._query_soa(DOMAIN)
+        assert query_mock.call_count == 1
+
+        # Other servers are queried separately
+        self.rfc2136_client.port = 5353
+        self.rfc2136_client._query_soa(DOMAIN)
+        assert query_mock.call_count == 2
+
+    @mock.patch("dns.query.tcp")
+    def test_connection_reused(self, query_mock):
+        query_mock.return_value.rcode.return_value = dns.rcode.NOERROR
+        # _find_domain | pylint: disable=protected-access
+        # workaround for wont-fix https://github.com/python/mypy/issues/2427 that works with
+        # both strict and non-strict mypy
+        setattr(self.rfc2136_client, '_find_domain', mock.MagicMock(return_value="example.com"))
+
+        self.rfc2136_client.add_txt_record("bar", "baz", 42)
+        self.rfc2136_client.del_txt_record("bar", "baz")
+
+        self.create_connection.assert_called_once_with((SERVER, PORT), TIMEOUT)
+        sock = self.create_connection.return_value
+        sock.setblocking.assert_called_once_with(False)
+        assert [call[1]["sock"] for call in query_mock.call_args_list] == [sock, sock]
+        sock.close.assert_not_called()
+
+    @mock.patch("dns.query.tcp")
+    def test_connection_reopened(self, query_mock):
+        response = mock.MagicMock()
+        response.rcode.return_value = dns.rcode.NOERROR
+        query_mock.side_effect = [response, EOFError, response]
+        first, second = mock.MagicMock(), mock.MagicMock()
+        self.create_connection.side_effect = [first, second]
+        # _find_domain | pylint: disable=protected-access
+        # workaround for wont-fix https://github.com/python/mypy/issues/2427 that works with
+        # both strict and non-strict mypy
+        setattr(self.rfc2136_client, '_find_domain', mock.MagicMock(return_value="example.com"))
+
+        self.rfc2136_client.add_txt_record("bar", "baz", 42)
+        # The server closed the connection in the meantime
+        self.rfc2136_client.del_txt_record("bar", "baz")
+
+        first.close.assert_called_once_with()
+        assert [call[1]["sock"] for call in query_mock.call_args_list] == [first, first, second]
+
+    @mock.patch("dns.query.tcp")
+    def test_connection_closed_after_timeout(self, query_mock):
+        query_mock.side_effect = dns.exception.Timeout
+        # _find_domain | pylint: disable=protected-access
+        # workaround for wont-fix https://github.com/python/mypy/issues/2427 that works with
+        # both strict and non-strict mypy
+        setattr(self.rfc2136_client, '_find_domain', mock.MagicMock(return_value="example.com"))
+
+        with pytest.raises(errors.PluginError):
+            self.rfc2136_client.add_txt_record("bar", "baz", 42)
+
+        assert query_mock.call_count == 1
+        self.create_connection.return_value.close.assert_called_once_with()
+
+
+class _LocalDNSServer(socketserver.ThreadingTCPServer):
+    """Stand-in for a DNS server authoritative for example.com, served over TCP on 127.0.0.1.
+
+    Signed updates are recorded in `updates` and answered successfully. If
+    `close_connections` is set, the connection is closed after each response.
+
+    """
+    daemon_threads = True
+
+    def __init__(self, close_connections: bool = False) -> None:
+        super().__init__(('127.0.0.1', 0), _LocalDNSHandler)
+        self.keyring = dns.tsigkeyring.from_text({NAME: SECRET})
+        self.close_connections = close_connections
+        self.connections = 0
+        self.soa_queries = 0
+        self.updates: List[dns.message.Message] = []
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    def answer(self, request: dns.message.Message) -> dns.message.Message:
+        """Answer a query or an update."""
+        response = dns.message.make_response(request)
+        if request.opcode() == dns.opcode.UPDATE:
+            self.updates.append(request)
+            return response
+        self.soa_queries += 1
+        if request.question[0].name.to_text() == DOMAIN + '.':
+            response.flags |= dns.flags.AA
+            response.answer.append(dns.rrset.from_text(
+                DOMAIN + '.', 60, 'IN', 'SOA',
+                'ns1.example.com. admin.example.com. 1 3600 600 86400 60'))
+        else:
+            response.set_rcode(dns.rcode.NXDOMAIN)
+        return response
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        self.shutdown()
+        self.server_close()
+
+
+class _LocalDNSHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        server = cast(_LocalDNSServer, self.server)
+        server.connections += 1
+        while True:
+            try:
+                request, _ = dns.query.receive_tcp(self.request, None, keyring=server.keyring)
+            except (EOFError, OSError):
+                return
+            dns.query.send_tcp(self.request, server.answer(request), None)
+            if server.close_connections:
+                return
+
+
+class RFC2136ClientConnectionTest(unittest.TestCase):
+    """Tests of _RFC2136Client against a local DNS server."""
+
+    def setUp(self):
+        from certbot_dns_rfc2136._internal import dns_rfc2136
+
+        for patcher in (mock.patch.dict(MODULE + '._connections', clear=True),
+                        mock.patch.dict(MODULE + '._soa_answers', clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.dns_rfc2136 = dns_rfc2136
+        self.records = [('_acme-challenge.' + DOMAIN, 'foo'),
+                        ('_acme-challenge.www.' + DOMAIN, 'bar')]
+
+    def _client(self, close_connections: bool = False
+                ) -> Tuple[_LocalDNSServer, '_RFC2136Client']:
+        server = _LocalDNSServer(close_connections)
+        self.addCleanup(server.stop)
+        # pylint: disable=protected-access
+        self.addCleanup(self.dns_rfc2136._close_connections)
+        client = self.dns_rfc2136._RFC2136Client(
+            '127.0.0.1', server.server_address[1], NAME, SECRET, dns.tsig.HMAC_MD5, False, 5)
+        return server, client
+
+    def test_one_connection_per_run(self):
+        server, client = self._client()
+
+        client.add_txt_records(self.records, 42)
+        client.del_txt_records(self.records)
+        # Another client for the same server in the run
+        client = self.dns_rfc2136._RFC2136Client(  # pylint: disable=protected-access
+            '127.0.0.1', server.server_address[1], NAME, SECRET, dns.tsig.HMAC_MD5, False, 5)
+        client.add_txt_records(self.records[:1], 42)
+
+        assert server.connections == 1
+        assert len(server.updates) == 3
+        # _acme-challenge.example.com, example.com, _acme-challenge.www.example.com and
+        # www.example.com are each queried once
+        assert server.soa_queries == 4
+        assert '_acme-challenge.example.com. 42 IN TXT "foo"' in str(server.updates[0])
+        assert '_acme-challenge.www.example.com. 42 IN TXT "bar"' in str(server.updates[0])
+
+    def test_closed_connections_reopened(self):
+        server, client = self._client(close_connections=True)
+
+        client.add_txt_records(self.records, 42)
+        client.del_txt_records(self.records)
+
+        assert server.connections == server.soa_queries + len(server.updates)
+        assert len(server.updates) == 2
+
 
 if __name__ == "__main__":
     sys.exit(pytest.main(sys.argv[1:] + [__file__]))  # pragma: no cover
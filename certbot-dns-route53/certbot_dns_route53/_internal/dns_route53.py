@@ -1,6 +1,7 @@
 """Certbot Route53 authenticator plugin."""
 import collections
 import logging
+import threading
 import time
 from typing import Any
 from typing import Callable
@@ -8,6 +9,8 @@ from typing import DefaultDict
 from typing import Dict
 from typing import Iterable
 from typing import List
+from typing import Optional
+from typing import Tuple
 from typing import Type
 from typing import cast
 
@@ -21,6 +24,7 @@ from certbot import errors
 from certbot import interfaces
 from certbot.achallenges import AnnotatedChallenge
 from certbot.plugins import common
+from certbot.plugins import dns_common
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +33,19 @@ INSTRUCTIONS = (
     "https://boto3.readthedocs.io/en/latest/guide/configuration.html#best-practices-for-configuring-credentials "  # pylint: disable=line-too-long
     "and add the necessary permissions for Route53 access.")
 
+# Polling of changes until they are INSYNC: total time in seconds before giving
+# up, and delays in seconds between rounds of polling, which grow exponentially.
+CHANGE_TIMEOUT = 600
+CHANGE_INITIAL_DELAY = 1
+CHANGE_MAX_DELAY = 10
+
+# Error codes of requests rejected because of the rate limit of the Route53 API
+THROTTLING_ERRORS = ("Throttling", "PriorRequestNotComplete")
+
+# Names and ids of the public hosted zones of each AWS access key, listed once per run
+_hosted_zones: Dict[Optional[str], List[Tuple[str, str]]] = {}
+_hosted_zones_lock = threading.Lock()
+
 
 class Authenticator(common.Plugin, interfaces.Authenticator):
     """Route53 Authenticator
@@ -73,51 +90,71 @@ class Authenticator(common.Plugin, interfaces.Authenticator):
 
         try:
             change_ids = [
-                self._change_txt_record("UPSERT",
-                  achall.validation_domain_name(achall.domain),
-                  achall.validation(achall.account_key))
-                for achall in achalls
+                self._change_txt_records("UPSERT", zone_id, records)
+                for zone_id, records in self._records_by_zone(achalls).items()
             ]
 
-            for change_id in change_ids:
-                self._wait_for_change(change_id)
+            self._wait_for_changes(change_ids)
         except (NoCredentialsError, ClientError) as e:
             logger.debug('Encountered error during perform: %s', e, exc_info=True)
+            # Hosted zones may have changed since they were cached
+            zone_cache = self._zone_cache()
+            for achall in achalls:
+                zone_cache.forget(achall.validation_domain_name(achall.domain))
             raise errors.PluginError("\n".join([str(e), INSTRUCTIONS]))
         return [achall.response(achall.account_key) for achall in achalls]
 
     def cleanup(self, achalls: List[achallenges.AnnotatedChallenge]) -> None:
         if self._attempt_cleanup:
-            for achall in achalls:
-                domain = achall.domain
-                validation_domain_name = achall.validation_domain_name(domain)
-                validation = achall.validation(achall.account_key)
+            try:
+                zones = self._records_by_zone(achalls)
+            except (NoCredentialsError, ClientError) as e:
+                logger.debug('Encountered error during cleanup: %s', e, exc_info=True)
+                return
 
-                self._cleanup(validation_domain_name, validation)
+            for zone_id, records in zones.items():
+                self._cleanup(zone_id, records)
 
-    def _cleanup(self, validation_name: str, validation: str) -> None:
+    def _cleanup(self, zone_id: str, records: List[Tuple[str, str]]) -> None:
         try:
-            self._change_txt_record("DELETE", validation_name, validation)
+            self._change_txt_records("DELETE", zone_id, records)
         except (NoCredentialsError, ClientError) as e:
             logger.debug('Encountered error during cleanup: %s', e, exc_info=True)
 
+    def _records_by_zone(self, achalls: List[AnnotatedChallenge]
+                         ) -> Dict[str, List[Tuple[str, str]]]:
+        """Group the validation domain name and validation of each challenge by zone id."""
+        zones: Dict[str, List[Tuple[str, str]]] = {}
+        for achall in achalls:
+            validation_domain_name = achall.validation_domain_name(achall.domain)
+            zone_id = self._find_zone_id_for_domain(validation_domain_name)
+            zones.setdefault(zone_id, []).append(
+                (validation_domain_name, achall.validation(achall.account_key)))
+        return zones
+
+    @staticmethod
+    def _access_key() -> Optional[str]:
+        # boto3.client() created the default session, which keeps the credentials it found
+        credentials = boto3.DEFAULT_SESSION.get_credentials() if boto3.DEFAULT_SESSION else None
+        return credentials.access_key if credentials else None
+
+    def _zone_cache(self) -> dns_common.ZoneCache:
+        return dns_common.zone_cache(self.config, "dns-route53", [self._access_key()])
+
     def _find_zone_id_for_domain(self, domain: str) -> str:
+        """Find the zone id responsible a given FQDN, unless it is cached."""
+        return self._zone_cache().find(domain, self._discover_zone_id_for_domain)
+
+    def _discover_zone_id_for_domain(self, domain: str) -> str:
         """Find the zone id responsible a given FQDN.
 
            That is, the id for the zone whose name is the longest parent of the
-           domain.
+           domain. Hosted zones are listed again if none matches, in case the
+           zone was created after they were listed.
         """
-        paginator = self.r53.get_paginator("list_hosted_zones")
-        zones: list[tuple[str, str]] = []
-        target_labels = domain.rstrip(".").split(".")
-        for page in paginator.paginate():
-            for zone in page["HostedZones"]:
-                if zone["Config"]["PrivateZone"]:
-                    continue
-
-                candidate_labels = zone["Name"].rstrip(".").split(".")
-                if candidate_labels == target_labels[-len(candidate_labels):]:
-                    zones.append((zone["Name"], zone["Id"]))
+        zones = self._matching_zones(domain, self._list_hosted_zones())
+        if not zones:
+            zones = self._matching_zones(domain, self._list_hosted_zones(refresh=True))
 
         if not zones:
             raise errors.PluginError(
@@ -131,54 +168,121 @@ class Authenticator(common.Plugin, interfaces.Authenticator):
         zones.sort(key=lambda z: len(z[0]), reverse=True)
         return zones[0][1]
 
-    def _change_txt_record(self, action: str, validation_domain_name: str, validation: str) -> str:
-        zone_id = self._find_zone_id_for_domain(validation_domain_name)
-
-        rrecords = self._resource_records[validation_domain_name]
-        challenge = {"Value": '"{0}"'.format(validation)}
-        if action == "DELETE":
-            # Remove the record being deleted from the list of tracked records
-            rrecords.remove(challenge)
-            if rrecords:
-                # Need to update instead, as we're not deleting the rrset
-                action = "UPSERT"
+    @staticmethod
+    def _matching_zones(domain: str, hosted_zones: List[Tuple[str, str]]
+                        ) -> List[Tuple[str, str]]:
+        target_labels = domain.rstrip(".").split(".")
+        zones: List[Tuple[str, str]] = []
+        for name, zone_id in hosted_zones:
+            candidate_labels = name.rstrip(".").split(".")
+            if candidate_labels == target_labels[-len(candidate_labels):]:
+                zones.append((name, zone_id))
+        return zones
+
+    def _list_hosted_zones(self, refresh: bool = False) -> List[Tuple[str, str]]:
+        """List the names and ids of the public hosted zones, once per run."""
+        access_key = self._access_key()
+        with _hosted_zones_lock:
+            if refresh or access_key not in _hosted_zones:
+                paginator = self.r53.get_paginator("list_hosted_zones")
+                _hosted_zones[access_key] = [
+                    (zone["Name"], zone["Id"])
+                    for page in paginator.paginate()
+                    for zone in page["HostedZones"]
+                    if not zone["Config"]["PrivateZone"]
+                ]
+            return _hosted_zones[access_key]
+
+    def _change_txt_records(self, action: str, zone_id: str,
+                            records: List[Tuple[str, str]]) -> str:
+        """Change TXT records of a hosted zone in a single change batch.
+
+        :param str action: UPSERT or DELETE
+        :param str zone_id: id of the hosted zone of all records
+        :param list records: validation domain name and validation of each record
+
+        :returns: the id of the change
+        :rtype: str
+
+        """
+        removed: DefaultDict[str, List[Dict[str, str]]] = collections.defaultdict(list)
+        names: List[str] = []
+        for validation_domain_name, validation in records:
+            rrecords = self._resource_records[validation_domain_name]
+            challenge = {"Value": '"{0}"'.format(validation)}
+            if action == "DELETE":
+                # Remove the record being deleted from the list of tracked records
+                rrecords.remove(challenge)
+                removed[validation_domain_name].append(challenge)
             else:
-                # Create a new list containing the record to use with DELETE
-                rrecords = [challenge]
-        else:
-            rrecords.append(challenge)
+                rrecords.append(challenge)
+            if validation_domain_name not in names:
+                names.append(validation_domain_name)
+
+        # Route53 rejects batches changing the same record set twice, so all
+        # values of a name go in a single change.
+        changes = []
+        for validation_domain_name in names:
+            rrecords = self._resource_records[validation_domain_name]
+            change_action = action
+            if action == "DELETE":
+                if rrecords:
+                    # Need to update instead, as we're not deleting the rrset
+                    change_action = "UPSERT"
+                else:
+                    # Create a new list containing the records to use with DELETE
+                    rrecords = removed[validation_domain_name]
+            changes.append({
+                "Action": change_action,
+                "ResourceRecordSet": {
+                    "Name": validation_domain_name,
+                    "Type": "TXT",
+                    "TTL": self.ttl,
+                    "ResourceRecords": rrecords,
+                }
+            })
 
         response = self.r53.change_resource_record_sets(
             HostedZoneId=zone_id,
             ChangeBatch={
                 "Comment": "certbot-dns-route53 certificate validation " + action,
-                "Changes": [
-                    {
-                        "Action": action,
-                        "ResourceRecordSet": {
-                            "Name": validation_domain_name,
-                            "Type": "TXT",
-                            "TTL": self.ttl,
-                            "ResourceRecords": rrecords,
-                        }
-                    }
-                ]
+                "Changes": changes,
             }
         )
         return cast(str, response["ChangeInfo"]["Id"])
 
-    def _wait_for_change(self, change_id: str) -> None:
-        """Wait for a change to be propagated to all Route53 DNS servers.
+    def _wait_for_changes(self, change_ids: Iterable[str]) -> None:
+        """Wait for changes to be propagated to all Route53 DNS servers.
+
+           The status of all pending changes is checked in each round, and
+           the delay between rounds doubles up to CHANGE_MAX_DELAY, or
+           immediately when Route53 throttles requests.
            https://docs.aws.amazon.com/Route53/latest/APIReference/API_GetChange.html
         """
-        for unused_n in range(0, 120):
-            response = self.r53.get_change(Id=change_id)
-            if response["ChangeInfo"]["Status"] == "INSYNC":
+        pending = list(change_ids)
+        deadline = time.monotonic() + CHANGE_TIMEOUT
+        delay = CHANGE_INITIAL_DELAY
+        status = "PENDING"
+        while pending:
+            for change_id in list(pending):
+                try:
+                    response = self.r53.get_change(Id=change_id)
+                except ClientError as e:
+                    if e.response.get("Error", {}).get("Code") not in THROTTLING_ERRORS:
+                        raise
+                    logger.debug("Route53 throttled GetChange requests: %s", e)
+                    delay = CHANGE_MAX_DELAY
+                    break
+                status = response["ChangeInfo"]["Status"]
+                if status == "INSYNC":
+                    pending.remove(change_id)
+            if not pending:
                 return
-            time.sleep(5)
-        raise errors.PluginError(
-            "Timed out waiting for Route53 change. Current status: %s" %
-            response["ChangeInfo"]["Status"])
+            if time.monotonic() + delay > deadline:
+                raise errors.PluginError(
+                    "Timed out waiting for Route53 change. Current status: %s" % status)
+            time.sleep(delay)
+            delay = min(delay * 2, CHANGE_MAX_DELAY)
 
 
 # Our route53 plugin was initially a 3rd party plugin named `certbot-route53:auth` as described at
@@ -1,6 +1,7 @@
 """Tests for certbot_dns_route53._internal.dns_route53.Authenticator"""
 
 import sys
+import tempfile
 import unittest
 from unittest import mock
 
@@ -13,6 +14,7 @@ from acme import challenges
 from certbot import achallenges
 from certbot import errors
 from certbot.compat import os
+from certbot.plugins import dns_test_common
 from certbot.plugins.dns_test_common import DOMAIN
 from certbot.tests import acme_util
 from certbot.tests import util as test_util
@@ -34,6 +36,15 @@ class AuthenticatorTest(unittest.TestCase):
 
         self.config = mock.MagicMock()
 
+        patcher = mock.patch.dict(
+            "certbot_dns_route53._internal.dns_route53._hosted_zones", clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        zone_cache_patcher = mock.patch("certbot.plugins.dns_common.zone_cache",
+                                        return_value=dns_test_common.uncached_zones())
+        zone_cache_patcher.start()
+        self.addCleanup(zone_cache_patcher.stop)
+
         # Set up dummy credentials for testing
         os.environ["AWS_ACCESS_KEY_ID"] = "dummy_access_key"
         os.environ["AWS_SECRET_ACCESS_KEY"] = "dummy_secret_access_key"
@@ -51,54 +62,93 @@ class AuthenticatorTest(unittest.TestCase):
     def test_get_chall_pref(self) -> None:
         self.assertEqual(self.auth.get_chall_pref("example.org"), [challenges.DNS01])
 
+    def test_auth_hint(self):
+        assert "hosted by AWS Route53" in self.auth.auth_hint([self.achall])
+
     def test_perform(self):
-        self.auth._change_txt_record = mock.MagicMock() # type: ignore[method-assign, unused-ignore]
-        self.auth._wait_for_change = mock.MagicMock() # type: ignore [method-assign, unused-ignore]
+        self.auth._find_zone_id_for_domain = mock.MagicMock( # type: ignore[method-assign, unused-ignore]
+            return_value="EXAMPLE")
+        self.auth._change_txt_records = mock.MagicMock( # type: ignore[method-assign, unused-ignore]
+            return_value="1")
+        self.auth._wait_for_changes = mock.MagicMock() # type: ignore [method-assign, unused-ignore]
 
         self.auth.perform([self.achall])
 
-        self.auth._change_txt_record.assert_called_once_with("UPSERT",
-                                                             '_acme-challenge.' + DOMAIN,
-                                                             mock.ANY)
-        assert self.auth._wait_for_change.call_count == 1
+        self.auth._change_txt_records.assert_called_once_with(
+            "UPSERT", "EXAMPLE", [('_acme-challenge.' + DOMAIN, mock.ANY)])
+        self.auth._wait_for_changes.assert_called_once_with(["1"])
+
+    def test_perform_one_change_per_zone(self):
+        zones = {"_acme-challenge.example.com": "EXAMPLE",
+                 "_acme-challenge.www.example.com": "EXAMPLE",
+                 "_acme-challenge.example.org": "OTHER"}
+        self.auth._find_zone_id_for_domain = mock.MagicMock( # type: ignore[method-assign, unused-ignore]
+            side_effect=zones.get)
+        self.auth._change_txt_records = mock.MagicMock( # type: ignore[method-assign, unused-ignore]
+            side_effect=lambda action, zone_id, records: zone_id + "-change")
+        self.auth._wait_for_changes = mock.MagicMock() # type: ignore [method-assign, unused-ignore]
+
+        self.auth.perform([self.achall.update(domain=domain)
+                           for domain in ("example.com", "www.example.com", "example.org")])
+
+        assert [call[0][:2] for call in self.auth._change_txt_records.call_args_list] == \
+            [("UPSERT", "EXAMPLE"), ("UPSERT", "OTHER")]
+        assert [name for name, _ in self.auth._change_txt_records.call_args_list[0][0][2]] == \
+            ["_acme-challenge.example.com", "_acme-challenge.www.example.com"]
+        self.auth._wait_for_changes.assert_called_once_with(["EXAMPLE-change", "OTHER-change"])
 
     def test_perform_no_credentials_error(self):
-        self.auth._change_txt_record = mock.MagicMock( # type: ignore [method-assign, unused-ignore]
+        self.auth._find_zone_id_for_domain = mock.MagicMock( # type: ignore [method-assign, unused-ignore]
             side_effect=NoCredentialsError)
 
         with pytest.raises(errors.PluginError):
             self.auth.perform([self.achall])
 
     def test_perform_client_error(self):
-        self.auth._change_txt_record = mock.MagicMock( # type: ignore [method-assign, unused-ignore]
+        self.auth._find_zone_id_for_domain = mock.MagicMock() # type: ignore [method-assign, unused-ignore]
+        self.auth._change_txt_records = mock.MagicMock( # type: ignore [method-assign, unused-ignore]
             side_effect=ClientError({"Error": {"Code": "foo"}}, "bar"))
 
         with pytest.raises(errors.PluginError):
             self.auth.perform([self.achall])
 
+    def test_perform_client_error_forgets_zones(self):
+        zone_cache = mock.MagicMock()
+        self.auth._zone_cache = mock.MagicMock( # type: ignore [method-assign, unused-ignore]
+            return_value=zone_cache)
+        self.auth._find_zone_id_for_domain = mock.MagicMock() # type: ignore [method-assign, unused-ignore]
+        self.auth._change_txt_records = mock.MagicMock( # type: ignore [method-assign, unused-ignore]
+            side_effect=ClientError({"Error": {"Code": "foo"}}, "bar"))
+
+        with pytest.raises(errors.PluginError):
+            self.auth.perform([self.achall])
+        zone_cache.forget.assert_called_once_with('_acme-challenge.' + DOMAIN)
+
     def test_cleanup(self):
         self.auth._attempt_cleanup = True
 
-        self.auth._change_txt_record = mock.MagicMock() # type: ignore[method-assign, unused-ignore]
+        self.auth._find_zone_id_for_domain = mock.MagicMock( # type: ignore[method-assign, unused-ignore]
+            return_value="EXAMPLE")
+        self.auth._change_txt_records = mock.MagicMock() # type: ignore[method-assign, unused-ignore]
 
         self.auth.cleanup([self.achall])
 
-        self.auth._change_txt_record.assert_called_once_with("DELETE",
-                                                             '_acme-challenge.'+DOMAIN,
-                                                             mock.ANY)
+        self.auth._change_txt_records.assert_called_once_with(
+            "DELETE", "EXAMPLE", [('_acme-challenge.' + DOMAIN, mock.ANY)])
 
     def test_cleanup_no_credentials_error(self):
         self.auth._attempt_cleanup = True
 
-        self.auth._change_txt_record = mock.MagicMock( # type: ignore [method-assign, unused-ignore]
-        side_effect=NoCredentialsError)
+        self.auth._find_zone_id_for_domain = mock.MagicMock( # type: ignore [method-assign, unused-ignore]
+            side_effect=NoCredentialsError)
 
         self.auth.cleanup([self.achall])
 
     def test_cleanup_client_error(self):
         self.auth._attempt_cleanup = True
 
-        self.auth._change_txt_record = mock.MagicMock( # type: ignore [method-assign, unused-ignore]
+        self.auth._find_zone_id_for_domain = mock.MagicMock() # type: ignore [method-assign, unused-ignore]
+        self.auth._change_txt_records = mock.MagicMock( # type: ignore [method-assign, unused-ignore]
             side_effect=ClientError({"Error": {"Code": "foo"}}, "bar"))
 
         self.auth.cleanup([self.achall])
@@ -144,6 +194,15 @@ class ClientTest(unittest.TestCase):
 
         self.config = mock.MagicMock()
 
+        patcher = mock.patch.dict(
+            "certbot_dns_route53._internal.dns_route53._hosted_zones", clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.zone_cache_patcher = mock.patch("certbot.plugins.dns_common.zone_cache",
+                                             return_value=dns_test_common.uncached_zones())
+        self.zone_cache_patcher.start()
+        self.addCleanup(self.zone_cache_patcher.stop)
+
         # Set up dummy credentials for testing
         os.environ["AWS_ACCESS_KEY_ID"] = "dummy_access_key"
         os.environ["AWS_SECRET_ACCESS_KEY"] = "dummy_secret_access_key"
@@ -210,18 +269,57 @@ class ClientTest(unittest.TestCase):
         with pytest.raises(errors.PluginError):
             self.client._find_zone_id_for_domain("foo.example.com")
 
-    def test_change_txt_record(self):
-        self.client._find_zone_id_for_domain = mock.MagicMock() # type: ignore [method-assign, unused-ignore]
+    def test_find_zone_id_for_domain_zone_cache(self):
+        self.zone_cache_patcher.stop()
+        self.client.r53.get_paginator = mock.MagicMock()
+        self.client.r53.get_paginator().paginate.return_value = [
+            {"HostedZones": [self.EXAMPLE_COM_ZONE]}]
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            self.config.work_dir = work_dir
+            assert self.client._find_zone_id_for_domain("foo.example.com") == "EXAMPLE"
+            assert self.client._find_zone_id_for_domain("foo.example.com") == "EXAMPLE"
+            self.client.r53.get_paginator().paginate.assert_called_once_with()
+
+            with mock.patch("boto3.DEFAULT_SESSION") as mock_session:
+                mock_session.get_credentials.return_value.access_key = "other_access_key"
+                assert self.client._find_zone_id_for_domain("foo.example.com") == "EXAMPLE"
+            assert self.client.r53.get_paginator().paginate.call_count == 2
+
+    def test_change_txt_records(self):
         self.client.r53.change_resource_record_sets = mock.MagicMock(
             return_value={"ChangeInfo": {"Id": 1}})
 
-        self.client._change_txt_record("FOO", DOMAIN, "foo")
+        self.client._change_txt_records("FOO", "EXAMPLE", [(DOMAIN, "foo")])
 
         call_count = self.client.r53.change_resource_record_sets.call_count
         assert call_count == 1
 
-    def test_change_txt_record_delete(self):
-        self.client._find_zone_id_for_domain = mock.MagicMock() # type: ignore[ method-assign, unused-ignore]
+    def test_change_txt_records_batch(self):
+        self.client.r53.change_resource_record_sets = mock.MagicMock(
+            return_value={"ChangeInfo": {"Id": 1}})
+
+        self.client._change_txt_records("UPSERT", "EXAMPLE", [
+            (DOMAIN, "foo"), ("www." + DOMAIN, "bar"), (DOMAIN, "baz")])
+
+        self.client.r53.change_resource_record_sets.assert_called_once()
+        call_args = self.client.r53.change_resource_record_sets.call_args[1]
+        assert call_args["HostedZoneId"] == "EXAMPLE"
+        changes = call_args["ChangeBatch"]["Changes"]
+        assert [change["ResourceRecordSet"]["Name"] for change in changes] == \
+            [DOMAIN, "www." + DOMAIN]
+        assert changes[0]["ResourceRecordSet"]["ResourceRecords"] == \
+            [{"Value": '"foo"'}, {"Value": '"baz"'}]
+
+        self.client._change_txt_records("DELETE", "EXAMPLE", [
+            (DOMAIN, "foo"), ("www." + DOMAIN, "bar"), (DOMAIN, "baz")])
+
+        changes = self.client.r53.change_resource_record_sets.call_args[1]["ChangeBatch"]["Changes"]
+        assert [change["Action"] for change in changes] == ["DELETE", "DELETE"]
+        assert changes[0]["ResourceRecordSet"]["ResourceRecords"] == \
+            [{"Value": '"foo"'}, {"Value": '"baz"'}]
+
+    def test_change_txt_records_delete(self):
         self.client.r53.change_resource_record_sets = mock.MagicMock(
             return_value={"ChangeInfo": {"Id": 1}})
 
@@ -229,7 +327,7 @@ class ClientTest(unittest.TestCase):
         validation_record = {"Value": '"{0}"'.format(validation)}
         self.client._resource_records[DOMAIN] = [validation_record]
 
-        self.client._change_txt_record("DELETE", DOMAIN, validation)
+        self.client._change_txt_records("DELETE", "EXAMPLE", [(DOMAIN, validation)])
 
         call_count = self.client.r53.change_resource_record_sets.call_count
         assert call_count == 1
@@ -239,8 +337,7 @@ class ClientTest(unittest.TestCase):
         assert call_args_batch["ResourceRecordSet"]["ResourceRecords"] == \
             [validation_record]
 
-    def test_change_txt_record_multirecord(self):
-        self.client._find_zone_id_for_domain = mock.MagicMock() # type: ignore [method-assign, unused-ignore]
+    def test_change_txt_records_multirecord(self):
         self.client._resource_records[DOMAIN] = [
             {"Value": "\"pre-existing-value\""},
             {"Value": "\"pre-existing-value-two\""},
@@ -248,7 +345,7 @@ class ClientTest(unittest.TestCase):
         self.client.r53.change_resource_record_sets = mock.MagicMock(
             return_value={"ChangeInfo": {"Id": 1}})
 
-        self.client._change_txt_record("DELETE", DOMAIN, "pre-existing-value")
+        self.client._change_txt_records("DELETE", "EXAMPLE", [(DOMAIN, "pre-existing-value")])
 
         call_count = self.client.r53.change_resource_record_sets.call_count
         call_args = self.client.r53.change_resource_record_sets.call_args_list[0][1]
@@ -259,14 +356,70 @@ class ClientTest(unittest.TestCase):
 
         assert call_count == 1
 
-    def test_wait_for_change(self):
+    @mock.patch("certbot_dns_route53._internal.dns_route53.time.sleep")
+    def test_wait_for_changes(self, mock_sleep):
+        statuses = {"1": ["PENDING", "INSYNC"], "2": ["PENDING", "PENDING", "INSYNC"]}
+        self.client.r53.get_change = mock.MagicMock(
+            side_effect=lambda Id: {"ChangeInfo": {"Status": statuses[Id].pop(0)}})
+
+        self.client._wait_for_changes(["1", "2"])
+
+        # Both changes are polled in each round until they are INSYNC
+        assert [call[1]["Id"] for call in self.client.r53.get_change.call_args_list] == \
+            ["1", "2", "1", "2", "2"]
+        assert mock_sleep.call_args_list == [mock.call(1), mock.call(2)]
+
+    @mock.patch("certbot_dns_route53._internal.dns_route53.time.sleep")
+    def test_wait_for_changes_backoff(self, mock_sleep):
+        throttled = ClientError({"Error": {"Code": "Throttling"}}, "GetChange")
+        self.client.r53.get_change = mock.MagicMock(
+            side_effect=[{"ChangeInfo": {"Status": "PENDING"}}] * 5 + [throttled] +
+                        [{"ChangeInfo": {"Status": "INSYNC"}}])
+
+        self.client._wait_for_changes(["1"])
+
+        assert mock_sleep.call_args_list == [mock.call(delay) for delay in (1, 2, 4, 8, 10, 10)]
+
+    @mock.patch("certbot_dns_route53._internal.dns_route53.time.sleep")
+    def test_wait_for_changes_error(self, unused_mock_sleep):
+        self.client.r53.get_change = mock.MagicMock(
+            side_effect=ClientError({"Error": {"Code": "NoSuchChange"}}, "GetChange"))
+
+        with pytest.raises(ClientError):
+            self.client._wait_for_changes(["1"])
+
+    @mock.patch("certbot_dns_route53._internal.dns_route53.time")
+    def test_wait_for_changes_timeout(self, mock_time):
+        mock_time.monotonic.side_effect = [0, 0, 599]
         self.client.r53.get_change = mock.MagicMock(
-            side_effect=[{"ChangeInfo": {"Status": "PENDING"}},
-                         {"ChangeInfo": {"Status": "INSYNC"}}])
+            return_value={"ChangeInfo": {"Status": "PENDING"}})
 
-        self.client._wait_for_change("1")
+        with pytest.raises(errors.PluginError, match="Current status: PENDING"):
+            self.client._wait_for_changes(["1"])
 
-        assert self.client.r53.get_change.called
+        mock_time.sleep.assert_called_once_with(1)
+
+    def test_hosted_zones_listed_once(self):
+        from certbot_dns_route53._internal.dns_route53 import Authenticator
+
+        self.client.r53.get_paginator = mock.MagicMock()
+        paginate = self.client.r53.get_paginator().paginate
+        paginate.return_value = [{"HostedZones": [self.EXAMPLE_COM_ZONE]}]
+
+        assert self.client._find_zone_id_for_domain("foo.example.com") == "EXAMPLE"
+        assert self.client._find_zone_id_for_domain("bar.example.com") == "EXAMPLE"
+
+        # Other instances of the plugin reuse the list
+        other = Authenticator(self.config, "route53")
+        other.r53 = self.client.r53
+        assert other._find_zone_id_for_domain("foo.example.com") == "EXAMPLE"
+        assert paginate.call_count == 1
+
+        # Zones created since are found by listing them again
+        paginate.return_value = [{"HostedZones": [self.EXAMPLE_COM_ZONE,
+                                                  self.EXAMPLE_NET_ZONE]}]
+        assert other._find_zone_id_for_domain("foo.example.net") == "BAD-WRONG-TLD"
+        assert paginate.call_count == 2
 
 
 if __name__ == "__main__":
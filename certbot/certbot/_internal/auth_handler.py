@@ -1,9 +1,12 @@
 """ACME AuthHandler."""
+from concurrent import futures
 import datetime
 import logging
 import time
+from typing import cast
 from typing import Dict
 from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
 from typing import Sequence
@@ -25,9 +28,13 @@ from certbot._internal import error_handler
 from certbot._internal.account import Account
 from certbot.display import util as display_util
 from certbot.plugins import common as plugin_common
+from certbot.plugins import dns_common
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of challenges answered at the same time
+_MAX_ANSWER_WORKERS = 10
+
 
 class AuthHandler:
     """ACME Authorization Handler for a client.
@@ -44,14 +51,18 @@ class AuthHandler:
     :ivar list pref_challs: sorted user specified preferred challenges
         type strings with the most preferred challenge listed first
 
+    :ivar acme.client.PollingStrategy polling: when to poll authorizations
+
     """
     def __init__(self, auth: interfaces.Authenticator, acme_client: Optional[client.ClientV2],
-                 account: Optional[Account], pref_challs: List[str]) -> None:
+                 account: Optional[Account], pref_challs: List[str],
+                 polling: Optional[client.PollingStrategy] = None) -> None:
         self.auth = auth
         self.acme = acme_client
 
         self.account = account
         self.pref_challs = pref_challs
+        self.polling = polling if polling is not None else client.PollingStrategy()
 
     def handle_authorizations(self, orderr: messages.OrderResource,
                               config: configuration.NamespaceConfig, best_effort: bool = False,
@@ -83,29 +94,17 @@ class AuthHandler:
 
         # Starting now, challenges will be cleaned at the end no matter what.
         with error_handler.ExitHandler(self._cleanup_challenges, achalls):
-            # To begin, let's ask the authenticator plugin to perform all challenges.
-            try:
-                resps = self.auth.perform(achalls)
-
-                # If debug is on, wait for user input before starting the verification process.
-                if config.debug_challenges:
-                    display_util.notification(
-                        'Challenges loaded. Press continue to submit to CA.\n' +
-                        self._debug_challenges_msg(achalls, config), pause=True)
-            except errors.AuthorizationError as error:
-                logger.critical('Failure in setting up challenges.')
-                logger.info('Attempting to clean up outstanding challenges...')
-                raise error
-            # All challenges should have been processed by the authenticator.
-            assert len(resps) == len(achalls), 'Some challenges have not been performed.'
-
-            # Inform the ACME CA server that challenges are available for validation.
-            for achall, resp in zip(achalls, resps):
-                self.acme.answer_challenge(achall.challb, resp)
+            # Ask the authenticator plugin to perform the challenges, and inform
+            # the ACME CA server that they are available for validation.
+            self._perform_and_answer(achalls, config)
 
             # Wait for authorizations to be checked.
             logger.info('Waiting for verification...')
-            self._poll_authorizations(authzrs, max_retries, max_time_mins, best_effort)
+            try:
+                self._poll_authorizations(authzrs, max_retries, max_time_mins, best_effort,
+                                          orderr.uri)
+            finally:
+                _forget_failed_zones(config, authzrs)
 
             # Keep validated authorizations only. If there is none, no certificate can be issued.
             authzrs_validated = [authzr for authzr in authzrs
@@ -117,6 +116,63 @@ class AuthHandler:
 
         raise errors.Error("An unexpected error occurred while handling the authorizations.")
 
+    def _perform_and_answer(self, achalls: List[achallenges.AnnotatedChallenge],
+                            config: configuration.NamespaceConfig) -> None:
+        """Perform the challenges and answer them concurrently.
+
+        Each challenge is answered as soon as it is ready, by at most
+        `_MAX_ANSWER_WORKERS` threads, each request signed with its own
+        nonce.
+
+        :raises .AuthorizationError: if the authenticator fails
+        :raises acme.errors.Error: if answering a challenge fails, once all
+            answers were sent
+
+        """
+        assert self.acme is not None
+        with futures.ThreadPoolExecutor(
+                max_workers=min(len(achalls), _MAX_ANSWER_WORKERS)) as executor:
+            answers: List["futures.Future[messages.ChallengeResource]"] = []
+            for achall, resp in self._perform_iter(achalls, config):
+                answers.append(executor.submit(self.acme.answer_challenge, achall.challb, resp))
+            for answer in answers:
+                answer.result()
+
+    def _perform_iter(self, achalls: List[achallenges.AnnotatedChallenge],
+                      config: configuration.NamespaceConfig
+                      ) -> Iterator[Tuple[achallenges.AnnotatedChallenge,
+                                          challenges.ChallengeResponse]]:
+        """Perform the challenges, yielding each one once it is ready.
+
+        With ``--answer-challenges-early``, authenticators implementing
+        `.StreamingAuthenticator` report each challenge as soon as it is
+        ready. Otherwise, and with ``--debug-challenges``, all challenges
+        are performed before any of them is reported.
+
+        """
+        try:
+            if config.answer_challenges_early and not config.debug_challenges:
+                if _is_streaming(self.auth):
+                    yield from cast(interfaces.StreamingAuthenticator, self.auth).perform_iter(
+                        achalls)
+                    return
+                logger.warning('The authenticator cannot report challenges as soon as they are '
+                               'ready, ignoring --answer-challenges-early.')
+            resps = self.auth.perform(achalls)
+
+            # If debug is on, wait for user input before starting the verification process.
+            if config.debug_challenges:
+                display_util.notification(
+                    'Challenges loaded. Press continue to submit to CA.\n' +
+                    self._debug_challenges_msg(achalls, config), pause=True)
+            # All challenges should have been processed by the authenticator.
+            assert len(resps) == len(achalls), 'Some challenges have not been performed.'
+            yield from zip(achalls, resps)
+        except errors.AuthorizationError as error:
+            logger.critical('Failure in setting up challenges.')
+            logger.info('Attempting to clean up outstanding challenges...')
+            raise error
+
     def deactivate_valid_authorizations(self, orderr: messages.OrderResource) -> Tuple[List, List]:
         """
         Deactivate all `valid` authorizations in the order, so that they cannot be re-used
@@ -145,11 +201,14 @@ class AuthHandler:
         return (deactivated, failed)
 
     def _poll_authorizations(self, authzrs: List[messages.AuthorizationResource], max_retries: int,
-                             deadline_minutes: float, best_effort: bool) -> None:
+                             deadline_minutes: float, best_effort: bool,
+                             order_uri: Optional[str] = None) -> None:
         """
         Poll the ACME CA server, to wait for confirmation that authorizations have their challenges
         all verified. The poll may occur several times, until all authorizations are checked
         (valid or invalid), or a maximum of retries, or the polling deadline is reached.
+        The delays between polls are given by the polling strategy, and the timing statistics
+        are recorded under the URI of the order.
         """
         if not self.acme:
             raise errors.Error("No ACME client defined, cannot poll authorizations.")
@@ -159,50 +218,54 @@ class AuthHandler:
                             for index, authzr in enumerate(authzrs)}
         authzrs_failed_to_report = []
         deadline = datetime.datetime.now() + datetime.timedelta(minutes=deadline_minutes)
-        # Give an initial second to the ACME CA server to check the authorizations
-        sleep_seconds: float = 1
-        for _ in range(max_retries):
-            # Wait for appropriate time (from Retry-After, initial wait, or no wait)
-            if sleep_seconds > 0:
-                time.sleep(sleep_seconds)
-            # Poll all updated authorizations.
-            authzrs_to_check = {index: self.acme.poll(authzr) for index, (authzr, _)
-                                in authzrs_to_check.items()}
-            # Update the original list of authzr with the updated authzrs from server.
-            for index, (authzr, _) in authzrs_to_check.items():
-                authzrs[index] = authzr
-
-            # Gather failed authorizations
-            authzrs_failed = [authzr for authzr, _ in authzrs_to_check.values()
-                              if authzr.body.status == messages.STATUS_INVALID]
-            for authzr_failed in authzrs_failed:
-                logger.info('Challenge failed for domain %s',
-                               authzr_failed.body.identifier.value)
-            # Accumulating all failed authzrs to build a consolidated report
-            # on them at the end of the polling.
-            authzrs_failed_to_report.extend(authzrs_failed)
-
-            # Extract out the authorization already checked for next poll iteration.
-            # Poll may stop here because there is no pending authorizations anymore.
-            authzrs_to_check = {index: (authzr, resp) for index, (authzr, resp)
-                                in authzrs_to_check.items()
-                                if authzr.body.status == messages.STATUS_PENDING}
-            if not authzrs_to_check or datetime.datetime.now() > deadline:
-                # Polling process is finished, we can leave the loop
-                break
-
-            # Be merciful with the ACME server CA, check the Retry-After header returned,
-            # and wait this time before polling again in next loop iteration.
-            # From all the pending authorizations, we take the greatest Retry-After value
-            # to avoid polling an authorization before its relevant Retry-After value.
-            # (by construction resp cannot be None at that time, but mypy do not know it).
-            retry_after = max(self.acme.retry_after(resp, 3)
-                              for _, resp in authzrs_to_check.values()
-                              if resp is not None)
-            # Whatever Retry-After the ACME server requests, the polling must not take
-            # longer than the overall deadline (https://github.com/certbot/certbot/issues/9526).
-            retry_after = min(retry_after, deadline)
-            sleep_seconds = (retry_after - datetime.datetime.now()).total_seconds()
+        stats = self.polling.start(order_uri, 'authorizations')
+        # Poll right away unless the polling strategy is configured to give the ACME CA server
+        # some time to check the authorizations first
+        sleep_seconds = self.polling.first_delay(stats=stats)
+        try:
+            for attempt in range(1, max_retries + 1):
+                # Wait for appropriate time (from Retry-After, the polling strategy, or no wait)
+                if sleep_seconds > 0:
+                    time.sleep(sleep_seconds)
+                    stats.waited += sleep_seconds
+                # Poll all updated authorizations.
+                authzrs_to_check = {index: self.acme.poll(authzr) for index, (authzr, _)
+                                    in authzrs_to_check.items()}
+                stats.polls += len(authzrs_to_check)
+                # Update the original list of authzr with the updated authzrs from server.
+                for index, (authzr, _) in authzrs_to_check.items():
+                    authzrs[index] = authzr
+
+                # Gather failed authorizations
+                authzrs_failed = [authzr for authzr, _ in authzrs_to_check.values()
+                                  if authzr.body.status == messages.STATUS_INVALID]
+                for authzr_failed in authzrs_failed:
+                    logger.info('Challenge failed for domain %s',
+                                   authzr_failed.body.identifier.value)
+                # Accumulating all failed authzrs to build a consolidated report
+                # on them at the end of the polling.
+                authzrs_failed_to_report.extend(authzrs_failed)
+
+                # Extract out the authorization already checked for next poll iteration.
+                # Poll may stop here because there is no pending authorizations anymore.
+                authzrs_to_check = {index: (authzr, resp) for index, (authzr, resp)
+                                    in authzrs_to_check.items()
+                                    if authzr.body.status == messages.STATUS_PENDING}
+                if not authzrs_to_check or datetime.datetime.now() > deadline:
+                    # Polling process is finished, we can leave the loop
+                    break
+
+                # Be merciful with the ACME server CA, the polling strategy honors the
+                # Retry-After header returned. From all the pending authorizations, we take
+                # the greatest delay to avoid polling an authorization before its relevant
+                # Retry-After value.
+                delay = max(self.polling.next_delay(attempt, resp, stats)
+                            for _, resp in authzrs_to_check.values())
+                # Whatever Retry-After the ACME server requests, the polling must not take
+                # longer than the overall deadline (https://github.com/certbot/certbot/issues/9526).
+                sleep_seconds = min(delay, (deadline - datetime.datetime.now()).total_seconds())
+        finally:
+            stats.finish()
 
         # In case of failed authzrs, create a report to the user.
         if authzrs_failed_to_report:
@@ -364,6 +427,17 @@ class AuthHandler:
             return 'Pass "-v" for more info about challenges.'
 
 
+def _is_streaming(auth: interfaces.Authenticator) -> bool:
+    """Does the authenticator implement its own `~.StreamingAuthenticator.perform_iter`?
+
+    Subclasses of a `.StreamingAuthenticator` that override `perform` are
+    treated as regular authenticators so that their `perform` is used.
+
+    """
+    return (isinstance(auth, interfaces.StreamingAuthenticator)
+            and type(auth).perform is interfaces.StreamingAuthenticator.perform)
+
+
 def challb_to_achall(challb: messages.ChallengeBody, account_key: josepy.JWK,
                      domain: str) -> achallenges.AnnotatedChallenge:
     """Converts a ChallengeBody object to an AnnotatedChallenge.
@@ -460,6 +534,28 @@ def _report_no_chall_path(challbs: List[messages.ChallengeBody]) -> errors.Autho
     return errors.AuthorizationError(msg)
 
 
+def _forget_failed_zones(config: configuration.NamespaceConfig,
+                         authzrs: Iterable[messages.AuthorizationResource]) -> None:
+    """Forget the cached DNS zones of the domains whose dns-01 challenge failed.
+
+    The zones of these domains may have moved since DNS plugins cached them.
+
+    :param certbot.configuration.NamespaceConfig config: current Certbot configuration
+    :param authzrs: the authorizations, as last polled
+
+    """
+    names: List[str] = []
+    for authzr in authzrs:
+        if authzr.body.status != messages.STATUS_INVALID:
+            continue
+        domain = authzr.body.identifier.value
+        for challb in authzr.body.challenges:
+            if isinstance(challb.chall, challenges.DNS01) and challb.error:
+                names.extend((domain, challb.chall.validation_domain_name(domain)))
+    if names:
+        dns_common.forget_zones(config, names)
+
+
 def _generate_failed_chall_msg(failed_achalls: List[achallenges.AnnotatedChallenge]) -> str:
     """Creates a user friendly error message about failed challenges.
 
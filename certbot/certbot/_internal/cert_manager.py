@@ -8,6 +8,7 @@ from typing import Callable
 from typing import Iterable
 from typing import List
 from typing import Optional
+from typing import Set
 from typing import Tuple
 from typing import TypeVar
 from typing import Union
@@ -17,14 +18,20 @@ import pytz
 from certbot import configuration
 from certbot import crypto_util
 from certbot import errors
+from certbot import interfaces
 from certbot import ocsp
 from certbot import util
+from certbot._internal import lineage_index
 from certbot._internal import storage
 from certbot.compat import os
 from certbot.display import util as display_util
 
 logger = logging.getLogger(__name__)
 
+# A lineage as found by searching the lineage index: its metadata, or the
+# parsed lineage if it couldn't be indexed.
+_Lineage = Union[storage.RenewableCert, lineage_index.LineageMetadata]
+
 ###################
 # Commands
 ###################
@@ -64,16 +71,24 @@ def certificates(config: configuration.NamespaceConfig) -> None:
     """
     parsed_certs = []
     parse_failures = []
-    for renewal_file in storage.renewal_conf_files(config):
+    index = lineage_index.LineageIndex(config)
+    renewal_files = storage.renewal_conf_files(config)
+    for renewal_file in renewal_files:
+        metadata = index.get(renewal_file)
+        if metadata is not None and metadata.verified:
+            parsed_certs.append(metadata)
+            continue
         try:
             renewal_candidate = storage.RenewableCert(renewal_file, config)
             crypto_util.verify_renewable_cert(renewal_candidate)
-            parsed_certs.append(renewal_candidate)
+            parsed_certs.append(index.update(renewal_candidate, verified=True))
         except Exception as e:  # pylint: disable=broad-except
             logger.warning("Renewal configuration file %s produced an "
                            "unexpected error: %s. Skipping.", renewal_file, e)
             logger.debug("Traceback was:\n%s", traceback.format_exc())
             parse_failures.append(renewal_file)
+    index.prune(renewal_files)
+    index.save()
 
     # Describe all the certs
     _describe_certs(config, parsed_certs, parse_failures)
@@ -126,6 +141,13 @@ def lineage_for_certname(cli_config: configuration.NamespaceConfig,
 def domains_for_certname(config: configuration.NamespaceConfig,
                          certname: str) -> Optional[List[str]]:
     """Find the domains in the cert with name certname."""
+    try:
+        metadata = lineage_index.LineageIndex(config).get(
+            storage.renewal_file_for_certname(config, certname))
+    except errors.CertStorageError:
+        metadata = None
+    if metadata is not None:
+        return metadata.names()
     lineage = lineage_for_certname(config, certname)
     return lineage.names() if lineage else None
 
@@ -145,6 +167,10 @@ def find_duplicative_certs(config: configuration.NamespaceConfig,
     sized subsets, which matching certificates are returned is
     undefined.
 
+    Only the lineages that the lineage index lists for at least one of
+    `domains` are considered, so lineages aren't parsed unless they
+    were changed outside of Certbot or aren't indexed yet.
+
     :param config: Configuration.
     :type config: :class:`certbot._internal.configuration.NamespaceConfig`
     :param domains: List of domain names
@@ -155,11 +181,11 @@ def find_duplicative_certs(config: configuration.NamespaceConfig,
     :rtype: `tuple` of `storage.RenewableCert` or `None`
 
     """
-    def update_certs_for_domain_matches(candidate_lineage: storage.RenewableCert,
-                                        rv: Tuple[Optional[storage.RenewableCert],
-                                                  Optional[storage.RenewableCert]]
-                                        ) -> Tuple[Optional[storage.RenewableCert],
-                                                   Optional[storage.RenewableCert]]:
+    def update_certs_for_domain_matches(candidate_lineage: _Lineage,
+                                        rv: Tuple[Optional[_Lineage],
+                                                  Optional[_Lineage]]
+                                        ) -> Tuple[Optional[_Lineage],
+                                                   Optional[_Lineage]]:
         """Return cert as identical_names_cert if it matches,
            or subset_names_cert if it matches as subset
         """
@@ -178,19 +204,43 @@ def find_duplicative_certs(config: configuration.NamespaceConfig,
                 subset_names_cert = candidate_lineage
         return (identical_names_cert, subset_names_cert)
 
-    init: Tuple[Optional[storage.RenewableCert], Optional[storage.RenewableCert]] = (None, None)
-
-    return _search_lineages(config, update_certs_for_domain_matches, init)
-
-
-def _archive_files(candidate_lineage: storage.RenewableCert, filetype: str) -> Optional[List[str]]:
+    init: Tuple[Optional[_Lineage],
+                Optional[_Lineage]] = (None, None)
+
+    index, candidates = _complete_lineage_index(config)
+    # Only the candidates are checked against the stamps of their files. A
+    # stale candidate is indexed again, and its new names are looked up too.
+    checked: Set[str] = set()
+    unchecked = index.lineages_for_domains(domains)
+    while unchecked:
+        for lineagename in sorted(unchecked):
+            checked.add(lineagename)
+            entry = index.entries[lineagename]
+            if not entry.is_fresh():
+                candidate_lineage = _index_lineage(config, index, entry.renewal_file)
+                if isinstance(candidate_lineage, storage.RenewableCert):
+                    candidates.append(candidate_lineage)
+        unchecked = index.lineages_for_domains(domains) - checked
+    for lineagename in sorted(index.lineages_for_domains(domains)):
+        candidates.append(index.entries[lineagename])
+    index.save()
+
+    identical_names_cert, subset_names_cert = init
+    for candidate in candidates:
+        identical_names_cert, subset_names_cert = update_certs_for_domain_matches(
+            candidate, (identical_names_cert, subset_names_cert))
+    return (_load_indexed_lineage(config, identical_names_cert),
+            _load_indexed_lineage(config, subset_names_cert))
+
+
+def _archive_files(candidate_lineage: _Lineage, filetype: str) -> Optional[List[str]]:
     """ In order to match things like:
         /etc/letsencrypt/archive/example.com/chain1.pem.
 
         Anonymous functions which call this function are eventually passed (in a list) to
         `match_and_check_overlaps` to help specify the acceptable_matches.
 
-        :param `.storage.RenewableCert` candidate_lineage: Lineage whose archive dir is to
+        :param `._Lineage` candidate_lineage: Lineage whose archive dir is to
             be searched.
         :param str filetype: main file name prefix e.g. "fullchain" or "chain".
 
@@ -205,8 +255,8 @@ def _archive_files(candidate_lineage: storage.RenewableCert, filetype: str) -> O
     return None
 
 
-def _acceptable_matches() -> List[Union[Callable[[storage.RenewableCert], str],
-                                        Callable[[storage.RenewableCert], Optional[List[str]]]]]:
+def _acceptable_matches() -> List[Union[Callable[[_Lineage], str],
+                                        Callable[[_Lineage], Optional[List[str]]]]]:
     """ Generates the list that's passed to match_and_check_overlaps. Is its own function to
     make unit testing easier.
 
@@ -236,10 +286,10 @@ def cert_path_to_lineage(cli_config: configuration.NamespaceConfig) -> str:
 
 def match_and_check_overlaps(cli_config: configuration.NamespaceConfig,
                              acceptable_matches: Iterable[Union[
-                                 Callable[[storage.RenewableCert], str],
-                                 Callable[[storage.RenewableCert], Optional[List[str]]]]],
-                             match_func: Callable[[storage.RenewableCert], str],
-                             rv_func: Callable[[storage.RenewableCert], str]) -> List[str]:
+                                 Callable[[_Lineage], str],
+                                 Callable[[_Lineage], Optional[List[str]]]]],
+                             match_func: Callable[[_Lineage], str],
+                             rv_func: Callable[[_Lineage], str]) -> List[str]:
     """ Searches through all lineages for a match, and checks for duplicates.
     If a duplicate is found, an error is raised, as performing operations on lineages
     that have their properties incorrectly duplicated elsewhere is probably a bad idea.
@@ -250,10 +300,10 @@ def match_and_check_overlaps(cli_config: configuration.NamespaceConfig,
     :param function rv_func: specifies what to return
 
     """
-    def find_matches(candidate_lineage: storage.RenewableCert, return_value: List[str],
+    def find_matches(candidate_lineage: _Lineage, return_value: List[str],
                      acceptable_matches: Iterable[Union[
-                         Callable[[storage.RenewableCert], str],
-                         Callable[[storage.RenewableCert], Optional[List[str]]]]]) -> List[str]:
+                         Callable[[_Lineage], str],
+                         Callable[[_Lineage], Optional[List[str]]]]]) -> List[str]:
         """Returns a list of matches using _search_lineages."""
         acceptable_matches_resolved = [func(candidate_lineage) for func in acceptable_matches]
         acceptable_matches_rv: List[str] = []
@@ -275,15 +325,19 @@ def match_and_check_overlaps(cli_config: configuration.NamespaceConfig,
     return matched
 
 
-def human_readable_cert_info(config: configuration.NamespaceConfig, cert: storage.RenewableCert,
-                             skip_filter_checks: bool = False) -> Optional[str]:
-    """ Returns a human readable description of info about a RenewableCert object"""
+def human_readable_cert_info(config: configuration.NamespaceConfig,
+                             cert: lineage_index.LineageMetadata,
+                             skip_filter_checks: bool = False,
+                             revoked: Optional[bool] = None) -> Optional[str]:
+    """ Returns a human readable description of info about a RenewableCert object
+
+    :param bool revoked: OCSP status of the certificate if already known,
+        otherwise OCSP is queried
+
+    """
     certinfo = []
-    checker = ocsp.RevocationChecker()
 
-    if config.certname and cert.lineagename != config.certname and not skip_filter_checks:
-        return None
-    if config.domains and not set(config.domains).issubset(cert.names()):
+    if not _cert_matches_filters(config, cert, skip_filter_checks):
         return None
     now = datetime.datetime.now(pytz.UTC)
 
@@ -292,7 +346,8 @@ def human_readable_cert_info(config: configuration.NamespaceConfig, cert: storag
         reasons.append('TEST_CERT')
     if cert.target_expiry <= now:
         reasons.append('EXPIRED')
-    elif checker.ocsp_revoked(cert):
+    elif revoked or (revoked is None and ocsp.RevocationChecker(
+            cache_dir=config.ocsp_cache_dir).ocsp_revoked(cert)):
         reasons.append('REVOKED')
 
     if reasons:
@@ -307,17 +362,25 @@ def human_readable_cert_info(config: configuration.NamespaceConfig, cert: storag
             status = f"VALID: {diff.days} days"
 
     valid_string = "{0} ({1})".format(cert.target_expiry, status)
-    serial = format(crypto_util.get_serial_from_cert(cert.cert_path), 'x')
+    serial = format(cert.serial, 'x')
     certinfo.append(f"  Certificate Name: {cert.lineagename}\n"
                     f"    Serial Number: {serial}\n"
                     f"    Key Type: {cert.private_key_type}\n"
                     f'    Domains: {" ".join(cert.names())}\n'
                     f"    Expiry Date: {valid_string}\n"
-                    f"    Certificate Path: {cert.fullchain}\n"
-                    f"    Private Key Path: {cert.privkey}")
+                    f"    Certificate Path: {cert.fullchain_path}\n"
+                    f"    Private Key Path: {cert.key_path}")
     return "".join(certinfo)
 
 
+def _cert_matches_filters(config: configuration.NamespaceConfig, cert: interfaces.RenewableCert,
+                          skip_filter_checks: bool = False) -> bool:
+    """Does the cert match the --cert-name and --domains filters?"""
+    if config.certname and cert.lineagename != config.certname and not skip_filter_checks:
+        return False
+    return not config.domains or set(config.domains).issubset(cert.names())
+
+
 def get_certnames(config: configuration.NamespaceConfig, verb: str, allow_multiple: bool = False,
                   custom_prompt: Optional[str] = None) -> List[str]:
     """Get certname from flag, interactively, or error out."""
@@ -363,18 +426,24 @@ def _report_lines(msgs: Iterable[str]) -> str:
 
 
 def _report_human_readable(config: configuration.NamespaceConfig,
-                           parsed_certs: Iterable[storage.RenewableCert]) -> str:
+                           parsed_certs: Iterable[lineage_index.LineageMetadata]) -> str:
     """Format a results report for a parsed cert"""
     certinfo = []
+    now = datetime.datetime.now(pytz.UTC)
+    parsed_certs = list(parsed_certs)
+    checker = ocsp.RevocationChecker(cache_dir=config.ocsp_cache_dir)
+    revocations = checker.check_many(
+        [cert for cert in parsed_certs
+         if _cert_matches_filters(config, cert) and cert.target_expiry > now])
     for cert in parsed_certs:
-        cert_info = human_readable_cert_info(config, cert)
+        cert_info = human_readable_cert_info(config, cert, revoked=revocations.get(cert, False))
         if cert_info is not None:
             certinfo.append(cert_info)
     return "\n".join(certinfo)
 
 
 def _describe_certs(config: configuration.NamespaceConfig,
-                    parsed_certs: Iterable[storage.RenewableCert],
+                    parsed_certs: Iterable[lineage_index.LineageMetadata],
                     parse_failures: Iterable[str]) -> None:
     """Print information about the certs we know about"""
     out: List[str] = []
@@ -410,18 +479,109 @@ def _search_lineages(cli_config: configuration.NamespaceConfig, func: Callable[.
     :param initial_rv: initial return value of the function (any type)
 
     :returns: Whatever was specified by `func` if a match is found.
+    """
+    rv = initial_rv
+    for candidate_lineage in _indexed_lineages(cli_config):
+        rv = func(candidate_lineage, rv, *args)
+    return rv
+
+
+def _indexed_lineages(cli_config: configuration.NamespaceConfig) -> List[_Lineage]:
+    """Get all unbroken lineages, using the lineage index where possible.
+
+    Lineages whose index entry is missing or out of date are parsed and
+    indexed again. If a lineage can be parsed but not indexed, the
+    parsed `storage.RenewableCert` is returned instead of its metadata.
+
+    :param `configuration.NamespaceConfig` cli_config: parsed command line arguments
+
+    :returns: the metadata of the lineages
+    :rtype: `list` of `lineage_index.LineageMetadata` or `storage.RenewableCert`
+
     """
     configs_dir = cli_config.renewal_configs_dir
     # Verify the directory is there
     util.make_or_verify_dir(configs_dir, mode=0o755)
 
-    rv = initial_rv
-    for renewal_file in storage.renewal_conf_files(cli_config):
-        try:
-            candidate_lineage = storage.RenewableCert(renewal_file, cli_config)
-        except (OSError, errors.CertStorageError):
-            logger.debug("Renewal conf file %s is broken. Skipping.", renewal_file)
-            logger.debug("Traceback was:\n%s", traceback.format_exc())
-            continue
-        rv = func(candidate_lineage, rv, *args)
-    return rv
+    index = lineage_index.LineageIndex(cli_config)
+    renewal_files = storage.renewal_conf_files(cli_config)
+    lineages: List[_Lineage] = []
+    for renewal_file in renewal_files:
+        candidate_lineage: Optional[_Lineage] = index.get(renewal_file)
+        if candidate_lineage is None:
+            candidate_lineage = _index_lineage(cli_config, index, renewal_file)
+        if candidate_lineage is not None:
+            lineages.append(candidate_lineage)
+    index.prune(renewal_files)
+    index.save()
+    return lineages
+
+
+def _complete_lineage_index(cli_config: configuration.NamespaceConfig
+                            ) -> Tuple[lineage_index.LineageIndex, List[_Lineage]]:
+    """Get the lineage index after indexing the lineages added or removed since.
+
+    Only the list of renewal configuration files is compared with the
+    index, so the entries of other lineages are trusted without checking
+    the stamps of their files. Callers check the entries they use.
+
+    :param `configuration.NamespaceConfig` cli_config: parsed command line arguments
+
+    :returns: the index, and the lineages that could be parsed but not indexed
+    :rtype: `tuple` of `lineage_index.LineageIndex` and `list` of `storage.RenewableCert`
+
+    """
+    configs_dir = cli_config.renewal_configs_dir
+    # Verify the directory is there
+    util.make_or_verify_dir(configs_dir, mode=0o755)
+
+    index = lineage_index.LineageIndex(cli_config)
+    renewal_files = storage.renewal_conf_files(cli_config)
+    unindexed: List[_Lineage] = []
+    for renewal_file in renewal_files:
+        if index.get_indexed(renewal_file) is None:
+            candidate_lineage = _index_lineage(cli_config, index, renewal_file)
+            if isinstance(candidate_lineage, storage.RenewableCert):
+                unindexed.append(candidate_lineage)
+    index.prune(renewal_files)
+    return index, unindexed
+
+
+def _index_lineage(cli_config: configuration.NamespaceConfig, index: lineage_index.LineageIndex,
+                   renewal_file: str) -> Optional[_Lineage]:
+    """Parse a lineage and update its index entry.
+
+    :returns: the new metadata of the lineage, the parsed lineage if it
+        can't be indexed, or None if it is broken
+    :rtype: `lineage_index.LineageMetadata` or `storage.RenewableCert` or None
+
+    """
+    try:
+        candidate_lineage = storage.RenewableCert(renewal_file, cli_config)
+    except (OSError, errors.CertStorageError):
+        logger.debug("Renewal conf file %s is broken. Skipping.", renewal_file)
+        logger.debug("Traceback was:\n%s", traceback.format_exc())
+        metadata = index.get_indexed(renewal_file)
+        if metadata is not None:
+            index.remove(metadata.lineagename)
+        return None
+    try:
+        return index.update(candidate_lineage)
+    except Exception:  # pylint: disable=broad-except
+        logger.debug("Unable to index lineage %s", candidate_lineage.lineagename,
+                     exc_info=True)
+        index.remove(candidate_lineage.lineagename)
+        return candidate_lineage
+
+
+def _load_indexed_lineage(cli_config: configuration.NamespaceConfig,
+                          lineage: Optional[_Lineage]) -> Optional[storage.RenewableCert]:
+    """Get the `storage.RenewableCert` of a lineage returned by `_indexed_lineages`."""
+    if lineage is None or isinstance(lineage, storage.RenewableCert):
+        return lineage
+    try:
+        return storage.RenewableCert(lineage.renewal_file, cli_config)
+    except (OSError, errors.CertStorageError):
+        logger.debug("Renewal conf file %s is broken.", lineage.renewal_file)
+        logger.debug("Traceback was:\n%s", traceback.format_exc())
+        return None
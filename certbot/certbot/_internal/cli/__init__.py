@@ -35,6 +35,7 @@ from certbot._internal.cli.cli_utils import flag_default
 from certbot._internal.cli.cli_utils import HelpfulArgumentGroup
 from certbot._internal.cli.cli_utils import nonnegative_int
 from certbot._internal.cli.cli_utils import parse_preferred_challenges
+from certbot._internal.cli.cli_utils import positive_int
 from certbot._internal.cli.cli_utils import read_file
 from certbot._internal.cli.cli_utils import set_test_server_options
 from certbot._internal.cli.group_adder import _add_all_groups
@@ -246,6 +247,16 @@ def prepare_and_parse_args(plugins: plugins_disco.PluginsRegistry, args: List[st
              "the requested domains. This may be useful for allowing renewals for "
              "multiple domains to succeed even if some domains no longer point "
              "at this system. This option cannot be used with --csr.")
+    helpful.add(
+        ["automation", "renew", "certonly"],
+        "--answer-challenges-early", action="store_true",
+        default=flag_default("answer_challenges_early"),
+        help="Tell the CA that each challenge is ready as soon as the "
+             "authenticator plugin has set it up instead of after all of them, "
+             "so validation starts earlier. Only plugins that report each "
+             "challenge when it is ready, such as DNS plugins, support this; "
+             "it is ignored for other plugins. "
+             "(default: False)")
     helpful.add(
         "automation", "--agree-tos", dest="tos", action="store_true",
         default=flag_default("tos"),
@@ -413,6 +424,35 @@ def prepare_and_parse_args(plugins: plugins_disco.PluginsRegistry, args: List[st
         "renew", "--no-random-sleep-on-renew", action="store_false",
         default=flag_default("random_sleep_on_renew"), dest="random_sleep_on_renew",
         help=argparse.SUPPRESS)
+    helpful.add(
+        "renew", "--renew-concurrency", type=positive_int,
+        default=flag_default("renew_concurrency"), dest="renew_concurrency",
+        help="Maximum number of certificates to renew at the same time. Certificates"
+        " that share an installer, that use an authenticator which binds shared"
+        " resources (such as standalone), or that have names in common are always"
+        " renewed one after the other. (default: 1)")
+    helpful.add(
+        "renew", "--pregenerate-keys", type=nonnegative_int, metavar="N",
+        default=flag_default("pregenerate_keys"), dest="pregenerate_keys",
+        help="Generate the new private keys of up to N certificates due for renewal"
+        " ahead of time, in background processes, while other certificates are"
+        " being renewed. Certificates renewed with --reuse-key keep their key."
+        " Use 0 to generate each key when its certificate is renewed. (default: 0)")
+    helpful.add(
+        "renew", "--coalesce-reloads", action="store_true",
+        default=flag_default("coalesce_reloads"), dest="coalesce_reloads",
+        help="Reload the server of each installer plugin once, after all certificates"
+        " have been renewed, instead of after every renewed certificate. If that"
+        " reload fails, the renewed certificates are deployed and the server"
+        " reloaded one at a time, and those preventing the reload are reported"
+        " as failures and keep their previous certificate. (default: False)")
+    helpful.add(
+        "renew", "--ocsp-check-budget", type=nonnegative_int, metavar="SECONDS",
+        default=flag_default("ocsp_check_budget"), dest="ocsp_check_budget",
+        help="Maximum number of seconds spent checking whether certificates that are"
+        " not yet due for renewal have been revoked. Certificates whose OCSP status"
+        " is not known by then are assumed not to be revoked. Use 0 to skip these"
+        " checks. (default: no limit)")
     helpful.add(
         ["renew", "reconfigure"], "--deploy-hook", action=_DeployHookAction,
         help='Command to be run in a shell once for each successfully'
@@ -252,6 +252,26 @@ def nonnegative_int(value: str) -> int:
         raise argparse.ArgumentTypeError("value must be non-negative")
     return int_value
 
+
+def positive_int(value: str) -> int:
+    """Converts value to an int and checks that it is greater than zero.
+
+    This function should used as the type parameter for argparse
+    arguments.
+
+    :param str value: value provided on the command line
+
+    :returns: integer representation of value
+    :rtype: int
+
+    :raises argparse.ArgumentTypeError: if value isn't a positive integer
+
+    """
+    int_value = nonnegative_int(value)
+    if int_value == 0:
+        raise argparse.ArgumentTypeError("value must be positive")
+    return int_value
+
 def set_test_server_options(verb: str, config: configuration.NamespaceConfig) -> None:
     """Updates server, break_my_certs, staging, tos, and
     register_unsafely_without_email in config as necessary to prepare
@@ -1,12 +1,16 @@
 """Certbot client API."""
+import contextlib
 import datetime
+import json
 import logging
 import platform
+import threading
 from typing import Any
 from typing import Callable
 from typing import cast
 from typing import Dict
 from typing import IO
+from typing import Iterator
 from typing import List
 from typing import Optional
 from typing import Tuple
@@ -37,9 +41,11 @@ from certbot._internal import cli
 from certbot._internal import constants
 from certbot._internal import eff
 from certbot._internal import error_handler
+from certbot._internal import key_pool
 from certbot._internal import storage
 from certbot._internal.plugins import disco as plugin_disco
 from certbot._internal.plugins import selection as plugin_selection
+from certbot.compat import filesystem
 from certbot.compat import os
 from certbot.display import ops as display_ops
 from certbot.display import util as display_util
@@ -47,11 +53,69 @@ from certbot.interfaces import AccountStorage
 
 logger = logging.getLogger(__name__)
 
+# ACME clients of existing accounts keyed by server, account, key thumbprint,
+# SSL verification and user agent. None outside of shared_acme_clients.
+_SharedClientKey = Tuple[str, str, str, bool, str]
+_shared_acme_clients: Optional[Dict[_SharedClientKey, acme_client.ClientV2]] = None
+_shared_acme_clients_lock = threading.Lock()
+
+# Number of nonces the ACME clients fetch ahead of time, so that the
+# requests of an order rarely have to wait for a newNonce request
+_NONCE_PREFETCH = 2
+
+# Serializes updates of the preferred chains file by concurrent renewals
+_preferred_chains_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def shared_acme_clients() -> Iterator[None]:
+    """Share ACME clients between the certificates handled in this block.
+
+    Within the block, `acme_from_config_key` returns the same client for
+    the same server and existing account, so that later certificates reuse
+    its connections, its copy of the directory and its leftover nonces.
+
+    """
+    global _shared_acme_clients  # pylint: disable=global-statement
+    with _shared_acme_clients_lock:
+        outermost = _shared_acme_clients is None
+        if outermost:
+            _shared_acme_clients = {}
+    try:
+        yield
+    finally:
+        if outermost:
+            with _shared_acme_clients_lock:
+                _shared_acme_clients = None
+
 
 def acme_from_config_key(config: configuration.NamespaceConfig, key: jose.JWK,
                          regr: Optional[messages.RegistrationResource] = None
                          ) -> acme_client.ClientV2:
-    """Wrangle ACME client construction"""
+    """Wrangle ACME client construction
+
+    Clients of existing accounts are reused within `shared_acme_clients`.
+
+    """
+    with _shared_acme_clients_lock:
+        if regr is not None and _shared_acme_clients is not None:
+            shared_key = (config.server, regr.uri or "", key.thumbprint().hex(),
+                          not config.no_verify_ssl, determine_user_agent(config))
+            acme = _shared_acme_clients.get(shared_key)
+            if acme is None:
+                # Built while holding the lock so that concurrent renewals wait
+                # for this client instead of fetching the directory again.
+                acme = _new_acme_client(config, key, regr)
+                _shared_acme_clients[shared_key] = acme
+            else:
+                logger.debug("Reusing the ACME client of account %s on %s",
+                             regr.uri, config.server)
+            return acme
+    return _new_acme_client(config, key, regr)
+
+
+def _new_acme_client(config: configuration.NamespaceConfig, key: jose.JWK,
+                     regr: Optional[messages.RegistrationResource]) -> acme_client.ClientV2:
     if key.typ == 'EC':
         public_key = key.key
         if public_key.key_size == 256:
@@ -68,7 +132,8 @@ def acme_from_config_key(config: configuration.NamespaceConfig, key: jose.JWK,
         alg = RS256
     net = acme_client.ClientNetwork(key, alg=alg, account=regr,
                                     verify_ssl=(not config.no_verify_ssl),
-                                    user_agent=determine_user_agent(config))
+                                    user_agent=determine_user_agent(config),
+                                    nonce_prefetch=_NONCE_PREFETCH)
 
     directory = acme_client.ClientV2.get_directory(config.server, net)
     return acme_client.ClientV2(directory, net)
@@ -300,8 +365,10 @@ class Client:
 
         self.auth_handler: Optional[auth_handler.AuthHandler]
         if auth is not None:
+            # Sharing the polling strategy keeps the statistics of an order together
             self.auth_handler = auth_handler.AuthHandler(
-                auth, self.acme, self.account, self.config.pref_challs)
+                auth, self.acme, self.account, self.config.pref_challs,
+                polling=self.acme.polling if self.acme is not None else None)
         else:
             self.auth_handler = None
 
@@ -339,8 +406,27 @@ class Client:
 
         logger.debug("Will poll for certificate issuance until %s", deadline)
 
+        # With --preferred-chain, chains are fetched until one matches, starting with
+        # the alternative chain that matched for the previous certificate from this CA.
+        chain_predicate: Optional[Callable[[int, str], bool]] = None
+        chain_hint: Optional[int] = None
+        matched_positions: List[int] = []
+        preferred_chain = self.config.preferred_chain
+        if preferred_chain:
+            chain_hint = _preferred_chain_hint(self.config)
+
+            def is_preferred_chain(position: int, chain: str) -> bool:
+                if crypto_util.chain_has_issuer(chain, preferred_chain):
+                    matched_positions.append(position)
+                    return True
+                return False
+            chain_predicate = is_preferred_chain
+
         orderr = self.acme.finalize_order(
-            orderr, deadline, fetch_alternative_chains=self.config.preferred_chain is not None)
+            orderr, deadline, fetch_alternative_chains=self.config.preferred_chain is not None,
+            chain_predicate=chain_predicate, chain_hint=chain_hint)
+        if matched_positions and matched_positions[0] != chain_hint:
+            _save_preferred_chain_hint(self.config, matched_positions[0])
 
         fullchain = orderr.fullchain_pem
         if self.config.preferred_chain and orderr.alternative_fullchains_pem:
@@ -400,6 +486,14 @@ class Client:
         elif self.config.rsa_key_size and self.config.key_type.lower() == 'rsa':
             key_size = self.config.rsa_key_size
 
+        if key is None:
+            # The key may have been generated in advance while other
+            # certificates were being renewed.
+            pregenerated = key_pool.take(key_pool.KeySpec(self.config.key_type, key_size,
+                                                          elliptic_curve))
+            if pregenerated is not None:
+                key = util.Key(file=None, pem=pregenerated)
+
         # Create CSR from names
         if self.config.dry_run:
             key = key or util.Key(
@@ -848,6 +942,50 @@ def rollback(default_installer: str, checkpoints: int,
         installer.restart()
 
 
+def _preferred_chain_hint(config: configuration.NamespaceConfig) -> Optional[int]:
+    """Position of the alternative chain of the last certificate from the CA
+    that matched --preferred-chain, if known."""
+    server_hints = _read_preferred_chains(config).get(config.server, {})
+    hint = server_hints.get(cast(str, config.preferred_chain))
+    return hint if isinstance(hint, int) else None
+
+
+def _save_preferred_chain_hint(config: configuration.NamespaceConfig, position: int) -> None:
+    """Remember the position of the chain matching --preferred-chain for the CA.
+
+    Failing to do so isn't an error, all chains are then checked again
+    next time.
+
+    """
+    path = os.path.join(config.work_dir, constants.PREFERRED_CHAINS_FILE)
+    with _preferred_chains_lock:
+        hints = _read_preferred_chains(config)
+        hints.setdefault(config.server, {})[cast(str, config.preferred_chain)] = position
+        try:
+            with os.fdopen(filesystem.open(path + ".tmp", os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                                           0o644), "w") as hints_file:
+                json.dump(hints, hints_file)
+            filesystem.replace(path + ".tmp", path)
+        except OSError as error:
+            logger.debug("Unable to write preferred chains to %s: %s", path, error)
+
+
+def _read_preferred_chains(config: configuration.NamespaceConfig) -> Dict[str, Dict[str, int]]:
+    path = os.path.join(config.work_dir, constants.PREFERRED_CHAINS_FILE)
+    try:
+        with open(path) as hints_file:
+            hints = json.load(hints_file)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as error:
+        logger.debug("Ignoring unreadable preferred chains file %s: %s", path, error)
+        return {}
+    if not isinstance(hints, dict):
+        return {}
+    return {server: server_hints for server, server_hints in hints.items()
+            if isinstance(server_hints, dict)}
+
+
 def _open_pem_file(config: configuration.NamespaceConfig,
                    cli_arg_path: str, pem_path: str) -> Tuple[IO, str]:
     """Open a pem file.
@@ -55,6 +55,7 @@ CLI_DEFAULTS: Dict[str, Any] = dict(  # pylint: disable=use-dict-literal
     staging=False,
     debug=False,
     debug_challenges=False,
+    answer_challenges_early=False,
     no_verify_ssl=False,
     http01_port=challenges.HTTP01Response.PORT,
     http01_address="",
@@ -78,6 +79,10 @@ CLI_DEFAULTS: Dict[str, Any] = dict(  # pylint: disable=use-dict-literal
     new_key=False,
     disable_renew_updates=False,
     random_sleep_on_renew=True,
+    renew_concurrency=1,
+    pregenerate_keys=0,
+    coalesce_reloads=False,
+    ocsp_check_budget=None,
     eab_hmac_key=None,
     eab_kid=None,
     issuance_timeout=90,
@@ -185,6 +190,17 @@ KEY_DIR = "keys"
 """Directory (relative to `certbot.configuration.NamespaceConfig.config_dir`)
 where keys are saved."""
 
+OCSP_CACHE_DIR = "ocsp"
+"""Directory (relative to `certbot.configuration.NamespaceConfig.work_dir`)
+where validated OCSP responses are cached."""
+
+PREFERRED_CHAINS_FILE = "preferred-chains.json"
+"""Positions of the alternative chains matching the preferred chains of each
+CA, relative to `certbot.configuration.NamespaceConfig.work_dir`."""
+
+LINEAGE_INDEX_FILE = "lineage-index.json"
+"""Lineage metadata index, relative to `certbot.configuration.NamespaceConfig.config_dir`."""
+
 LIVE_DIR = "live"
 """Live directory, relative to `certbot.configuration.NamespaceConfig.config_dir`."""
 
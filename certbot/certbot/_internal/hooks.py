@@ -1,6 +1,7 @@
 """Facilities for implementing hooks that call shell commands."""
 
 import logging
+import threading
 from typing import Dict
 from typing import List
 from typing import Optional
@@ -84,6 +85,10 @@ def pre_hook(config: configuration.NamespaceConfig) -> None:
 
 executed_pre_hooks: Set[str] = set()
 
+# Held while checking and updating executed_pre_hooks and post_hooks so that
+# lineages renewed concurrently don't run or register the same hook twice.
+_hooks_lock = threading.RLock()
+
 
 def _run_pre_hook_if_necessary(command: str) -> None:
     """Run the specified pre-hook if we haven't already.
@@ -94,11 +99,12 @@ def _run_pre_hook_if_necessary(command: str) -> None:
     :param str command: pre-hook to be run
 
     """
-    if command in executed_pre_hooks:
-        logger.info("Pre-hook command already run, skipping: %s", command)
-    else:
-        _run_hook("pre-hook", command)
-        executed_pre_hooks.add(command)
+    with _hooks_lock:
+        if command in executed_pre_hooks:
+            logger.info("Pre-hook command already run, skipping: %s", command)
+        else:
+            _run_hook("pre-hook", command)
+            executed_pre_hooks.add(command)
 
 
 def post_hook(
@@ -162,8 +168,9 @@ def _run_eventually(command: str) -> None:
     :param str command: post-hook to register to be run
 
     """
-    if command not in post_hooks:
-        post_hooks.append(command)
+    with _hooks_lock:
+        if command not in post_hooks:
+            post_hooks.append(command)
 
 
 def run_saved_post_hooks(renewed_domains: List[str], failed_domains: List[str]) -> None:
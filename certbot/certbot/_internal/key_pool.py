@@ -0,0 +1,153 @@
+"""Generation of private keys ahead of time in background processes.
+
+Generating an RSA key can take seconds of CPU time. While certificates
+are renewed one after the other, the keys of the next certificates due
+for renewal can be generated on other processors in the meantime.
+
+The pool only produces PEM encoded keys, exactly as
+:func:`certbot.crypto_util.make_key` would. Whoever takes a key from the
+pool saves it, so where keys are written and with which permissions
+doesn't change, and lineages reusing their private key never take one.
+
+"""
+import collections
+from concurrent import futures
+import contextlib
+import logging
+import multiprocessing
+import threading
+from typing import Deque
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import NamedTuple
+from typing import Optional
+
+from certbot import configuration
+from certbot import crypto_util
+
+logger = logging.getLogger(__name__)
+
+
+class KeySpec(NamedTuple):
+    """Parameters of :func:`certbot.crypto_util.make_key` for a key."""
+    key_type: str
+    bits: int
+    elliptic_curve: str
+
+
+def key_spec(config: configuration.NamespaceConfig) -> KeySpec:
+    """The kind of key :meth:`.Client.obtain_certificate` generates for a configuration."""
+    key_type = config.key_type[0] if isinstance(config.key_type, list) else config.key_type
+    elliptic_curve = "secp256r1"
+    if config.elliptic_curve and key_type == "ecdsa":
+        elliptic_curve = config.elliptic_curve
+    return KeySpec(key_type, config.rsa_key_size, elliptic_curve)
+
+
+class KeyPool:
+    """Keys being generated in a pool of processes.
+
+    At most `ahead` keys are generated or waiting to be taken at any
+    time. Keys for the specs passed to :meth:`schedule` are generated in
+    that order, and each key taken makes room for the next one.
+
+    :param int ahead: maximum number of keys generated in advance
+
+    """
+    def __init__(self, ahead: int) -> None:
+        self._ahead = ahead
+        # Worker processes are spawned rather than forked since renewals
+        # may be running in other threads.
+        self._executor = futures.ProcessPoolExecutor(
+            max_workers=min(ahead, multiprocessing.cpu_count()),
+            mp_context=multiprocessing.get_context("spawn"))
+        self._upcoming: Deque[KeySpec] = collections.deque()
+        self._keys: Dict[KeySpec, Deque["futures.Future[bytes]"]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def schedule(self, specs: Iterable[KeySpec]) -> None:
+        """Generate keys of the given kinds, `ahead` at a time."""
+        with self._lock:
+            self._upcoming.extend(specs)
+            self._submit_upcoming()
+
+    def take(self, spec: KeySpec) -> Optional[bytes]:
+        """Take a key of the given kind, waiting for it if necessary.
+
+        :returns: the PEM encoded key, or None if no key of this kind was
+            scheduled or generating it failed
+        :rtype: bytes or None
+
+        """
+        with self._lock:
+            pending = self._keys.get(spec)
+            future = pending.popleft() if pending else None
+            if future is None:
+                self.stats["misses"] += 1
+            else:
+                self.stats["hits"] += 1
+                self._submit_upcoming()
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception:  # pylint: disable=broad-except
+            # The caller generates the key itself and reports the error
+            logger.debug("Unable to generate a %s key in advance", spec.key_type, exc_info=True)
+            return None
+
+    def close(self) -> None:
+        """Stop generating keys."""
+        with self._lock:
+            self._upcoming.clear()
+            self._keys.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        logger.debug("Private keys generated in advance: %(hits)d used, %(misses)d missing",
+                     self.stats)
+
+    def _submit_upcoming(self) -> None:
+        in_advance = sum(len(pending) for pending in self._keys.values())
+        while self._upcoming and in_advance < self._ahead:
+            spec = self._upcoming.popleft()
+            self._keys.setdefault(spec, collections.deque()).append(self._executor.submit(
+                crypto_util.make_key, bits=spec.bits, key_type=spec.key_type,
+                elliptic_curve=spec.elliptic_curve))
+            in_advance += 1
+
+
+_active_pool: Optional[KeyPool] = None
+
+
+@contextlib.contextmanager
+def pregenerated_keys(ahead: int) -> Iterator[Optional[KeyPool]]:
+    """Make :func:`take` use a new `KeyPool` until the context exits.
+
+    :param int ahead: number of keys to generate in advance, no pool is
+        created if it is 0
+
+    """
+    global _active_pool  # pylint: disable=global-statement
+    if ahead <= 0 or _active_pool is not None:
+        yield _active_pool
+        return
+    pool = KeyPool(ahead)
+    _active_pool = pool
+    try:
+        yield pool
+    finally:
+        _active_pool = None
+        pool.close()
+
+
+def take(spec: KeySpec) -> Optional[bytes]:
+    """Take a key generated in advance from the active pool, if any.
+
+    :returns: the PEM encoded key, or None if the caller has to generate
+        it itself
+    :rtype: bytes or None
+
+    """
+    pool = _active_pool
+    return pool.take(spec) if pool is not None else None
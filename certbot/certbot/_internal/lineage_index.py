@@ -0,0 +1,416 @@
+"""Persistent index of certificate lineage metadata.
+
+Listing or searching lineages otherwise means parsing every renewal
+configuration file and reading every certificate and private key from
+disk. The index keeps the metadata of each lineage in a single file in
+the configuration directory. An entry is only used while the files it
+was computed from are unchanged, which is checked by comparing the
+inode, modification time and size of the renewal configuration file,
+the live symlinks and their targets, and the archive directory.
+
+"""
+import datetime
+import json
+import logging
+import tempfile
+import threading
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from typing import TYPE_CHECKING
+
+from certbot import configuration
+from certbot import crypto_util
+from certbot import errors
+from certbot import interfaces
+from certbot import util
+from certbot._internal import constants
+from certbot.compat import filesystem
+from certbot.compat import os
+
+if TYPE_CHECKING:
+    from certbot._internal import storage
+
+logger = logging.getLogger(__name__)
+
+_INDEX_VERSION = 1
+
+# Held while the index file is written and while the changes recorded by
+# record and forget, which are called from the threads of concurrent
+# renewals, are updated. Other processes are kept out by the lock Certbot
+# holds on its config directory.
+_index_lock = threading.RLock()
+
+# Lineages changed during this run, keyed by index file: the configuration
+# and, by lineage name, the lineage to index or None to remove it. They are
+# written by save_pending once renewals are done, or at exit.
+_pending: Dict[str, Tuple[configuration.NamespaceConfig,
+                          Dict[str, Optional['storage.RenewableCert']]]] = {}
+_save_at_exit_registered = False
+
+# Identity of a file as (inode, modification time in ns, size), or None if
+# the file doesn't exist.
+_FileStamp = Optional[List[int]]
+
+
+class LineageMetadata(interfaces.RenewableCert):
+    """Metadata of a certificate lineage, as recorded in the lineage index.
+
+    :ivar str renewal_file: path to the renewal configuration file
+    :ivar int serial: serial number of the current certificate
+    :ivar datetime.datetime target_expiry: expiration of the current certificate
+    :ivar str private_key_type: type of the current private key, RSA or ECDSA
+    :ivar int latest_version: latest version available for all four files
+    :ivar bool is_test_cert: whether the lineage is from a staging server
+    :ivar str archive_dir: the archive directory of the lineage
+    :ivar bool verified: whether the files of the lineage were checked with
+        :func:`certbot.crypto_util.verify_renewable_cert`
+
+    """
+    def __init__(self, lineagename: str, renewal_file: str, names: Iterable[str],
+                 serial: int, target_expiry: datetime.datetime, private_key_type: str,
+                 latest_version: int, is_test_cert: bool, paths: Dict[str, str],
+                 archive_dir: str, verified: bool = False,
+                 stamps: Optional[Dict[str, _FileStamp]] = None) -> None:
+        self._lineagename = lineagename
+        self.renewal_file = renewal_file
+        self._names = list(names)
+        self.serial = serial
+        self.target_expiry = target_expiry
+        self.private_key_type = private_key_type
+        self.latest_version = latest_version
+        self.is_test_cert = is_test_cert
+        self.paths = dict(paths)
+        self.archive_dir = archive_dir
+        self.verified = verified
+        self.stamps = stamps if stamps is not None else _stamp_files(self._watched_files())
+
+    @classmethod
+    def from_lineage(cls, lineage: 'storage.RenewableCert',
+                     verified: bool = False) -> 'LineageMetadata':
+        """Compute the metadata of a lineage from its files.
+
+        :param .storage.RenewableCert lineage: the lineage
+        :param bool verified: whether the lineage passed
+            :func:`certbot.crypto_util.verify_renewable_cert`
+
+        :raises errors.Error: if the current certificate can't be found
+
+        """
+        paths = {"cert": lineage.cert_path, "privkey": lineage.key_path,
+                 "chain": lineage.chain_path, "fullchain": lineage.fullchain_path}
+        archive_dir = lineage.archive_dir
+        # Files are stamped before they are read so that a concurrent change
+        # can only make the entry look stale, never fresh with old content.
+        stamps = _stamp_files(_watched_files(lineage.configfile.filename, paths, archive_dir))
+        cert_target = lineage.current_target("cert")
+        if cert_target is None:
+            raise errors.CertStorageError("could not find the certificate file")
+        return cls(
+            lineagename=lineage.lineagename,
+            renewal_file=lineage.configfile.filename,
+            names=lineage.names(),
+            serial=crypto_util.get_serial_from_cert(cert_target),
+            target_expiry=crypto_util.notAfter(cert_target),
+            private_key_type=lineage.private_key_type,
+            latest_version=lineage.latest_common_version(),
+            is_test_cert=lineage.is_test_cert,
+            paths=paths,
+            archive_dir=archive_dir,
+            verified=verified,
+            stamps=stamps,
+        )
+
+    @classmethod
+    def from_json(cls, jobj: Dict[str, Any]) -> 'LineageMetadata':
+        """Deserialize an entry of the index file."""
+        return cls(
+            lineagename=jobj["lineagename"],
+            renewal_file=jobj["renewal_file"],
+            names=jobj["names"],
+            serial=int(jobj["serial"]),
+            target_expiry=datetime.datetime.fromisoformat(jobj["target_expiry"]),
+            private_key_type=jobj["private_key_type"],
+            latest_version=jobj["latest_version"],
+            is_test_cert=jobj["is_test_cert"],
+            paths=jobj["paths"],
+            archive_dir=jobj["archive_dir"],
+            verified=jobj["verified"],
+            stamps=jobj["stamps"],
+        )
+
+    def to_json(self) -> Dict[str, Any]:
+        """Serialize this entry for the index file."""
+        return {
+            "lineagename": self.lineagename,
+            "renewal_file": self.renewal_file,
+            "names": self._names,
+            # Serial numbers can be larger than what some JSON readers handle
+            "serial": str(self.serial),
+            "target_expiry": self.target_expiry.isoformat(),
+            "private_key_type": self.private_key_type,
+            "latest_version": self.latest_version,
+            "is_test_cert": self.is_test_cert,
+            "paths": self.paths,
+            "archive_dir": self.archive_dir,
+            "verified": self.verified,
+            "stamps": self.stamps,
+        }
+
+    def is_fresh(self) -> bool:
+        """Are the files this entry was computed from unchanged?"""
+        return _stamp_files(self._watched_files()) == self.stamps
+
+    def _watched_files(self) -> List[str]:
+        return _watched_files(self.renewal_file, self.paths, self.archive_dir)
+
+    @property
+    def cert_path(self) -> str:
+        return self.paths["cert"]
+
+    @property
+    def key_path(self) -> str:
+        return self.paths["privkey"]
+
+    @property
+    def chain_path(self) -> str:
+        return self.paths["chain"]
+
+    @property
+    def fullchain_path(self) -> str:
+        return self.paths["fullchain"]
+
+    @property
+    def lineagename(self) -> str:
+        return self._lineagename
+
+    def names(self) -> List[str]:
+        return list(self._names)
+
+
+class LineageIndex:
+    """The lineage index of a configuration directory.
+
+    The index file is read on first use. Changes are kept in memory
+    until :meth:`save` is called. Failing to read or write the index
+    file isn't an error, since the index only avoids work.
+
+    """
+    def __init__(self, config: configuration.NamespaceConfig) -> None:
+        self.path = os.path.join(config.config_dir, constants.LINEAGE_INDEX_FILE)
+        self._entries: Optional[Dict[str, LineageMetadata]] = None
+        # Lineage names keyed by renewal configuration file and by domain
+        # name, derived from the entries when they are read and then kept
+        # up to date as entries change.
+        self._by_renewal_file: Dict[str, str] = {}
+        self._by_domain: Dict[str, Set[str]] = {}
+        self._dirty = False
+
+    @property
+    def entries(self) -> Dict[str, LineageMetadata]:
+        """All entries of the index, fresh or not, keyed by lineage name."""
+        if self._entries is None:
+            self._entries = {}
+            for entry in self._read().values():
+                self._add(entry)
+        return self._entries
+
+    def get(self, renewal_file: str) -> Optional[LineageMetadata]:
+        """Get the metadata of a lineage if it is still up to date.
+
+        :param str renewal_file: path to the renewal configuration file
+
+        :returns: the metadata, or None if the lineage isn't indexed or
+            its files changed since it was
+        :rtype: LineageMetadata or None
+
+        """
+        entry = self.get_indexed(renewal_file)
+        return entry if entry is not None and entry.is_fresh() else None
+
+    def get_indexed(self, renewal_file: str) -> Optional[LineageMetadata]:
+        """Get the metadata of a lineage without checking that it is up to date."""
+        name = self._by_renewal_file.get(renewal_file) if self.entries else None
+        return self.entries[name] if name is not None else None
+
+    def lineages_for_domains(self, domains: Iterable[str]) -> Set[str]:
+        """Names of the indexed lineages with a certificate for any of the domains.
+
+        Names are compared literally, so a wildcard domain only matches
+        lineages with the same wildcard name.
+
+        """
+        names: Set[str] = set()
+        if self.entries:
+            for domain in domains:
+                names.update(self._by_domain.get(domain, ()))
+        return names
+
+    def update(self, lineage: 'storage.RenewableCert',
+               verified: bool = False) -> LineageMetadata:
+        """Index the current state of a lineage.
+
+        :param .storage.RenewableCert lineage: the lineage
+        :param bool verified: whether the lineage passed
+            :func:`certbot.crypto_util.verify_renewable_cert`
+
+        :returns: the new metadata of the lineage
+        :rtype: LineageMetadata
+
+        """
+        entry = LineageMetadata.from_lineage(lineage, verified)
+        self.remove(entry.lineagename)
+        self._add(entry)
+        self._dirty = True
+        return entry
+
+    def remove(self, lineagename: str) -> None:
+        """Remove a lineage from the index."""
+        entry = self.entries.pop(lineagename, None)
+        if entry is None:
+            return
+        self._by_renewal_file.pop(entry.renewal_file, None)
+        for domain in entry.names():
+            lineages = self._by_domain.get(domain, set())
+            lineages.discard(lineagename)
+            if not lineages:
+                self._by_domain.pop(domain, None)
+        self._dirty = True
+
+    def _add(self, entry: LineageMetadata) -> None:
+        self.entries[entry.lineagename] = entry
+        self._by_renewal_file[entry.renewal_file] = entry.lineagename
+        for domain in entry.names():
+            self._by_domain.setdefault(domain, set()).add(entry.lineagename)
+
+    def prune(self, renewal_files: Iterable[str]) -> None:
+        """Remove the lineages whose renewal configuration file isn't listed."""
+        keep = set(renewal_files)
+        for name, entry in list(self.entries.items()):
+            if entry.renewal_file not in keep:
+                self.remove(name)
+
+    def save(self) -> None:
+        """Atomically write the index file if it was changed.
+
+        The file is written to a temporary file of its own first, then
+        renamed over the index file.
+
+        """
+        if not self._dirty:
+            return
+        index = {
+            "version": _INDEX_VERSION,
+            "lineages": {name: entry.to_json() for name, entry in self.entries.items()},
+        }
+        temp_path = None
+        try:
+            with _index_lock:
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path),
+                                                 prefix=os.path.basename(self.path) + ".",
+                                                 suffix=".tmp")
+                with os.fdopen(fd, "w") as index_file:
+                    json.dump(index, index_file)
+                filesystem.chmod(temp_path, 0o644)
+                filesystem.replace(temp_path, self.path)
+        except OSError as error:
+            logger.debug("Unable to write lineage index %s: %s", self.path, error)
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self._dirty = False
+
+    def _read(self) -> Dict[str, LineageMetadata]:
+        try:
+            with open(self.path) as index_file:
+                index = json.load(index_file)
+            if index.get("version") != _INDEX_VERSION:
+                return {}
+            return {name: LineageMetadata.from_json(jobj)
+                    for name, jobj in index["lineages"].items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as error:
+            logger.debug("Ignoring unreadable lineage index %s: %s", self.path, error)
+            return {}
+
+
+def record(config: configuration.NamespaceConfig, lineage: 'storage.RenewableCert') -> None:
+    """Update the index entry of a lineage whose files were just changed.
+
+    The entry is computed and the index file written by
+    :func:`save_pending`, so that a lineage changed several times, and
+    all lineages changed by a command, cost a single write.
+
+    """
+    _change(config, lineage.lineagename, lineage)
+
+
+def forget(config: configuration.NamespaceConfig, lineagename: str) -> None:
+    """Remove a deleted or renamed lineage from the index, see :func:`record`."""
+    _change(config, lineagename, None)
+
+
+def save_pending() -> None:
+    """Write the changes recorded by :func:`record` and :func:`forget`.
+
+    Errors computing an entry are logged and otherwise ignored, the
+    entry is then dropped so that it is recomputed when it is next
+    needed.
+
+    """
+    with _index_lock:
+        pending = list(_pending.values())
+        _pending.clear()
+        for config, changes in pending:
+            index = LineageIndex(config)
+            for lineagename, lineage in changes.items():
+                if lineage is None:
+                    index.remove(lineagename)
+                    continue
+                try:
+                    index.update(lineage)
+                except Exception:  # pylint: disable=broad-except
+                    logger.debug("Unable to index lineage %s", lineagename, exc_info=True)
+                    index.remove(lineagename)
+            index.save()
+
+
+def _change(config: configuration.NamespaceConfig, lineagename: str,
+            lineage: Optional['storage.RenewableCert']) -> None:
+    global _save_at_exit_registered  # pylint: disable=global-statement
+    path = os.path.join(config.config_dir, constants.LINEAGE_INDEX_FILE)
+    with _index_lock:
+        if not _save_at_exit_registered:
+            util.atexit_register(save_pending)
+            _save_at_exit_registered = True
+        _pending.setdefault(path, (config, {}))[1][lineagename] = lineage
+
+
+def _watched_files(renewal_file: str, paths: Dict[str, str], archive_dir: str) -> List[str]:
+    """Files whose changes invalidate the metadata of a lineage."""
+    files = [renewal_file, archive_dir]
+    for kind in sorted(paths):
+        files.append(paths[kind])
+        try:
+            files.append(filesystem.realpath(paths[kind]))
+        except RuntimeError:
+            # The link is a loop, its own stamp is all there is to compare
+            logger.debug("Unable to resolve %s", paths[kind], exc_info=True)
+    return files
+
+
+def _stamp_files(paths: Iterable[str]) -> Dict[str, _FileStamp]:
+    stamps: Dict[str, _FileStamp] = {}
+    for path in paths:
+        try:
+            stat_result = os.lstat(path)
+        except OSError:
+            stamps[path] = None
+        else:
+            stamps[path] = [stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size]
+    return stamps
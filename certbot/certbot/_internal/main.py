@@ -1502,7 +1502,8 @@ def _csr_get_and_save_cert(config: configuration.NamespaceConfig,
 
 
 def renew_cert(config: configuration.NamespaceConfig, plugins: plugins_disco.PluginsRegistry,
-               lineage: storage.RenewableCert) -> None:
+               lineage: storage.RenewableCert,
+               defer_restart: bool = False) -> Optional[interfaces.Installer]:
     """Renew & save an existing cert. Do not install it.
 
     :param config: Configuration object
@@ -1514,8 +1515,12 @@ def renew_cert(config: configuration.NamespaceConfig, plugins: plugins_disco.Plu
     :param lineage: Certificate lineage object
     :type lineage: storage.RenewableCert
 
-    :returns: `None`
-    :rtype: None
+    :param bool defer_restart: if `True`, the installer is not restarted
+        and is returned to the caller, who becomes responsible for
+        reloading the server
+
+    :returns: the installer which still needs to be restarted, if any
+    :rtype: interfaces.Installer or None
 
     :raises errors.PluginSelectionError: MissingCommandlineFlag if supplied parameters do not pass
 
@@ -1532,8 +1537,11 @@ def renew_cert(config: configuration.NamespaceConfig, plugins: plugins_disco.Plu
     if installer and not config.dry_run:
         # In case of a renewal, reload server to pick up new certificate.
         updater.run_renewal_deployer(config, renewed_lineage, installer)
+        if defer_restart:
+            return installer
         display_util.notify(f"Reloading {config.installer} server after certificate renewal")
         installer.restart()
+    return None
 
 
 def certonly(config: configuration.NamespaceConfig, plugins: plugins_disco.PluginsRegistry) -> None:
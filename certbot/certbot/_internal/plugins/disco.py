@@ -1,6 +1,9 @@
 """Utilities for plugins discovery and selection."""
+import json
 import logging
 import sys
+import threading
+from typing import Any
 from typing import Callable
 from typing import cast
 from typing import Dict
@@ -16,6 +19,7 @@ from certbot import configuration
 from certbot import errors
 from certbot import interfaces
 from certbot._internal import constants
+from certbot.compat import filesystem
 from certbot.compat import os
 from certbot.errors import Error
 
@@ -30,6 +34,17 @@ logger = logging.getLogger(__name__)
 PLUGIN_INTERFACES = [interfaces.Authenticator, interfaces.Installer, interfaces.Plugin]
 """Interfaces that should be listed in `certbot plugins` output"""
 
+PLUGIN_INDEX_ENV_VAR = "CERTBOT_PLUGIN_INDEX"
+"""Environment variable holding the path of the optional on-disk entry point index"""
+
+_PLUGIN_INDEX_VERSION = 1
+
+# Entry points of all plugins, discovered at most once per process.
+_discovered_entry_points: Optional[List[importlib_metadata.EntryPoint]] = None
+# Whether _discovered_entry_points was read from the on-disk index.
+_entry_points_from_index = False
+_discovery_lock = threading.Lock()
+
 
 class PluginEntryPoint:
     """Plugin entry point."""
@@ -181,17 +196,29 @@ class PluginsRegistry(Mapping):
         See https://packaging.python.org/en/latest/specifications/entry-points/ for more info on
         entry points.
 
+        Entry points are only discovered the first time this method is
+        called in a process. Every call still returns a new registry of new
+        `PluginEntryPoint` objects, since those memoize the plugin instances
+        they initialize with a given configuration.
+
         """
+        try:
+            return cls._from_entry_points(_plugin_entry_points())
+        except errors.PluginError:
+            if not _entry_points_from_index:
+                raise
+            # The index may be out of date in a way its fingerprint
+            # couldn't detect, so retry after scanning the installed
+            # distributions.
+            logger.debug("Loading plugins from the entry point index failed, "
+                         "discovering them again", exc_info=True)
+            return cls._from_entry_points(_plugin_entry_points(use_index=False))
+
+    @classmethod
+    def _from_entry_points(cls, entry_points: Iterable[importlib_metadata.EntryPoint]
+                           ) -> 'PluginsRegistry':
         plugins: Dict[str, PluginEntryPoint] = {}
-        plugin_paths_string = os.getenv('CERTBOT_PLUGIN_PATH')
-        plugin_paths = plugin_paths_string.split(':') if plugin_paths_string else []
-        # XXX should ensure this only happens once
-        sys.path.extend(plugin_paths)
-        entry_points = list(importlib_metadata.entry_points(  # pylint: disable=unexpected-keyword-arg
-            group=constants.SETUPTOOLS_PLUGINS_ENTRY_POINT))
-        old_entry_points = list(importlib_metadata.entry_points(  # pylint: disable=unexpected-keyword-arg
-            group=constants.OLD_SETUPTOOLS_PLUGINS_ENTRY_POINT))
-        for entry_point in entry_points + old_entry_points:
+        for entry_point in entry_points:
             try:
                 cls._load_entry_point(entry_point, plugins)
             except Exception as e:
@@ -286,3 +313,127 @@ class PluginsRegistry(Mapping):
         if not self._plugins:
             return "No plugins"
         return "\n\n".join(str(p_ep) for p_ep in self._plugins.values())
+
+
+def _plugin_entry_points(use_index: bool = True) -> List[importlib_metadata.EntryPoint]:
+    """Entry points of all the installed plugins.
+
+    The result is computed once per process. If the environment variable
+    named by `PLUGIN_INDEX_ENV_VAR` is set, the entry points are read from
+    the index file it points to when the installed distributions haven't
+    changed since the index was written, and the index is rewritten
+    otherwise.
+
+    :param bool use_index: whether the on-disk index may be used
+
+    :returns: entry points of the current and old plugins groups
+    :rtype: `list` of `importlib_metadata.EntryPoint`
+
+    """
+    global _discovered_entry_points, _entry_points_from_index  # pylint: disable=global-statement
+    with _discovery_lock:
+        if _discovered_entry_points is not None and (use_index or not _entry_points_from_index):
+            return _discovered_entry_points
+
+        plugin_paths_string = os.getenv('CERTBOT_PLUGIN_PATH')
+        plugin_paths = plugin_paths_string.split(':') if plugin_paths_string else []
+        if _discovered_entry_points is None:
+            sys.path.extend(plugin_paths)
+
+        index_path = os.getenv(PLUGIN_INDEX_ENV_VAR)
+        fingerprint = _distributions_fingerprint()
+        entry_points = None
+        if index_path and use_index:
+            entry_points = _read_entry_point_index(index_path, fingerprint)
+        _entry_points_from_index = entry_points is not None
+        if entry_points is None:
+            entry_points = _scan_entry_points()
+            if index_path:
+                _write_entry_point_index(index_path, fingerprint, entry_points)
+
+        _discovered_entry_points = entry_points
+        return entry_points
+
+
+def _scan_entry_points() -> List[importlib_metadata.EntryPoint]:
+    """Read the plugins entry points from the metadata of every distribution."""
+    entry_points = list(importlib_metadata.entry_points(  # pylint: disable=unexpected-keyword-arg
+        group=constants.SETUPTOOLS_PLUGINS_ENTRY_POINT))
+    old_entry_points = list(importlib_metadata.entry_points(  # pylint: disable=unexpected-keyword-arg
+        group=constants.OLD_SETUPTOOLS_PLUGINS_ENTRY_POINT))
+    return entry_points + old_entry_points
+
+
+def _distributions_fingerprint() -> List[List[Any]]:
+    """Modification times of the directories distributions are installed in.
+
+    Installing, upgrading or removing a distribution adds or removes its
+    metadata directory, which updates the modification time of its parent.
+
+    :returns: pairs of each entry of `sys.path` and its modification time
+    :rtype: `list`
+
+    """
+    fingerprint: List[List[Any]] = []
+    for path in sys.path:
+        try:
+            fingerprint.append([path, os.path.getmtime(path or os.curdir)])
+        except OSError:
+            fingerprint.append([path, None])
+    return fingerprint
+
+
+def _read_entry_point_index(index_path: str, fingerprint: List[List[Any]]
+                            ) -> Optional[List[importlib_metadata.EntryPoint]]:
+    """Load entry points from the index, if it is current.
+
+    :param str index_path: path to the index file
+    :param list fingerprint: current value of :func:`_distributions_fingerprint`
+
+    :returns: the indexed entry points or `None` if the index can't be used
+    :rtype: `list` of `importlib_metadata.EntryPoint` or `None`
+
+    """
+    try:
+        if not filesystem.check_owner(index_path):
+            logger.warning("Ignoring plugin entry point index %s which is not owned by the "
+                           "current user", index_path)
+            return None
+        with open(index_path, "r", encoding="utf-8") as index_file:
+            index = json.load(index_file)
+        if index.get("version") != _PLUGIN_INDEX_VERSION or index.get(
+                "fingerprint") != fingerprint:
+            logger.debug("Plugin entry point index %s is out of date", index_path)
+            return None
+        return [importlib_metadata.EntryPoint(name=entry["name"], value=entry["value"],
+                                              group=entry["group"])
+                for entry in index["entry_points"]]
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as error:
+        logger.debug("Unable to read plugin entry point index %s: %s", index_path, error)
+        return None
+
+
+def _write_entry_point_index(index_path: str, fingerprint: List[List[Any]],
+                             entry_points: Iterable[importlib_metadata.EntryPoint]) -> None:
+    """Atomically replace the index with the given entry points.
+
+    Failing to write the index isn't an error, since it is only used to
+    speed up later runs.
+
+    """
+    index = {
+        "version": _PLUGIN_INDEX_VERSION,
+        "fingerprint": fingerprint,
+        "entry_points": [{"name": entry_point.name, "value": entry_point.value,
+                          "group": entry_point.group} for entry_point in entry_points],
+    }
+    temp_path = index_path + ".tmp"
+    try:
+        with os.fdopen(filesystem.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                                       0o644), "w") as index_file:
+            json.dump(index, index_file)
+        filesystem.replace(temp_path, index_path)
+    except OSError as error:
+        logger.debug("Unable to write plugin entry point index %s: %s", index_path, error)
@@ -1,10 +1,12 @@
 """Functionality for autorenewal and associated juggling of configurations"""
 
+from concurrent import futures
 import copy
 import itertools
 import logging
 import random
 import sys
+import threading
 import time
 import traceback
 from typing import Any
@@ -12,6 +14,7 @@ from typing import Dict
 from typing import Iterable
 from typing import List
 from typing import Mapping
+from typing import NamedTuple
 from typing import Optional
 from typing import Tuple
 from typing import Union
@@ -24,11 +27,15 @@ from cryptography.hazmat.primitives.serialization import load_pem_private_key
 from certbot import configuration
 from certbot import crypto_util
 from certbot import errors
+from certbot import interfaces
+from certbot import ocsp
 from certbot import util
 from certbot._internal import cli
 from certbot._internal import client
 from certbot._internal import constants
 from certbot._internal import hooks
+from certbot._internal import key_pool
+from certbot._internal import lineage_index
 from certbot._internal import storage
 from certbot._internal import updater
 from certbot._internal.display import obj as display_obj
@@ -308,12 +315,19 @@ def _restore_str(name: str, value: str) -> Optional[str]:
     return None if value == "None" else value
 
 
-def should_renew(config: configuration.NamespaceConfig, lineage: storage.RenewableCert) -> bool:
-    """Return true if any of the circumstances for automatic renewal apply."""
+def should_renew(config: configuration.NamespaceConfig, lineage: storage.RenewableCert,
+                 revoked: Optional[bool] = None) -> bool:
+    """Return true if any of the circumstances for automatic renewal apply.
+
+    :param revoked: OCSP status of the lineage's most recent certificate if
+        it was already determined, see :meth:`.RenewableCert.should_autorenew`
+    :type revoked: bool or None
+
+    """
     if config.renew_by_default:
         logger.debug("Auto-renewal forced with --force-renewal...")
         return True
-    if lineage.should_autorenew():
+    if lineage.should_autorenew(revoked=revoked):
         logger.info("Certificate is due for renewal, auto-renewing...")
         return True
     if config.dry_run:
@@ -463,8 +477,473 @@ def _renew_describe_results(config: configuration.NamespaceConfig, renew_success
     notify(display_obj.SIDE_FRAME)
 
 
+class _RenewalResult(NamedTuple):
+    """Outcome of processing a single renewal configuration file."""
+    status: str
+    """One of the ``_SUCCESS``, ``_FAILURE``, ``_SKIPPED`` or ``_PARSE_FAILURE`` constants."""
+    description: str
+    """Entry for the renewal report (a fullchain path, message or renewal file)."""
+    domains: List[str]
+    """Domains of the lineage that were renewed or failed to be renewed."""
+    installer: Optional[interfaces.Installer] = None
+    """Installer whose restart was deferred until the end of the renewal run."""
+    installer_key: Tuple[str, ...] = ()
+    """Installer name and options, identifying the server the installer reloads."""
+    lineage: Optional[storage.RenewableCert] = None
+    """Lineage whose restart was deferred."""
+    previous_version: Optional[int] = None
+    """Version of the certificate deployed by the lineage before it was renewed."""
+
+
+_SUCCESS = "success"
+_FAILURE = "failure"
+_SKIPPED = "skipped"
+_PARSE_FAILURE = "parsefail"
+
+# Authenticators which bind ports or edit shared server configuration. Lineages
+# using them are never renewed at the same time as each other.
+_EXCLUSIVE_AUTHENTICATORS = ("apache", "manual", "nginx", "standalone")
+
+# Position of a lineage in the list of renewal configuration files, its
+# reconstituted configuration and the lineage itself.
+_LoadedLineage = Tuple[int, configuration.NamespaceConfig, storage.RenewableCert]
+
+
+class _RandomDelay:
+    """Sleeps a random amount of time once, before the first renewal is attempted.
+
+    Noninteractive renewals include a random delay in order to spread
+    out the load on the certificate authority servers, even if many
+    users all pick the same time for renewals.  This delay precedes
+    running any hooks, so that side effects of the hooks (such as
+    shutting down a web service) aren't prolonged unnecessarily.
+
+    When lineages are renewed concurrently, every renewal waits for the
+    delay to be over before proceeding.
+
+    """
+    def __init__(self, enabled: bool) -> None:
+        self._enabled = enabled
+        self._lock = threading.Lock()
+
+    def apply(self) -> None:
+        """Sleep if this is the first time a renewal is about to happen."""
+        with self._lock:
+            if self._enabled:
+                sleep_time = random.uniform(1, 60 * 8)
+                logger.info("Non-interactive renewal: random delay of %s seconds",
+                            sleep_time)
+                time.sleep(sleep_time)
+                # We will sleep only once this day, folks.
+                self._enabled = False
+
+
+def _load_lineage(config: configuration.NamespaceConfig, renewal_file: str
+                  ) -> Union[_RenewalResult,
+                             Tuple[configuration.NamespaceConfig, storage.RenewableCert]]:
+    """Reconstitute the lineage defined by renewal_file.
+
+    Problems with the file are logged along with its path, while the
+    "Processing" notification of lineages that could be loaded is left to
+    :func:`_renew_lineage`, next to the output of their renewal.
+
+    :returns: a parse failure result, or the lineage specific configuration
+        and the lineage itself
+    :rtype: `_RenewalResult` or `tuple`
+
+    """
+    lineage_config = copy.deepcopy(config)
+    lineagename = storage.lineagename_for_filename(renewal_file)
+
+    # Note that this modifies config (to add back the configuration
+    # elements from within the renewal configuration file).
+    try:
+        renewal_candidate = reconstitute(lineage_config, renewal_file)
+    except Exception as e:  # pylint: disable=broad-except
+        logger.error("Renewal configuration file %s (cert: %s) "
+                       "produced an unexpected error: %s. Skipping.",
+                       renewal_file, lineagename, e)
+        logger.debug("Traceback was:\n%s", traceback.format_exc())
+        return _RenewalResult(_PARSE_FAILURE, renewal_file, [])
+
+    if not renewal_candidate:
+        return _RenewalResult(_PARSE_FAILURE, renewal_file, [])
+
+    return lineage_config, renewal_candidate
+
+
+def _needs_ocsp_check(lineage_config: configuration.NamespaceConfig,
+                      renewal_candidate: storage.RenewableCert) -> bool:
+    """Whether the renewal decision of a lineage depends on its OCSP status.
+
+    This is the cheap, local stage of the renewal decision: lineages that
+    are forced to renew, that don't autorenew or whose most recent
+    certificate is within its renewal window don't need an OCSP query.
+    Lineages renewed by a dry run are checked like the others, so that
+    :func:`should_renew` doesn't query OCSP for them one at a time.
+
+    """
+    if lineage_config.renew_by_default:
+        return False
+    try:
+        return (renewal_candidate.autorenewal_is_enabled()
+                and not renewal_candidate.within_renewal_window())
+    except Exception:  # pylint: disable=broad-except
+        # Let _renew_lineage report the problem with this lineage
+        logger.debug("Unable to check the renewal window of %s", renewal_candidate.lineagename,
+                     exc_info=True)
+        return False
+
+
+def _new_key_specs(lineages: List[_LoadedLineage],
+                   revocations: Dict[int, bool]) -> List[key_pool.KeySpec]:
+    """Kinds of the private keys generated by renewing the lineages, in order.
+
+    Only lineages known to be due for renewal are included, so lineages
+    that reuse their private key, that aren't due, or whose renewal window
+    couldn't be checked are left out.
+
+    :param dict revocations: OCSP statuses from :func:`_check_revocations`
+
+    """
+    specs = []
+    for index, lineage_config, renewal_candidate in lineages:
+        if lineage_config.reuse_key and not lineage_config.new_key:
+            continue
+        if lineage_config.renew_by_default or lineage_config.dry_run:
+            due = True
+        elif index in revocations:
+            due = revocations[index]
+        else:
+            # Lineages not checked for revocation either don't autorenew, are
+            # within their renewal window, or failed to be checked.
+            try:
+                due = (renewal_candidate.autorenewal_is_enabled()
+                       and renewal_candidate.within_renewal_window())
+            except Exception:  # pylint: disable=broad-except
+                due = False
+        if due:
+            specs.append(key_pool.key_spec(lineage_config))
+    return specs
+
+
+def _check_revocations(config: configuration.NamespaceConfig,
+                       lineages: List[_LoadedLineage]) -> Dict[int, bool]:
+    """Query the OCSP status of the lineages that aren't otherwise due for renewal.
+
+    Responders are queried concurrently with
+    :meth:`certbot.ocsp.RevocationChecker.check_many_by_paths`. If
+    ``--ocsp-check-budget`` is set, the whole stage takes at most that many
+    seconds and certificates whose status isn't known by then are considered
+    not revoked. A budget of 0 skips OCSP checks entirely.
+
+    :param list lineages: the reconstituted lineages
+
+    :returns: whether the most recent certificate of each checked lineage
+        is revoked, keyed by the lineage position
+    :rtype: dict
+
+    """
+    candidates = [(index, renewal_candidate) for index, lineage_config, renewal_candidate
+                  in lineages if _needs_ocsp_check(lineage_config, renewal_candidate)]
+    revoked = {index: False for index, _ in candidates}
+    if not candidates:
+        return revoked
+    if config.ocsp_check_budget == 0:
+        logger.debug("Skipping OCSP checks of %d certificate(s)", len(candidates))
+        return revoked
+
+    # As in RenewableCert.should_autorenew, the most recent certificate is
+    # checked rather than the deployed one.
+    paths = {}
+    for index, renewal_candidate in candidates:
+        version = renewal_candidate.latest_common_version()
+        paths[index] = (renewal_candidate.version("cert", version),
+                        renewal_candidate.version("chain", version))
+    checker = ocsp.RevocationChecker(cache_dir=config.ocsp_cache_dir)
+    statuses = checker.check_many_by_paths(list(paths.values()),
+                                           deadline=config.ocsp_check_budget)
+    for index, cert_paths in paths.items():
+        revoked[index] = statuses[cert_paths]
+    return revoked
+
+
+def _renew_lineage(lineage_config: configuration.NamespaceConfig,
+                   renewal_candidate: storage.RenewableCert,
+                   random_delay: _RandomDelay,
+                   revoked: Optional[bool] = None) -> _RenewalResult:
+    """Renew a reconstituted lineage if it is due and run the updaters.
+
+    :param revoked: OCSP status determined by :func:`_check_revocations`
+    :type revoked: bool or None
+
+    :returns: the outcome of the renewal
+    :rtype: `_RenewalResult`
+
+    """
+    display_util.notification(f"Processing {renewal_candidate.configfile.filename}",
+                              pause=False)
+    try:
+        renewal_candidate.ensure_deployed()
+        from certbot._internal import main
+        plugins = plugins_disco.PluginsRegistry.find_all()
+        if should_renew(lineage_config, renewal_candidate, revoked):
+            previous_version = renewal_candidate.current_version("cert")
+            # Apply random sleep upon first renewal if needed
+            random_delay.apply()
+
+            # domains have been restored into lineage_config by reconstitute
+            # but they're unnecessary anyway because renew_cert here
+            # will just grab them from the certificate
+            # we already know it's time to renew based on should_renew
+            # and we have a lineage in renewal_candidate
+            installer = main.renew_cert(lineage_config, plugins, renewal_candidate,
+                                        defer_restart=lineage_config.coalesce_reloads)
+            result = _RenewalResult(_SUCCESS, renewal_candidate.fullchain,
+                                    renewal_candidate.names())
+            if lineage_config.coalesce_reloads and installer is not None:
+                result = result._replace(installer=installer,
+                                         installer_key=_installer_key(lineage_config),
+                                         lineage=renewal_candidate,
+                                         previous_version=previous_version)
+        else:
+            expiry = crypto_util.notAfter(renewal_candidate.version(
+                "cert", renewal_candidate.latest_common_version()))
+            result = _RenewalResult(_SKIPPED, "%s expires on %s" % (
+                renewal_candidate.fullchain, expiry.strftime("%Y-%m-%d")), [])
+        # Run updater interface methods
+        updater.run_generic_updaters(lineage_config, renewal_candidate,
+                                     plugins)
+        return result
+
+    except Exception as e:  # pylint: disable=broad-except
+        # obtain_cert (presumably) encountered an unanticipated problem.
+        logger.error(
+            "Failed to renew certificate %s with error: %s",
+            renewal_candidate.lineagename, e
+        )
+        logger.debug("Traceback was:\n%s", traceback.format_exc())
+        return _RenewalResult(_FAILURE, renewal_candidate.fullchain, renewal_candidate.names())
+    finally:
+        renewal_candidate.log_snapshot_stats()
+
+
+def _installer_key(lineage_config: configuration.NamespaceConfig) -> Tuple[str, ...]:
+    """Identify the server reloaded by the installer of a lineage.
+
+    Lineages using the same installer with the same installer specific
+    options (such as ``nginx_server_root``) are served by the same server.
+
+    :param configuration.NamespaceConfig lineage_config: reconstituted
+        configuration of the lineage
+
+    :returns: the installer name followed by its options
+    :rtype: `tuple` of `str`
+
+    """
+    prefix = lineage_config.installer.replace("-", "_") + "_"
+    options = sorted(f"{name}={value}" for name, value in lineage_config.to_dict().items()
+                     if name.startswith(prefix))
+    return (lineage_config.installer, *options)
+
+
+def _reload_deferred_installers(results: List[_RenewalResult]) -> List[_RenewalResult]:
+    """Restart each server once for all the lineages whose restart was deferred.
+
+    The configuration is tested and the server restarted using the installer
+    of the last lineage renewed for that server. If this fails, the renewed
+    certificates are deployed and the server reloaded one lineage at a time
+    by :func:`_reload_one_at_a_time`, to find the lineages which prevent the
+    server from reloading.
+
+    :param list results: outcome of every processed lineage
+
+    :returns: the results updated with any reload failure
+    :rtype: `list` of `_RenewalResult`
+
+    """
+    groups: Dict[Tuple[str, ...], List[int]] = {}
+    for index, result in enumerate(results):
+        if result.installer is not None:
+            groups.setdefault(result.installer_key, []).append(index)
+
+    results = list(results)
+    for key, indices in groups.items():
+        display_util.notify(f"Reloading {key[0]} server after renewing "
+                            f"{len(indices)} certificate(s)")
+        if _reload_installer(results[indices[-1]], key[0]):
+            continue
+        for index in _reload_one_at_a_time([results[index] for index in indices], key[0]):
+            results[indices[index]] = results[indices[index]]._replace(status=_FAILURE)
+    return results
+
+
+def _reload_one_at_a_time(results: List[_RenewalResult], server: str) -> List[int]:
+    """Find the lineages whose renewed certificate prevents a server from reloading.
+
+    The certificates deployed before the renewal are restored for all the
+    lineages, then each renewed certificate is deployed again and the server
+    reloaded in turn. Lineages for which the reload fails keep their previous
+    certificate.
+
+    :param list results: outcome of the lineages served by the server
+    :param str server: name of the installer, for messages
+
+    :returns: positions in `results` of the lineages that failed
+    :rtype: `list` of `int`
+
+    """
+    logger.warning("Reloading the %s server failed, deploying the %d renewed "
+                   "certificate(s) one at a time", server, len(results))
+    renewed_versions = [_deploy_version(result, result.previous_version) for result in results]
+
+    if not _reload_installer(results[-1], server):
+        # The previous certificates don't work either, so the renewed ones aren't to blame
+        for result, version in zip(results, renewed_versions):
+            _deploy_version(result, version)
+        return list(range(len(results)))
+
+    failed = []
+    for index, (result, version) in enumerate(zip(results, renewed_versions)):
+        _deploy_version(result, version)
+        if not _reload_installer(result, server):
+            failed.append(index)
+            _deploy_version(result, result.previous_version)
+            _reload_installer(result, server)
+    return failed
+
+
+def _deploy_version(result: _RenewalResult, version: Optional[int]) -> Optional[int]:
+    """Point the links of the lineage of a result to a certificate version.
+
+    :returns: the version the links pointed to before, if known
+    :rtype: int or None
+
+    """
+    if result.lineage is None or version is None:
+        return None
+    try:
+        current = result.lineage.current_version("cert")
+        result.lineage.update_all_links_to(version)
+        return current
+    except Exception as e:  # pylint: disable=broad-except
+        logger.error("Failed to deploy version %d of the certificate %s: %s",
+                     version, result.description, e)
+        logger.debug("Traceback was:\n%s", traceback.format_exc())
+        return None
+
+
+def _reload_installer(result: _RenewalResult, server: str) -> bool:
+    """Test the server configuration and restart it with the installer of a result.
+
+    :returns: whether the server was restarted
+    :rtype: bool
+
+    """
+    installer = result.installer
+    assert installer is not None
+    try:
+        installer.config_test()
+        installer.restart()
+        return True
+    except Exception as e:  # pylint: disable=broad-except
+        logger.error("Failed to reload %s server with the installer of %s: %s",
+                     server, result.description, e)
+        logger.debug("Traceback was:\n%s", traceback.format_exc())
+        return False
+
+
+def _conflict_keys(lineage_config: configuration.NamespaceConfig) -> List[str]:
+    """Resources that a lineage cannot share with lineages renewed concurrently.
+
+    :param configuration.NamespaceConfig lineage_config: reconstituted
+        configuration of the lineage
+
+    :returns: keys identifying the installer, the exclusive authenticator
+        and the domains used by the lineage
+    :rtype: `list` of `str`
+
+    """
+    keys = ["domain:" + domain for domain in lineage_config.domains]
+    if lineage_config.installer:
+        keys.append("installer:" + lineage_config.installer)
+    if lineage_config.authenticator in _EXCLUSIVE_AUTHENTICATORS:
+        keys.append("authenticator:" + lineage_config.authenticator)
+    return keys
+
+
+def _group_conflicting_lineages(lineages: List[_LoadedLineage]) -> List[List[_LoadedLineage]]:
+    """Partition lineages so that conflicting lineages end up in the same group.
+
+    Two lineages conflict when they share any of their :func:`_conflict_keys`,
+    and conflicts are transitive. Lineages within a group keep their
+    original relative order.
+
+    :returns: the groups of lineages
+    :rtype: `list` of `list`
+
+    """
+    parents = list(range(len(lineages)))
+
+    def find(index: int) -> int:
+        while parents[index] != index:
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        return index
+
+    owners: Dict[str, int] = {}
+    for index, (_, lineage_config, _) in enumerate(lineages):
+        for key in _conflict_keys(lineage_config):
+            if key in owners:
+                parents[find(index)] = find(owners[key])
+            else:
+                owners[key] = index
+
+    groups: Dict[int, List[_LoadedLineage]] = {}
+    for index, lineage in enumerate(lineages):
+        groups.setdefault(find(index), []).append(lineage)
+    return list(groups.values())
+
+
+def _renew_lineages_concurrently(config: configuration.NamespaceConfig,
+                                 lineages: List[_LoadedLineage],
+                                 revocations: Dict[int, bool],
+                                 random_delay: _RandomDelay) -> Dict[int, _RenewalResult]:
+    """Renew lineages on a bounded pool of threads.
+
+    Lineages conflicting with each other are grouped together and each
+    group is renewed serially by a single worker.
+
+    :returns: results keyed by the lineage position
+    :rtype: dict
+
+    """
+    results: Dict[int, _RenewalResult] = {}
+    groups = _group_conflicting_lineages(lineages)
+    logger.debug("Renewing %d lineage(s) in %d independent group(s) with up to %d workers",
+                 len(lineages), len(groups), config.renew_concurrency)
+
+    def renew_group(group: List[_LoadedLineage]) -> None:
+        for index, lineage_config, renewal_candidate in group:
+            results[index] = _renew_lineage(lineage_config, renewal_candidate, random_delay,
+                                            revocations.get(index))
+
+    with futures.ThreadPoolExecutor(max_workers=config.renew_concurrency,
+                                    thread_name_prefix="renew") as executor:
+        for future in [executor.submit(renew_group, group) for group in groups]:
+            future.result()
+
+    return results
+
+
 def handle_renewal_request(config: configuration.NamespaceConfig) -> Tuple[list, list]:
-    """Examine each lineage; renew if due and report results"""
+    """Examine each lineage; renew if due and report results
+
+    Every lineage is reconstituted first. The renewal decision then runs in
+    stages: local checks of each lineage's expiry date, followed by a
+    single concurrent OCSP stage for the lineages that aren't due yet.
+
+    """
 
     # This is trivially False if config.domains is empty
     if any(domain not in config.webroot_map for domain in config.domains):
@@ -483,82 +962,44 @@ def handle_renewal_request(config: configuration.NamespaceConfig) -> Tuple[list,
     else:
         conf_files = storage.renewal_conf_files(config)
 
-    renew_successes = []
-    renew_failures = []
-    renew_skipped = []
-    parse_failures = []
-
-    renewed_domains = []
-    failed_domains = []
-
-    # Noninteractive renewals include a random delay in order to spread
-    # out the load on the certificate authority servers, even if many
-    # users all pick the same time for renewals.  This delay precedes
-    # running any hooks, so that side effects of the hooks (such as
-    # shutting down a web service) aren't prolonged unnecessarily.
-    apply_random_sleep = not sys.stdin.isatty() and config.random_sleep_on_renew
-
-    for renewal_file in conf_files:
-        display_util.notification("Processing " + renewal_file, pause=False)
-        lineage_config = copy.deepcopy(config)
-        lineagename = storage.lineagename_for_filename(renewal_file)
-
-        # Note that this modifies config (to add back the configuration
-        # elements from within the renewal configuration file).
-        try:
-            renewal_candidate = reconstitute(lineage_config, renewal_file)
-        except Exception as e:  # pylint: disable=broad-except
-            logger.error("Renewal configuration file %s (cert: %s) "
-                           "produced an unexpected error: %s. Skipping.",
-                           renewal_file, lineagename, e)
-            logger.debug("Traceback was:\n%s", traceback.format_exc())
-            parse_failures.append(renewal_file)
-            continue
-
-        try:
-            if not renewal_candidate:
-                parse_failures.append(renewal_file)
-            else:
-                renewal_candidate.ensure_deployed()
-                from certbot._internal import main
-                plugins = plugins_disco.PluginsRegistry.find_all()
-                if should_renew(lineage_config, renewal_candidate):
-                    # Apply random sleep upon first renewal if needed
-                    if apply_random_sleep:
-                        sleep_time = random.uniform(1, 60 * 8)
-                        logger.info("Non-interactive renewal: random delay of %s seconds",
-                                    sleep_time)
-                        time.sleep(sleep_time)
-                        # We will sleep only once this day, folks.
-                        apply_random_sleep = False
-
-                    # domains have been restored into lineage_config by reconstitute
-                    # but they're unnecessary anyway because renew_cert here
-                    # will just grab them from the certificate
-                    # we already know it's time to renew based on should_renew
-                    # and we have a lineage in renewal_candidate
-                    main.renew_cert(lineage_config, plugins, renewal_candidate)
-                    renew_successes.append(renewal_candidate.fullchain)
-                    renewed_domains.extend(renewal_candidate.names())
-                else:
-                    expiry = crypto_util.notAfter(renewal_candidate.version(
-                        "cert", renewal_candidate.latest_common_version()))
-                    renew_skipped.append("%s expires on %s" % (renewal_candidate.fullchain,
-                                         expiry.strftime("%Y-%m-%d")))
-                # Run updater interface methods
-                updater.run_generic_updaters(lineage_config, renewal_candidate,
-                                             plugins)
-
-        except Exception as e:  # pylint: disable=broad-except
-            # obtain_cert (presumably) encountered an unanticipated problem.
-            logger.error(
-                "Failed to renew certificate %s with error: %s",
-                lineagename, e
-            )
-            logger.debug("Traceback was:\n%s", traceback.format_exc())
-            if renewal_candidate:
-                renew_failures.append(renewal_candidate.fullchain)
-                failed_domains.extend(renewal_candidate.names())
+    random_delay = _RandomDelay(not sys.stdin.isatty() and config.random_sleep_on_renew)
+
+    results_by_index: Dict[int, _RenewalResult] = {}
+    lineages: List[_LoadedLineage] = []
+    for index, renewal_file in enumerate(conf_files):
+        loaded = _load_lineage(config, renewal_file)
+        if isinstance(loaded, _RenewalResult):
+            results_by_index[index] = loaded
+        else:
+            lineages.append((index, loaded[0], loaded[1]))
+
+    revocations = _check_revocations(config, lineages)
+
+    # Lineages of the same account and server reuse one ACME client
+    with client.shared_acme_clients(), \
+            key_pool.pregenerated_keys(config.pregenerate_keys) as keys:
+        if keys is not None:
+            keys.schedule(_new_key_specs(lineages, revocations))
+        if config.renew_concurrency > 1 and len(lineages) > 1:
+            results_by_index.update(
+                _renew_lineages_concurrently(config, lineages, revocations, random_delay))
+        else:
+            for index, lineage_config, renewal_candidate in lineages:
+                results_by_index[index] = _renew_lineage(lineage_config, renewal_candidate,
+                                                         random_delay, revocations.get(index))
+    # Index the renewed lineages with a single write of the lineage index
+    lineage_index.save_pending()
+    results = [results_by_index[index] for index in sorted(results_by_index)]
+
+    results = _reload_deferred_installers(results)
+
+    renew_successes = [r.description for r in results if r.status == _SUCCESS]
+    renew_failures = [r.description for r in results if r.status == _FAILURE]
+    renew_skipped = [r.description for r in results if r.status == _SKIPPED]
+    parse_failures = [r.description for r in results if r.status == _PARSE_FAILURE]
+
+    renewed_domains = [d for r in results if r.status == _SUCCESS for d in r.domains]
+    failed_domains = [d for r in results if r.status == _FAILURE for d in r.domains]
 
     # Describe all the results
     _renew_describe_results(config, renew_successes, renew_failures,
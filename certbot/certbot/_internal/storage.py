@@ -33,6 +33,7 @@ from certbot import ocsp
 from certbot import util
 from certbot._internal import constants
 from certbot._internal import error_handler
+from certbot._internal import lineage_index
 from certbot._internal.plugins import disco as plugins_disco
 from certbot.compat import filesystem
 from certbot.compat import os
@@ -42,6 +43,8 @@ from certbot.util import parse_loose_version
 logger = logging.getLogger(__name__)
 
 ALL_FOUR = ("cert", "privkey", "chain", "fullchain")
+# File names of the archived versions of each kind of item
+_VERSION_PATTERNS = {kind: re.compile(r"^{0}([0-9]+)\.pem$".format(kind)) for kind in ALL_FOUR}
 README = "README"
 CURRENT_VERSION = parse_loose_version(certbot.__version__)
 BASE_PRIVKEY_MODE = 0o600
@@ -192,6 +195,7 @@ def rename_renewal_config(prev_name: str, new_name: str,
     except OSError:
         raise errors.ConfigurationError("Please specify a valid filename "
             "for the new certificate name.")
+    lineage_index.forget(cli_config, prev_name)
 
 
 def update_configuration(lineagename: str, archive_dir: str, target: Mapping[str, str],
@@ -419,6 +423,8 @@ def delete_files(config: configuration.NamespaceConfig, certname: str) -> None:
     except OSError:
         logger.debug("Unable to remove %s", archive_path)
 
+    lineage_index.forget(config, certname)
+
 
 class RenewableCert(interfaces.RenewableCert):
     """Renewable certificate.
@@ -503,6 +509,15 @@ class RenewableCert(interfaces.RenewableCert):
         self.fullchain = self.configuration["fullchain"]
         self.live_dir = os.path.dirname(self.cert)
 
+        # Snapshot of the link targets and archived versions of the lineage,
+        # filled on first use and discarded by _invalidate_snapshot whenever
+        # this object changes the links or the archive directory.
+        self._targets: Dict[str, Optional[str]] = {}
+        self._current_versions: Dict[str, Optional[int]] = {}
+        self._available_versions: Dict[str, List[int]] = {}
+        self._latest_common_version: Optional[int] = None
+        self.snapshot_stats = {"hits": 0, "reads": 0}
+
         self._fix_symlinks()
         self._check_symlinks()
 
@@ -634,8 +649,7 @@ class RenewableCert(interfaces.RenewableCert):
 
             # The link must point to a file that follows the archive
             # naming convention
-            pattern = re.compile(r"^{0}([0-9]+)\.pem$".format(kind))
-            if not pattern.match(os.path.basename(target)):
+            if not _VERSION_PATTERNS[kind].match(os.path.basename(target)):
                 logger.debug("%s does not follow the archive naming "
                              "convention.", target)
                 return False
@@ -666,6 +680,27 @@ class RenewableCert(interfaces.RenewableCert):
         #       we can update the symlinks to.  (Maybe involve
         #       parsing keys and certs to see if they exist and
         #       if a key corresponds to the subject key of a cert?)
+        self._invalidate_snapshot()
+
+    def _invalidate_snapshot(self) -> None:
+        """Discard the cached link targets and archived versions.
+
+        Must be called after this object changes the live symlinks or the
+        contents of the archive directory.
+
+        """
+        if self._targets or self._available_versions:
+            self.log_snapshot_stats()
+        self._targets.clear()
+        self._current_versions.clear()
+        self._available_versions.clear()
+        self._latest_common_version = None
+
+    def log_snapshot_stats(self) -> None:
+        """Log how many link and archive lookups the snapshot answered."""
+        logger.debug("Link snapshot of %s: %d lookups answered from the snapshot, "
+                     "%d from the filesystem.", self.lineagename,
+                     self.snapshot_stats["hits"], self.snapshot_stats["reads"])
 
     # TODO: In general, the symlink-reading functions below are not
     #       cautious enough about the possibility that links or their
@@ -706,6 +741,7 @@ class RenewableCert(interfaces.RenewableCert):
         for _, link in previous_symlinks:
             if os.path.exists(link):
                 os.unlink(link)
+        self._invalidate_snapshot()
 
     def current_target(self, kind: str) -> Optional[str]:
         """Returns full path to which the specified item currently points.
@@ -720,12 +756,19 @@ class RenewableCert(interfaces.RenewableCert):
         """
         if kind not in ALL_FOUR:
             raise errors.CertStorageError("unknown kind of item")
+        if kind in self._targets:
+            self.snapshot_stats["hits"] += 1
+            return self._targets[kind]
+        self.snapshot_stats["reads"] += 1
         link = getattr(self, kind)
+        target: Optional[str] = None
         if not os.path.exists(link):
             logger.debug("Expected symlink %s for %s does not exist.",
                          link, kind)
-            return None
-        return get_link_target(link)
+        else:
+            target = get_link_target(link)
+        self._targets[kind] = target
+        return target
 
     def current_version(self, kind: str) -> Optional[int]:
         """Returns numerical version of the specified item.
@@ -742,17 +785,21 @@ class RenewableCert(interfaces.RenewableCert):
         """
         if kind not in ALL_FOUR:
             raise errors.CertStorageError("unknown kind of item")
-        pattern = re.compile(r"^{0}([0-9]+)\.pem$".format(kind))
+        if kind in self._current_versions:
+            self.snapshot_stats["hits"] += 1
+            return self._current_versions[kind]
         target = self.current_target(kind)
+        self.snapshot_stats["reads"] += 1
         if target is None or not os.path.exists(target):
             logger.debug("Current-version target for %s "
                          "does not exist at %s.", kind, target)
             target = ""
-        matches = pattern.match(os.path.basename(target))
-        if matches:
-            return int(matches.groups()[0])
-        logger.debug("No matches for target %s.", kind)
-        return None
+        matches = _VERSION_PATTERNS[kind].match(os.path.basename(target))
+        version = int(matches.groups()[0]) if matches else None
+        if version is None:
+            logger.debug("No matches for target %s.", kind)
+        self._current_versions[kind] = version
+        return version
 
     def version(self, kind: str, version: int) -> str:
         """The filename that corresponds to the specified version and kind.
@@ -792,14 +839,19 @@ class RenewableCert(interfaces.RenewableCert):
         """
         if kind not in ALL_FOUR:
             raise errors.CertStorageError("unknown kind of item")
+        if kind in self._available_versions:
+            self.snapshot_stats["hits"] += 1
+            return list(self._available_versions[kind])
         link = self.current_target(kind)
         if not link:
             raise errors.Error(f"Target {kind} does not exist!")
         where = os.path.dirname(link)
+        self.snapshot_stats["reads"] += 1
         files = os.listdir(where)
-        pattern = re.compile(r"^{0}([0-9]+)\.pem$".format(kind))
-        matches = [pattern.match(f) for f in files]
-        return sorted([int(m.groups()[0]) for m in matches if m])
+        matches = [_VERSION_PATTERNS[kind].match(f) for f in files]
+        versions = sorted([int(m.groups()[0]) for m in matches if m])
+        self._available_versions[kind] = versions
+        return list(versions)
 
     def newest_available_version(self, kind: str) -> int:
         """Newest available version of the specified kind of item?
@@ -825,8 +877,13 @@ class RenewableCert(interfaces.RenewableCert):
         #       (it should probably return None instead)
         # TODO: this can raise a spurious AttributeError if the current
         #       link for any kind is missing (it should probably return None)
-        versions = [self.available_versions(x) for x in ALL_FOUR]
-        return max(n for n in versions[0] if all(n in v for v in versions[1:]))
+        if self._latest_common_version is None:
+            versions = [self.available_versions(x) for x in ALL_FOUR]
+            self._latest_common_version = max(
+                n for n in versions[0] if all(n in v for v in versions[1:]))
+        else:
+            self.snapshot_stats["hits"] += 1
+        return self._latest_common_version
 
     def next_free_version(self) -> int:
         """Smallest version newer than all full or partial versions?
@@ -902,6 +959,7 @@ class RenewableCert(interfaces.RenewableCert):
         #       for the other corresponding items
         os.unlink(link)
         os.symlink(os.path.join(target_directory, filename), link)
+        self._invalidate_snapshot()
 
     def update_all_links_to(self, version: int) -> None:
         """Change all member objects to point to the specified version.
@@ -922,6 +980,8 @@ class RenewableCert(interfaces.RenewableCert):
 
             for _, link in previous_links:
                 os.unlink(link)
+        self._invalidate_snapshot()
+        lineage_index.record(self.cli_config, self)
 
     def names(self) -> List[str]:
         """What are the subject names of this certificate?
@@ -956,8 +1016,8 @@ class RenewableCert(interfaces.RenewableCert):
         # determine the OCSP status, let's ensure we don't crash Certbot by
         # catching all exceptions here.
         try:
-            return ocsp.RevocationChecker().ocsp_revoked_by_paths(cert_path,
-                                                                  chain_path)
+            checker = ocsp.RevocationChecker(cache_dir=self.cli_config.ocsp_cache_dir)
+            return checker.ocsp_revoked_by_paths(cert_path, chain_path)
         except Exception as e:  # pylint: disable=broad-except
             logger.warning(
                 "An error occurred determining the OCSP status of %s.",
@@ -977,17 +1037,47 @@ class RenewableCert(interfaces.RenewableCert):
         return ("autorenew" not in self.configuration["renewalparams"] or
                 self.configuration["renewalparams"].as_bool("autorenew"))
 
-    def should_autorenew(self) -> bool:
+    def within_renewal_window(self) -> bool:
+        """Has the period before expiry in which to renew been reached?
+
+        This only looks at the numerically most recent cert version on
+        disk and never contacts the network.
+
+        :returns: whether the most current cert version expires within
+            ``renew_before_expiry`` from now
+        :rtype: bool
+
+        """
+        default_interval = constants.RENEWER_DEFAULTS["renew_before_expiry"]
+        interval = self.configuration.get("renew_before_expiry", default_interval)
+        expiry = crypto_util.notAfter(self.version(
+            "cert", self.latest_common_version()))
+        now = datetime.datetime.now(pytz.UTC)
+        if expiry < add_time_interval(now, interval):
+            logger.debug("Should renew, less than %s before certificate "
+                         "expiry %s.", interval,
+                         expiry.strftime("%Y-%m-%d %H:%M:%S %Z"))
+            return True
+        return False
+
+    def should_autorenew(self, revoked: Optional[bool] = None) -> bool:
         """Should we now try to autorenew the most recent cert version?
 
         This is a policy question and does not only depend on whether
         the cert is expired. (This considers whether autorenewal is
-        enabled, whether the cert is revoked, and whether the time
-        interval for autorenewal has been reached.)
+        enabled, whether the time interval for autorenewal has been
+        reached, and whether the cert is revoked.)
+
+        The expiry window is checked first since it is local and cheap,
+        so the OCSP responder is only queried for certs not yet due.
 
         Note that this examines the numerically most recent cert version,
         not the currently deployed version.
 
+        :param revoked: OCSP status of the most current cert version if it
+            is already known, in which case OCSP isn't queried again
+        :type revoked: bool or None
+
         :returns: whether an attempt should now be made to autorenew the
             most current cert version in this lineage
         :rtype: bool
@@ -996,21 +1086,15 @@ class RenewableCert(interfaces.RenewableCert):
         if self.autorenewal_is_enabled():
             # Consider whether to attempt to autorenew this cert now
 
-            # Renewals on the basis of revocation
-            if self.ocsp_revoked(self.latest_common_version()):
-                logger.debug("Should renew, certificate is revoked.")
+            # Renews some period before expiry time
+            if self.within_renewal_window():
                 return True
 
-            # Renews some period before expiry time
-            default_interval = constants.RENEWER_DEFAULTS["renew_before_expiry"]
-            interval = self.configuration.get("renew_before_expiry", default_interval)
-            expiry = crypto_util.notAfter(self.version(
-                "cert", self.latest_common_version()))
-            now = datetime.datetime.now(pytz.UTC)
-            if expiry < add_time_interval(now, interval):
-                logger.debug("Should renew, less than %s before certificate "
-                             "expiry %s.", interval,
-                             expiry.strftime("%Y-%m-%d %H:%M:%S %Z"))
+            # Renewals on the basis of revocation
+            if revoked is None:
+                revoked = self.ocsp_revoked(self.latest_common_version())
+            if revoked:
+                logger.debug("Should renew, certificate is revoked.")
                 return True
         return False
 
@@ -1108,7 +1192,9 @@ class RenewableCert(interfaces.RenewableCert):
 
         new_config = write_renewal_config(config_filename, config_filename, archive,
             target, values)
-        return cls(new_config.filename, cli_config)
+        lineage = cls(new_config.filename, cli_config)
+        lineage_index.record(cli_config, lineage)
+        return lineage
 
     def _private_key(self) -> Union[RSAPrivateKey, EllipticCurvePrivateKey]:
         with open(self.configuration["privkey"], "rb") as priv_key_file:
@@ -1222,12 +1308,14 @@ class RenewableCert(interfaces.RenewableCert):
         with open(target["fullchain"], "wb") as f:
             logger.debug("Writing full chain to %s.", target["fullchain"])
             f.write(new_cert + new_chain)
+        self._invalidate_snapshot()
 
         symlinks = {kind: self.configuration[kind] for kind in ALL_FOUR}
         # Update renewal config file
         self.configfile = update_configuration(
             self.lineagename, self.archive_dir, symlinks, cli_config)
         self.configuration = config_with_defaults(self.configfile)
+        lineage_index.record(cli_config, self)
 
         return target_version
 
@@ -1272,3 +1360,4 @@ class RenewableCert(interfaces.RenewableCert):
                         os.unlink(item_path)
                 except OSError:
                     logger.debug("Failed to clean up %s", item_path, exc_info=True)
+        self._invalidate_snapshot()
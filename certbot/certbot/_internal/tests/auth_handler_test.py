@@ -2,6 +2,7 @@
 import datetime
 import logging
 import sys
+import threading
 import unittest
 from unittest import mock
 
@@ -14,6 +15,7 @@ from acme import errors as acme_errors
 from acme import messages
 from certbot import achallenges
 from certbot import errors
+from certbot import interfaces
 from certbot._internal.display import obj as display_obj
 from certbot.plugins import common as plugin_common
 from certbot.tests import acme_util
@@ -65,7 +67,7 @@ class HandleAuthorizationsTest(unittest.TestCase):
         from certbot._internal.auth_handler import AuthHandler
 
         self.mock_display = mock.Mock()
-        self.mock_config = mock.Mock(debug_challenges=False)
+        self.mock_config = mock.Mock(debug_challenges=False, answer_challenges_early=False)
         display_obj.set_display(self.mock_display)
 
         self.mock_auth = mock.MagicMock(name="Authenticator")
@@ -97,12 +99,13 @@ class HandleAuthorizationsTest(unittest.TestCase):
             assert self.mock_net.answer_challenge.call_count == 1
 
             assert self.mock_net.poll.call_count == 2  # Because there is one retry
-            assert mock_time.sleep.call_count == 2
+            # The first poll is made right away
+            assert mock_time.sleep.call_count == 1
             # Retry-After header is 30 seconds, but at the time sleep is invoked, several
             # instructions are executed, and next pool is in less than 30 seconds.
-            assert mock_time.sleep.call_args_list[1][0][0] <= 30
+            assert mock_time.sleep.call_args_list[0][0][0] <= 30
             # However, assert that we did not took the default value of 3 seconds.
-            assert mock_time.sleep.call_args_list[1][0][0] > 3
+            assert mock_time.sleep.call_args_list[0][0][0] > 3
 
             assert self.mock_auth.cleanup.call_count == 1
             # Test if list first element is http-01, use typ because it is an achall
@@ -252,10 +255,34 @@ class HandleAuthorizationsTest(unittest.TestCase):
                 # should be truncated and the polling should be aborted.
                 self.handler.handle_authorizations(mock_order, self.mock_config, False)
 
-        assert mock_sleep.call_count == 3 # 1s, 20m and 10m sleep
-        assert mock_sleep.call_args_list[0][0][0] == 1
-        assert abs(mock_sleep.call_args_list[1][0][0] - (interval - 1)) <= 1
-        assert abs(mock_sleep.call_args_list[2][0][0] - (interval/2 - 1)) <= 1
+        assert mock_sleep.call_count == 2 # 20m and 10m sleep
+        assert abs(mock_sleep.call_args_list[0][0][0] - interval) <= 1
+        assert abs(mock_sleep.call_args_list[1][0][0] - interval/2) <= 1
+
+    @mock.patch('certbot._internal.auth_handler.time.sleep')
+    def test_polling_strategy(self, mock_sleep):
+        from certbot._internal.auth_handler import AuthHandler
+        polling = acme_client.PollingStrategy(initial_delay=2, backoff=3, jitter=0,
+                                              immediate_first_poll=True)
+        self.handler = AuthHandler(self.mock_auth, self.mock_net, self.mock_account, [],
+                                   polling=polling)
+        authzrs = [gen_dom_authzr(domain="0", challs=acme_util.CHALLENGES)]
+        mock_order = mock.MagicMock(authorizations=authzrs, uri='https://example.com/order')
+
+        poll = _gen_mock_on_poll(retry=2)
+
+        def poll_without_retry_after(authzr):
+            updated_authzr, response = poll(authzr)
+            del response.headers['Retry-After']
+            return updated_authzr, response
+        self.mock_net.poll.side_effect = poll_without_retry_after
+
+        self.handler.handle_authorizations(mock_order, self.mock_config)
+
+        assert [call[0][0] for call in mock_sleep.call_args_list] == [2, 6]
+        stats = polling.stats['https://example.com/order']['authorizations']
+        assert (stats.polls, stats.waited, stats.retry_after) == (3, 8, 0)
+        assert stats.elapsed is not None
 
     def test_no_domains(self):
         mock_order = mock.MagicMock(authorizations=[])
@@ -312,6 +339,130 @@ class HandleAuthorizationsTest(unittest.TestCase):
         assert self.mock_auth.cleanup.call_count == 1
         assert self.mock_auth.cleanup.call_args[0][0][0].typ == "http-01"
 
+    def test_answers_sent_concurrently(self):
+        authzrs = [gen_dom_authzr(domain=str(i), challs=acme_util.CHALLENGES)
+                   for i in range(3)]
+        mock_order = mock.MagicMock(authorizations=authzrs)
+        barrier = threading.Barrier(3, timeout=5)
+        self.mock_net.answer_challenge.side_effect = lambda challb, resp: barrier.wait()
+        self.mock_net.poll.side_effect = _gen_mock_on_poll()
+
+        self.handler.handle_authorizations(mock_order, self.mock_config)
+
+        assert self.mock_net.answer_challenge.call_count == 3
+        assert self.mock_auth.perform.call_count == 1
+
+    def test_answer_error_after_all_answers(self):
+        authzrs = [gen_dom_authzr(domain=str(i), challs=acme_util.CHALLENGES)
+                   for i in range(3)]
+        mock_order = mock.MagicMock(authorizations=authzrs)
+        self.mock_net.answer_challenge.side_effect = [
+            None, acme_errors.Error('failed'), None]
+
+        with pytest.raises(acme_errors.Error, match='failed'):
+            self.handler.handle_authorizations(mock_order, self.mock_config)
+        assert self.mock_net.answer_challenge.call_count == 3
+        assert self.mock_auth.cleanup.call_count == 1
+
+    def test_answer_challenges_early_not_streaming(self):
+        authzrs = [gen_dom_authzr(domain=str(i), challs=acme_util.CHALLENGES)
+                   for i in range(3)]
+        mock_order = mock.MagicMock(authorizations=authzrs)
+        self.mock_net.poll.side_effect = _gen_mock_on_poll()
+        self.mock_config.answer_challenges_early = True
+
+        with mock.patch('certbot._internal.auth_handler.logger') as mock_logger:
+            self.handler.handle_authorizations(mock_order, self.mock_config)
+
+        # The flag is ignored, all challenges are performed together
+        assert self.mock_auth.perform.call_count == 1
+        assert len(self.mock_auth.perform.call_args[0][0]) == 3
+        assert self.mock_net.answer_challenge.call_count == 3
+        assert 'ignoring --answer-challenges-early' in mock_logger.warning.call_args[0][0]
+
+    def test_streaming_authenticator(self):
+        authzrs = [gen_dom_authzr(domain=str(i), challs=acme_util.CHALLENGES)
+                   for i in range(3)]
+        mock_order = mock.MagicMock(authorizations=authzrs)
+        answered = threading.Event()
+        self.mock_net.answer_challenge.side_effect = lambda challb, resp: answered.set()
+        auth = _StreamingAuthenticator(wait_for=answered)
+        self.handler.auth = auth
+        self.mock_net.poll.side_effect = _gen_mock_on_poll()
+        self.mock_config.answer_challenges_early = True
+
+        self.handler.handle_authorizations(mock_order, self.mock_config)
+
+        assert auth.performed == ['2', '1', '0']
+        self.mock_auth.perform.assert_not_called()
+        assert self.mock_net.answer_challenge.call_count == 3
+        assert sorted(call[0][1] for call in self.mock_net.answer_challenge.call_args_list) == [
+            'HTTP01Response0', 'HTTP01Response1', 'HTTP01Response2']
+        assert auth.cleaned_up == 3
+
+    def test_streaming_authenticator_answered_together(self):
+        authzrs = [gen_dom_authzr(domain=str(i), challs=acme_util.CHALLENGES)
+                   for i in range(3)]
+        mock_order = mock.MagicMock(authorizations=authzrs)
+        auth = _StreamingAuthenticator()
+        self.handler.auth = auth
+
+        def answer_challenge(challb, resp):
+            # All challenges are ready before the first one is answered
+            assert len(auth.performed) == 3
+        self.mock_net.answer_challenge.side_effect = answer_challenge
+        self.mock_net.poll.side_effect = _gen_mock_on_poll()
+
+        self.handler.handle_authorizations(mock_order, self.mock_config)
+        assert self.mock_net.answer_challenge.call_count == 3
+
+        # Challenges are also performed together when debugging them
+        auth.performed = []
+        self.mock_config.answer_challenges_early = True
+        self.mock_config.debug_challenges = True
+        self.mock_config.verbose_count = 0
+        with test_util.patch_display_util():
+            self.handler.handle_authorizations(mock_order, self.mock_config)
+        assert self.mock_net.answer_challenge.call_count == 6
+
+    def test_streaming_authenticator_perform(self):
+        from certbot import interfaces
+        achalls = [mock.MagicMock(domain=str(i)) for i in range(3)]
+        assert _StreamingAuthenticator().perform(achalls) == [
+            'HTTP01Response0', 'HTTP01Response1', 'HTTP01Response2']
+
+        class Incomplete(_StreamingAuthenticator):
+            """Authenticator forgetting a challenge."""
+            def perform_iter(self, achalls):
+                return super().perform_iter(achalls[1:])
+        with pytest.raises(errors.PluginError):
+            Incomplete().perform(achalls)
+
+        class Overridden(_StreamingAuthenticator):
+            """Authenticator overriding perform."""
+            def perform(self, achalls):
+                return gen_auth_resp(achalls)
+        self.handler.auth = Overridden()
+        authzrs = [gen_dom_authzr(domain="0", challs=acme_util.CHALLENGES)]
+        self.mock_net.poll.side_effect = _gen_mock_on_poll()
+        self.handler.handle_authorizations(mock.MagicMock(authorizations=authzrs),
+                                           self.mock_config)
+        assert self.handler.auth.performed == []
+        assert isinstance(self.handler.auth, interfaces.StreamingAuthenticator)
+
+    def test_streaming_authenticator_error(self):
+        auth = _StreamingAuthenticator(fail_after=1)
+        self.handler.auth = auth
+        self.mock_config.answer_challenges_early = True
+        authzrs = [gen_dom_authzr(domain=str(i), challs=acme_util.CHALLENGES)
+                   for i in range(2)]
+        with pytest.raises(errors.AuthorizationError):
+            self.handler.handle_authorizations(mock.MagicMock(authorizations=authzrs),
+                                               self.mock_config)
+        # The challenge that was ready was answered, and all were cleaned up
+        assert self.mock_net.answer_challenge.call_count == 1
+        assert auth.cleaned_up == 2
+
     def test_incomplete_authzr_error(self):
         authzrs = [gen_dom_authzr(domain="0", challs=acme_util.CHALLENGES)]
         mock_order = mock.MagicMock(authorizations=authzrs)
@@ -323,6 +474,31 @@ class HandleAuthorizationsTest(unittest.TestCase):
         assert self.mock_auth.cleanup.call_count == 1
         assert self.mock_auth.cleanup.call_args[0][0][0].typ == "http-01"
 
+    @mock.patch('certbot._internal.auth_handler.dns_common.forget_zones')
+    def test_failed_dns01_zones_forgotten(self, mock_forget):
+        self.mock_auth.get_chall_pref.return_value = [challenges.DNS01]
+
+        def _mock_poll(authzr):
+            domain = authzr.body.identifier.value
+            if domain == 'valid.com':
+                return _gen_mock_on_poll(messages.STATUS_VALID)(authzr)
+            challb = messages.ChallengeBody(
+                chall=acme_util.DNS01, uri='uri', status=messages.STATUS_INVALID,
+                error=messages.Error.with_code('unauthorized', detail='detail'))
+            body = authzr.body.update(status=messages.STATUS_INVALID, challenges=(challb,))
+            return messages.AuthorizationResource(body=body, uri=authzr.uri), mock.MagicMock()
+
+        authzrs = [gen_dom_authzr(domain='valid.com', challs=[acme_util.DNS01]),
+                   gen_dom_authzr(domain='invalid.com', challs=[acme_util.DNS01])]
+        self.mock_net.poll.side_effect = _mock_poll
+
+        with test_util.patch_display_util():
+            with pytest.raises(errors.AuthorizationError, match='Some challenges have failed.'):
+                self.handler.handle_authorizations(mock.MagicMock(authorizations=authzrs),
+                                                   self.mock_config)
+        mock_forget.assert_called_once_with(
+            self.mock_config, ['invalid.com', '_acme-challenge.invalid.com'])
+
     def test_best_effort(self):
         def _conditional_mock_on_poll(authzr):
             """This mock will invalidate one authzr, and invalidate the other one"""
@@ -410,6 +586,44 @@ class HandleAuthorizationsTest(unittest.TestCase):
         assert failed[0].body.status == messages.STATUS_VALID
 
 
+class _StreamingAuthenticator(interfaces.StreamingAuthenticator):
+    """Authenticator performing challenges in reverse order, one at a time."""
+    # pylint: disable=missing-function-docstring
+
+    def __init__(self, fail_after=None, wait_for=None):  # pylint: disable=super-init-not-called
+        self.fail_after = fail_after
+        self.wait_for = wait_for
+        self.performed = []
+        self.cleaned_up = 0
+
+    def prepare(self):
+        pass  # pragma: no cover
+
+    def more_info(self):
+        return ''  # pragma: no cover
+
+    @classmethod
+    def inject_parser_options(cls, parser, name):
+        pass  # pragma: no cover
+
+    def get_chall_pref(self, domain):
+        return [challenges.HTTP01]
+
+    def perform_iter(self, achalls):
+        for achall in reversed(achalls):
+            if len(self.performed) == self.fail_after:
+                raise errors.AuthorizationError('failed')
+            if self.performed and self.wait_for:
+                # The previous challenge is answered while this one is performed
+                assert self.wait_for.wait(5)
+                self.wait_for.clear()
+            self.performed.append(achall.domain)
+            yield achall, 'HTTP01Response' + achall.domain
+
+    def cleanup(self, achalls):
+        self.cleaned_up += len(achalls)
+
+
 def _gen_mock_on_poll(status=messages.STATUS_VALID, retry=0, wait_value=1):
     state = {'count': retry}
 
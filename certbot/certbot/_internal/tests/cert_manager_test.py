@@ -174,13 +174,14 @@ class CertificatesTest(BaseCertManagerTest):
         assert mock_utility.notification.called is False
         assert mock_logger.warning.called #pylint: disable=no-member
 
+    @mock.patch('certbot._internal.lineage_index.LineageMetadata.from_lineage')
     @mock.patch('certbot.crypto_util.verify_renewable_cert')
     @mock.patch('certbot._internal.cert_manager.logger')
     @test_util.patch_display_util()
     @mock.patch("certbot._internal.storage.RenewableCert")
     @mock.patch('certbot._internal.cert_manager._report_human_readable')
     def test_certificates_parse_success(self, mock_report, mock_renewable_cert,
-        mock_utility, mock_logger, mock_verifier):
+        mock_utility, mock_logger, mock_verifier, unused_mock_from_lineage):
         mock_verifier.return_value = None
         mock_report.return_value = ""
         self._certificates(self.config)
@@ -206,11 +207,10 @@ class CertificatesTest(BaseCertManagerTest):
         assert mock_utility.called
         shutil.rmtree(empty_tempdir)
 
-    @mock.patch('certbot.crypto_util.get_serial_from_cert')
-    @mock.patch('certbot._internal.cert_manager.ocsp.RevocationChecker.ocsp_revoked')
-    def test_report_human_readable(self, mock_revoked, mock_serial):
-        mock_revoked.return_value = None
-        mock_serial.return_value = 1234567890
+    @mock.patch('certbot._internal.cert_manager.ocsp.RevocationChecker.check_many')
+    def test_report_human_readable(self, mock_check_many):
+        revoked = False
+        mock_check_many.side_effect = lambda certs: {cert: revoked for cert in certs}
         import datetime
 
         import pytz
@@ -218,7 +218,7 @@ class CertificatesTest(BaseCertManagerTest):
         from certbot._internal import cert_manager
         expiry = datetime.datetime.now(pytz.UTC)
 
-        cert = mock.MagicMock(lineagename="nameone")
+        cert = mock.MagicMock(lineagename="nameone", serial=1234567890)
         cert.target_expiry = expiry
         cert.names.return_value = ["nameone", "nametwo"]
         cert.is_test_cert = False
@@ -232,6 +232,8 @@ class CertificatesTest(BaseCertManagerTest):
 
         out = get_report()
         assert "INVALID: EXPIRED" in out
+        # Expired certificates aren't checked with OCSP
+        mock_check_many.assert_called_with([])
 
         cert.target_expiry += datetime.timedelta(hours=2)
         # pylint: disable=protected-access
@@ -256,11 +258,11 @@ class CertificatesTest(BaseCertManagerTest):
         assert 'INVALID' not in out
 
         cert.is_test_cert = True
-        mock_revoked.return_value = True
+        revoked = True
         out = get_report()
         assert 'INVALID: TEST_CERT, REVOKED' in out
 
-        cert = mock.MagicMock(lineagename="indescribable")
+        cert = mock.MagicMock(lineagename="indescribable", serial=1234567890)
         cert.target_expiry = expiry
         cert.names.return_value = ["nameone", "thrice.named"]
         cert.is_test_cert = True
@@ -268,6 +270,7 @@ class CertificatesTest(BaseCertManagerTest):
 
         out = get_report()
         assert len(re.findall("INVALID:", out)) == 2
+        assert mock_check_many.call_args[0][0] == [parsed_certs[0]]
         mock_config.domains = ["thrice.named"]
         out = get_report()
         assert len(re.findall("INVALID:", out)) == 1
@@ -282,6 +285,130 @@ class CertificatesTest(BaseCertManagerTest):
         assert len(re.findall("INVALID:", out)) == 0
 
 
+class IndexedLineagesTest(test_util.ConfigTestCase):
+    """Tests for the use of the lineage index by certbot._internal.cert_manager."""
+
+    def setUp(self):
+        super().setUp()
+        from certbot._internal import lineage_index
+        from certbot._internal import storage
+        patcher = mock.patch.dict(lineage_index._pending, clear=True)  # pylint: disable=protected-access
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with mock.patch('certbot._internal.storage.relevant_values', return_value={}):
+            self.lineage = storage.RenewableCert.new_lineage(
+                'example.com', test_util.load_vector('cert-san_512.pem'),
+                test_util.load_vector('rsa512_key.pem'),
+                test_util.load_vector('cert-san_512.pem'), self.config)
+        lineage_index.save_pending()
+
+    @test_util.patch_display_util()
+    @mock.patch('certbot._internal.cert_manager.ocsp.RevocationChecker.check_many')
+    def test_certificates_verifies_once(self, mock_check_many, unused_display):
+        from certbot._internal import cert_manager
+        mock_check_many.return_value = {}
+        with mock.patch('certbot.crypto_util.verify_renewable_cert') as mock_verify:
+            cert_manager.certificates(self.config)
+            cert_manager.certificates(self.config)
+        assert mock_verify.call_count == 1
+
+        with mock.patch('certbot._internal.cert_manager.storage.RenewableCert') as mock_rc:
+            with mock.patch('certbot._internal.cert_manager._report_human_readable') as report:
+                report.return_value = ''
+                cert_manager.certificates(self.config)
+        assert mock_rc.called is False
+        assert report.call_args[0][1][0].names() == ['example.com', 'www.example.com']
+
+    def test_find_duplicative_certs_uses_index(self):
+        from certbot._internal import cert_manager
+        from certbot._internal import storage
+        with mock.patch.object(storage.RenewableCert, '__init__', autospec=True,
+                               side_effect=storage.RenewableCert.__init__) as mock_rc:
+            assert cert_manager.find_duplicative_certs(
+                self.config, ['wow.net']) == (None, None)
+            assert mock_rc.called is False
+            identical, subset = cert_manager.find_duplicative_certs(
+                self.config, ['example.com', 'www.example.com'])
+        assert identical.lineagename == 'example.com'
+        assert subset is None
+        # Only the matching lineage is parsed
+        assert mock_rc.call_count == 1
+
+    def test_find_duplicative_certs_refreshes_candidates(self):
+        from certbot._internal import cert_manager
+        from certbot._internal import lineage_index
+        # A lineage that isn't indexed yet is parsed and indexed
+        lineage_index.forget(self.config, 'example.com')
+        identical, _ = cert_manager.find_duplicative_certs(
+            self.config, ['example.com', 'www.example.com'])
+        assert identical.lineagename == 'example.com'
+        assert 'example.com' in lineage_index.LineageIndex(self.config).entries
+
+        # A stale candidate is parsed again before it is compared
+        with open(self.lineage.cert_path, 'wb') as cert_file:
+            cert_file.write(test_util.load_vector('cert_512.pem'))
+        identical, subset = cert_manager.find_duplicative_certs(
+            self.config, ['example.com', 'www.example.com'])
+        assert identical is None
+        assert subset.lineagename == 'example.com'
+        assert lineage_index.LineageIndex(self.config).get(
+            self.lineage.configfile.filename).names() == ['example.com']
+
+    def test_find_duplicative_certs_domains_changed(self):
+        from certbot._internal import cert_manager
+        from certbot._internal import lineage_index
+        # The domains of the indexed lineage are changed outside of Certbot,
+        # so the candidate found by its old names no longer matches
+        with open(self.lineage.cert_path, 'wb') as cert_file:
+            cert_file.write(test_util.load_vector('ocsp_certificate.pem'))
+        assert cert_manager.find_duplicative_certs(
+            self.config, ['example.com', 'www.example.com']) == (None, None)
+        assert lineage_index.LineageIndex(self.config).get(
+            self.lineage.configfile.filename).names() == ['buypass.pacalis.net']
+
+        identical, subset = cert_manager.find_duplicative_certs(
+            self.config, ['buypass.pacalis.net'])
+        assert identical.lineagename == 'example.com'
+        assert subset is None
+
+    def test_find_duplicative_certs_checks_candidates_only(self):
+        from certbot._internal import cert_manager
+        from certbot._internal import lineage_index
+        from certbot._internal import storage
+        with mock.patch('certbot._internal.storage.relevant_values', return_value={}):
+            storage.RenewableCert.new_lineage(
+                'buypass.pacalis.net', test_util.load_vector('ocsp_certificate.pem'),
+                test_util.load_vector('rsa512_key.pem'),
+                test_util.load_vector('ocsp_certificate.pem'), self.config)
+        lineage_index.save_pending()
+
+        with mock.patch.object(lineage_index.LineageMetadata, 'is_fresh', autospec=True,
+                               return_value=True) as mock_is_fresh:
+            identical, _ = cert_manager.find_duplicative_certs(
+                self.config, ['example.com', 'www.example.com'])
+        assert identical.lineagename == 'example.com'
+        assert [call[0][0].lineagename for call in mock_is_fresh.call_args_list] == \
+            ['example.com']
+
+    def test_domains_for_certname_uses_index(self):
+        from certbot._internal import cert_manager
+        with mock.patch('certbot._internal.cert_manager.storage.RenewableCert') as mock_rc:
+            assert cert_manager.domains_for_certname(self.config, 'example.com') == \
+                ['example.com', 'www.example.com']
+            assert cert_manager.domains_for_certname(self.config, 'unknown.com') is None
+        assert mock_rc.called is False
+
+    def test_unindexable_lineage(self):
+        from certbot._internal import cert_manager
+        with mock.patch('certbot._internal.lineage_index.LineageMetadata.from_lineage',
+                        side_effect=ValueError):
+            with mock.patch('certbot._internal.lineage_index.LineageIndex.get_indexed',
+                            return_value=None):
+                identical, _ = cert_manager.find_duplicative_certs(
+                    self.config, ['example.com', 'www.example.com'])
+        assert identical.lineagename == 'example.com'
+
+
 class SearchLineagesTest(BaseCertManagerTest):
     """Tests for certbot._internal.cert_manager._search_lineages."""
 
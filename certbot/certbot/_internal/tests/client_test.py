@@ -1,6 +1,7 @@
 """Tests for certbot._internal.client."""
 import contextlib
 import datetime
+import json
 import platform
 import shutil
 import sys
@@ -17,6 +18,7 @@ from certbot import util
 from certbot._internal import account
 from certbot._internal import constants
 from certbot._internal.display import obj as display_obj
+from certbot.compat import filesystem
 from certbot.compat import os
 import certbot.tests.util as test_util
 
@@ -245,6 +247,53 @@ class RegisterTest(test_util.ConfigTestCase):
         assert mock_handle.called is False
 
 
+class SharedACMEClientsTest(test_util.ConfigTestCase):
+    """Tests for certbot._internal.client.shared_acme_clients."""
+
+    def setUp(self):
+        super().setUp()
+        from acme import messages
+        import josepy as jose
+        self.key = jose.JWKRSA.load(KEY)
+        self.regr = messages.RegistrationResource(
+            uri="https://example.com/acme/acct/1", body=messages.Registration())
+        self.config.no_verify_ssl = False
+
+    def _call(self, regr=None):
+        from certbot._internal.client import acme_from_config_key
+        return acme_from_config_key(self.config, self.key, regr)
+
+    @mock.patch("certbot._internal.client.acme_client")
+    def test_shared_within_block(self, mock_acme):
+        from certbot._internal.client import shared_acme_clients
+        mock_acme.ClientV2.side_effect = lambda *args: mock.MagicMock()
+        with shared_acme_clients():
+            first = self._call(self.regr)
+            assert self._call(self.regr) is first
+            with shared_acme_clients():
+                assert self._call(self.regr) is first
+            assert self._call(self.regr) is first
+            # New registrations, other servers and other accounts get their own client
+            assert self._call() is not first
+            other_regr = self.regr.update(uri="https://example.com/acme/acct/2")
+            assert self._call(other_regr) is not first
+            self.config.server = "https://other.example.com/directory"
+            assert self._call(self.regr) is not first
+        assert mock_acme.ClientV2.get_directory.call_count == 4
+        assert self._call(self.regr) is not first
+
+    @mock.patch("certbot._internal.client.acme_client")
+    def test_not_shared_outside_block(self, mock_acme):
+        mock_acme.ClientV2.side_effect = lambda *args: mock.MagicMock()
+        assert self._call(self.regr) is not self._call(self.regr)
+        assert mock_acme.ClientNetwork.call_count == 2
+
+    @mock.patch("certbot._internal.client.acme_client")
+    def test_nonces_prefetched(self, mock_acme):
+        self._call(self.regr)
+        assert mock_acme.ClientNetwork.call_args[1]["nonce_prefetch"] == 2
+
+
 class ClientTestCommon(test_util.ConfigTestCase):
     """Common base class for certbot._internal.client.Client tests."""
 
@@ -301,7 +350,8 @@ class ClientTest(ClientTestCommon):
 
         self.acme.finalize_order.assert_called_once_with(
             self.eg_order, mock.ANY,
-            fetch_alternative_chains=self.config.preferred_chain is not None)
+            fetch_alternative_chains=self.config.preferred_chain is not None,
+            chain_predicate=None, chain_hint=None)
 
     @mock.patch("certbot._internal.client.crypto_util")
     @mock.patch("certbot._internal.client.logger")
@@ -361,6 +411,59 @@ class ClientTest(ClientTestCommon):
             self.client.obtain_certificate_from_csr(test_csr)
         mock_logger.error.assert_called_once_with(mock.ANY)
 
+    def test_obtain_certificate_preferred_chain_hint(self):
+        self._mock_obtain_certificate()
+        chains = [(test_util.load_vector('cert_leaf.pem') +
+                   test_util.load_vector(name)).decode()
+                  for name in ('cert_intermediate_1.pem', 'cert_intermediate_1.pem',
+                               'cert_intermediate_2.pem')]
+        checked = []
+
+        def finalize_order(orderr, deadline, fetch_alternative_chains, chain_predicate,
+                           chain_hint):
+            positions = [0, chain_hint] if chain_hint else [0, 1, 2]
+            for position in positions:
+                checked.append(position)
+                if chain_predicate(position, chains[position]):
+                    break
+            return mock.MagicMock(fullchain_pem=chains[0],
+                                  alternative_fullchains_pem=[chains[p] for p in positions[1:]])
+        self.acme.finalize_order.side_effect = finalize_order
+        self.config.preferred_chain = "Pebble Root CA 0cc6f0"
+        filesystem.makedirs(self.config.work_dir)
+        test_csr = util.CSR(form="pem", file=None, data=CSR_SAN)
+
+        _, chain = self.client.obtain_certificate_from_csr(test_csr, orderr=self.eg_order)
+        assert chain.decode() in chains[2]
+        assert checked == [0, 1, 2]
+        with open(os.path.join(self.config.work_dir, constants.PREFERRED_CHAINS_FILE)) as f:
+            assert json.load(f) == {self.config.server: {"Pebble Root CA 0cc6f0": 2}}
+
+        # The next certificate from the CA starts with the chain that matched
+        del checked[:]
+        _, chain = self.client.obtain_certificate_from_csr(test_csr, orderr=self.eg_order)
+        assert chain.decode() in chains[2]
+        assert checked == [0, 2]
+
+    @mock.patch("certbot._internal.client.logger")
+    def test_preferred_chain_hints_file(self, mock_logger):
+        from certbot._internal import client
+        self.config.preferred_chain = "Some CA"
+        filesystem.makedirs(self.config.work_dir)
+        path = os.path.join(self.config.work_dir, constants.PREFERRED_CHAINS_FILE)
+        assert client._preferred_chain_hint(self.config) is None
+        for content in ('not json', '[]', '{"%s": 1}' % self.config.server):
+            with open(path, 'w') as f:
+                f.write(content)
+            assert client._preferred_chain_hint(self.config) is None
+        client._save_preferred_chain_hint(self.config, 3)
+        assert client._preferred_chain_hint(self.config) == 3
+
+        with mock.patch("certbot._internal.client.filesystem.replace", side_effect=OSError):
+            client._save_preferred_chain_hint(self.config, 4)
+        assert client._preferred_chain_hint(self.config) == 3
+        assert mock_logger.debug.call_count == 2
+
     @mock.patch("certbot._internal.client.crypto_util")
     def test_obtain_certificate(self, mock_crypto_util):
         csr = util.CSR(form="pem", file=None, data=CSR_SAN)
@@ -382,6 +485,24 @@ class ClientTest(ClientTestCommon):
         mock_crypto_util.cert_and_chain_from_fullchain.assert_called_once_with(
             self.eg_order.fullchain_pem)
 
+    @mock.patch("certbot._internal.client.key_pool.take")
+    @mock.patch("certbot._internal.client.crypto_util")
+    def test_obtain_certificate_pregenerated_key(self, mock_crypto_util, mock_take):
+        from certbot._internal import key_pool
+        csr = util.CSR(form="pem", file=None, data=CSR_SAN)
+        mock_crypto_util.generate_csr.return_value = csr
+        mock_take.return_value = mock.sentinel.key_pem
+        self._set_mock_from_fullchain(mock_crypto_util.cert_and_chain_from_fullchain)
+
+        key = util.Key(file=None, pem=mock.sentinel.key_pem)
+        self._test_obtain_certificate_common(key, csr)
+
+        mock_take.assert_called_once_with(key_pool.KeySpec(
+            self.config.key_type, self.config.rsa_key_size, "secp256r1"))
+        mock_crypto_util.generate_key.assert_not_called()
+        mock_crypto_util.generate_csr.assert_called_once_with(
+            key, self.eg_domains, None, False, True)
+
     @mock.patch("certbot._internal.client.crypto_util")
     def test_obtain_certificate_partial_success(self, mock_crypto_util):
         csr = util.CSR(form="pem", file=mock.sentinel.csr_file, data=CSR_SAN)
@@ -47,6 +47,7 @@ class NamespaceConfigTest(test_util.ConfigTestCase):
 
         mock_constants.IN_PROGRESS_DIR = '../p'
         mock_constants.KEY_DIR = 'keys'
+        mock_constants.OCSP_CACHE_DIR = 'o'
         mock_constants.TEMP_CHECKPOINT_DIR = 't'
 
         ref_path = misc.underscores_for_unsupported_characters_in_path(
@@ -57,6 +58,8 @@ class NamespaceConfigTest(test_util.ConfigTestCase):
             os.path.normpath(os.path.join(self.config.work_dir, 'backups'))
         assert os.path.normpath(self.config.in_progress_dir) == \
             os.path.normpath(os.path.join(self.config.work_dir, '../p'))
+        assert os.path.normpath(self.config.ocsp_cache_dir) == \
+            os.path.normpath(os.path.join(self.config.work_dir, 'o'))
         assert os.path.normpath(self.config.temp_checkpoint_dir) == \
             os.path.normpath(os.path.join(self.config.work_dir, 't'))
 
@@ -90,6 +93,7 @@ class NamespaceConfigTest(test_util.ConfigTestCase):
         assert os.path.isabs(config.accounts_dir)
         assert os.path.isabs(config.backup_dir)
         assert os.path.isabs(config.in_progress_dir)
+        assert os.path.isabs(config.ocsp_cache_dir)
         assert os.path.isabs(config.temp_checkpoint_dir)
 
     @mock.patch('certbot.configuration.constants')
@@ -514,6 +514,12 @@ class FindChainWithIssuerTest(unittest.TestCase):
         assert matched == fullchains[0]
         mock_info.assert_not_called()
 
+    def test_chain_has_issuer(self):
+        from certbot.crypto_util import chain_has_issuer
+        fullchains = self._all_fullchains()
+        assert not chain_has_issuer(fullchains[0], "Pebble Root CA 0cc6f0")
+        assert chain_has_issuer(fullchains[1], "Pebble Root CA 0cc6f0")
+
     @mock.patch('certbot.crypto_util.logger.warning')
     def test_warning_on_no_match(self, mock_warning):
         fullchains = self._all_fullchains()
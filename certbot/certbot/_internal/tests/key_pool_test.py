@@ -0,0 +1,106 @@
+"""Tests for certbot._internal.key_pool."""
+from concurrent import futures
+import sys
+from unittest import mock
+
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
+import pytest
+
+from certbot._internal import key_pool
+from certbot.tests import util as test_util
+
+ECDSA_SPEC = key_pool.KeySpec("ecdsa", 2048, "secp384r1")
+RSA_SPEC = key_pool.KeySpec("rsa", 2048, "secp256r1")
+
+
+def _done(result=None, error=None):
+    future: futures.Future = futures.Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+    return future
+
+
+class KeySpecTest(test_util.ConfigTestCase):
+    """Tests for certbot._internal.key_pool.key_spec."""
+
+    def test_key_spec(self):
+        self.config.key_type = ["ecdsa", "rsa"]
+        self.config.elliptic_curve = "secp384r1"
+        assert key_pool.key_spec(self.config) == ECDSA_SPEC
+        self.config.key_type = "rsa"
+        assert key_pool.key_spec(self.config) == RSA_SPEC
+        self.config.key_type = "ecdsa"
+        self.config.elliptic_curve = None
+        assert key_pool.key_spec(self.config).elliptic_curve == "secp256r1"
+
+
+class KeyPoolTest(test_util.TempDirTestCase):
+    """Tests for certbot._internal.key_pool.KeyPool."""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch("certbot._internal.key_pool.futures.ProcessPoolExecutor")
+        self.executor = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.executor.submit.side_effect = lambda *args, **kwargs: _done(
+            kwargs["key_type"].encode())
+
+    def test_keys_generated_ahead(self):
+        pool = key_pool.KeyPool(2)
+        pool.schedule([RSA_SPEC, ECDSA_SPEC, RSA_SPEC])
+        assert self.executor.submit.call_count == 2
+        assert pool.take(ECDSA_SPEC) == b"ecdsa"
+        # Taking a key makes room for the next one
+        assert self.executor.submit.call_count == 3
+        assert pool.take(RSA_SPEC) == b"rsa"
+        assert pool.take(RSA_SPEC) == b"rsa"
+        assert pool.take(RSA_SPEC) is None
+        assert pool.stats == {"hits": 3, "misses": 1}
+        self.executor.submit.assert_called_with(
+            key_pool.crypto_util.make_key, bits=2048, key_type="rsa",
+            elliptic_curve="secp256r1")
+
+    def test_failed_generation(self):
+        self.executor.submit.side_effect = lambda *args, **kwargs: _done(error=ValueError())
+        pool = key_pool.KeyPool(1)
+        pool.schedule([RSA_SPEC])
+        assert pool.take(RSA_SPEC) is None
+
+    def test_close(self):
+        pool = key_pool.KeyPool(1)
+        pool.schedule([RSA_SPEC, RSA_SPEC])
+        pool.close()
+        self.executor.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+        assert pool.take(RSA_SPEC) is None
+
+    def test_pregenerated_keys(self):
+        assert key_pool.take(RSA_SPEC) is None
+        with key_pool.pregenerated_keys(0) as pool:
+            assert pool is None
+        with key_pool.pregenerated_keys(1) as pool:
+            assert pool is not None
+            pool.schedule([RSA_SPEC])
+            # Nested contexts share the pool
+            with key_pool.pregenerated_keys(1) as nested:
+                assert nested is pool
+            assert key_pool.take(RSA_SPEC) == b"rsa"
+        assert key_pool.take(RSA_SPEC) is None
+        self.executor.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+
+
+def test_process_pool():
+    pool = key_pool.KeyPool(1)
+    try:
+        pool.schedule([ECDSA_SPEC])
+        key = load_pem_private_key(pool.take(ECDSA_SPEC), password=None)
+    finally:
+        pool.close()
+    assert isinstance(key, ec.EllipticCurvePrivateKey)
+    assert key.curve.name == "secp384r1"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(sys.argv[1:] + [__file__]))  # pragma: no cover
@@ -0,0 +1,197 @@
+"""Tests for certbot._internal.lineage_index."""
+import sys
+import threading
+from unittest import mock
+
+import pytest
+
+from certbot import crypto_util
+from certbot.compat import os
+from certbot.tests import util as test_util
+
+CERT = test_util.load_vector('cert-san_512.pem')
+KEY = test_util.load_vector('rsa512_key.pem')
+
+
+class LineageIndexTest(test_util.ConfigTestCase):
+    """Tests for certbot._internal.lineage_index.LineageIndex."""
+
+    def setUp(self):
+        super().setUp()
+        from certbot._internal import lineage_index
+        from certbot._internal import storage
+        patcher = mock.patch.dict(lineage_index._pending, clear=True)  # pylint: disable=protected-access
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with mock.patch('certbot._internal.storage.relevant_values', return_value={}):
+            self.lineage = storage.RenewableCert.new_lineage(
+                'example.com', CERT, KEY, CERT, self.config)
+        lineage_index.save_pending()
+        self.renewal_file = self.lineage.configfile.filename
+
+    def _index(self):
+        from certbot._internal import lineage_index
+        return lineage_index.LineageIndex(self.config)
+
+    def test_new_lineage_is_indexed(self):
+        entry = self._index().get(self.renewal_file)
+        assert entry is not None
+        assert entry.lineagename == 'example.com'
+        assert entry.names() == ['example.com', 'www.example.com']
+        assert entry.serial == crypto_util.get_serial_from_cert(self.lineage.cert_path)
+        assert entry.target_expiry == self.lineage.target_expiry
+        assert entry.private_key_type == 'RSA'
+        assert entry.latest_version == 1
+        assert entry.is_test_cert is False
+        assert entry.cert_path == self.lineage.cert_path
+        assert entry.key_path == self.lineage.key_path
+        assert entry.chain_path == self.lineage.chain_path
+        assert entry.fullchain_path == self.lineage.fullchain_path
+        assert entry.verified is False
+
+    def test_changed_files_invalidate_entry(self):
+        with open(self.renewal_file, 'a') as renewal_file:
+            renewal_file.write('\n# edited\n')
+        assert self._index().get(self.renewal_file) is None
+
+        index = self._index()
+        index.update(self.lineage)
+        index.save()
+        assert self._index().get(self.renewal_file) is not None
+
+        with open(self.lineage.cert_path, 'ab') as cert_file:
+            cert_file.write(b'\n')
+        assert self._index().get(self.renewal_file) is None
+
+    def test_successor_updates_entry(self):
+        from certbot._internal import lineage_index
+        version = self.lineage.save_successor(1, CERT, None, CERT, self.config)
+        self.lineage.update_all_links_to(version)
+        # The index file is written once for both changes
+        with mock.patch('certbot._internal.lineage_index.LineageMetadata.from_lineage',
+                        wraps=lineage_index.LineageMetadata.from_lineage) as mock_from_lineage:
+            with mock.patch('certbot._internal.lineage_index.filesystem.replace',
+                            wraps=lineage_index.filesystem.replace) as mock_replace:
+                lineage_index.save_pending()
+                lineage_index.save_pending()
+        assert mock_from_lineage.call_count == 1
+        assert mock_replace.call_count == 1
+        entry = self._index().get(self.renewal_file)
+        assert entry is not None
+        assert entry.latest_version == version
+
+    def test_pending_saved_at_exit(self):
+        from certbot._internal import lineage_index
+        with mock.patch('certbot._internal.lineage_index._save_at_exit_registered', False), \
+                mock.patch('certbot._internal.lineage_index.util.atexit_register') as mock_register:
+            lineage_index.forget(self.config, 'example.com')
+            lineage_index.forget(self.config, 'example.com')
+        mock_register.assert_called_once_with(lineage_index.save_pending)
+        assert 'example.com' in self._index().entries
+        lineage_index.save_pending()
+        assert 'example.com' not in self._index().entries
+
+    def test_delete_and_rename_forget_entry(self):
+        from certbot._internal import lineage_index
+        from certbot._internal import storage
+        storage.rename_renewal_config('example.com', 'example.net', self.config)
+        lineage_index.save_pending()
+        assert 'example.com' not in self._index().entries
+
+        with mock.patch('certbot._internal.storage.relevant_values', return_value={}):
+            lineage = storage.RenewableCert.new_lineage(
+                'example.org', CERT, KEY, CERT, self.config)
+        lineage_index.save_pending()
+        assert 'example.org' in self._index().entries
+        storage.delete_files(self.config, lineage.lineagename)
+        lineage_index.save_pending()
+        assert 'example.org' not in self._index().entries
+
+    def test_verified_is_persisted(self):
+        index = self._index()
+        index.update(self.lineage, verified=True)
+        index.save()
+        assert self._index().get(self.renewal_file).verified is True
+
+    def test_lineages_for_domains(self):
+        from certbot._internal import lineage_index
+        from certbot._internal import storage
+        index = self._index()
+        assert index.lineages_for_domains(['www.example.com', 'other.net']) == {'example.com'}
+        assert index.lineages_for_domains(['other.net']) == set()
+
+        with mock.patch('certbot._internal.storage.relevant_values', return_value={}):
+            other = storage.RenewableCert.new_lineage(
+                'other', CERT, KEY, CERT, self.config)
+        lineage_index.save_pending()
+        index = self._index()
+        assert index.lineages_for_domains(['example.com']) == {'example.com', 'other'}
+
+        index.remove('example.com')
+        assert index.lineages_for_domains(['example.com']) == {'other'}
+        index.remove('other')
+        assert index.lineages_for_domains(['example.com']) == set()
+        # Updating an entry replaces its names
+        index.update(other)
+        index.update(other)
+        assert index.lineages_for_domains(['example.com']) == {'other'}
+        assert index.get_indexed(other.configfile.filename).lineagename == 'other'
+
+    def test_prune(self):
+        index = self._index()
+        index.prune([])
+        index.save()
+        assert self._index().entries == {}
+
+    def test_unreadable_index(self):
+        with open(self._index().path, 'w') as index_file:
+            index_file.write('{"version": 1, "lineages": {"example.com": {}}}')
+        assert self._index().entries == {}
+        with open(self._index().path, 'w') as index_file:
+            index_file.write('{"version": 0, "lineages": {}}')
+        assert self._index().entries == {}
+
+    def test_record_failure_drops_entry(self):
+        from certbot._internal import lineage_index
+        with mock.patch('certbot._internal.lineage_index.LineageMetadata.from_lineage',
+                        side_effect=ValueError):
+            lineage_index.record(self.config, self.lineage)
+            lineage_index.save_pending()
+        assert 'example.com' not in self._index().entries
+
+    @mock.patch('certbot._internal.lineage_index.filesystem.replace')
+    def test_write_failure(self, mock_replace):
+        mock_replace.side_effect = OSError
+        index = self._index()
+        index.prune([])
+        index.save()
+        assert os.path.exists(index.path)
+        assert 'example.com' in self._index().entries
+        assert [name for name in os.listdir(self.config.config_dir)
+                if name.endswith('.tmp')] == []
+
+    def test_concurrent_records(self):
+        from certbot._internal import lineage_index
+        from certbot._internal import storage
+        with mock.patch('certbot._internal.storage.relevant_values', return_value={}):
+            other = storage.RenewableCert.new_lineage(
+                'example.org', CERT, KEY, CERT, self.config)
+        lineage_index.forget(self.config, 'example.com')
+        lineage_index.forget(self.config, 'example.org')
+        lineage_index.save_pending()
+
+        def record_many(lineage):
+            for _ in range(20):
+                lineage_index.record(self.config, lineage)
+                lineage_index.save_pending()
+        threads = [threading.Thread(target=record_many, args=(lineage,))
+                   for lineage in (self.lineage, other)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert set(self._index().entries) == {'example.com', 'example.org'}
+
+
+if __name__ == '__main__':
+    sys.exit(pytest.main(sys.argv[1:] + [__file__]))  # pragma: no cover
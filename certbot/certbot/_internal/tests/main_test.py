@@ -1090,7 +1090,7 @@ class MainTest(test_util.ConfigTestCase):
             args += ["--user-agent", ua]
             self._call_no_clientmock(args)
             acme_net.assert_called_once_with(mock.ANY, account=mock.ANY, verify_ssl=True,
-                user_agent=ua, alg=jose.RS256)
+                user_agent=ua, alg=jose.RS256, nonce_prefetch=2)
 
     @mock.patch('certbot._internal.main.plug_sel.record_chosen_plugins')
     @mock.patch('certbot._internal.main.plug_sel.pick_installer')
@@ -1878,6 +1878,21 @@ class MainTest(test_util.ConfigTestCase):
         installer.restart.assert_not_called()
         mock_run_renewal_deployer.assert_not_called()
 
+    @mock.patch('certbot._internal.main.updater.run_renewal_deployer')
+    @mock.patch('certbot._internal.plugins.selection.choose_configurator_plugins')
+    @mock.patch('certbot._internal.main._init_le_client')
+    @mock.patch('certbot._internal.main._get_and_save_cert')
+    def test_renew_defers_restart(self, unused_mock_get_cert, unused_mock_init, mock_choose,
+                                  mock_run_renewal_deployer):
+        self.config.dry_run = False
+        installer = mock.MagicMock()
+        mock_choose.return_value = (installer, mock.MagicMock())
+
+        assert main.renew_cert(self.config, None, None, defer_restart=True) is installer
+
+        assert mock_run_renewal_deployer.call_count == 1
+        installer.restart.assert_not_called()
+
 
 class UnregisterTest(unittest.TestCase):
     def setUp(self):
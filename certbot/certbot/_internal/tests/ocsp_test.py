@@ -3,7 +3,10 @@
 import contextlib
 from datetime import datetime
 from datetime import timedelta
+import shutil
 import sys
+import tempfile
+import threading
 import unittest
 from unittest import mock
 import warnings
@@ -13,12 +16,15 @@ from cryptography.exceptions import InvalidSignature
 from cryptography.exceptions import UnsupportedAlgorithm
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.utils import CryptographyDeprecationWarning
 from cryptography.x509 import ocsp as ocsp_lib
 import pytest
 import pytz
 
 from certbot import errors
+from certbot.compat import os
 from certbot.tests import util as test_util
 
 out = """Missing = in header key=value
@@ -153,7 +159,8 @@ class OSCPTestCryptography(unittest.TestCase):
         mock_determine.return_value = ('http://example.com', 'example.com')
         self.checker.ocsp_revoked(self.cert_obj)
 
-        mock_check.assert_called_once_with(self.cert_path, self.chain_path, 'http://example.com', 10)
+        mock_check.assert_called_once_with(self.cert_path, self.chain_path, 'http://example.com', 10,
+                                           None, None)
 
     def test_revoke(self):
         with _ocsp_mock(ocsp_lib.OCSPCertStatus.REVOKED, ocsp_lib.OCSPResponseStatus.SUCCESSFUL):
@@ -286,24 +293,201 @@ class OSCPTestCryptography(unittest.TestCase):
                     revoked = self.checker.ocsp_revoked(self.cert_obj)
         assert revoked is False
 
-    def test_this_update_warning(self):
+    @unittest.skipIf(not hasattr(ocsp_lib.OCSPResponse, 'this_update_utc'),
+                     reason='cryptography<43.0.0 has no timezone-aware update times')
+    def test_deprecated_update_times_not_read(self):
         with _ocsp_mock(ocsp_lib.OCSPCertStatus.GOOD,
                         ocsp_lib.OCSPResponseStatus.SUCCESSFUL) as mocks:
-            value = mocks['mock_response'].return_value.this_update
-
-            def warn_first():
+            def warn():
                 msg = ('Properties that return a naïve datetime object have been deprecated. Please '
                        'switch to this_update_utc.')
                 warnings.warn(msg, CryptographyDeprecationWarning)
-                return value
 
-            property_mock = mock.PropertyMock(side_effect=warn_first)
             # Using type() in this way is recommended in mock's documentation at
             # https://docs.python.org/3/library/unittest.mock.html#unittest.mock.PropertyMock
-            type(mocks['mock_response'].return_value).this_update = property_mock
+            this_update = mock.PropertyMock(side_effect=warn)
+            next_update = mock.PropertyMock(side_effect=warn)
+            type(mocks['mock_response'].return_value).this_update = this_update
+            type(mocks['mock_response'].return_value).next_update = next_update
 
+            # Warnings are errors in tests, so the check fails if it reads them
             revoked = self.checker.ocsp_revoked(self.cert_obj)
         assert revoked is False
+        assert this_update.called is False
+        assert next_update.called is False
+
+
+class CheckManyTest(unittest.TestCase):
+    """Tests for certbot.ocsp.RevocationChecker.check_many."""
+
+    def setUp(self):
+        from certbot import ocsp
+        self.checker = ocsp.RevocationChecker()
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        self.certs = []
+        for index in range(3):
+            # Copies of the same certificate, checked separately
+            cert = mock.MagicMock()
+            cert.cert_path = os.path.join(tempdir, 'cert%d.pem' % index)
+            shutil.copy(test_util.vector_path('ocsp_certificate.pem'), cert.cert_path)
+            cert.chain_path = test_util.vector_path('ocsp_issuer_certificate.pem')
+            self.certs.append(cert)
+        now = datetime.now(pytz.UTC)
+        mock_not_after = mock.patch('certbot.ocsp.crypto_util.notAfter',
+                                    return_value=now + timedelta(hours=2))
+        mock_not_after.start()
+        self.addCleanup(mock_not_after.stop)
+
+    @mock.patch('certbot.ocsp.requests.Session')
+    def test_session_shared_per_responder(self, mock_session):
+        with _ocsp_mock(ocsp_lib.OCSPCertStatus.REVOKED,
+                        ocsp_lib.OCSPResponseStatus.SUCCESSFUL) as mocks:
+            mock_session.return_value.post.return_value = mock.Mock(status_code=200)
+            statuses = self.checker.check_many(self.certs)
+        assert statuses == {cert: True for cert in self.certs}
+        # All certificates have the same responder
+        assert mock_session.call_count == 1
+        assert mock_session.return_value.post.call_count == 3
+        assert mocks['mock_post'].called is False
+        mock_session.return_value.close.assert_called_once_with()
+
+    @mock.patch('certbot.ocsp.logger.warning')
+    def test_failures_are_isolated(self, mock_warning):
+        self.certs[1].cert_path = 'nonexistent.pem'
+        with _ocsp_mock(ocsp_lib.OCSPCertStatus.REVOKED, ocsp_lib.OCSPResponseStatus.SUCCESSFUL):
+            with mock.patch('certbot.ocsp.requests.Session') as mock_session:
+                mock_session.return_value.post.return_value = mock.Mock(status_code=200)
+                statuses = self.checker.check_many(self.certs)
+        assert statuses == {self.certs[0]: True, self.certs[1]: False, self.certs[2]: True}
+        assert "An error occurred determining the OCSP status" in mock_warning.call_args[0][0]
+
+    def test_deadline(self):
+        unblock = threading.Event()
+        with mock.patch.object(self.checker, '_ocsp_revoked_by_paths') as mock_check, \
+                mock.patch('certbot.ocsp._SessionPool.close') as mock_close:
+            mock_check.side_effect = lambda *args: unblock.wait(5)
+            closed = threading.Event()
+            mock_close.side_effect = closed.set
+            try:
+                statuses = self.checker.check_many(self.certs, deadline=0.01)
+                # Sessions are still in use by the query running past the deadline
+                assert mock_close.called is False
+            finally:
+                unblock.set()
+            assert closed.wait(5)
+        assert statuses == {cert: False for cert in self.certs}
+
+    def test_check_many_by_paths(self):
+        paths = [(self.certs[0].cert_path, self.certs[0].chain_path)]
+        with mock.patch.object(self.checker, '_ocsp_revoked_by_paths') as mock_check:
+            mock_check.return_value = True
+            assert self.checker.check_many_by_paths(paths + paths) == {paths[0]: True}
+        mock_check.assert_called_once_with(paths[0][0], paths[0][1], 10, mock.ANY)
+
+    def test_broken_or_empty(self):
+        assert self.checker.check_many([]) == {}
+        self.checker.broken = True
+        with mock.patch.object(self.checker, '_ocsp_revoked_by_paths') as mock_check:
+            assert self.checker.check_many(self.certs) == {cert: False for cert in self.certs}
+        assert mock_check.called is False
+
+
+class OCSPCacheTest(unittest.TestCase):
+    """Tests for the persistent OCSP response cache."""
+
+    def setUp(self):
+        from certbot import ocsp
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+        self.cache_dir = os.path.join(self.tempdir, 'ocsp')
+        self.checker = ocsp.RevocationChecker(cache_dir=self.cache_dir)
+        self.cert_path = test_util.vector_path('ocsp_certificate.pem')
+        self.chain_path = test_util.vector_path('ocsp_issuer_certificate.pem')
+        now = datetime.now(pytz.UTC)
+        mock_not_after = mock.patch('certbot.ocsp.crypto_util.notAfter',
+                                    return_value=now + timedelta(hours=2))
+        mock_not_after.start()
+        self.addCleanup(mock_not_after.stop)
+
+    def test_fetched_response_is_cached(self):
+        der = _build_ocsp_response(ocsp_lib.OCSPCertStatus.REVOKED)
+        with mock.patch('certbot.ocsp.requests.post') as mock_post:
+            mock_post.return_value = mock.Mock(status_code=200, content=der)
+            with mock.patch('certbot.ocsp.crypto_util.verify_signed_payload') as mock_check:
+                assert self.checker.ocsp_revoked_by_paths(self.cert_path, self.chain_path)
+                assert self.checker.ocsp_revoked_by_paths(self.cert_path, self.chain_path)
+        assert mock_post.call_count == 1
+        # Responder certificate and response signatures are only checked once.
+        assert mock_check.call_count == 2
+        assert self.checker.cached_response(self.cert_path, self.chain_path) == der
+
+    def test_cache_shared_between_checkers(self):
+        from certbot import ocsp
+        der = _build_ocsp_response(ocsp_lib.OCSPCertStatus.GOOD)
+        self.checker._cache.store(der)
+
+        checker = ocsp.RevocationChecker(cache_dir=self.cache_dir)
+        with mock.patch('certbot.ocsp.requests.post') as mock_post:
+            assert checker.ocsp_revoked_by_paths(self.cert_path, self.chain_path) is False
+        assert mock_post.called is False
+        assert checker.cached_response(self.cert_path, self.chain_path) == der
+
+    def test_stale_response_not_served(self):
+        der = _build_ocsp_response(ocsp_lib.OCSPCertStatus.GOOD)
+        self.checker._cache.store(der)
+        later = datetime.now(pytz.UTC).replace(tzinfo=None) + timedelta(days=2)
+        with mock.patch('certbot.ocsp.datetime') as mock_datetime:
+            mock_datetime.now.return_value.replace.return_value = later
+            assert self.checker.cached_response(self.cert_path, self.chain_path) is None
+
+    def test_responses_not_cached(self):
+        # No nextUpdate, so there is no way to tell when to query again.
+        self.checker._cache.store(_build_ocsp_response(ocsp_lib.OCSPCertStatus.GOOD,
+                                                       next_update=None))
+        # The responder doesn't know the certificate.
+        self.checker._cache.store(_build_ocsp_response(ocsp_lib.OCSPCertStatus.UNKNOWN))
+        self.checker._cache.store(b'garbage')
+        assert self.checker.cached_response(self.cert_path, self.chain_path) is None
+        assert not os.path.exists(self.cache_dir)
+
+    def test_unreadable_cache_entry(self):
+        der = _build_ocsp_response(ocsp_lib.OCSPCertStatus.GOOD)
+        self.checker._cache.store(der)
+        for name in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, name), 'wb') as cache_file:
+                cache_file.write(der[:10])
+        assert self.checker.cached_response(self.cert_path, self.chain_path) is None
+
+    def test_no_cache(self):
+        from certbot import ocsp
+        checker = ocsp.RevocationChecker()
+        assert checker.cached_response(self.cert_path, self.chain_path) is None
+
+    @mock.patch('certbot.ocsp._determine_ocsp_server')
+    @mock.patch('certbot.util.run_script')
+    def test_openssl_response_is_cached(self, mock_run, mock_determine):
+        from certbot import ocsp
+        with mock.patch('certbot.ocsp.subprocess.run') as mock_subprocess_run:
+            with mock.patch('certbot.util.exe_exists', return_value=True):
+                mock_subprocess_run.return_value.stderr = out
+                checker = ocsp.RevocationChecker(enforce_openssl_binary_usage=True,
+                                                 cache_dir=self.cache_dir)
+        mock_determine.return_value = ('http://example.com', 'example.com')
+        der = _build_ocsp_response(ocsp_lib.OCSPCertStatus.REVOKED)
+
+        def run_openssl(cmd, log):  # pylint: disable=unused-argument
+            with open(cmd[cmd.index('-respout') + 1], 'wb') as respout:
+                respout.write(der)
+            return '{0}: revoked'.format(self.cert_path), 'Response verify OK'
+        mock_run.side_effect = run_openssl
+
+        assert checker.ocsp_revoked_by_paths(self.cert_path, self.chain_path)
+        assert checker.ocsp_revoked_by_paths(self.cert_path, self.chain_path)
+        assert mock_run.call_count == 1
+        assert checker.cached_response(self.cert_path, self.chain_path) == der
+        # The temporary -respout file doesn't outlive the query.
+        assert len(os.listdir(self.cache_dir)) == 1
 
 
 @contextlib.contextmanager
@@ -336,6 +520,8 @@ def _construct_mock_ocsp_response(certificate_status, response_status):
     builder = builder.add_certificate(cert, issuer, hashes.SHA1())
     request = builder.build()
 
+    next_update = datetime.now(pytz.UTC) + timedelta(days=1)
+    this_update = datetime.now(pytz.UTC) - timedelta(days=1)
     return mock.Mock(
         response_status=response_status,
         certificate_status=certificate_status,
@@ -345,12 +531,44 @@ def _construct_mock_ocsp_response(certificate_status, response_status):
         responder_name=responder.subject,
         certificates=[responder],
         hash_algorithm=hashes.SHA1(),
-        next_update=datetime.now(pytz.UTC).replace(tzinfo=None) + timedelta(days=1),
-        this_update=datetime.now(pytz.UTC).replace(tzinfo=None) - timedelta(days=1),
+        next_update=next_update.replace(tzinfo=None),
+        this_update=this_update.replace(tzinfo=None),
+        next_update_utc=next_update,
+        this_update_utc=this_update,
         signature_algorithm_oid=x509.oid.SignatureAlgorithmOID.RSA_WITH_SHA1,
     )
 
 
+def _build_ocsp_response(certificate_status, next_update=timedelta(days=1)):
+    cert = x509.load_pem_x509_certificate(
+        test_util.load_vector('ocsp_certificate.pem'), default_backend())
+    issuer = x509.load_pem_x509_certificate(
+        test_util.load_vector('ocsp_issuer_certificate.pem'), default_backend())
+    now = datetime.now(pytz.UTC).replace(tzinfo=None)
+    # Signatures are mocked out in these tests, so an unrelated key is enough
+    # for the delegated responder.
+    responder_key = ec.generate_private_key(ec.SECP256R1())
+    responder = x509.CertificateBuilder(
+    ).subject_name(x509.Name([x509.NameAttribute(x509.oid.NameOID.COMMON_NAME, 'responder')])
+    ).issuer_name(issuer.subject
+    ).public_key(responder_key.public_key()
+    ).serial_number(1
+    ).not_valid_before(now - timedelta(days=1)
+    ).not_valid_after(now + timedelta(days=1)
+    ).add_extension(x509.ExtendedKeyUsage([x509.oid.ExtendedKeyUsageOID.OCSP_SIGNING]),
+                    critical=False
+    ).sign(responder_key, hashes.SHA256())
+    revocation_time = now if certificate_status == ocsp_lib.OCSPCertStatus.REVOKED else None
+    builder = ocsp_lib.OCSPResponseBuilder().add_response(
+        cert=cert, issuer=issuer, algorithm=hashes.SHA1(),
+        cert_status=certificate_status, this_update=now - timedelta(hours=1),
+        next_update=now + next_update if next_update else None,
+        revocation_time=revocation_time, revocation_reason=None,
+    ).responder_id(ocsp_lib.OCSPResponderEncoding.HASH, responder).certificates([responder])
+    response = builder.sign(responder_key, hashes.SHA256())
+    return response.public_bytes(serialization.Encoding.DER)
+
+
 # pylint: disable=line-too-long
 openssl_confused = ("", """
 /etc/letsencrypt/live/example.org/cert.pem: good
@@ -2,6 +2,7 @@
 import functools
 import string
 import sys
+import tempfile
 from typing import List
 import unittest
 from unittest import mock
@@ -13,6 +14,7 @@ from certbot import interfaces
 from certbot._internal.plugins import null
 from certbot._internal.plugins import standalone
 from certbot._internal.plugins import webroot
+from certbot.compat import os
 
 if sys.version_info >= (3, 10):  # pragma: no cover
     import importlib.metadata as importlib_metadata
@@ -200,6 +202,10 @@ class PluginsRegistryTest(unittest.TestCase):
             name="ep1",
             value="p1.ep1",
             group="certbot.plugins")
+        # Entry points are discovered once per process, start from scratch
+        discovered = mock.patch("certbot._internal.plugins.disco._discovered_entry_points", None)
+        discovered.start()
+        self.addCleanup(discovered.stop)
 
     def test_find_all(self):
         from certbot._internal.plugins.disco import PluginsRegistry
@@ -231,6 +237,64 @@ class PluginsRegistryTest(unittest.TestCase):
                 PluginsRegistry.find_all()
             assert "standalone' plugin errored" in str(cm.exception)
 
+    def test_find_all_discovers_once(self):
+        from certbot._internal.plugins.disco import PluginsRegistry
+        with mock.patch("certbot._internal.plugins.disco.importlib_metadata") as mock_meta:
+            mock_meta.entry_points.side_effect = [[EP_SA], [EP_WR]]
+            plugins1 = PluginsRegistry.find_all()
+            plugins2 = PluginsRegistry.find_all()
+        assert mock_meta.entry_points.call_count == 2
+        assert list(plugins1) == list(plugins2) == ["sa", "wr"]
+        # Each registry memoizes its own plugin instances
+        assert plugins1["sa"] is not plugins2["sa"]
+
+    def test_find_all_index(self):
+        from certbot._internal.plugins import disco
+        with tempfile.TemporaryDirectory() as tempdir:
+            index_path = os.path.join(tempdir, "index.json")
+            with mock.patch.dict(os.environ, {disco.PLUGIN_INDEX_ENV_VAR: index_path}):
+                with mock.patch("certbot._internal.plugins.disco.importlib_metadata") as mock_meta:
+                    mock_meta.entry_points.side_effect = [[EP_SA], [EP_WR]]
+                    disco.PluginsRegistry.find_all()
+                assert os.path.exists(index_path)
+
+                # A new process reads the index instead of scanning distributions
+                with mock.patch("certbot._internal.plugins.disco._discovered_entry_points",
+                                None):
+                    with mock.patch("certbot._internal.plugins.disco._scan_entry_points") \
+                            as mock_scan:
+                        plugins = disco.PluginsRegistry.find_all()
+                assert mock_scan.called is False
+                assert plugins["sa"].plugin_cls is standalone.Authenticator
+                assert plugins["wr"].plugin_cls is webroot.Authenticator
+
+                # Installing a distribution invalidates the index
+                with mock.patch("certbot._internal.plugins.disco._discovered_entry_points",
+                                None):
+                    with mock.patch("certbot._internal.plugins.disco"
+                                    "._distributions_fingerprint") as mock_fingerprint:
+                        mock_fingerprint.return_value = [["/new/path", 42.0]]
+                        with mock.patch("certbot._internal.plugins.disco._scan_entry_points") \
+                                as mock_scan:
+                            mock_scan.return_value = [EP_SA]
+                            plugins = disco.PluginsRegistry.find_all()
+                assert mock_scan.called is True
+                assert list(plugins) == ["sa"]
+
+    def test_find_all_broken_index(self):
+        from certbot._internal.plugins import disco
+        broken = importlib_metadata.EntryPoint(
+            name="broken", value="certbot._internal.plugins.nonexistent:Plugin",
+            group="certbot.plugins")
+        with mock.patch("certbot._internal.plugins.disco._read_entry_point_index") as mock_read:
+            mock_read.return_value = [broken]
+            with mock.patch("certbot._internal.plugins.disco._scan_entry_points") as mock_scan:
+                mock_scan.return_value = [EP_SA]
+                with mock.patch.dict(os.environ, {disco.PLUGIN_INDEX_ENV_VAR: "index.json"}):
+                    with mock.patch("certbot._internal.plugins.disco._write_entry_point_index"):
+                        plugins = disco.PluginsRegistry.find_all()
+        assert list(plugins) == ["sa"]
+
     def test_getitem(self):
         assert self.plugin_ep == self.reg["mock"]
 
@@ -2,7 +2,9 @@
 
 import collections
 import logging
+import socketserver
 import sys
+import threading
 import unittest
 from unittest import mock
 
@@ -10,12 +12,23 @@ import pytest
 
 from certbot import errors
 from certbot import util
+from certbot.compat import filesystem
 from certbot.compat import os
 from certbot.display import util as display_util
 from certbot.plugins import dns_common
 from certbot.plugins import dns_test_common
 from certbot.tests import util as test_util
 
+# dnspython is only needed to check DNS propagation, see certbot.plugins.dns_common
+try:
+    import dns.message
+    import dns.name
+    import dns.rdatatype
+    import dns.resolver
+    import dns.rrset
+except ImportError:  # pragma: no cover
+    dns = None  # type: ignore
+
 
 class DNSAuthenticatorTest(test_util.TempDirTestCase, dns_test_common.BaseAuthenticatorTest):
     # pylint: disable=protected-access
@@ -30,6 +43,7 @@ class DNSAuthenticatorTest(test_util.TempDirTestCase, dns_test_common.BaseAuthen
 
     class _FakeConfig:
         fake_propagation_seconds = 0
+        fake_check_propagation = False
         fake_config_key = 1
         fake_other_key = None
         fake_file_path = None
@@ -47,6 +61,51 @@ class DNSAuthenticatorTest(test_util.TempDirTestCase, dns_test_common.BaseAuthen
 
         self.auth._perform.assert_called_once_with(dns_test_common.DOMAIN, mock.ANY, mock.ANY)
 
+    @test_util.patch_display_util()
+    @mock.patch('certbot.plugins.dns_common.sleep')
+    def test_perform_iter(self, mock_sleep, unused_mock_get_utility):
+        ready = self.auth.perform_iter([self.achall])
+        assert list(ready) == [(self.achall, self.achall.response(self.achall.account_key))]
+        mock_sleep.assert_called_once_with(0)
+
+    @test_util.patch_display_util()
+    @mock.patch('certbot.plugins.dns_common.dns')
+    @mock.patch('certbot.plugins.dns_common.PropagationChecker')
+    def test_perform_iter_check_propagation(self, mock_checker, unused_mock_dns,
+                                            unused_mock_get_utility):
+        self.config.fake_check_propagation = True
+        other = dns_test_common.BaseAuthenticatorTest.achall.update(domain='example.org')
+        mock_checker.return_value.wait.return_value = iter([1])
+
+        ready = list(self.auth.perform_iter([self.achall, other]))
+
+        assert [achall.domain for achall, _ in ready] == ['example.org', 'example.com']
+        records = mock_checker.return_value.wait.call_args[0][0]
+        assert records == {
+            0: ('_acme-challenge.example.com', self.achall.validation(self.achall.account_key)),
+            1: ('_acme-challenge.example.org', other.validation(other.account_key))}
+        assert mock_checker.return_value.wait.call_args[0][1] == 0
+
+    @test_util.patch_display_util()
+    @mock.patch('certbot.plugins.dns_common.sleep')
+    @mock.patch('certbot.plugins.dns_common.PropagationChecker')
+    def test_perform_iter_check_propagation_without_dnspython(self, mock_checker, mock_sleep,
+                                                             unused_mock_get_utility):
+        self.config.fake_check_propagation = True
+
+        with mock.patch('certbot.plugins.dns_common.dns', None), \
+                mock.patch('certbot.plugins.dns_common.logger') as mock_logger, \
+                mock.patch.object(self.auth, '_perform') as mock_perform:
+            # The missing dnspython is reported before creating the records
+            mock_perform.side_effect = lambda *args: mock_logger.warning.assert_called_once()
+            ready = list(self.auth.perform_iter([self.achall]))
+
+        mock_perform.assert_called_once()
+        assert ready == [(self.achall, self.achall.response(self.achall.account_key))]
+        assert 'requires dnspython' in mock_logger.warning.call_args[0][0]
+        mock_checker.assert_not_called()
+        mock_sleep.assert_called_once_with(0)
+
     def test_cleanup(self):
         self.auth._attempt_cleanup = True
 
@@ -54,6 +113,23 @@ class DNSAuthenticatorTest(test_util.TempDirTestCase, dns_test_common.BaseAuthen
 
         self.auth._cleanup.assert_called_once_with(dns_test_common.DOMAIN, mock.ANY, mock.ANY)
 
+    @test_util.patch_display_util()
+    def test_perform_and_cleanup_batch(self, unused_mock_get_utility):
+        other = dns_test_common.BaseAuthenticatorTest.achall.update(domain='example.org')
+        expected = [
+            ('example.com', '_acme-challenge.example.com',
+             self.achall.validation(self.achall.account_key)),
+            ('example.org', '_acme-challenge.example.org', other.validation(other.account_key)),
+        ]
+
+        with mock.patch.object(self.auth, '_perform_batch') as mock_perform_batch:
+            self.auth.perform([self.achall, other])
+        mock_perform_batch.assert_called_once_with(expected)
+
+        with mock.patch.object(self.auth, '_cleanup_batch') as mock_cleanup_batch:
+            self.auth.cleanup([self.achall, other])
+        mock_cleanup_batch.assert_called_once_with(expected)
+
     @test_util.patch_display_util()
     def test_prompt(self, mock_get_utility):
         mock_display = mock_get_utility()
@@ -123,7 +199,231 @@ class DNSAuthenticatorTest(test_util.TempDirTestCase, dns_test_common.BaseAuthen
 
     def test_auth_hint(self):
         assert 'try increasing --fake-propagation-seconds (currently 0 seconds).' in \
-            self.auth.auth_hint([mock.MagicMock()])
+            self.auth.auth_hint([self.achall])
+
+
+class _LocalDNSServer(socketserver.ThreadingUDPServer):
+    """Stand-in for the authoritative nameservers of example.com.
+
+    The nameservers ns1 and ns2 of example.com are served on 127.0.0.1
+    and 127.0.0.2. Each instance answers for one of them and serves the
+    TXT records in `txt`.
+
+    """
+    daemon_threads = True
+
+    def __init__(self, address, port=0):
+        super().__init__((address, port), _LocalDNSHandler)
+        self.txt = {}
+        self.txt_queries = 0
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    def answer(self, query):
+        """Answer a query about example.com."""
+        response = dns.message.make_response(query)
+        question = query.question[0]
+        name = question.name.to_text()
+        answer = None
+        if question.rdtype == dns.rdatatype.SOA and name == 'example.com.':
+            answer = ['ns1.example.com. admin.example.com. 1 3600 600 86400 60']
+        elif question.rdtype == dns.rdatatype.NS and name == 'example.com.':
+            answer = ['ns1.example.com.', 'ns2.example.com.']
+        elif question.rdtype == dns.rdatatype.A and name == 'ns1.example.com.':
+            answer = ['127.0.0.1']
+        elif question.rdtype == dns.rdatatype.A and name == 'ns2.example.com.':
+            answer = ['127.0.0.2']
+        elif question.rdtype == dns.rdatatype.TXT:
+            self.txt_queries += 1
+            answer = ['"{0}"'.format(value) for value in self.txt.get(name, ())]
+        if answer:
+            response.answer.append(dns.rrset.from_text_list(
+                question.name, 60, 'IN', question.rdtype, answer))
+        return response
+
+    def stop(self):
+        """Stop serving and release the port."""
+        self.shutdown()
+        self.server_close()
+
+
+class _LocalDNSHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        data, sock = self.request
+        sock.sendto(self.server.answer(dns.message.from_wire(data)).to_wire(), self.client_address)
+
+
+@unittest.skipIf(dns is None, reason='dnspython is not installed')
+class PropagationCheckerTest(unittest.TestCase):
+    """Tests for certbot.plugins.dns_common.PropagationChecker."""
+
+    def setUp(self):
+        self.ns1 = _LocalDNSServer('127.0.0.1')
+        self.addCleanup(self.ns1.stop)
+        port = self.ns1.server_address[1]
+        try:
+            self.ns2 = _LocalDNSServer('127.0.0.2', port)
+        except OSError:  # pragma: no cover
+            self.skipTest('127.0.0.2 is not available')
+        self.addCleanup(self.ns2.stop)
+        resolver = dns.resolver.Resolver(configure=False)
+        resolver.nameservers = ['127.0.0.1']
+        resolver.port = port
+        self.checker = dns_common.PropagationChecker(resolver, port=port, query_timeout=1)
+        self.name = '_acme-challenge.www.example.com'
+        self.records = {'first': (self.name, 'token1'), 'second': (self.name, 'token2')}
+
+    @mock.patch('certbot.plugins.dns_common.sleep')
+    def test_propagated(self, mock_sleep):
+        for server in (self.ns1, self.ns2):
+            server.txt[self.name + '.'] = ['token1', 'token2']
+        assert list(self.checker.wait(self.records, 30)) == ['first', 'second']
+        mock_sleep.assert_not_called()
+        assert (self.ns1.txt_queries, self.ns2.txt_queries) == (1, 1)
+
+    @mock.patch('certbot.plugins.dns_common.sleep')
+    def test_all_nameservers_must_agree(self, mock_sleep):
+        self.ns1.txt[self.name + '.'] = ['token1', 'token2']
+        self.ns2.txt[self.name + '.'] = ['token1']
+
+        def propagate(unused_seconds):
+            if mock_sleep.call_count == 3:
+                self.ns2.txt[self.name + '.'].append('token2')
+        mock_sleep.side_effect = propagate
+
+        ready = self.checker.wait(self.records, 30)
+        assert next(ready) == 'first'
+        assert list(ready) == ['second']
+        assert [call[0][0] for call in mock_sleep.call_args_list] == [0.5, 1, 2]
+
+    @mock.patch('certbot.plugins.dns_common.monotonic')
+    @mock.patch('certbot.plugins.dns_common.sleep')
+    def test_timeout(self, mock_sleep, mock_monotonic):
+        mock_monotonic.side_effect = [0, 0, 9.75, 10]
+        assert list(self.checker.wait(self.records, 10)) == []
+        # The last delay is cut short by the deadline
+        assert [call[0][0] for call in mock_sleep.call_args_list] == [0.5, 0.25]
+        assert self.ns1.txt_queries == 3
+
+    def test_unknown_zone(self):
+        resolver = mock.MagicMock()
+        resolver.resolve.side_effect = dns.resolver.NoNameservers
+        checker = dns_common.PropagationChecker(resolver)
+        assert list(checker.wait(self.records, 0)) == []
+
+        with mock.patch('certbot.plugins.dns_common.dns.resolver.zone_for_name',
+                        return_value=dns.name.from_text('example.com')):
+            assert list(checker.wait(self.records, 0)) == []
+
+    @mock.patch('certbot.plugins.dns_common.dns.query.udp_with_fallback')
+    def test_unreachable_nameserver(self, mock_query):
+        mock_query.side_effect = OSError
+        self.ns1.txt[self.name + '.'] = ['token1', 'token2']
+        assert list(self.checker.wait(self.records, 0)) == []
+
+
+class ZoneCacheTest(test_util.TempDirTestCase):
+    """Tests for certbot.plugins.dns_common.ZoneCache."""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(dns_common._zone_stores, clear=True)  # pylint: disable=protected-access
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.path = os.path.join(self.tempdir, dns_common.ZONE_CACHE_FILE)
+        self.discover = mock.MagicMock(side_effect=lambda name: name.split('.', 1)[1])
+
+    def _cache(self, credentials=('token',)):
+        return dns_common.ZoneCache(self.path, 'dns-fake', credentials)
+
+    def test_zones_shared_within_run(self):
+        assert self._cache().find('www.example.com', self.discover) == 'example.com'
+        assert self._cache().find('www.example.com', self.discover) == 'example.com'
+        assert self.discover.call_count == 1
+
+        # Other credentials may give access to other zones
+        assert self._cache(('other',)).find('www.example.com', self.discover) == 'example.com'
+        assert self.discover.call_count == 2
+        with open(self.path) as cache_file:
+            assert 'token' not in cache_file.read()
+
+    def test_zones_persisted(self):
+        self._cache().find('www.example.com', self.discover)
+        dns_common._zone_stores.clear()  # pylint: disable=protected-access
+
+        assert self._cache().find('www.example.com', self.discover) == 'example.com'
+        assert self.discover.call_count == 1
+
+    @mock.patch('certbot.plugins.dns_common.time')
+    def test_zones_expire(self, mock_time):
+        mock_time.return_value = 1000
+        self._cache().find('www.example.com', self.discover)
+        mock_time.return_value = 1000 + dns_common.ZONE_CACHE_TTL
+        self._cache().find('www.example.com', self.discover)
+        assert self.discover.call_count == 2
+
+        # Expired zones aren't loaded from the cache file either
+        dns_common._zone_stores.clear()  # pylint: disable=protected-access
+        mock_time.return_value += dns_common.ZONE_CACHE_TTL
+        self._cache().find('www.example.com', self.discover)
+        assert self.discover.call_count == 3
+
+    def test_forget(self):
+        self._cache().forget('www.example.com')
+        self._cache().find('www.example.com', self.discover)
+        self._cache().forget('www.example.com')
+        self._cache().find('www.example.com', self.discover)
+        assert self.discover.call_count == 2
+
+    def test_discovery_failure_not_cached(self):
+        self.discover.side_effect = errors.PluginError
+        with pytest.raises(errors.PluginError):
+            self._cache().find('www.example.com', self.discover)
+        assert not os.path.exists(self.path)
+
+    def test_unreadable_cache(self):
+        with open(self.path, 'w') as cache_file:
+            cache_file.write('{"version": 1, "zones": {"dns-fake": []}}')
+        assert self._cache().find('www.example.com', self.discover) == 'example.com'
+        assert self.discover.call_count == 1
+
+    @mock.patch('certbot.plugins.dns_common.filesystem.replace')
+    def test_write_failure(self, mock_replace):
+        mock_replace.side_effect = OSError
+        self._cache().find('www.example.com', self.discover)
+        self._cache().find('www.example.com', self.discover)
+        assert self.discover.call_count == 1
+        assert not os.path.exists(self.path)
+        assert not [name for name in os.listdir(os.path.dirname(self.path))
+                    if name.endswith('.tmp')]
+
+    def test_written_privately(self):
+        self._cache().find('www.example.com', self.discover)
+        assert filesystem.check_mode(self.path, 0o600)
+
+    def test_memory_only(self):
+        cache = dns_common.ZoneCache(None, 'dns-fake', ['token'])
+        cache.find('www.example.com', self.discover)
+        cache.find('www.example.com', self.discover)
+        assert self.discover.call_count == 1
+
+    def test_zone_cache(self):
+        config = mock.MagicMock(work_dir=self.tempdir)
+        dns_common.zone_cache(config, 'dns-fake', ['token']).find('www.example.com', self.discover)
+        assert os.path.exists(self.path)
+
+    def test_forget_zones(self):
+        config = mock.MagicMock(work_dir=self.tempdir)
+        self._cache().find('www.example.com', self.discover)
+        self._cache(('other',)).find('www.example.com', self.discover)
+        self._cache().find('mail.example.com', self.discover)
+
+        dns_common.forget_zones(config, ['www.example.com', 'www.example.org'])
+        dns_common._zone_stores.clear()  # pylint: disable=protected-access
+        self._cache().find('www.example.com', self.discover)
+        self._cache(('other',)).find('www.example.com', self.discover)
+        self._cache().find('mail.example.com', self.discover)
+        assert self.discover.call_count == 5
 
 
 class CredentialsConfigurationTest(test_util.TempDirTestCase):
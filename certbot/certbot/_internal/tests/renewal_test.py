@@ -331,5 +331,279 @@ class DescribeResultsTest(unittest.TestCase):
         ])
 
 
+class _DeployedLineage:
+    """Lineage keeping track of the version its links point to."""
+    def __init__(self, version):
+        self.version = version
+        self.updates = []
+
+    def current_version(self, unused_kind):
+        return self.version
+
+    def update_all_links_to(self, version):
+        self.version = version
+        self.updates.append(version)
+
+
+class ConcurrentRenewalTest(test_util.ConfigTestCase):
+    """Tests for renewing lineages with --renew-concurrency."""
+    def setUp(self):
+        super().setUp()
+        self.config.renew_concurrency = 4
+        self.config.random_sleep_on_renew = False
+        self.lineages = {}
+        patcher = test_util.patch_display_util()
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _reconstitute(self, lineage_config, full_path):
+        name = storage.lineagename_for_filename(full_path)
+        params = self.lineages[name]
+        lineage_config.domains = params['domains']
+        lineage_config.installer = params.get('installer')
+        lineage_config.authenticator = params.get('authenticator', 'webroot')
+        if params.get('broken'):
+            return None
+        return mock.MagicMock(fullchain=name + '/fullchain.pem', lineagename=name,
+                              names=mock.MagicMock(return_value=params['domains']),
+                              configfile=mock.MagicMock(filename=full_path))
+
+    def _call(self):
+        from certbot._internal import renewal
+        conf_files = [name + '.conf' for name in self.lineages]
+        with mock.patch('certbot._internal.renewal.storage.renewal_conf_files') as mock_files, \
+             mock.patch('certbot._internal.renewal.reconstitute') as mock_reconstitute, \
+             mock.patch('certbot._internal.renewal.should_renew') as mock_should_renew, \
+             mock.patch('certbot._internal.renewal.updater'), \
+             mock.patch('certbot._internal.renewal.plugins_disco'), \
+             mock.patch('certbot._internal.renewal._renew_describe_results') as mock_describe, \
+             mock.patch('certbot._internal.main.renew_cert') as mock_renew_cert, \
+             mock.patch('certbot._internal.renewal.lineage_index.save_pending') as mock_save:
+            self.save_pending = mock_save
+            mock_files.return_value = conf_files
+            mock_reconstitute.side_effect = self._reconstitute
+            mock_should_renew.return_value = True
+            mock_renew_cert.side_effect = (
+                lambda *args, **kwargs: self._renew_cert(*args, **kwargs))
+            try:
+                result = renewal.handle_renewal_request(self.config)
+            finally:
+                self.describe_args = mock_describe.call_args[0]
+        return result
+
+    def _renew_cert(self, unused_config, unused_plugins, lineage, **unused_kwargs):
+        # The lineage index is written once all lineages are renewed
+        self.save_pending.assert_not_called()
+        if lineage.lineagename.startswith('fail'):
+            raise errors.Error('renewal failed')
+
+    def test_results_keep_conf_file_order(self):
+        for index in range(6):
+            self.lineages['cert%d' % index] = {'domains': ['%d.example.com' % index]}
+        renewed, failed = self._call()
+        assert renewed == ['%d.example.com' % index for index in range(6)]
+        self.save_pending.assert_called_once_with()
+        assert failed == []
+        assert self.describe_args[1] == ['cert%d/fullchain.pem' % index for index in range(6)]
+
+    def test_processing_notified_with_each_renewal(self):
+        self.config.renew_concurrency = 1
+        self.lineages['cert1'] = {'domains': ['a.example.com']}
+        self.lineages['cert2'] = {'domains': ['b.example.com']}
+        events = []
+
+        def renew_cert(unused_config, unused_plugins, lineage, **unused_kwargs):
+            events.append('renew ' + lineage.lineagename)
+        self._renew_cert = renew_cert
+        with mock.patch('certbot._internal.renewal.display_util.notification') as mock_notify:
+            mock_notify.side_effect = lambda message, pause: events.append(message)
+            self._call()
+        assert events == ['Processing cert1.conf', 'renew cert1',
+                          'Processing cert2.conf', 'renew cert2']
+
+    def test_failures_and_parse_failures(self):
+        self.lineages['cert'] = {'domains': ['example.com']}
+        self.lineages['fail'] = {'domains': ['example.org']}
+        self.lineages['broken'] = {'domains': ['example.net'], 'broken': True}
+        with pytest.raises(errors.Error, match='1 renew failure'):
+            self._call()
+        _, successes, failures, _, parse_failures = self.describe_args
+        assert successes == ['cert/fullchain.pem']
+        assert failures == ['fail/fullchain.pem']
+        assert parse_failures == ['broken.conf']
+
+    def test_group_conflicting_lineages(self):
+        from certbot._internal import renewal
+        lineages = []
+        for index, (domains, installer, authenticator) in enumerate([
+                (['a.example.com'], 'nginx', 'webroot'),
+                (['b.example.com'], None, 'webroot'),
+                (['c.example.com'], 'nginx', 'webroot'),
+                (['b.example.com', 'd.example.com'], None, 'dns-rfc2136'),
+                (['e.example.com'], None, 'standalone'),
+                (['f.example.com'], None, 'standalone'),
+                (['g.example.com'], None, 'webroot')]):
+            lineage_config = mock.MagicMock(domains=domains, installer=installer,
+                                            authenticator=authenticator)
+            lineages.append((index, lineage_config, mock.MagicMock()))
+        groups = renewal._group_conflicting_lineages(lineages)  # pylint: disable=protected-access
+        assert sorted([index for index, _, _ in group] for group in groups) == [
+            [0, 2], [1, 3], [4, 5], [6]]
+
+    def test_coalesced_reloads(self):
+        self.config.renew_concurrency = 1
+        self.config.coalesce_reloads = True
+        self.lineages['cert1'] = {'domains': ['a.example.com'], 'installer': 'nginx'}
+        self.lineages['cert2'] = {'domains': ['b.example.com'], 'installer': 'nginx'}
+        self.lineages['cert3'] = {'domains': ['c.example.com'], 'installer': 'apache'}
+        installers = {name: mock.MagicMock() for name in self.lineages}
+        self._renew_cert = lambda config, plugins, lineage, defer_restart: (
+            installers[lineage.lineagename] if defer_restart else None)
+        self._call()
+        installers['cert1'].restart.assert_not_called()
+        assert installers['cert2'].config_test.call_count == 1
+        assert installers['cert2'].restart.call_count == 1
+        assert installers['cert3'].restart.call_count == 1
+
+    def test_coalesced_reload_one_at_a_time(self):
+        from certbot._internal import renewal
+        lineages = [_DeployedLineage(2) for _ in range(3)]
+        installer = mock.MagicMock()
+
+        def restart():
+            if lineages[1].version == 2:
+                raise RuntimeError('bad certificate')
+        installer.restart.side_effect = restart
+        results = [
+            renewal._RenewalResult(renewal._SUCCESS, 'cert%d' % index, [], installer,
+                                   ('nginx',), lineage, 1)
+            for index, lineage in enumerate(lineages)]
+        results = renewal._reload_deferred_installers(results)
+        assert [result.status for result in results] == [
+            renewal._SUCCESS, renewal._FAILURE, renewal._SUCCESS]
+        assert [lineage.version for lineage in lineages] == [2, 1, 2]
+        assert lineages[1].updates == [1, 2, 1]
+
+    def test_coalesced_reload_previous_versions_fail(self):
+        from certbot._internal import renewal
+        lineage = _DeployedLineage(2)
+        installer = mock.MagicMock()
+        installer.config_test.side_effect = errors.MisconfigurationError
+        results = [renewal._RenewalResult(renewal._SUCCESS, 'cert', [], installer,
+                                          ('nginx',), lineage, 1)]
+        results = renewal._reload_deferred_installers(results)
+        assert results[0].status == renewal._FAILURE
+        # The renewed certificate is kept since it isn't to blame
+        assert lineage.updates == [1, 2]
+        installer.restart.assert_not_called()
+
+    def test_coalesced_reload_failure(self):
+        from certbot._internal import renewal
+        installer = mock.MagicMock()
+        installer.config_test.side_effect = errors.MisconfigurationError
+        results = [
+            renewal._RenewalResult(renewal._SUCCESS, 'cert', ['example.com'], installer,
+                                   ('nginx',)),
+            renewal._RenewalResult(renewal._SKIPPED, 'skipped', [])]
+        results = renewal._reload_deferred_installers(results)
+        assert [result.status for result in results] == [renewal._FAILURE, renewal._SKIPPED]
+        installer.restart.assert_not_called()
+
+    def test_installer_key(self):
+        from certbot._internal import renewal
+        self.config.installer = 'nginx'
+        self.config.nginx_server_root = '/etc/nginx'
+        assert renewal._installer_key(self.config) == (  # pylint: disable=protected-access
+            'nginx', 'nginx_server_root=/etc/nginx')
+
+    @mock.patch('certbot._internal.renewal.ocsp.RevocationChecker.check_many_by_paths')
+    def test_revocation_stage(self, mock_check_many):
+        from certbot._internal import renewal
+        lineages = []
+        for index, (forced, autorenew, in_window, dry_run) in enumerate([
+                (True, True, False, False), (False, False, False, False),
+                (False, True, True, False), (False, True, False, False),
+                (False, True, False, False), (False, True, False, True)]):
+            lineage_config = mock.MagicMock(renew_by_default=forced, dry_run=dry_run)
+            lineage = mock.MagicMock()
+            lineage.autorenewal_is_enabled.return_value = autorenew
+            lineage.within_renewal_window.return_value = in_window
+            # The most recent version isn't deployed yet
+            lineage.latest_common_version.return_value = 2
+            lineage.version.side_effect = (
+                lambda kind, version, index=index: f'{index}/{kind}{version}.pem')
+            lineages.append((index, lineage_config, lineage))
+        mock_check_many.return_value = {('3/cert2.pem', '3/chain2.pem'): False,
+                                        ('4/cert2.pem', '4/chain2.pem'): True,
+                                        ('5/cert2.pem', '5/chain2.pem'): False}
+        self.config.ocsp_check_budget = 30
+        revoked = renewal._check_revocations(self.config, lineages)  # pylint: disable=protected-access
+        # Lineages renewed by a dry run are checked with the others
+        assert revoked == {3: False, 4: True, 5: False}
+        mock_check_many.assert_called_once_with(
+            [('3/cert2.pem', '3/chain2.pem'), ('4/cert2.pem', '4/chain2.pem'),
+             ('5/cert2.pem', '5/chain2.pem')], deadline=30)
+
+        # A budget of 0 skips the OCSP stage
+        self.config.ocsp_check_budget = 0
+        mock_check_many.reset_mock()
+        revoked = renewal._check_revocations(self.config, lineages)  # pylint: disable=protected-access
+        assert revoked == {3: False, 4: False, 5: False}
+        assert mock_check_many.called is False
+
+    def test_renewal_uses_revocation_stage(self):
+        self.config.renew_concurrency = 1
+        self.lineages['cert'] = {'domains': ['example.com']}
+        with mock.patch('certbot._internal.renewal._check_revocations') as mock_check:
+            mock_check.return_value = {0: True}
+            with mock.patch('certbot._internal.renewal._renew_lineage') as mock_renew:
+                mock_renew.return_value = mock.MagicMock(status='success', installer=None)
+                self._call()
+        assert mock_renew.call_args[0][3] is True
+
+    @mock.patch('certbot._internal.renewal.key_pool.KeyPool')
+    def test_pregenerated_keys(self, mock_pool):
+        self.config.pregenerate_keys = 2
+        self.lineages['cert1'] = {'domains': ['a.example.com']}
+        self.lineages['cert2'] = {'domains': ['b.example.com']}
+        self._call()
+        mock_pool.assert_called_once_with(2)
+        specs = list(mock_pool.return_value.schedule.call_args[0][0])
+        assert len(specs) == 2
+        assert mock_pool.return_value.close.call_count == 1
+
+    def test_new_key_specs(self):
+        from certbot._internal import key_pool
+        from certbot._internal import renewal
+        lineages = []
+        for index, (forced, reuse_key, new_key, autorenew) in enumerate([
+                (True, False, False, False), (False, True, False, True),
+                (False, True, True, True), (False, False, False, True),
+                (False, False, False, False), (False, False, False, True),
+                (False, False, False, True), (False, False, False, True)]):
+            lineage_config = mock.MagicMock(renew_by_default=forced, dry_run=False,
+                                            reuse_key=reuse_key, new_key=new_key,
+                                            key_type='rsa', rsa_key_size=2048 + index)
+            lineage = mock.MagicMock()
+            lineage.autorenewal_is_enabled.return_value = autorenew
+            lineage.within_renewal_window.return_value = True
+            lineages.append((index, lineage_config, lineage))
+        # The renewal window of this lineage can't be checked
+        lineages[6][2].within_renewal_window.side_effect = ValueError
+        # Lineages 5 and 7 were checked for revocation and only the last is revoked
+        specs = renewal._new_key_specs(  # pylint: disable=protected-access
+            lineages, {5: False, 7: True})
+        assert specs == [key_pool.KeySpec('rsa', bits, 'secp256r1')
+                         for bits in (2048, 2050, 2051, 2055)]
+
+    @mock.patch('certbot._internal.renewal.time.sleep')
+    def test_random_delay_applied_once(self, mock_sleep):
+        from certbot._internal import renewal
+        delay = renewal._RandomDelay(True)  # pylint: disable=protected-access
+        delay.apply()
+        delay.apply()
+        assert mock_sleep.call_count == 1
+
+
 if __name__ == "__main__":
     sys.exit(pytest.main(sys.argv[1:] + [__file__]))  # pragma: no cover
@@ -165,6 +165,8 @@ class BaseRenewableCertTest(test_util.ConfigTestCase):
             f.write(kind.encode('ascii') if value is None else value)
         if kind == "privkey":
             filesystem.chmod(link, 0o600)
+        # The lineage didn't make this change itself
+        self.test_rc._invalidate_snapshot()  # pylint: disable=protected-access
 
     def _write_out_ex_kinds(self):
         for kind in ALL_FOUR:
@@ -415,6 +417,53 @@ class RenewableCertTests(BaseRenewableCertTest):
         for kind in ALL_FOUR:
             assert self.test_rc.current_version(kind) == 11
 
+    def test_snapshot_avoids_filesystem_lookups(self):
+        from certbot._internal import storage
+        self._write_out_ex_kinds()
+        with mock.patch("certbot._internal.storage.os.listdir",
+                        wraps=os.listdir) as mock_listdir:
+            with mock.patch("certbot._internal.storage.get_link_target",
+                            wraps=storage.get_link_target) as mock_target:
+                for _ in range(3):
+                    assert self.test_rc.latest_common_version() == 12
+                    for kind in ALL_FOUR:
+                        assert self.test_rc.current_version(kind) == 11
+                        assert self.test_rc.available_versions(kind) == [11, 12]
+        assert mock_listdir.call_count == len(ALL_FOUR)
+        assert mock_target.call_count == len(ALL_FOUR)
+        assert self.test_rc.snapshot_stats["hits"] > self.test_rc.snapshot_stats["reads"]
+
+        # The cached lists can't be changed by callers
+        self.test_rc.available_versions("cert").append(42)
+        assert self.test_rc.available_versions("cert") == [11, 12]
+
+    @mock.patch("certbot._internal.storage.relevant_values")
+    def test_snapshot_invalidation(self, mock_rv):
+        mock_rv.side_effect = lambda x: x.to_dict()
+        self._write_out_ex_kinds()
+        assert self.test_rc.latest_common_version() == 12
+
+        version = self.test_rc.save_successor(11, b"cert", None, b"chain", self.config)
+        assert self.test_rc.latest_common_version() == version == 13
+        assert self.test_rc.current_version("cert") == 11
+
+        self.test_rc.update_all_links_to(version)
+        assert self.test_rc.current_version("cert") == version
+
+        self.test_rc.truncate(0)
+        assert self.test_rc.available_versions("cert") == [version]
+
+    @mock.patch("certbot._internal.storage.logger")
+    def test_log_snapshot_stats(self, mock_logger):
+        self._write_out_ex_kinds()
+        self.test_rc.latest_common_version()
+        self.test_rc.latest_common_version()
+        self.test_rc.log_snapshot_stats()
+        assert mock_logger.debug.call_args[0][1:] == (
+            "example.org", self.test_rc.snapshot_stats["hits"],
+            self.test_rc.snapshot_stats["reads"])
+        assert self.test_rc.snapshot_stats["hits"] == 1
+
     def test_has_pending_deployment(self):
         for ver in range(1, 6):
             for kind in ALL_FOUR:
@@ -438,6 +487,7 @@ class RenewableCertTests(BaseRenewableCertTest):
 
         # Trying missing cert
         os.unlink(self.test_rc.cert)
+        self.test_rc._invalidate_snapshot()  # pylint: disable=protected-access
         with pytest.raises(errors.CertStorageError):
             self.test_rc.names()
 
@@ -496,11 +546,13 @@ class RenewableCertTests(BaseRenewableCertTest):
         assert not self.test_rc.autorenewal_is_enabled()
 
     @mock.patch.object(configuration.NamespaceConfig, 'set_by_user')
+    @mock.patch("certbot._internal.storage.RenewableCert.within_renewal_window")
     @mock.patch("certbot._internal.storage.RenewableCert.ocsp_revoked")
-    def test_should_autorenew(self, mock_ocsp, mock_set_by_user):
+    def test_should_autorenew(self, mock_ocsp, mock_window, mock_set_by_user):
         """Test should_autorenew on the basis of reasons other than
         expiry time window."""
         mock_set_by_user.return_value = False
+        mock_window.return_value = False
         # Autorenewal turned off
         self.test_rc.configuration["renewalparams"] = {"autorenew": "False"}
         assert not self.test_rc.should_autorenew()
@@ -511,6 +563,18 @@ class RenewableCertTests(BaseRenewableCertTest):
         mock_ocsp.return_value = True
         assert self.test_rc.should_autorenew()
         mock_ocsp.return_value = False
+        assert not self.test_rc.should_autorenew()
+
+        # A known OCSP status is used instead of querying the responder
+        mock_ocsp.reset_mock()
+        assert self.test_rc.should_autorenew(revoked=True)
+        assert not self.test_rc.should_autorenew(revoked=False)
+        assert mock_ocsp.called is False
+
+        # OCSP isn't queried for certificates within their renewal window
+        mock_window.return_value = True
+        assert self.test_rc.should_autorenew()
+        assert mock_ocsp.called is False
 
     @mock.patch("certbot._internal.storage.relevant_values")
     def test_save_successor(self, mock_rv):
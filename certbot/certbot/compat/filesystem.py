@@ -5,6 +5,7 @@ from contextlib import contextmanager
 import errno
 import os  # pylint: disable=os-module-forbidden
 import stat
+import threading
 from typing import Any
 from typing import Dict
 from typing import Generator
@@ -37,6 +38,10 @@ class _WindowsUmask:
 
 _WINDOWS_UMASK = _WindowsUmask()
 
+# The umask is process wide, so concurrent temp_umask() blocks running in different threads
+# could otherwise restore each other's masks in the wrong order.
+_TEMP_UMASK_LOCK = threading.RLock()
+
 
 def chmod(file_path: str, mode: int) -> None:
     """
@@ -84,13 +89,14 @@ def temp_umask(mask: int) -> Generator[None, None, None]:
 
     :param int mask: The user file-creation mode mask to apply temporarily
     """
-    old_umask: Optional[int] = None
-    try:
-        old_umask = umask(mask)
-        yield None
-    finally:
-        if old_umask is not None:
-            umask(old_umask)
+    with _TEMP_UMASK_LOCK:
+        old_umask: Optional[int] = None
+        try:
+            old_umask = umask(mask)
+            yield None
+        finally:
+            if old_umask is not None:
+                umask(old_umask)
 
 
 # One could ask why there is no copy_ownership() function, or even a reimplementation
@@ -282,6 +282,11 @@ class NamespaceConfig:
         """Configuration backups directory."""
         return os.path.join(self.namespace.work_dir, constants.BACKUP_DIR)
 
+    @property
+    def ocsp_cache_dir(self) -> str:
+        """Directory where validated OCSP responses are cached."""
+        return os.path.join(self.namespace.work_dir, constants.OCSP_CACHE_DIR)
+
     @property
     def in_progress_dir(self) -> str:
         """Directory used before a permanent checkpoint is finalized."""
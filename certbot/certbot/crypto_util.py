@@ -611,10 +611,7 @@ def find_chain_with_issuer(fullchains: List[str], issuer_cn: str,
     :rtype: `str`
     """
     for chain in fullchains:
-        certs = CERT_PEM_REGEX.findall(chain.encode())
-        top_cert = x509.load_pem_x509_certificate(certs[-1], default_backend())
-        top_issuer_cn = top_cert.issuer.get_attributes_for_oid(x509.NameOID.COMMON_NAME)
-        if top_issuer_cn and top_issuer_cn[0].value == issuer_cn:
+        if chain_has_issuer(chain, issuer_cn):
             return chain
 
     # Nothing matched, return whatever was first in the list.
@@ -623,3 +620,22 @@ def find_chain_with_issuer(fullchains: List[str], issuer_cn: str,
                     "issuer '%s', but no chain from the CA matched this issuer. Using "
                     "the default certificate chain instead.", issuer_cn)
     return fullchains[0]
+
+
+def chain_has_issuer(fullchain: str, issuer_cn: str) -> bool:
+    """Does the topmost intermediate of a chain have an Issuer Common Name
+    matching issuer_cn?
+
+    This is the test :func:`find_chain_with_issuer` applies to each chain,
+    for use when chains are examined one at a time.
+
+    :param str fullchain: The fullchain in PEM chain format.
+    :param str issuer_cn: The exact Subject Common Name to match against the
+        issuer of the topmost certificate of the chain.
+
+    :rtype: bool
+    """
+    certs = CERT_PEM_REGEX.findall(fullchain.encode())
+    top_cert = x509.load_pem_x509_certificate(certs[-1], default_backend())
+    top_issuer_cn = top_cert.issuer.get_attributes_for_oid(x509.NameOID.COMMON_NAME)
+    return bool(top_issuer_cn) and top_issuer_cn[0].value == issuer_cn
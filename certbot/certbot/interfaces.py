@@ -4,8 +4,10 @@ from abc import abstractmethod
 from argparse import ArgumentParser
 from typing import Any
 from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Type
 from typing import TYPE_CHECKING
 from typing import Union
@@ -14,6 +16,7 @@ from acme.challenges import Challenge
 from acme.challenges import ChallengeResponse
 from acme.client import ClientV2
 from certbot import configuration
+from certbot import errors
 from certbot.achallenges import AnnotatedChallenge
 
 try:
@@ -214,6 +217,44 @@ class Authenticator(Plugin):
         """
 
 
+class StreamingAuthenticator(Authenticator):
+    """Authenticator reporting each challenge as soon as it is ready.
+
+    With ``--answer-challenges-early``, Certbot asks the ACME server to
+    validate a challenge as soon as :func:`perform_iter` yields its
+    response, rather than once all challenges are set up. :func:`perform` is implemented with
+    :func:`perform_iter`, so plugins only need to implement the latter.
+
+    """
+
+    @abstractmethod
+    def perform_iter(self, achalls: List[AnnotatedChallenge]
+                     ) -> Iterator[Tuple[AnnotatedChallenge, ChallengeResponse]]:
+        """Perform the given challenges, yielding each one once it is ready.
+
+        :param list achalls: Non-empty (guaranteed) list of
+            :class:`~certbot.achallenges.AnnotatedChallenge`
+            instances, such that it contains types found within
+            :func:`get_chall_pref` only.
+
+        :returns: pairs of an annotated challenge and its
+            :class:`~acme.challenges.ChallengeResponse`, for every
+            challenge in `achalls`, in any order, as soon as the
+            challenge can be validated
+        :rtype: :class:`collections.Iterator` of `tuple`
+
+        :raises .PluginError: If some or all challenges cannot be performed
+
+        """
+
+    def perform(self, achalls: List[AnnotatedChallenge]) -> List[ChallengeResponse]:
+        """Perform the given challenges, see :func:`Authenticator.perform`."""
+        ready = {id(achall): response for achall, response in self.perform_iter(achalls)}
+        if any(id(achall) not in ready for achall in achalls):
+            raise errors.PluginError("Some challenges have not been performed.")
+        return [ready[id(achall)] for achall in achalls]
+
+
 class Installer(Plugin):
     """Generic Certbot Installer Interface.
 
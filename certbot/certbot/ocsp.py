@@ -1,13 +1,16 @@
 """Tools for checking certificate revocation."""
+from concurrent import futures
 from datetime import datetime
 from datetime import timedelta
 import logging
 import re
 import subprocess
 from subprocess import PIPE
+import threading
+from typing import Dict
+from typing import Iterable
 from typing import Optional
 from typing import Tuple
-import warnings
 
 from cryptography import x509
 from cryptography.exceptions import InvalidSignature
@@ -22,18 +25,36 @@ import requests
 from certbot import crypto_util
 from certbot import errors
 from certbot import util
+from certbot.compat import filesystem
+from certbot.compat import os
 from certbot.compat.os import getenv
 from certbot.interfaces import RenewableCert
 
 logger = logging.getLogger(__name__)
 
+_CHECK_MANY_WORKERS = 10
+"""Maximum number of concurrent OCSP checks made by `RevocationChecker.check_many`."""
+
+_UTC_UPDATE_TIMES = hasattr(ocsp.OCSPResponse, 'this_update_utc')
+"""Whether OCSP responses have the timezone-aware update times of cryptography>=43.0.0."""
+
 
 class RevocationChecker:
     """This class figures out OCSP checking on this system, and performs it."""
 
-    def __init__(self, enforce_openssl_binary_usage: bool = False) -> None:
+    def __init__(self, enforce_openssl_binary_usage: bool = False,
+                 cache_dir: Optional[str] = None) -> None:
+        """Create a revocation checker.
+
+        :param bool enforce_openssl_binary_usage: query OCSP with the
+            ``openssl`` binary instead of cryptography
+        :param str cache_dir: if set, validated OCSP responses are kept in
+            this directory and reused until their nextUpdate time
+
+        """
         self.broken = False
         self.use_openssl_binary = enforce_openssl_binary_usage
+        self._cache = _ResponseCache(cache_dir) if cache_dir else None
 
         if self.use_openssl_binary:
             if not util.exe_exists("openssl"):
@@ -62,6 +83,87 @@ class RevocationChecker:
         """
         return self.ocsp_revoked_by_paths(cert.cert_path, cert.chain_path)
 
+    def check_many(self, certs: Iterable[RenewableCert], timeout: int = 10,
+                   deadline: Optional[float] = None) -> Dict[RenewableCert, bool]:
+        """Get the revoked status of several certificates at once.
+
+        This is :meth:`ocsp_revoked` for many certificates, see
+        :meth:`check_many_by_paths`.
+
+        :param certs: Certificate objects
+        :type certs: `list` of `.interfaces.RenewableCert`
+        :param int timeout: Timeout (in seconds) for each OCSP query
+        :param float deadline: if set, the maximum number of seconds
+            spent on all checks; certificates whose status isn't known
+            by then are considered not revoked
+
+        :returns: for each certificate, True if revoked; False if valid
+            or the check failed or cert is expired.
+        :rtype: dict
+
+        """
+        paths = {cert: (cert.cert_path, cert.chain_path) for cert in certs}
+        statuses = self.check_many_by_paths(paths.values(), timeout, deadline)
+        return {cert: statuses[cert_paths] for cert, cert_paths in paths.items()}
+
+    def check_many_by_paths(self, paths: Iterable[Tuple[str, str]], timeout: int = 10,
+                            deadline: Optional[float] = None) -> Dict[Tuple[str, str], bool]:
+        """Get the revoked status of several certificates at once.
+
+        Certificates are checked concurrently. Queries to the same OCSP
+        responder share a session, so its keep-alive connections are
+        reused instead of opening a new connection for every certificate.
+
+        :param paths: Certificate and chain filepaths of each certificate
+        :type paths: `list` of `tuple` of `str`
+        :param int timeout: Timeout (in seconds) for each OCSP query
+        :param float deadline: if set, the maximum number of seconds
+            spent on all checks; certificates whose status isn't known
+            by then are considered not revoked
+
+        :returns: for each certificate and chain filepaths, True if
+            revoked; False if valid or the check failed or cert is expired.
+        :rtype: dict
+
+        """
+        statuses = {cert_paths: False for cert_paths in paths}
+        if self.broken or not statuses:
+            return statuses
+
+        sessions = _SessionPool(min(len(statuses), _CHECK_MANY_WORKERS))
+        executor = futures.ThreadPoolExecutor(
+            max_workers=min(len(statuses), _CHECK_MANY_WORKERS), thread_name_prefix="ocsp")
+        pending: Dict["futures.Future[bool]", Tuple[str, str]] = {}
+        try:
+            for cert_path, chain_path in statuses:
+                future = executor.submit(self._ocsp_revoked_safely, cert_path, chain_path,
+                                         timeout, sessions)
+                pending[future] = (cert_path, chain_path)
+            done, not_done = futures.wait(pending, timeout=deadline)
+            for future in done:
+                statuses[pending[future]] = future.result()
+            if not_done:
+                logger.warning("The OCSP status of %d certificate(s) could not be determined "
+                               "within %s seconds, assuming they are not revoked.",
+                               len(not_done), deadline)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            # Queries still running past the deadline keep using their session
+            sessions.close_when_done(pending)
+        return statuses
+
+    def _ocsp_revoked_safely(self, cert_path: str, chain_path: str, timeout: int,
+                             sessions: '_SessionPool') -> bool:
+        # A failure to check one certificate shouldn't prevent reporting
+        # the status of the others.
+        try:
+            return self._ocsp_revoked_by_paths(cert_path, chain_path, timeout, sessions)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning("An error occurred determining the OCSP status of %s.",
+                           cert_path)
+            logger.debug(str(e))
+            return False
+
     def ocsp_revoked_by_paths(self, cert_path: str, chain_path: str, timeout: int = 10) -> bool:
         """Performs the OCSP revocation check
 
@@ -73,6 +175,10 @@ class RevocationChecker:
         :rtype: bool
 
         """
+        return self._ocsp_revoked_by_paths(cert_path, chain_path, timeout)
+
+    def _ocsp_revoked_by_paths(self, cert_path: str, chain_path: str, timeout: int,
+                               sessions: Optional['_SessionPool'] = None) -> bool:
         if self.broken:
             return False
 
@@ -83,13 +189,51 @@ class RevocationChecker:
         if crypto_util.notAfter(cert_path) <= now:
             return False
 
+        cached = self._cached_ocsp_response(cert_path, chain_path)
+        if cached is not None:
+            logger.debug("Using cached OCSP response for %s, certificate status is: %s",
+                         cert_path, cached.certificate_status)
+            return cached.certificate_status == ocsp.OCSPCertStatus.REVOKED
+
         url, host = _determine_ocsp_server(cert_path)
         if not host or not url:
             return False
 
         if self.use_openssl_binary:
             return self._check_ocsp_openssl_bin(cert_path, chain_path, host, url, timeout)
-        return _check_ocsp_cryptography(cert_path, chain_path, url, timeout)
+        session = sessions.get(url) if sessions else None
+        return _check_ocsp_cryptography(cert_path, chain_path, url, timeout, self._cache, session)
+
+    def cached_response(self, cert_path: str, chain_path: str) -> Optional[bytes]:
+        """Get the cached OCSP response for a certificate, if still fresh.
+
+        The returned response was validated when it was fetched and its
+        nextUpdate time hasn't passed yet, so it is suitable for OCSP
+        stapling.
+
+        :param str cert_path: Certificate filepath
+        :param str chain_path: Certificate chain
+
+        :returns: the DER encoded OCSP response, or None if no fresh
+            response is cached
+        :rtype: bytes or None
+
+        """
+        cached = self._cached_ocsp_response(cert_path, chain_path)
+        if cached is None:
+            return None
+        return cached.public_bytes(serialization.Encoding.DER)
+
+    def _cached_ocsp_response(self, cert_path: str,
+                              chain_path: str) -> Optional[ocsp.OCSPResponse]:
+        if not self._cache:
+            return None
+        try:
+            request, _ = _build_ocsp_request(cert_path, chain_path)
+        except (OSError, ValueError) as error:
+            logger.debug("Unable to build OCSP request for %s: %s", cert_path, error)
+            return None
+        return self._cache.load(request)
 
     def _check_ocsp_openssl_bin(self, cert_path: str, chain_path: str,
                                 host: str, url: str, timeout: int) -> bool:
@@ -119,14 +263,208 @@ class RevocationChecker:
                "-trust_other",
                "-timeout", str(timeout),
                "-header"] + self.host_args(host) + url_opts
+        cache = self._cache if self._cache and self._cache.prepare() else None
+        respout_path = None
+        if cache:
+            respout_path = cache.temp_path(".respout")
+            cmd += ["-respout", respout_path]
         logger.debug("Querying OCSP for %s", cert_path)
         logger.debug(" ".join(cmd))
         try:
-            output, err = util.run_script(cmd, log=logger.debug)
-        except errors.SubprocessError:
-            logger.info("OCSP check failed for %s (are we offline?)", cert_path)
+            try:
+                output, err = util.run_script(cmd, log=logger.debug)
+            except errors.SubprocessError:
+                logger.info("OCSP check failed for %s (are we offline?)", cert_path)
+                return False
+            revoked = _translate_ocsp_query(cert_path, output, err)
+            # openssl has verified the response signature against the chain,
+            # so the response it wrote out can be cached.
+            if cache and respout_path and "Response verify OK" in err:
+                cache.store_file(respout_path)
+            return revoked
+        finally:
+            if respout_path and os.path.exists(respout_path):
+                os.remove(respout_path)
+
+
+class _ResponseCache:
+    """Cache of validated OCSP responses shared by all Certbot processes.
+
+    Responses are stored in DER form, one file per certificate named
+    after the issuer key hash and the certificate serial number, and
+    are only served until their nextUpdate time. Responses are only
+    stored once their signature has been checked, so loading them
+    again doesn't repeat that work. Files are replaced atomically, so
+    concurrent Certbot processes never read a partial response.
+
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def load(self, request: ocsp.OCSPRequest) -> Optional[ocsp.OCSPResponse]:
+        """Get the cached response for a request if it is still fresh."""
+        path = os.path.join(self.directory, _cache_key(request.issuer_key_hash,
+                                                       request.serial_number))
+        try:
+            with open(path, "rb") as cache_file:
+                response = ocsp.load_der_ocsp_response(cache_file.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as error:
+            logger.debug("Ignoring unreadable cached OCSP response %s: %s", path, error)
+            return None
+
+        if (response.response_status != ocsp.OCSPResponseStatus.SUCCESSFUL
+                or response.serial_number != request.serial_number
+                or not isinstance(response.hash_algorithm, type(request.hash_algorithm))
+                or response.issuer_key_hash != request.issuer_key_hash
+                or response.issuer_name_hash != request.issuer_name_hash
+                or not _is_fresh(response)):
+            return None
+        return response
+
+    def store(self, response_der: bytes) -> None:
+        """Save a validated response, replacing any previous one.
+
+        Responses without a nextUpdate time or with an unknown
+        certificate status are not cached. Failing to write the cache
+        isn't an error, since it is only used to avoid OCSP queries.
+
+        """
+        try:
+            response = ocsp.load_der_ocsp_response(response_der)
+        except ValueError as error:
+            logger.debug("Not caching unparsable OCSP response: %s", error)
+            return
+        if (response.response_status != ocsp.OCSPResponseStatus.SUCCESSFUL
+                or response.certificate_status == ocsp.OCSPCertStatus.UNKNOWN
+                or not _is_fresh(response)):
+            return
+        if not self.prepare():
+            return
+
+        path = os.path.join(self.directory, _cache_key(response.issuer_key_hash,
+                                                       response.serial_number))
+        temp_path = self.temp_path()
+        try:
+            with os.fdopen(filesystem.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL,
+                                           0o644), "wb") as cache_file:
+                cache_file.write(response_der)
+            filesystem.replace(temp_path, path)
+        except OSError as error:
+            logger.debug("Unable to cache OCSP response in %s: %s", path, error)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def store_file(self, response_path: str) -> None:
+        """Save the validated response written at the given path."""
+        try:
+            with open(response_path, "rb") as response_file:
+                response_der = response_file.read()
+        except OSError as error:
+            logger.debug("Unable to read OCSP response %s: %s", response_path, error)
+            return
+        self.store(response_der)
+
+    def prepare(self) -> bool:
+        """Create the cache directory, returning whether it is usable."""
+        try:
+            util.make_or_verify_dir(self.directory, 0o755)
+        except (OSError, errors.Error) as error:
+            logger.debug("Unable to use OCSP cache directory %s: %s", self.directory, error)
             return False
-        return _translate_ocsp_query(cert_path, output, err)
+        return True
+
+    def temp_path(self, suffix: str = ".tmp") -> str:
+        """Path of a temporary file in the cache directory unique to this thread."""
+        return os.path.join(self.directory, ".{0}-{1}{2}".format(
+            os.getpid(), threading.get_ident(), suffix))
+
+
+class _SessionPool:
+    """HTTP sessions shared by concurrent OCSP queries, one per responder URL."""
+
+    def __init__(self, pool_size: int) -> None:
+        self._pool_size = pool_size
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> requests.Session:
+        """Get the session for an OCSP responder, creating it if needed."""
+        with self._lock:
+            session = self._sessions.get(url)
+            if session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=1,
+                                                        pool_maxsize=self._pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[url] = session
+            return session
+
+    def close(self) -> None:
+        """Close all sessions and their connections."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def close_when_done(self, queries: Iterable["futures.Future[bool]"]) -> None:
+        """Close all sessions once the queries using them are over.
+
+        Queries which were not started yet should have been cancelled.
+
+        """
+        running = [query for query in queries if not query.done()]
+        if not running:
+            self.close()
+            return
+
+        def close_after_queries() -> None:
+            futures.wait(running)
+            self.close()
+        threading.Thread(target=close_after_queries, name="ocsp-sessions", daemon=True).start()
+
+
+def _cache_key(issuer_key_hash: bytes, serial_number: int) -> str:
+    return "{0}-{1:x}.der".format(issuer_key_hash.hex(), serial_number)
+
+
+def _is_fresh(response: ocsp.OCSPResponse) -> bool:
+    """Can this response still be used without querying the responder again?"""
+    now = datetime.now(pytz.UTC).replace(tzinfo=None)
+    next_update = _update_times(response)[1]
+    return next_update is not None and now < next_update
+
+
+def _update_times(response: ocsp.OCSPResponse) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Get the thisUpdate and nextUpdate times of a response as naive UTC datetimes.
+
+    The this_update and next_update attributes were deprecated in
+    cryptography's 43.0.0 release in favor of timezone-aware ones, which
+    are used when available. This way no warning is triggered, rather than
+    changing the warning filters of the whole process while other threads
+    check responses.
+
+    """
+    if not _UTC_UPDATE_TIMES:
+        return response.this_update, response.next_update
+    this_update, next_update = response.this_update_utc, response.next_update_utc
+    return (this_update.replace(tzinfo=None) if this_update is not None else None,
+            next_update.replace(tzinfo=None) if next_update is not None else None)
+
+
+def _build_ocsp_request(cert_path: str,
+                        chain_path: str) -> Tuple[ocsp.OCSPRequest, x509.Certificate]:
+    """Build the OCSP request for a certificate, also returning its issuer."""
+    with open(chain_path, 'rb') as file_handler:
+        issuer = x509.load_pem_x509_certificate(file_handler.read(), default_backend())
+    with open(cert_path, 'rb') as file_handler:
+        cert = x509.load_pem_x509_certificate(file_handler.read(), default_backend())
+    builder = ocsp.OCSPRequestBuilder()
+    builder = builder.add_certificate(cert, issuer, hashes.SHA1())
+    return builder.build(), issuer
 
 
 def _determine_ocsp_server(cert_path: str) -> Tuple[Optional[str], Optional[str]]:
@@ -159,20 +497,17 @@ def _determine_ocsp_server(cert_path: str) -> Tuple[Optional[str], Optional[str]
     return None, None
 
 
-def _check_ocsp_cryptography(cert_path: str, chain_path: str, url: str, timeout: int) -> bool:
+def _check_ocsp_cryptography(cert_path: str, chain_path: str, url: str, timeout: int,
+                             cache: Optional[_ResponseCache] = None,
+                             session: Optional[requests.Session] = None) -> bool:
     # Retrieve OCSP response
-    with open(chain_path, 'rb') as file_handler:
-        issuer = x509.load_pem_x509_certificate(file_handler.read(), default_backend())
-    with open(cert_path, 'rb') as file_handler:
-        cert = x509.load_pem_x509_certificate(file_handler.read(), default_backend())
-    builder = ocsp.OCSPRequestBuilder()
-    builder = builder.add_certificate(cert, issuer, hashes.SHA1())
-    request = builder.build()
+    request, issuer = _build_ocsp_request(cert_path, chain_path)
     request_binary = request.public_bytes(serialization.Encoding.DER)
+    post = session.post if session else requests.post
     try:
-        response = requests.post(url, data=request_binary,
-                                 headers={'Content-Type': 'application/ocsp-request'},
-                                 timeout=timeout)
+        response = post(url, data=request_binary,
+                        headers={'Content-Type': 'application/ocsp-request'},
+                        timeout=timeout)
     except requests.exceptions.RequestException:
         logger.info("OCSP check failed for %s (are we offline?)", cert_path, exc_info=True)
         return False
@@ -203,6 +538,8 @@ def _check_ocsp_cryptography(cert_path: str, chain_path: str, url: str, timeout:
         # Check OCSP certificate status
         logger.debug("OCSP certificate status for %s is: %s",
                      cert_path, response_ocsp.certificate_status)
+        if cache:
+            cache.store(response.content)
         return response_ocsp.certificate_status == ocsp.OCSPCertStatus.REVOKED
 
     return False
@@ -236,17 +573,13 @@ def _check_ocsp_response(response_ocsp: 'ocsp.OCSPResponse', request_ocsp: 'ocsp
     # https://github.com/openssl/openssl/blob/ef45aa14c5af024fcb8bef1c9007f3d1c115bd85/crypto/ocsp/ocsp_cl.c#L338-L391
     # thisUpdate/nextUpdate are expressed in UTC/GMT time zone
     now = datetime.now(pytz.UTC).replace(tzinfo=None)
-    # The this_update and next_update attributes were deprecated in cryptography's 43.0.0 release.
-    # Updating the code and tests to (also) work with the new API is being tracked in
-    # https://github.com/certbot/certbot/issues/10053.
-    with warnings.catch_warnings():
-        warnings.filterwarnings('ignore', message='Properties that return.*datetime object')
-        if not response_ocsp.this_update:
-            raise AssertionError('param thisUpdate is not set.')
-        if response_ocsp.this_update > now + timedelta(minutes=5):
-            raise AssertionError('param thisUpdate is in the future.')
-        if response_ocsp.next_update and response_ocsp.next_update < now - timedelta(minutes=5):
-            raise AssertionError('param nextUpdate is in the past.')
+    this_update, next_update = _update_times(response_ocsp)
+    if not this_update:
+        raise AssertionError('param thisUpdate is not set.')
+    if this_update > now + timedelta(minutes=5):
+        raise AssertionError('param thisUpdate is in the future.')
+    if next_update and next_update < now - timedelta(minutes=5):
+        raise AssertionError('param nextUpdate is in the past.')
 
 
 def _check_ocsp_response_signature(response_ocsp: 'ocsp.OCSPResponse',
@@ -1,13 +1,25 @@
 """Common code for DNS Authenticator Plugins."""
 import abc
+import hashlib
+import json
 import logging
+import tempfile
+import threading
+from time import monotonic
 from time import sleep
+from time import time
 from typing import Callable
+from typing import Dict
 from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Mapping
 from typing import Optional
+from typing import Sequence
+from typing import Set
+from typing import Tuple
 from typing import Type
+from typing import TypeVar
 
 import configobj
 
@@ -22,14 +34,28 @@ from certbot.display import ops
 from certbot.display import util as display_util
 from certbot.plugins import common
 
+# dnspython is not declared as a dependency in Certbot itself, but only
+# in the plugins using it. It is only needed to check DNS propagation.
+try:
+    import dns.exception
+    import dns.message
+    import dns.name
+    import dns.query
+    import dns.rdatatype
+    import dns.resolver
+except ImportError:  # pragma: no cover
+    dns = None  # type: ignore
+
 logger = logging.getLogger(__name__)
 
+_Key = TypeVar('_Key')
+
 
 # As of writing this, the only one of our plugins that does not inherit from this class (either
 # directly or indirectly through certbot.plugins.dns_common_lexicon.LexiconDNSAuthenticator) is
 # certbot-dns-route53. If you are attempting to make changes to all of our DNS plugins, please keep
 # this difference in mind.
-class DNSAuthenticator(common.Plugin, interfaces.Authenticator, metaclass=abc.ABCMeta):
+class DNSAuthenticator(common.Plugin, interfaces.StreamingAuthenticator, metaclass=abc.ABCMeta):
     """Base class for DNS Authenticators"""
 
     def __init__(self, config: configuration.NamespaceConfig, name: str) -> None:
@@ -45,6 +71,13 @@ class DNSAuthenticator(common.Plugin, interfaces.Authenticator, metaclass=abc.AB
             type=int,
             help='The number of seconds to wait for DNS to propagate before asking the ACME server '
                  'to verify the DNS record.')
+        add('check-propagation',
+            action='store_true',
+            default=False,
+            help='Instead of always waiting for the propagation seconds, query the '
+                 'authoritative nameservers of each zone until they all serve the DNS record, '
+                 'waiting at most the propagation seconds. Requires dnspython, without '
+                 'which the propagation seconds are always waited.')
 
     def auth_hint(self, failed_achalls: List[achallenges.AnnotatedChallenge]) -> str:
         """See certbot.plugins.common.Plugin.auth_hint."""
@@ -65,20 +98,29 @@ class DNSAuthenticator(common.Plugin, interfaces.Authenticator, metaclass=abc.AB
     def more_info(self) -> str:  # pylint: disable=missing-function-docstring
         raise NotImplementedError()
 
-    def perform(self, achalls: List[achallenges.AnnotatedChallenge]
-                ) -> List[challenges.ChallengeResponse]: # pylint: disable=missing-function-docstring
+    def perform_iter(self, achalls: List[achallenges.AnnotatedChallenge]
+                     ) -> Iterator[Tuple[achallenges.AnnotatedChallenge,
+                                         challenges.ChallengeResponse]]:  # pylint: disable=missing-function-docstring
         self._setup_credentials()
 
         self._attempt_cleanup = True
 
-        responses = []
-        for achall in achalls:
-            domain = achall.domain
-            validation_domain_name = achall.validation_domain_name(domain)
-            validation = achall.validation(achall.account_key)
+        # Configurations of plugins unaware of this option may hold any value
+        check_propagation = self.conf('check-propagation') is True
+        if check_propagation and dns is None:
+            logger.warning('Checking DNS propagation requires dnspython, which is not '
+                           'installed. Waiting --%s instead.',
+                           self.option_name('propagation-seconds'))
+            check_propagation = False
 
-            self._perform(domain, validation_domain_name, validation)
-            responses.append(achall.response(achall.account_key))
+        records = _txt_records(achalls)
+        self._perform_batch(records)
+
+        if check_propagation:
+            yield from self._wait_for_propagation(
+                achalls, {index: (validation_domain_name, validation)
+                          for index, (_, validation_domain_name, validation) in enumerate(records)})
+            return
 
         # DNS updates take time to propagate and checking to see if the update has occurred is not
         # reliable (the machine this code is running on might be able to see an update before
@@ -87,16 +129,35 @@ class DNSAuthenticator(common.Plugin, interfaces.Authenticator, metaclass=abc.AB
                     self.conf('propagation-seconds'))
         sleep(self.conf('propagation-seconds'))
 
-        return responses
+        for achall in achalls:
+            yield achall, achall.response(achall.account_key)
+
+    def _wait_for_propagation(self, achalls: List[achallenges.AnnotatedChallenge],
+                              records: Dict[int, Tuple[str, str]]
+                              ) -> Iterator[Tuple[achallenges.AnnotatedChallenge,
+                                                  challenges.ChallengeResponse]]:
+        """Yield each challenge once all authoritative nameservers serve its record.
+
+        Challenges whose record isn't served everywhere within the
+        propagation seconds are yielded once they have elapsed.
+
+        """
+        timeout = self.conf('propagation-seconds')
+        display_util.notify("Waiting up to %d seconds for DNS changes to propagate" % timeout)
+        pending = set(records)
+        for index in PropagationChecker().wait(records, timeout):
+            pending.discard(index)
+            yield achalls[index], achalls[index].response(achalls[index].account_key)
+        if pending:
+            logger.info("Not all authoritative nameservers serve the DNS TXT records for %s "
+                        "after %d seconds",
+                        ", ".join(achalls[index].domain for index in sorted(pending)), timeout)
+        for index in sorted(pending):
+            yield achalls[index], achalls[index].response(achalls[index].account_key)
 
     def cleanup(self, achalls: List[achallenges.AnnotatedChallenge]) -> None:  # pylint: disable=missing-function-docstring
         if self._attempt_cleanup:
-            for achall in achalls:
-                domain = achall.domain
-                validation_domain_name = achall.validation_domain_name(domain)
-                validation = achall.validation(achall.account_key)
-
-                self._cleanup(domain, validation_domain_name, validation)
+            self._cleanup_batch(_txt_records(achalls))
 
     @abc.abstractmethod
     def _setup_credentials(self) -> None:  # pragma: no cover
@@ -132,6 +193,34 @@ class DNSAuthenticator(common.Plugin, interfaces.Authenticator, metaclass=abc.AB
         """
         raise NotImplementedError()
 
+    def _perform_batch(self, records: List[Tuple[str, str, str]]) -> None:
+        """
+        Performs dns-01 challenges by creating DNS TXT records.
+
+        Plugins able to create several records at once, for instance with a
+        single request per zone, should override this method. By default,
+        `_perform` is called for each record.
+
+        :param list records: The domain, validation record domain name and
+            validation record content of each record.
+        :raises errors.PluginError: If the challenges cannot be performed
+        """
+        for domain, validation_domain_name, validation in records:
+            self._perform(domain, validation_domain_name, validation)
+
+    def _cleanup_batch(self, records: List[Tuple[str, str, str]]) -> None:
+        """
+        Deletes the DNS TXT records which would have been created by `_perform_batch`.
+
+        Plugins able to delete several records at once should override this
+        method. By default, `_cleanup` is called for each record.
+
+        :param list records: The domain, validation record domain name and
+            validation record content of each record.
+        """
+        for domain, validation_domain_name, validation in records:
+            self._cleanup(domain, validation_domain_name, validation)
+
     def _configure(self, key: str, label: str) -> None:
         """
         Ensure that a configuration value is available.
@@ -262,6 +351,299 @@ class DNSAuthenticator(common.Plugin, interfaces.Authenticator, metaclass=abc.AB
         raise errors.PluginError('{0} required to proceed.'.format(label))
 
 
+def _txt_records(achalls: Iterable[achallenges.AnnotatedChallenge]
+                 ) -> List[Tuple[str, str, str]]:
+    """The domain, validation record name and validation of each challenge."""
+    return [(achall.domain, achall.validation_domain_name(achall.domain),
+             achall.validation(achall.account_key)) for achall in achalls]
+
+
+class PropagationChecker:
+    """Checks that DNS TXT records are served by the authoritative nameservers.
+
+    The zone of each record and the addresses of its authoritative
+    nameservers are found with a recursive resolver. Each of these
+    nameservers is then queried directly, so that caches along the way
+    don't matter. A record is propagated once every nameserver of its
+    zone serves its value. Nameservers are queried again, with an
+    exponential backoff, until all records are propagated.
+
+    :param dns.resolver.Resolver resolver: resolver used to find zones and
+        nameservers, the system resolver by default
+    :param int port: port on which the authoritative nameservers are queried
+    :param float query_timeout: seconds to wait for the answer of a nameserver
+    :param float initial_delay: seconds to wait before querying again
+    :param float max_delay: maximum number of seconds between queries
+
+    :raises errors.PluginError: if dnspython is not installed
+
+    """
+
+    def __init__(self, resolver: Optional['dns.resolver.Resolver'] = None, port: int = 53,
+                 query_timeout: float = 2.0, initial_delay: float = 0.5,
+                 max_delay: float = 8.0) -> None:
+        if dns is None:  # pragma: no cover
+            raise errors.PluginError('Checking DNS propagation requires dnspython.')
+        self._resolver = resolver if resolver is not None else dns.resolver.Resolver()
+        self._port = port
+        self._query_timeout = query_timeout
+        self._initial_delay = initial_delay
+        self._max_delay = max_delay
+        self._zones: Dict[str, str] = {}
+        self._nameservers: Dict[str, List[str]] = {}
+
+    def wait(self, records: Mapping[_Key, Tuple[str, str]], timeout: float) -> Iterator[_Key]:
+        """Wait until the records are propagated.
+
+        :param dict records: the name and expected value of each TXT record
+        :param float timeout: maximum number of seconds to wait
+
+        :returns: the key of each record, as soon as it is propagated.
+            Records that are still not propagated after `timeout` seconds
+            are left out.
+        :rtype: `collections.Iterator`
+
+        """
+        deadline = monotonic() + timeout
+        pending = dict(records)
+        delay = self._initial_delay
+        while pending:
+            values = {name: self._served_values(name)
+                      for name in {name for name, _ in pending.values()}}
+            for key, (name, value) in list(pending.items()):
+                if value in values[name]:
+                    del pending[key]
+                    yield key
+            remaining = deadline - monotonic()
+            if not pending or remaining <= 0:
+                return
+            sleep(min(delay, remaining))
+            delay = min(delay * 2, self._max_delay)
+
+    def _served_values(self, name: str) -> Set[str]:
+        """The TXT values of `name` served by all its authoritative nameservers."""
+        nameservers = self._authoritative_nameservers(name)
+        query = dns.message.make_query(name, dns.rdatatype.TXT)
+        served: Optional[Set[str]] = None
+        for nameserver in nameservers:
+            try:
+                response, _ = dns.query.udp_with_fallback(
+                    query, nameserver, timeout=self._query_timeout, port=self._port)
+            except (dns.exception.DNSException, OSError) as error:
+                logger.debug("Unable to query %s for %s: %s", nameserver, name, error)
+                return set()
+            values = {b''.join(rdata.strings).decode('utf-8', 'replace')
+                      for rrset in response.answer if rrset.rdtype == dns.rdatatype.TXT
+                      for rdata in rrset}
+            served = values if served is None else served & values
+        return served or set()
+
+    def _authoritative_nameservers(self, name: str) -> List[str]:
+        """Addresses of the authoritative nameservers of the zone of `name`."""
+        zone = self._zones.get(name)
+        if zone is None:
+            try:
+                zone = dns.resolver.zone_for_name(name, resolver=self._resolver).to_text()
+            except dns.exception.DNSException as error:
+                logger.debug("Unable to find the zone of %s: %s", name, error)
+                return []
+            self._zones[name] = zone
+        if zone not in self._nameservers:
+            addresses: List[str] = []
+            try:
+                targets = [ns.to_text() for ns in self._resolver.resolve(zone, dns.rdatatype.NS)]
+            except dns.exception.DNSException as error:
+                logger.debug("Unable to find the nameservers of %s: %s", zone, error)
+                targets = []
+            for target in targets:
+                for rdtype in (dns.rdatatype.A, dns.rdatatype.AAAA):
+                    try:
+                        addresses.extend(rdata.to_text()
+                                         for rdata in self._resolver.resolve(target, rdtype))
+                    except dns.exception.DNSException:
+                        logger.debug("No %s record for nameserver %s", rdtype.name, target)
+            logger.debug("Authoritative nameservers of %s: %s", zone, addresses)
+            if not addresses:
+                return []
+            self._nameservers[zone] = addresses
+        return self._nameservers[zone]
+
+
+ZONE_CACHE_FILE = 'dns-zones.json'
+"""Name of the file caching the zones found by DNS plugins, in the work directory."""
+
+ZONE_CACHE_TTL = 7 * 24 * 60 * 60
+"""Number of seconds during which a zone found by a DNS plugin is reused."""
+
+_ZONE_CACHE_VERSION = 1
+
+
+def zone_cache(config: configuration.NamespaceConfig, provider: str,
+               credentials: Sequence[Optional[str]]) -> 'ZoneCache':
+    """The zone cache of a DNS provider account in Certbot's work directory.
+
+    :param certbot.configuration.NamespaceConfig config: Certbot configuration
+    :param str provider: name of the DNS plugin or provider
+    :param credentials: values identifying the account, e.g. an API token,
+        of which only a hash is kept
+
+    :returns: the zone cache
+    :rtype: ZoneCache
+
+    """
+    return ZoneCache(os.path.join(config.work_dir, ZONE_CACHE_FILE), provider, credentials)
+
+
+def forget_zones(config: configuration.NamespaceConfig, names: Iterable[str]) -> None:
+    """Forget the zones of domain names cached by any DNS plugin.
+
+    :param certbot.configuration.NamespaceConfig config: Certbot configuration
+    :param names: the domain names, e.g. those whose validation failed
+
+    """
+    _zone_store(os.path.join(config.work_dir, ZONE_CACHE_FILE)).discard_all(names)
+
+
+class ZoneCache:
+    """Zones found by a DNS plugin for one account.
+
+    Finding the zone of a domain name usually takes several requests to
+    the DNS provider. Zones found are shared with all plugins using the
+    same cache file, provider and credentials during a run, and saved in
+    the cache file for later runs until they expire.
+
+    :param str path: path of the cache file, or None to only keep zones in memory
+    :param str provider: name of the DNS plugin or provider
+    :param credentials: values identifying the account, e.g. an API token,
+        of which only a hash is kept
+    :param float ttl: number of seconds during which a zone found is reused
+
+    """
+
+    def __init__(self, path: Optional[str], provider: str, credentials: Sequence[Optional[str]],
+                 ttl: float = ZONE_CACHE_TTL) -> None:
+        self._store = _zone_store(path)
+        digest = hashlib.sha256(
+            '\0'.join(value or '' for value in credentials).encode('utf-8')).hexdigest()
+        self._key = '{0}:{1}'.format(provider, digest)
+        self._ttl = ttl
+
+    def find(self, name: str, discover: Callable[[str], str]) -> str:
+        """Find the zone of a domain name, unless it is already known.
+
+        :param str name: the domain name
+        :param callable discover: function finding the zone of a domain name
+            with the DNS provider, only called if the zone isn't cached
+
+        :returns: the zone, as returned by `discover`
+        :rtype: str
+
+        :raises errors.PluginError: if `discover` raises it
+
+        """
+        zone = self._store.get(self._key, name)
+        if zone is not None:
+            logger.debug('Using cached zone %s for %s', zone, name)
+            return zone
+        zone = discover(name)
+        self._store.set(self._key, name, zone, time() + self._ttl)
+        return zone
+
+    def forget(self, name: str) -> None:
+        """Forget the zone of a domain name, e.g. because using it failed."""
+        self._store.discard(self._key, name)
+
+
+class _ZoneStore:
+    """Zones of all cache keys, read from and written to a cache file."""
+
+    def __init__(self, path: Optional[str]) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        # Zone and expiration time of each domain name, by cache key
+        self._zones: Optional[Dict[str, Dict[str, Tuple[str, float]]]] = None
+
+    def get(self, key: str, name: str) -> Optional[str]:
+        """The zone of a domain name, or None if it isn't cached or expired."""
+        with self._lock:
+            entry = self._read().get(key, {}).get(name)
+        if entry is None or entry[1] <= time():
+            return None
+        return entry[0]
+
+    def set(self, key: str, name: str, zone: str, expires: float) -> None:
+        """Cache the zone of a domain name until it expires."""
+        with self._lock:
+            self._read().setdefault(key, {})[name] = (zone, expires)
+            self._write()
+
+    def discard(self, key: str, name: str) -> None:
+        """Remove the zone of a domain name from the cache."""
+        with self._lock:
+            if self._read().get(key, {}).pop(name, None) is not None:
+                self._write()
+
+    def discard_all(self, names: Iterable[str]) -> None:
+        """Remove the zones of domain names from the cache, for all cache keys."""
+        with self._lock:
+            removed = [zones.pop(name, None) for zones in self._read().values()
+                       for name in set(names)]
+            if any(zone is not None for zone in removed):
+                self._write()
+
+    def _read(self) -> Dict[str, Dict[str, Tuple[str, float]]]:
+        if self._zones is not None:
+            return self._zones
+        self._zones = {}
+        if self.path is None:
+            return self._zones
+        try:
+            with open(self.path) as cache_file:
+                cache = json.load(cache_file)
+            if cache.get('version') == _ZONE_CACHE_VERSION:
+                now = time()
+                for key, names in cache['zones'].items():
+                    self._zones[key] = {name: (str(zone), float(expires))
+                                        for name, (zone, expires) in names.items()
+                                        if expires > now}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as error:
+            logger.debug('Ignoring unreadable zone cache %s: %s', self.path, error)
+            self._zones = {}
+        return self._zones
+
+    def _write(self) -> None:
+        if self.path is None:
+            return
+        cache = {'version': _ZONE_CACHE_VERSION, 'zones': self._zones}
+        temp_path = None
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path),
+                                             prefix=os.path.basename(self.path) + '.',
+                                             suffix='.tmp')
+            with os.fdopen(fd, 'w') as cache_file:
+                json.dump(cache, cache_file)
+            filesystem.chmod(temp_path, 0o600)
+            filesystem.replace(temp_path, self.path)
+        except OSError as error:
+            logger.debug('Unable to write zone cache %s: %s', self.path, error)
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+_zone_stores: Dict[Optional[str], _ZoneStore] = {}
+_zone_stores_lock = threading.Lock()
+
+
+def _zone_store(path: Optional[str]) -> _ZoneStore:
+    """The zone store of a cache file, shared by all caches using it."""
+    with _zone_stores_lock:
+        if path not in _zone_stores:
+            _zone_stores[path] = _ZoneStore(path)
+        return _zone_stores[path]
+
+
 class CredentialsConfiguration:
     """Represents a user-supplied filed which stores API credentials."""
 
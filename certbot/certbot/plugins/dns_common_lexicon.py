@@ -224,6 +224,8 @@ class LexiconDNSAuthenticator(dns_common.DNSAuthenticator):
                 operations.create_record(rtype='TXT', name=validation_name, content=validation)
         except RequestException as e:
             logger.debug('Encountered error adding TXT record: %s', e, exc_info=True)
+            # The zone may have changed since it was cached
+            self._zone_cache().forget(domain)
             raise errors.PluginError('Error adding TXT record: {0}'.format(e))
 
     def _cleanup(self, domain: str, validation_name: str, validation: str) -> None:
@@ -240,7 +242,17 @@ class LexiconDNSAuthenticator(dns_common.DNSAuthenticator):
         except RequestException as e:
             logger.debug('Encountered error deleting TXT record: %s', e, exc_info=True)
 
+    def _zone_cache(self) -> dns_common.ZoneCache:
+        if not hasattr(self, '_credentials'):  # pragma: no cover
+            self._setup_credentials()
+        return dns_common.zone_cache(self.config, self.name,
+                                     [self._credentials.conf(item[0])
+                                      for item in self._provider_options])
+
     def _resolve_domain(self, domain: str) -> str:
+        return self._zone_cache().find(domain, self._discover_domain)
+
+    def _discover_domain(self, domain: str) -> str:
         domain_name_guesses = dns_common.base_domain_name_guesses(domain)
 
         for domain_name in domain_name_guesses:
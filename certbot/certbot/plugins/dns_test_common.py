@@ -53,6 +53,14 @@ class BaseAuthenticatorTest:
     achall = achallenges.KeyAuthorizationAnnotatedChallenge(
         challb=acme_util.DNS01, domain=DOMAIN, account_key=KEY)
 
+    def setUp(self) -> None:
+        """Look zones up with the DNS provider instead of the zone cache."""
+        super().setUp()  # type: ignore[misc]  # pylint: disable=no-member
+        zone_cache_patcher = mock.patch('certbot.plugins.dns_common.zone_cache',
+                                        return_value=uncached_zones())
+        zone_cache_patcher.start()
+        self.addCleanup(zone_cache_patcher.stop)  # type: ignore[attr-defined]  # pylint: disable=no-member
+
     def test_more_info(self: _AuthenticatorCallableTestCase) -> None:
         self.assertTrue(isinstance(self.auth.more_info(), str))  # pylint: disable=no-member
 
@@ -66,6 +74,17 @@ class BaseAuthenticatorTest:
         m.assert_any_call('propagation-seconds', type=int, default=mock.ANY, help=mock.ANY)
 
 
+def uncached_zones() -> mock.MagicMock:
+    """A stand-in for a `.ZoneCache` always looking up zones.
+
+    :returns: a mock whose `find` method calls `discover`
+    :rtype: mock.MagicMock
+    """
+    zone_cache = mock.MagicMock()
+    zone_cache.find.side_effect = lambda name, discover: discover(name)
+    return zone_cache
+
+
 def write(values: Mapping[str, Any], path: str) -> None:
     """Write the specified values to a config file.
 
@@ -219,6 +219,20 @@ class BaseLexiconDNSAuthenticatorTest(dns_test_common.BaseAuthenticatorTest):
         mock_operations.create_record.assert_called_with(
             rtype='TXT', name=f'_acme-challenge.{DOMAIN}', content=mock.ANY)
 
+    def test_perform_with_zone_cache(self: _BaseLexiconDNSAuthenticatorTestProto) -> None:
+        zone_cache = mock.MagicMock()
+        zone_cache.find.side_effect = lambda name, discover: discover(name)
+        with test_util.patch_display_util():
+            with _patch_lexicon_client() as (_, mock_operations):
+                with mock.patch('certbot.plugins.dns_common.zone_cache',
+                                return_value=zone_cache):
+                    self.auth.perform([self.achall])
+                    zone_cache.find.assert_called_once_with(DOMAIN, mock.ANY)
+
+                    mock_operations.create_record.side_effect = self.GENERIC_ERROR
+                    self.assertRaises(errors.PluginError, self.auth.perform, [self.achall])
+                    zone_cache.forget.assert_called_once_with(DOMAIN)
+
     def test_perform_with_one_domain_resolution_failure_succeed(
             self: _BaseLexiconDNSAuthenticatorTestProto) -> None:
         with test_util.patch_display_util():
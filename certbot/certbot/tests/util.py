@@ -376,6 +376,7 @@ class TempDirTestCase(unittest.TestCase):
 
     def setUp(self) -> None:
         """Execute before test"""
+        super().setUp()
         self.tempdir = tempfile.mkdtemp()
 
     def tearDown(self) -> None: